@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 from flask import Flask
+from app.api import init_api
 from app.config.secrets import SecureConfig
 from app.dash.charts import create_dash_app
+from app.dash.serialization import configure_fast_json
 
 
 # Make dash_app available at package level
@@ -16,6 +18,7 @@ def create_app(config_class=SecureConfig) -> Flask:
 
     app = Flask(__name__)
     app.config.from_object(config_class)
+    configure_fast_json(app)
 
     # Initialize Dash app
     dash_app = create_dash_app()
@@ -25,5 +28,6 @@ def create_app(config_class=SecureConfig) -> Flask:
     from app.routes import init_routes
 
     init_routes(app)
+    init_api(app)
 
     return app
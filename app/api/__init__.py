@@ -0,0 +1,12 @@
+"""HTTP API serving cached series data."""
+
+from __future__ import annotations
+
+from flask import Flask
+
+from .routes import bp
+
+
+def init_api(app: Flask) -> None:
+    """Register the API blueprint on ``app``."""
+    app.register_blueprint(bp)
@@ -0,0 +1,227 @@
+"""ASGI application serving the data API asynchronously.
+
+Under WSGI every request holds a worker thread, including while it waits on
+a slow FRED fetch or keeps a price stream open.  This app serves the
+``/api`` routes with async handlers on
+:class:`~app.data.async_fred.AsyncFREDClient` and the price stream from
+:meth:`PricePoller.asubscribe <app.api.prices.PricePoller.asubscribe>`, so
+waiting clients only cost a coroutine, and mounts the existing Flask/Dash
+application through a WSGI bridge for everything else.  Responses are
+identical to the Flask routes in ``routes.py``; both build them from
+``series.py`` and ``prices.py``.
+
+Run with an ASGI server, e.g. ``uvicorn asgi:app``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from typing import Callable, Optional
+import logging
+
+from ..data.async_fred import AsyncFREDClient
+from ..data.fetch_queue import FetchQueue
+from .export import CHUNK_SIZE, EXPORT_FORMATS, MAX_EXPORT_SERIES, stream_csv, stream_ndjson
+from .prices import StreamFull, get_price_poller
+from .series import (
+    FORMATS,
+    QueryError,
+    SeriesQuery,
+    choose_encoding,
+    compress,
+    compute_etag,
+    is_not_modified,
+    load_flags,
+    parse_query,
+    queue_uncached,
+    render,
+    shape_frame,
+    validator_headers,
+)
+
+try:
+    from a2wsgi import WSGIMiddleware
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse, Response, StreamingResponse
+    from starlette.routing import Mount, Route
+    STARLETTE_AVAILABLE = True
+except ImportError:
+    STARLETTE_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def _error(message: str, status: int, **extra) -> "JSONResponse":
+    """Return a JSON error response."""
+    return JSONResponse({"error": message, **extra}, status_code=status)
+
+
+def _ids_param(request) -> list[str]:
+    """Read series IDs from repeated or comma-separated ``ids`` parameters."""
+    return [sid for value in request.query_params.getlist("ids") for sid in value.split(",")]
+
+
+async def _cached_versions(client: AsyncFREDClient,
+                           series_ids: list[str]) -> tuple[dict[str, str], list[str]]:
+    """Refresh the cached series that are stale; return their versions and
+    the uncached IDs, which are left to the fetch queue."""
+    versions = await client.get_series_versions(series_ids)
+    await client.ensure_cached([series_id for series_id in series_ids if series_id in versions])
+    versions = await client.get_series_versions(series_ids)
+    return versions, [series_id for series_id in series_ids if series_id not in versions]
+
+
+def _uncached_error(request, series_ids: list[str]) -> "JSONResponse":
+    """Queue uncached series and return the 202, 404 or 503 response."""
+    message, status, extra, headers = queue_uncached(request.app.state.fetch_queue, series_ids)
+    response = _error(message, status, **extra)
+    response.headers.update(headers)
+    return response
+
+
+def _render_body(frame, query: SeriesQuery, flags,
+                 accept_encoding: str) -> tuple[bytes, Optional[str]]:
+    """Render and compress a response body (CPU-bound; run off the loop)."""
+    return compress(render(shape_frame(frame, query, flags), query),
+                    choose_encoding(accept_encoding))
+
+
+async def _series_response(request, series_ids: list[str]):
+    """Serve one or more series, honouring conditional request headers."""
+    try:
+        query = parse_query(series_ids, request.query_params)
+    except QueryError as e:
+        return _error(str(e), 400)
+
+    client: AsyncFREDClient = request.app.state.fred
+    ids = list(query.series_ids)
+    versions, missing = await _cached_versions(client, ids)
+    if missing:
+        return _uncached_error(request, missing)
+
+    etag = compute_etag(query, versions)
+    last_modified = await client.get_last_modified(ids)
+    headers = validator_headers(etag, last_modified)
+    if is_not_modified(etag, last_modified, request.headers.get("if-none-match"),
+                       request.headers.get("if-modified-since")):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        frame = await client.get_multiple_series(ids, start_date=query.start,
+                                                 end_date=query.end)
+        flags = await asyncio.to_thread(load_flags, client.miner, query)
+    except Exception as e:
+        logger.error(f"Failed to load {', '.join(ids)}: {e}")
+        return _error("failed to load series", 502)
+
+    body, encoding = await asyncio.to_thread(
+        _render_body, frame, query, flags, request.headers.get("accept-encoding", ""))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    if query.fmt == "csv":
+        name = ids[0] if len(ids) == 1 else "series"
+        headers["Content-Disposition"] = f'attachment; filename="{name}.csv"'
+    return Response(body, media_type=query.mimetype, headers=headers)
+
+
+async def series(request):
+    """Return a single series (see ``routes.series``)."""
+    return await _series_response(request, [request.path_params["series_id"]])
+
+
+async def series_batch(request):
+    """Return several series on a common date index (see ``routes.series_batch``)."""
+    return await _series_response(request, _ids_param(request))
+
+
+async def export(request):
+    """Stream many series as CSV or NDJSON (see ``routes.export``)."""
+    try:
+        query = parse_query(_ids_param(request), request.query_params,
+                            formats=EXPORT_FORMATS, max_series=MAX_EXPORT_SERIES)
+    except QueryError as e:
+        return _error(str(e), 400)
+    if query.freq:
+        return _error("resampling is not supported for streaming exports", 400)
+
+    client: AsyncFREDClient = request.app.state.fred
+    ids = list(query.series_ids)
+    _, missing = await _cached_versions(client, ids)
+    if missing:
+        return _uncached_error(request, missing)
+
+    # The generator blocks on SQLite, so Starlette iterates it in a thread.
+    chunks = client.miner.iter_observations(ids, query.start, query.end, chunk_size=CHUNK_SIZE)
+    stream = stream_csv if query.fmt == "csv" else stream_ndjson
+    return StreamingResponse(
+        stream(chunks, ids), media_type=FORMATS[query.fmt],
+        headers={"Content-Disposition": f'attachment; filename="export.{query.fmt}"'},
+    )
+
+
+async def price_stream(request):
+    """Stream live price updates as Server-Sent Events (see ``routes.price_stream``).
+
+    Served natively rather than through the WSGI bridge, so an open stream
+    waits on the event loop instead of holding a worker thread.
+    """
+    last_event_id = (request.headers.get("last-event-id")
+                     or request.query_params.get("lastEventId"))
+    try:
+        events = get_price_poller().asubscribe(last_event_id)
+    except StreamFull as e:
+        response = _error(str(e), 503)
+        response.headers["Retry-After"] = "30"
+        return response
+    return StreamingResponse(events, media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        # Stop reverse proxies from buffering the stream.
+        "X-Accel-Buffering": "no",
+    })
+
+
+def create_asgi_app(flask_app=None,
+                    client_factory: Optional[Callable[[], AsyncFREDClient]] = None):
+    """Create the ASGI application.
+
+    Parameters
+    ----------
+    flask_app : flask.Flask, optional
+        WSGI application mounted at ``/`` for everything outside the async
+        API routes; defaults to ``create_app()``
+    client_factory : Callable[[], AsyncFREDClient], optional
+        Builds the async FRED client when the server starts; defaults to one
+        backed by the process-wide :class:`FREDDataMiner`
+
+    Returns
+    -------
+    starlette.applications.Starlette
+    """
+    if not STARLETTE_AVAILABLE:
+        raise ImportError("starlette and a2wsgi are required for ASGI serving. "
+                          "Run: pip install starlette a2wsgi")
+    if flask_app is None:
+        from app import create_app
+        flask_app = create_app()
+    client_factory = client_factory or AsyncFREDClient
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        app.state.fred = client_factory()
+        app.state.fetch_queue = FetchQueue(app.state.fred.miner)
+        try:
+            yield
+        finally:
+            await app.state.fred.aclose()
+
+    return Starlette(
+        routes=[
+            Route("/api/series/{series_id}", series),
+            Route("/api/series", series_batch),
+            Route("/api/export", export),
+            Route("/api/prices/stream", price_stream),
+            Mount("/", app=WSGIMiddleware(flask_app)),
+        ],
+        lifespan=lifespan,
+    )
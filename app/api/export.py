@@ -0,0 +1,93 @@
+"""Streaming CSV and NDJSON export of cached series.
+
+Exports are generated row by row from ``FREDDataMiner.iter_observations``,
+which reads ``series_data`` through a cursor in ordered chunks.  Each date
+is written as soon as all of its observations have been read, so the
+response starts immediately and memory stays flat regardless of how many
+series or observations are exported.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+from typing import Iterable, Iterator, Optional
+
+from ..dash.serialization import dumps
+
+EXPORT_FORMATS = ("csv", "ndjson")
+
+# Exports may cover far more series than the buffered endpoints
+MAX_EXPORT_SERIES = 1000
+
+# Rows read from the cache per chunk
+CHUNK_SIZE = 10000
+
+
+def iter_rows(chunks: Iterable[list[tuple[str, str, float]]],
+              series_ids: list[str]) -> Iterator[tuple[str, list[Optional[float]]]]:
+    """Turn date-ordered long rows into wide rows.
+
+    Parameters
+    ----------
+    chunks : Iterable[list[tuple[str, str, float]]]
+        ``(date, series_id, value)`` rows ordered by date, in chunks
+    series_ids : list[str]
+        Column order of the wide rows
+
+    Yields
+    ------
+    tuple[str, list[float or None]]
+        Date and one value per series (None where a series has no
+        observation on that date)
+    """
+    position = {series_id: i for i, series_id in enumerate(series_ids)}
+    current_date = None
+    values: list[Optional[float]] = []
+    for chunk in chunks:
+        for date, series_id, value in chunk:
+            if date != current_date:
+                if current_date is not None:
+                    yield current_date, values
+                current_date = date
+                values = [None] * len(series_ids)
+            values[position[series_id]] = value
+    if current_date is not None:
+        yield current_date, values
+
+
+def stream_csv(chunks: Iterable[list[tuple[str, str, float]]],
+               series_ids: list[str]) -> Iterator[str]:
+    """Yield a wide CSV document (``date`` plus one column per series)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(["date", *series_ids])
+    yield buffer.getvalue()
+    for chunk in _batched(iter_rows(chunks, series_ids)):
+        buffer.seek(0)
+        buffer.truncate()
+        for date, values in chunk:
+            writer.writerow([date, *("" if v is None else repr(v) for v in values)])
+        yield buffer.getvalue()
+
+
+def stream_ndjson(chunks: Iterable[list[tuple[str, str, float]]],
+                  series_ids: list[str]) -> Iterator[str]:
+    """Yield one JSON object per date: ``{"date": ..., "<series>": value}``."""
+    for chunk in _batched(iter_rows(chunks, series_ids)):
+        yield "".join(
+            dumps({"date": date, **dict(zip(series_ids, values))}) + "\n"
+            for date, values in chunk
+        )
+
+
+def _batched(rows: Iterator, size: int = 1000) -> Iterator[list]:
+    """Group rows so each yielded body piece is a reasonable size."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,307 @@
+"""Live price stream delivered to browsers with Server-Sent Events.
+
+A single :class:`PricePoller` thread fetches quotes for a configured set of
+symbols once per interval, however many browsers are watching, so upstream
+API usage does not grow with the audience.  Each poll that changes any quote
+appends an ``update`` event holding only the changed symbols to a bounded
+history; every connected client follows that history with its own cursor.
+
+* Reconnecting clients send ``Last-Event-ID`` and are replayed the events
+  they missed, as long as those are still in the history.
+* Clients that cannot be resumed (first connect, server restart, or too far
+  behind) receive a full ``snapshot`` event instead.
+* Slow clients never queue events in memory: a client whose writes block
+  simply falls behind the shared history and is caught up with one
+  snapshot, and the number of concurrent streams is capped.
+* The poller idles while nobody is connected.
+
+Streams are served to WSGI workers with :meth:`PricePoller.subscribe`, a
+blocking iterator, and to the ASGI app with :meth:`PricePoller.asubscribe`,
+an async iterator that waits on the event loop, so an open stream costs a
+coroutine rather than a thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Callable, Iterator, Optional
+import logging
+
+from ..config.secrets import get_config
+from ..dash.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+Quotes = dict[str, dict[str, float]]
+
+# Reconnect delay suggested to EventSource clients, in milliseconds
+RETRY_MS = 5000
+
+
+class StreamFull(RuntimeError):
+    """Raised when the maximum number of concurrent streams is reached."""
+
+
+def format_event(data, event_id: Optional[str] = None,
+                 event: Optional[str] = None) -> str:
+    """Format one Server-Sent Event."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def diff_quotes(previous: Quotes, current: Quotes) -> Quotes:
+    """Return the quotes in ``current`` that are new or changed."""
+    return {symbol: quote for symbol, quote in current.items()
+            if previous.get(symbol) != quote}
+
+
+class PricePoller:
+    """Polls quotes on one background thread and fans changes out to streams."""
+
+    def __init__(self, fetch: Callable[[list[str]], Quotes], symbols: list[str],
+                 interval: float = 30.0, history: int = 256,
+                 heartbeat: float = 15.0, max_clients: int = 500):
+        """Initialize the poller (call :meth:`start` to begin polling).
+
+        Parameters
+        ----------
+        fetch : Callable[[list[str]], Quotes]
+            Returns ``{symbol: quote}`` for the requested symbols
+        symbols : list[str]
+            Symbols fetched on every poll
+        interval : float
+            Seconds between polls
+        history : int
+            Number of update events kept for resuming clients
+        heartbeat : float
+            Seconds of silence after which a keep-alive comment is sent
+        max_clients : int
+            Maximum number of concurrent streams
+        """
+        self.fetch = fetch
+        self.symbols = list(symbols)
+        self.interval = interval
+        self.heartbeat = heartbeat
+        self.max_clients = max_clients
+
+        # Event IDs are "<epoch>-<seq>"; the epoch tells a resuming client
+        # whether its ID came from this process.
+        self._epoch = format(int(time.time() * 1000), "x")
+        self._seq = 0
+        self._quotes: Quotes = {}
+        self._history: deque[tuple[int, str]] = deque(maxlen=history)
+        self._clients = 0
+        self._cond = threading.Condition()
+        # Wake-ups for async streams, which cannot wait on the condition
+        self._wakers: set[Callable[[], None]] = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the polling thread if it is not running."""
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="price-poller", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the polling thread."""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            with self._cond:
+                while self._clients == 0 and not self._stop.is_set():
+                    self._cond.wait()
+            if self._stop.is_set():
+                break
+            self.poll_once()
+            self._stop.wait(self.interval)
+
+    def poll_once(self) -> Optional[int]:
+        """Fetch quotes once and publish any changes.
+
+        Returns
+        -------
+        int or None
+            Sequence number of the published event, or None if nothing
+            changed or the fetch failed
+        """
+        try:
+            quotes = self.fetch(self.symbols)
+        except Exception as e:
+            logger.error(f"Price poll failed: {e}")
+            return None
+
+        with self._cond:
+            changed = diff_quotes(self._quotes, quotes)
+            if not changed:
+                return None
+            self._quotes = {**self._quotes, **changed}
+            self._seq += 1
+            self._history.append(
+                (self._seq, format_event(changed, self._event_id(self._seq), "update")))
+            self._cond.notify_all()
+            for wake in self._wakers:
+                wake()
+            return self._seq
+
+    @property
+    def clients(self) -> int:
+        """Number of connected streams."""
+        return self._clients
+
+    def _event_id(self, seq: int) -> str:
+        return f"{self._epoch}-{seq}"
+
+    def _parse_event_id(self, event_id: Optional[str]) -> Optional[int]:
+        """Return the sequence number of an ID issued by this process, else None."""
+        epoch, _, seq = (event_id or "").partition("-")
+        if epoch != self._epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def _snapshot(self) -> str:
+        """Full state as an event (lock must be held)."""
+        return format_event(self._quotes, self._event_id(self._seq), "snapshot")
+
+    def _events_after(self, seq: int) -> Optional[list[tuple[int, str]]]:
+        """Events newer than ``seq``, or None if some were already dropped
+        (lock must be held)."""
+        if seq > self._seq:
+            return None
+        oldest = self._history[0][0] if self._history else self._seq + 1
+        if seq < oldest - 1:
+            return None
+        return [(s, event) for s, event in self._history if s > seq]
+
+    def _register(self) -> None:
+        with self._cond:
+            if self._clients >= self.max_clients:
+                raise StreamFull(f"{self.max_clients} price streams already open")
+            self._clients += 1
+            self._cond.notify_all()
+        self.start()
+
+    def _next_chunk(self, cursor: Optional[int]) -> tuple[str, int]:
+        """Events a client at ``cursor`` has not seen, and its new cursor
+        (lock must be held)."""
+        events = None if cursor is None else self._events_after(cursor)
+        if events is None:
+            # First connect, unknown ID or fell behind the history.
+            out = self._snapshot() if self._quotes else None
+            cursor = self._seq
+        else:
+            out = "".join(event for _, event in events) or None
+            cursor = events[-1][0] if events else cursor
+        return (out if out is not None else ": keep-alive\n\n"), cursor
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Iterator[str]:
+        """Register a client and return its event stream.
+
+        Parameters
+        ----------
+        last_event_id : str, optional
+            ``Last-Event-ID`` sent by a reconnecting client
+
+        Returns
+        -------
+        Iterator[str]
+            Formatted events; closing the iterator unregisters the client
+
+        Raises
+        ------
+        StreamFull
+            If ``max_clients`` streams are already open
+        """
+        self._register()
+        return self._stream(self._parse_event_id(last_event_id))
+
+    def _stream(self, cursor: Optional[int]) -> Iterator[str]:
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            while True:
+                with self._cond:
+                    if cursor is not None and cursor == self._seq:
+                        self._cond.wait(self.heartbeat)
+                    out, cursor = self._next_chunk(cursor)
+                yield out
+        finally:
+            with self._cond:
+                self._clients -= 1
+
+    def asubscribe(self, last_event_id: Optional[str] = None) -> AsyncIterator[str]:
+        """Like :meth:`subscribe`, but return an async iterator for use on an
+        event loop.
+
+        Must be called from the loop that will consume the stream.
+        """
+        self._register()
+        return self._astream(self._parse_event_id(last_event_id), asyncio.get_running_loop())
+
+    async def _astream(self, cursor: Optional[int],
+                       loop: asyncio.AbstractEventLoop) -> AsyncIterator[str]:
+        published = asyncio.Event()
+
+        def wake():
+            try:
+                loop.call_soon_threadsafe(published.set)
+            except RuntimeError:
+                pass  # the loop has closed; the stream is gone
+
+        with self._cond:
+            self._wakers.add(wake)
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            while True:
+                with self._cond:
+                    idle = cursor is not None and cursor == self._seq
+                    if idle:
+                        # Cleared under the lock, so a publish after the check still wakes us
+                        published.clear()
+                if idle:
+                    try:
+                        await asyncio.wait_for(published.wait(), self.heartbeat)
+                    except asyncio.TimeoutError:
+                        pass
+                with self._cond:
+                    out, cursor = self._next_chunk(cursor)
+                yield out
+        finally:
+            with self._cond:
+                self._wakers.discard(wake)
+                self._clients -= 1
+
+
+# Global poller shared by all streams in the process
+_poller_instance: Optional[PricePoller] = None
+
+
+def get_price_poller() -> PricePoller:
+    """Get the global price poller, configured from ``prices.*`` settings."""
+    global _poller_instance
+    if _poller_instance is None:
+        from ..data.crypto_prices import QUOTE_SOURCES
+
+        config = get_config()
+        _poller_instance = PricePoller(
+            QUOTE_SOURCES[config.get_config('prices.source', 'coingecko')],
+            symbols=config.get_config('prices.symbols', ["BTC", "ETH", "SOL"]),
+            interval=float(config.get_config('prices.interval_seconds', 30)),
+            max_clients=int(config.get_config('prices.max_clients', 500)),
+        )
+    return _poller_instance
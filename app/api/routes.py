@@ -0,0 +1,191 @@
+"""Flask views for the data API."""
+
+from __future__ import annotations
+
+import logging
+
+from flask import Blueprint, Response, jsonify, request
+
+from ..data.fetch_queue import get_fetch_queue
+from ..data.fred_client import get_fred_miner
+from ..data.tick_store import get_tick_store
+from .export import CHUNK_SIZE, EXPORT_FORMATS, MAX_EXPORT_SERIES, stream_csv, stream_ndjson
+from .prices import StreamFull, get_price_poller
+from .series import (
+    FORMATS,
+    QueryError,
+    choose_encoding,
+    compress,
+    compute_etag,
+    is_not_modified,
+    load_frame,
+    parse_query,
+    queue_uncached,
+    render,
+    validator_headers,
+)
+
+logger = logging.getLogger(__name__)
+
+bp = Blueprint("api", __name__, url_prefix="/api")
+
+
+def _error(message: str, status: int, **extra) -> Response:
+    """Return a JSON error response."""
+    response = jsonify({"error": message, **extra})
+    response.status_code = status
+    return response
+
+
+def _cached_versions(miner, series_ids: list[str]) -> tuple[dict[str, str], list[str]]:
+    """Refresh the cached series that are stale; return their versions and
+    the uncached IDs, which are left to the fetch queue."""
+    versions = miner.get_series_versions(series_ids)
+    miner.ensure_cached([series_id for series_id in series_ids if series_id in versions])
+    versions = miner.get_series_versions(series_ids)
+    return versions, [series_id for series_id in series_ids if series_id not in versions]
+
+
+def _uncached_error(series_ids: list[str]) -> Response:
+    """Queue uncached series and return the 202, 404 or 503 response."""
+    message, status, extra, headers = queue_uncached(get_fetch_queue(), series_ids)
+    response = _error(message, status, **extra)
+    response.headers.update(headers)
+    return response
+
+
+def _series_response(series_ids: list[str]) -> Response:
+    """Serve one or more series, honouring conditional request headers."""
+    try:
+        query = parse_query(series_ids, request.args)
+    except QueryError as e:
+        return _error(str(e), 400)
+
+    miner = get_fred_miner()
+    ids = list(query.series_ids)
+    versions, missing = _cached_versions(miner, ids)
+    if missing:
+        return _uncached_error(missing)
+
+    # Validators come from cache metadata alone, so a revalidation that ends
+    # in 304 never touches the observations.
+    etag = compute_etag(query, versions)
+    last_modified = miner.get_last_modified(ids)
+    response = Response(mimetype=query.mimetype,
+                        headers=validator_headers(etag, last_modified))
+    if is_not_modified(etag, last_modified, request.headers.get("If-None-Match"),
+                       request.headers.get("If-Modified-Since")):
+        response.status_code = 304
+        return response
+
+    try:
+        frame = load_frame(miner, query)
+    except Exception as e:
+        logger.error(f"Failed to load {', '.join(ids)}: {e}")
+        return _error("failed to load series", 502)
+
+    body, encoding = compress(render(frame, query),
+                              choose_encoding(request.headers.get("Accept-Encoding", "")))
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    if query.fmt == "csv":
+        name = ids[0] if len(ids) == 1 else "series"
+        response.headers["Content-Disposition"] = f'attachment; filename="{name}.csv"'
+    response.set_data(body)
+    return response
+
+
+@bp.route("/series/<series_id>")
+def series(series_id: str):
+    """Return a single series.
+
+    Query parameters: ``start``, ``end`` (YYYY-MM-DD), ``freq`` (W, M, Q,
+    A), ``how`` (mean, last, first, min, max, sum), ``format`` (json,
+    csv, arrow) and ``exclude`` (quality flags, e.g. ``outlier,gap``,
+    whose observations are left out).
+    """
+    return _series_response([series_id])
+
+
+@bp.route("/series")
+def series_batch():
+    """Return several series aligned on a common date index.
+
+    Series are given as ``ids=GDP,UNRATE`` (or repeated ``ids``); other
+    parameters are the same as for :func:`series`.
+    """
+    ids = [sid for value in request.args.getlist("ids") for sid in value.split(",")]
+    return _series_response(ids)
+
+
+@bp.route("/export")
+def export():
+    """Stream many series as CSV or NDJSON without buffering them.
+
+    Accepts ``ids``, ``start``, ``end`` and ``format`` (csv or ndjson).
+    Rows are written as they are read from the cache, so arbitrarily large
+    exports start immediately and use constant memory.
+    """
+    ids = [sid for value in request.args.getlist("ids") for sid in value.split(",")]
+    try:
+        query = parse_query(ids, request.args, formats=EXPORT_FORMATS,
+                            max_series=MAX_EXPORT_SERIES)
+    except QueryError as e:
+        return _error(str(e), 400)
+    if query.freq:
+        return _error("resampling is not supported for streaming exports", 400)
+
+    miner = get_fred_miner()
+    ids = list(query.series_ids)
+    _, missing = _cached_versions(miner, ids)
+    if missing:
+        return _uncached_error(missing)
+
+    chunks = miner.iter_observations(ids, query.start, query.end, chunk_size=CHUNK_SIZE)
+    stream = stream_csv if query.fmt == "csv" else stream_ndjson
+    response = Response(stream(chunks, ids), mimetype=FORMATS[query.fmt])
+    response.headers["Content-Disposition"] = f'attachment; filename="export.{query.fmt}"'
+    return response
+
+
+@bp.route("/prices/stream")
+def price_stream():
+    """Stream live price updates as Server-Sent Events.
+
+    Sends a ``snapshot`` event with every quote, then ``update`` events
+    holding only changed quotes.  Reconnecting clients are resumed from
+    ``Last-Event-ID`` (or a ``lastEventId`` query parameter) when possible.
+    """
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("lastEventId")
+    try:
+        stream = get_price_poller().subscribe(last_event_id)
+    except StreamFull as e:
+        response = _error(str(e), 503)
+        response.headers["Retry-After"] = "30"
+        return response
+    response = Response(stream, mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    # Stop reverse proxies from buffering the stream.
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+@bp.route("/crypto/<coin_id>/bars")
+def crypto_bars(coin_id: str):
+    """Return OHLCV bars for a coin from the live tick store.
+
+    ``interval`` is ``1m``, ``1h`` or ``1d`` (default ``1m``); the last bar
+    is still being built.
+    """
+    store = get_tick_store()
+    interval = request.args.get("interval", "1m")
+    if interval not in store.intervals:
+        return _error(f"'interval' must be one of {', '.join(store.intervals)}", 400)
+    if coin_id not in store.coins():
+        return _error("no ticks recorded for coin", 404)
+    bars = store.bars(coin_id, interval)
+    return jsonify({
+        "interval": interval,
+        "time": (bars.index.asi8 // 1_000_000).tolist(),
+        **{column: bars[column].tolist() for column in bars.columns},
+    })
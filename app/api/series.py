@@ -0,0 +1,326 @@
+"""Framework-independent pieces of the series API.
+
+Query parsing, data loading, resampling, output rendering, validators
+(ETag/Last-Modified) and response compression live here so the Flask
+routes and any other HTTP front end share exactly the same behaviour.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import io
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Mapping, Optional
+
+import pandas as pd
+from werkzeug.http import http_date, parse_date, parse_etags
+
+from ..dash.serialization import dumps
+from ..data.fetch_queue import FetchQueue, QueueFull
+from ..data.quality import FLAGS as QUALITY_FLAGS, mask_flagged
+
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    pa = None
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+    brotli = None
+
+# Query value -> pandas offset alias for resampling
+RESAMPLE_FREQUENCIES = {
+    "W": "W-FRI",
+    "M": "MS",
+    "Q": "QS",
+    "A": "YS",
+}
+
+AGGREGATIONS = ("mean", "last", "first", "min", "max", "sum")
+
+FORMATS = {
+    "json": "application/json",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "ndjson": "application/x-ndjson",
+}
+
+# Formats served by the buffered series endpoints; the first is the default
+QUERY_FORMATS = ("json", "csv", "arrow")
+
+# Maximum number of series in one batch request
+MAX_BATCH_SIZE = 100
+
+# Responses smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 1024
+
+# Clients may reuse a response for this long before revalidating it
+CACHE_MAX_AGE = 300
+
+# Seconds a client is asked to wait before retrying series being fetched
+FETCH_RETRY_AFTER = 5
+
+
+class QueryError(ValueError):
+    """Raised for invalid API query parameters."""
+
+
+@dataclass(frozen=True)
+class SeriesQuery:
+    """A validated request for one or more series."""
+
+    series_ids: tuple[str, ...]
+    start: Optional[str] = None
+    end: Optional[str] = None
+    freq: Optional[str] = None
+    how: str = "mean"
+    fmt: str = "json"
+    exclude: tuple[str, ...] = ()
+
+    @property
+    def mimetype(self) -> str:
+        return FORMATS[self.fmt]
+
+    def cache_key(self) -> str:
+        """Return a string identifying everything that shapes the output."""
+        return "|".join([",".join(self.series_ids), self.start or "", self.end or "",
+                         self.freq or "", self.how, self.fmt, ",".join(self.exclude)])
+
+
+def _parse_date(value: Optional[str], name: str) -> Optional[str]:
+    """Validate a YYYY-MM-DD query parameter."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise QueryError(f"'{name}' must be a date in YYYY-MM-DD format")
+
+
+def parse_query(series_ids: list[str], args: Mapping[str, str],
+                formats: tuple[str, ...] = QUERY_FORMATS,
+                max_series: int = MAX_BATCH_SIZE) -> SeriesQuery:
+    """Validate query parameters for a series request.
+
+    Parameters
+    ----------
+    series_ids : list[str]
+        Requested FRED series identifiers
+    args : Mapping[str, str]
+        Query-string parameters: ``start``, ``end``, ``freq``
+        (W, M, Q or A), ``how`` (aggregation), ``format``
+        (json, csv or arrow) and ``exclude`` (comma-separated quality
+        flags whose observations are left out)
+    formats : tuple[str, ...]
+        Output formats accepted by the caller; the first is the default
+    max_series : int
+        Maximum number of series in one request
+
+    Returns
+    -------
+    SeriesQuery
+
+    Raises
+    ------
+    QueryError
+        If any parameter is invalid
+    """
+    ids = tuple(dict.fromkeys(sid.strip().upper() for sid in series_ids if sid.strip()))
+    if not ids:
+        raise QueryError("at least one series ID is required")
+    if len(ids) > max_series:
+        raise QueryError(f"at most {max_series} series may be requested at once")
+
+    start = _parse_date(args.get("start"), "start")
+    end = _parse_date(args.get("end"), "end")
+    if start and end and start > end:
+        raise QueryError("'start' must not be after 'end'")
+
+    freq = args.get("freq") or None
+    if freq is not None:
+        freq = freq.upper()
+        if freq not in RESAMPLE_FREQUENCIES:
+            raise QueryError(f"'freq' must be one of {', '.join(RESAMPLE_FREQUENCIES)}")
+
+    how = (args.get("how") or "mean").lower()
+    if how not in AGGREGATIONS:
+        raise QueryError(f"'how' must be one of {', '.join(AGGREGATIONS)}")
+
+    fmt = (args.get("format") or formats[0]).lower()
+    if fmt not in formats:
+        raise QueryError(f"'format' must be one of {', '.join(formats)}")
+    if fmt == "arrow" and not PYARROW_AVAILABLE:
+        raise QueryError("Arrow output requires pyarrow on the server")
+
+    exclude = tuple(sorted({flag.strip().lower()
+                            for flag in (args.get("exclude") or "").split(",") if flag.strip()}))
+    unknown = [flag for flag in exclude if flag not in QUALITY_FLAGS]
+    if unknown:
+        raise QueryError(f"'exclude' flags must be among {', '.join(QUALITY_FLAGS)}")
+
+    return SeriesQuery(ids, start, end, freq, how, fmt, exclude)
+
+
+def compute_etag(query: SeriesQuery, versions: Mapping[str, str]) -> str:
+    """Return an ETag derived from the query and the series content versions.
+
+    Series versions are hashes of the cached observations, so the tag
+    changes exactly when the response body would, and can be computed
+    without loading any data.
+    """
+    digest = hashlib.sha1(query.cache_key().encode())
+    for series_id in query.series_ids:
+        digest.update(f";{series_id}={versions.get(series_id, '')}".encode())
+    return digest.hexdigest()[:20]
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> dict[str, str]:
+    """Return the caching headers sent with every series response."""
+    headers = {
+        "ETag": f'W/"{etag}"',
+        "Cache-Control": f"public, max-age={CACHE_MAX_AGE}",
+        "Vary": "Accept-Encoding",
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(_utc(last_modified))
+    return headers
+
+
+def is_not_modified(etag: str, last_modified: Optional[datetime],
+                    if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+    """Evaluate conditional request headers against the current validators.
+
+    ``If-None-Match`` takes precedence over ``If-Modified-Since`` as
+    required by RFC 9110; ETags are compared weakly.
+    """
+    if if_none_match:
+        return parse_etags(if_none_match).contains_weak(etag)
+    if if_modified_since and last_modified is not None:
+        since = parse_date(if_modified_since)
+        return since is not None and _utc(last_modified).replace(microsecond=0) <= since
+    return False
+
+
+def _utc(value: datetime) -> datetime:
+    """Return an aware UTC datetime; naive values are taken as local time."""
+    return value.astimezone(timezone.utc)
+
+
+def queue_uncached(fetch_queue: FetchQueue,
+                   series_ids: list[str]) -> tuple[str, int, dict, dict[str, str]]:
+    """Queue uncached series for a background fetch and describe the response.
+
+    Requests never fetch uncached series themselves, so the cost of a
+    request for unknown IDs stays bounded (see :mod:`app.data.fetch_queue`).
+
+    Returns
+    -------
+    tuple
+        ``(message, status, extra, headers)``: 404 listing series that
+        failed to fetch, 202 listing those now being fetched, or 503 when
+        the queue is full
+    """
+    try:
+        pending, failed = fetch_queue.submit(series_ids)
+    except QueueFull as e:
+        return str(e), 503, {}, {"Retry-After": str(FETCH_RETRY_AFTER * 6)}
+    if failed:
+        extra = {"missing": failed, **({"pending": pending} if pending else {})}
+        return "series not available", 404, extra, {}
+    return ("series not cached yet; retry shortly", 202, {"pending": pending},
+            {"Retry-After": str(FETCH_RETRY_AFTER)})
+
+
+def load_frame(miner, query: SeriesQuery) -> pd.DataFrame:
+    """Load the requested series from the cache as a wide DataFrame."""
+    frame = miner.get_multiple_series(list(query.series_ids),
+                                      start_date=query.start, end_date=query.end)
+    return shape_frame(frame, query, load_flags(miner, query))
+
+
+def load_flags(miner, query: SeriesQuery) -> Optional[pd.DataFrame]:
+    """Read the stored quality flags the query excludes, if any."""
+    if not query.exclude:
+        return None
+    return miner.get_quality_flags(list(query.series_ids), list(query.exclude),
+                                   query.start, query.end)
+
+
+def shape_frame(frame: pd.DataFrame, query: SeriesQuery,
+                flags: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Order, index, filter and resample a frame of series as the query asks.
+
+    ``flags`` are the quality flags whose observations are blanked before
+    resampling (see :func:`load_flags`).
+    """
+    frame = frame.reindex(columns=list(query.series_ids))
+    frame.index = pd.to_datetime(frame.index)
+    frame.index.name = "date"
+    frame = frame.sort_index()
+    if flags is not None:
+        frame = mask_flagged(frame, flags)
+    if query.freq:
+        resampled = frame.resample(RESAMPLE_FREQUENCIES[query.freq])
+        frame = getattr(resampled, query.how)().dropna(how="all")
+    return frame
+
+
+def render(frame: pd.DataFrame, query: SeriesQuery) -> bytes:
+    """Serialize a frame in the requested output format."""
+    if query.fmt == "csv":
+        return frame.to_csv(date_format="%Y-%m-%d").encode()
+
+    if query.fmt == "arrow":
+        table = pa.Table.from_pandas(frame.reset_index(), preserve_index=False)
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue()
+
+    body = {
+        "dates": frame.index.strftime("%Y-%m-%d").tolist(),
+        "series": {
+            series_id: frame[series_id].astype(object).where(frame[series_id].notna(), None).tolist()
+            for series_id in frame.columns
+        },
+    }
+    if query.freq:
+        body["freq"] = query.freq
+        body["how"] = query.how
+    return dumps(body).encode()
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the best supported content coding from an Accept-Encoding header."""
+    offered = {}
+    for part in (accept_encoding or "").split(","):
+        token, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if token:
+            offered[token.lower()] = quality
+    if BROTLI_AVAILABLE and offered.get("br", 0) > 0:
+        return "br"
+    if offered.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: Optional[str]) -> tuple[bytes, Optional[str]]:
+    """Compress a response body; returns the body and the coding applied."""
+    if encoding is None or len(body) < MIN_COMPRESS_BYTES:
+        return body, None
+    if encoding == "br":
+        return brotli.compress(body, quality=5), "br"
+    return gzip.compress(body, compresslevel=6), "gzip"
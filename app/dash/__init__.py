@@ -12,7 +12,8 @@ from dash import Dash, html, dcc
 
 from flask import Flask
 
-from .charts import sample_chart
+from .indicators import indicator_dashboard, register_indicator_callbacks
+from .serialization import configure_fast_json
 
 
 def register_dashapps(app: Flask) -> None:
@@ -26,6 +27,9 @@ def register_dashapps(app: Flask) -> None:
     app : Flask
         The Flask application instance on which to mount Dash.
     """
+    # Serialize Flask and Dash responses with orjson when it is available.
+    configure_fast_json(app)
+
     # Example: register a single Dash app at '/dash/'
     mount_path = "/dash/"
     dash_app = Dash(
@@ -42,19 +46,17 @@ def register_dashapps(app: Flask) -> None:
         "https://cdnjs.cloudflare.com/ajax/libs/skeleton/2.0.4/skeleton.min.css",
     ]
 
-    # Build a basic layout containing a header and a Plotly graph created in
-    # charts.py.  For larger apps you might use Dash components such as Tabs
-    # or separate pages.
+    # Build a layout with one tab per indicator category.  Each tab's charts
+    # are created when the tab is selected and load through their own
+    # callbacks (see indicators.py).
     dash_app.layout = html.Div(
         [
             html.H2("Economic Indicators Dashboard"),
-            dcc.Graph(
-                id="sample-graph",
-                figure=sample_chart(),
-            ),
+            indicator_dashboard(),
         ],
         style={"margin": "40px"},
     )
+    register_indicator_callbacks(dash_app)
 
     # Set the external stylesheets properly
     dash_app.config.external_stylesheets = dash_app._external_stylesheets
@@ -0,0 +1,279 @@
+/*
+ * Clientside callbacks for the indicator dashboard (app/dash/indicators.py).
+ *
+ * Each chart's observations arrive once as base64 typed arrays in a
+ * dcc.Store.  The functions below derive every view from that data in the
+ * browser: date window, level / percent-change transforms, the recession
+ * overlay and the stored forecast band.  The server is only asked for a
+ * higher-resolution slice when a window contains too few points of the
+ * downsampled overview.
+ */
+(function () {
+    'use strict';
+
+    var DAY_MS = 24 * 3600 * 1000;
+    var YEAR_MS = 365.25 * DAY_MS;
+    var RANGE_YEARS = {'1Y': 1, '5Y': 5, '10Y': 10};
+    var TYPED_ARRAYS = {
+        f8: Float64Array, f4: Float32Array, i4: Int32Array, u4: Uint32Array,
+        i2: Int16Array, u2: Uint16Array, i1: Int8Array, u1: Uint8Array
+    };
+    var TRANSFORM_TITLES = {change: '% change over window', yoy: '% change year over year'};
+
+    // Decoded arrays per store payload, so re-renders skip base64 decoding.
+    var decoded = new WeakMap();
+
+    function decode(spec) {
+        if (!spec) {
+            return [];
+        }
+        if (Array.isArray(spec)) {
+            return spec;
+        }
+        var binary = atob(spec.bdata);
+        var bytes = new Uint8Array(binary.length);
+        for (var i = 0; i < binary.length; i++) {
+            bytes[i] = binary.charCodeAt(i);
+        }
+        return Array.from(new TYPED_ARRAYS[spec.dtype](bytes.buffer));
+    }
+
+    function points(payload) {
+        var cached = decoded.get(payload);
+        if (!cached) {
+            cached = {x: decode(payload.x), y: decode(payload.y)};
+            decoded.set(payload, cached);
+        }
+        return cached;
+    }
+
+    function forecastPoints(forecast) {
+        var cached = decoded.get(forecast);
+        if (!cached) {
+            cached = {x: decode(forecast.x), mean: decode(forecast.mean),
+                      lower: decode(forecast.lower), upper: decode(forecast.upper)};
+            decoded.set(forecast, cached);
+        }
+        return cached;
+    }
+
+    // Forecast mean and band traces, drawn after the observations.
+    function forecastTraces(forecast) {
+        var f = forecastPoints(forecast);
+        var label = 'Forecast' + (forecast.model ? ' (' + forecast.model + ')' : '');
+        return [
+            {type: 'scatter', mode: 'lines', x: f.x, y: f.upper, line: {width: 0},
+             hoverinfo: 'skip', showlegend: false},
+            {type: 'scatter', mode: 'lines', x: f.x, y: f.lower, line: {width: 0},
+             fill: 'tonexty', fillcolor: 'rgba(99, 110, 250, 0.2)', hoverinfo: 'skip',
+             showlegend: false},
+            {type: 'scatter', mode: 'lines', x: f.x, y: f.mean, name: label,
+             line: {color: '#636efa', dash: 'dash'}, showlegend: false}
+        ];
+    }
+
+    function toMillis(value) {
+        if (typeof value === 'number') {
+            return value;
+        }
+        var text = String(value).replace(' ', 'T');
+        if (text.length === 10) {
+            text += 'T00:00:00';
+        }
+        return Date.parse(text + 'Z');
+    }
+
+    // Index of the first element of the sorted array `x` that is >= target.
+    function lowerBound(x, target) {
+        var lo = 0;
+        var hi = x.length;
+        while (lo < hi) {
+            var mid = (lo + hi) >>> 1;
+            if (x[mid] < target) {
+                lo = mid + 1;
+            } else {
+                hi = mid;
+            }
+        }
+        return lo;
+    }
+
+    // Replace the overview points inside the detail window with the detail.
+    function merge(overview, detail) {
+        if (!detail || detail.error) {
+            return overview;
+        }
+        var fine = points(detail);
+        var lo = lowerBound(overview.x, detail.start);
+        var hi = lowerBound(overview.x, detail.end + 1);
+        return {
+            x: overview.x.slice(0, lo).concat(fine.x, overview.x.slice(hi)),
+            y: overview.y.slice(0, lo).concat(fine.y, overview.y.slice(hi))
+        };
+    }
+
+    function rangeWindow(range, x) {
+        var years = RANGE_YEARS[range];
+        if (!years || !x.length) {
+            return null;
+        }
+        var end = x[x.length - 1];
+        return [end - years * YEAR_MS, end];
+    }
+
+    // Keep the points inside the window plus one before it.
+    function clip(series, window) {
+        if (!window) {
+            return series;
+        }
+        var lo = Math.max(lowerBound(series.x, window[0]) - 1, 0);
+        return {x: series.x.slice(lo), y: series.y.slice(lo)};
+    }
+
+    function transform(series, mode) {
+        var x = series.x;
+        var y = series.y;
+        if (mode === 'change') {
+            var base = y.length ? y[0] : null;
+            return y.map(function (v) { return base ? 100 * (v / base - 1) : null; });
+        }
+        if (mode === 'yoy') {
+            return y.map(function (v, i) {
+                // Closest observation to one year earlier, within 45 days.
+                var target = x[i] - YEAR_MS;
+                var j = lowerBound(x, target);
+                if (j > 0 && (j === x.length || target - x[j - 1] < x[j] - target)) {
+                    j -= 1;
+                }
+                if (j >= i || Math.abs(x[j] - target) > 45 * DAY_MS || !y[j]) {
+                    return null;
+                }
+                return 100 * (v / y[j] - 1);
+            });
+        }
+        return y;
+    }
+
+    function placeholder(title, message) {
+        return {
+            data: [],
+            layout: {
+                title: {text: title},
+                height: 400,
+                xaxis: {visible: false},
+                yaxis: {visible: false},
+                annotations: [{text: message, showarrow: false, xref: 'paper', yref: 'paper', x: 0.5, y: 0.5}]
+            }
+        };
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        indicators: {
+            /* Assign a random ID to the browser tab for server-side stores. */
+            ensureSession: function (modified, sessionId) {
+                if (sessionId) {
+                    return window.dash_clientside.no_update;
+                }
+                if (window.crypto && window.crypto.randomUUID) {
+                    return window.crypto.randomUUID();
+                }
+                return Date.now().toString(36) + Math.random().toString(36).slice(2);
+            },
+
+            /*
+             * Decide whether the visible window needs a finer slice than the
+             * overview holds.  Returns {start, end} in epoch milliseconds to
+             * request one from the server, or null to drop the detail.
+             */
+            requestWindow: function (relayout, range, data, current) {
+                var noUpdate = window.dash_clientside.no_update;
+                if (!data || data.error || data.complete) {
+                    return noUpdate;
+                }
+                var overview = points(data);
+                var triggered = window.dash_clientside.callback_context.triggered
+                    .map(function (t) { return t.prop_id; }).join(' ');
+
+                var win;
+                if (triggered.indexOf('relayoutData') >= 0) {
+                    if (!relayout) {
+                        return noUpdate;
+                    }
+                    if (relayout['xaxis.range[0]'] !== undefined) {
+                        win = [toMillis(relayout['xaxis.range[0]']), toMillis(relayout['xaxis.range[1]'])];
+                    } else if (relayout['xaxis.range']) {
+                        win = relayout['xaxis.range'].map(toMillis);
+                    } else if (relayout['xaxis.autorange']) {
+                        win = rangeWindow(range, overview.x);
+                    } else {
+                        return noUpdate;
+                    }
+                } else {
+                    win = rangeWindow(range, overview.x);
+                }
+
+                if (win) {
+                    var visible = lowerBound(overview.x, win[1] + 1) - lowerBound(overview.x, win[0]);
+                    if (visible >= data.max_points / 2) {
+                        win = null;
+                    }
+                }
+                var next = win ? {start: win[0], end: win[1]} : null;
+                if (JSON.stringify(next) === JSON.stringify(current || null)) {
+                    return noUpdate;
+                }
+                return next;
+            },
+
+            /* Build the figure for the selected window, transform and overlay. */
+            render: function (data, detail, range, mode, overlay, recessions) {
+                if (!data) {
+                    return window.dash_clientside.no_update;
+                }
+                if (data.error) {
+                    return placeholder(data.title, data.error);
+                }
+
+                var full = merge(points(data), detail);
+                var win = rangeWindow(range, full.x);
+                var series = clip(full, win);
+                var y = transform(series, mode);
+
+                var layout = {
+                    title: {text: data.title},
+                    height: 400,
+                    // Keep the user's zoom across data updates, but reset it
+                    // when the window or transform is changed explicitly.
+                    uirevision: [data.name, range, mode].join(':'),
+                    plot_bgcolor: 'white',
+                    paper_bgcolor: 'white',
+                    xaxis: {type: 'date', title: {text: 'Date'}, gridcolor: '#ebf0f8'},
+                    yaxis: {title: {text: TRANSFORM_TITLES[mode] || data.units || data.name}, gridcolor: '#ebf0f8'}
+                };
+                // Forecasts are in levels; percent-change views leave them out.
+                var traces = [{type: 'scatter', mode: 'lines', x: series.x, y: y, name: data.name,
+                               line: {color: '#636efa'}}];
+                if (data.forecast && !TRANSFORM_TITLES[mode]) {
+                    traces = traces.concat(forecastTraces(data.forecast));
+                    if (win) {
+                        var ahead = forecastPoints(data.forecast).x;
+                        win = [win[0], Math.max(win[1], ahead[ahead.length - 1])];
+                    }
+                }
+                if (win) {
+                    layout.xaxis.range = win;
+                }
+                if (overlay && overlay.indexOf('on') >= 0 && recessions) {
+                    layout.shapes = recessions.map(function (period) {
+                        return {
+                            type: 'rect', xref: 'x', yref: 'paper', x0: period[0], x1: period[1],
+                            y0: 0, y1: 1, fillcolor: '#7f8c8d', opacity: 0.2, line: {width: 0}, layer: 'below'
+                        };
+                    });
+                }
+
+                return {data: traces, layout: layout};
+            }
+        }
+    });
+}());
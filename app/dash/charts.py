@@ -7,11 +7,21 @@ makes it easy to test and reuse them across different pages.
 
 from __future__ import annotations
 
+from typing import Optional, Sequence
+
 import pandas as pd
 import plotly.express as px
 import dash
 from dash import dcc, html
 
+from ..data.forecasting import load_forecast
+from .downsample import DEFAULT_MAX_POINTS, lttb, window_slice
+from .figure_cache import FigureCache, get_figure_cache
+from .serialization import encode_figure_arrays, encode_typed_array
+
+# The sample chart is built from constant data, so its version never changes.
+SAMPLE_CHART_VERSIONS = {"sample": "synthetic-v1"}
+
 
 def sample_chart():
     """Return a simple line chart illustrating GDP growth over time.
@@ -50,6 +60,256 @@ def sample_chart():
     return fig
 
 
+def series_chart(series: pd.Series, title: Optional[str] = None,
+                 yaxis_title: Optional[str] = None):
+    """Return a line chart for a single economic time series.
+
+    Parameters
+    ----------
+    series : pd.Series
+        Observations indexed by date, e.g. from ``FREDDataMiner.get_series``
+    title : str, optional
+        Chart title; defaults to the series name
+    yaxis_title : str, optional
+        Y-axis label; defaults to the series name
+
+    Returns
+    -------
+    plotly.graph_objects.Figure
+        A Plotly figure object ready for use in a Dash `dcc.Graph`.
+    """
+    name = series.name or "value"
+    df = series.rename(name).rename_axis("date").reset_index()
+
+    fig = px.line(df, x="date", y=name, title=title or str(name))
+    fig.update_layout(
+        xaxis_title="Date",
+        yaxis_title=yaxis_title or str(name),
+        template="plotly_white",
+        height=400,
+    )
+
+    return fig
+
+
+def downsampled_series_chart(series: pd.Series, max_points: int = DEFAULT_MAX_POINTS,
+                             start=None, end=None, title: Optional[str] = None):
+    """Return a series chart reduced to at most ``max_points`` points.
+
+    The series is first cut to the ``[start, end]`` window and then
+    downsampled with LTTB, so a zoomed-in view gets the full point budget
+    for the visible range only.
+
+    Parameters
+    ----------
+    series : pd.Series
+        Full-resolution observations indexed by date
+    max_points : int
+        Point budget for the visible window
+    start, end : optional
+        Visible x-axis window; ``None`` means the full series
+    title : str, optional
+        Chart title; defaults to the series name
+
+    Returns
+    -------
+    plotly.graph_objects.Figure
+        A Plotly figure object ready for use in a Dash `dcc.Graph`.
+    """
+    visible = lttb(window_slice(series, start, end), max_points)
+    fig = series_chart(visible, title=title)
+
+    # Keep the user's zoom when the figure is replaced by a finer slice.
+    fig.update_layout(uirevision=str(series.name))
+    if start is not None or end is not None:
+        fig.update_xaxes(range=[start, end], autorange=False)
+
+    return fig
+
+
+def series_title(series_id: str, metadata: Optional[dict] = None) -> str:
+    """Return a chart title combining the FRED title and series ID."""
+    title = (metadata or {}).get("title")
+    return f"{title} ({series_id})" if title else series_id
+
+
+def cached_sample_chart(cache: Optional[FigureCache] = None) -> dict:
+    """Return :func:`sample_chart` as a pre-serialized, typed-array figure dict."""
+    if cache is None:
+        cache = get_figure_cache()
+    return cache.get_figure("sample_chart", SAMPLE_CHART_VERSIONS,
+                            lambda: encode_figure_arrays(sample_chart()))
+
+
+def cached_series_chart(miner, series_id: str, start_date: Optional[str] = None,
+                        end_date: Optional[str] = None,
+                        cache: Optional[FigureCache] = None,
+                        max_points: Optional[int] = DEFAULT_MAX_POINTS) -> dict:
+    """Return a series chart, reusing the cached figure while its data is unchanged.
+
+    Parameters
+    ----------
+    miner : FREDDataMiner
+        Data client used to load the series and look up its content version
+    series_id : str
+        FRED series identifier
+    start_date, end_date : str, optional
+        Date window in YYYY-MM-DD format
+    cache : FigureCache, optional
+        Figure cache to use; defaults to the process-wide cache
+    max_points : int, optional
+        Downsample the series to this many points with LTTB; ``None`` keeps
+        every observation
+
+    Returns
+    -------
+    dict
+        Figure dict with typed-array trace data, ready for use in a Dash
+        `dcc.Graph`.
+    """
+    if cache is None:
+        cache = get_figure_cache()
+
+    versions = miner.get_series_versions([series_id])
+    if series_id not in versions:
+        # Never cached before: fetching populates the cache and its version.
+        miner.get_series(series_id, start_date=start_date, end_date=end_date)
+        versions = miner.get_series_versions([series_id])
+
+    def build():
+        series = miner.get_series(series_id, start_date=start_date, end_date=end_date)
+        title = series_title(series_id, miner.get_series_metadata(series_id))
+        if max_points is None:
+            fig = series_chart(series, title=title)
+        else:
+            fig = downsampled_series_chart(series, max_points, title=title)
+        return encode_figure_arrays(fig)
+
+    params = {"series_id": series_id, "start_date": start_date, "end_date": end_date,
+              "max_points": max_points}
+    return cache.get_figure("series_chart", versions, build, params)
+
+
+def series_payload(series: pd.Series, max_points: int = DEFAULT_MAX_POINTS,
+                   start=None, end=None, **extra) -> dict:
+    """Return the data for a browser-rendered chart as typed arrays.
+
+    Charts that are drawn by clientside callbacks receive the observations
+    once in this form and derive every view (date window, transforms,
+    overlays) in the browser.
+
+    Parameters
+    ----------
+    series : pd.Series
+        Full-resolution observations indexed by date
+    max_points : int
+        Point budget; the series is downsampled with LTTB above it
+    start, end : optional
+        Restrict the payload to this window
+    **extra
+        Additional JSON-serializable fields (title, units, ...)
+
+    Returns
+    -------
+    dict
+        ``x`` (epoch milliseconds) and ``y`` typed arrays, plus ``complete``
+        which is True when no observations were dropped by downsampling.
+    """
+    window = window_slice(series.dropna(), start, end)
+    visible = lttb(window, max_points)
+    return {
+        "name": str(series.name),
+        "x": encode_typed_array(visible.index.to_numpy()),
+        "y": encode_typed_array(visible.to_numpy(dtype=float)),
+        "complete": len(visible) == len(window),
+        "max_points": max_points,
+        **extra,
+    }
+
+
+def forecast_payload(forecast: pd.DataFrame) -> dict:
+    """Return a stored forecast (see :func:`~app.data.forecasting.load_forecast`)
+    as typed arrays for the browser: ``x``, ``mean``, ``lower`` and ``upper``."""
+    return {
+        "x": encode_typed_array(forecast.index.to_numpy()),
+        **{column: encode_typed_array(forecast[column].to_numpy(dtype=float))
+           for column in ("mean", "lower", "upper")},
+        "model": forecast.attrs.get("model", ""),
+    }
+
+
+def cached_series_payload(miner, series_id: str, max_points: int = DEFAULT_MAX_POINTS,
+                          cache: Optional[FigureCache] = None,
+                          exclude: Sequence[str] = ()) -> dict:
+    """Return :func:`series_payload` for a FRED series through the figure cache.
+
+    The stored batch forecast of the series, if any, is included as
+    ``forecast`` (see :func:`forecast_payload`).  Observations carrying any
+    of the quality flags in ``exclude`` (e.g. ``'outlier'``) are left out.
+    """
+    if cache is None:
+        cache = get_figure_cache()
+
+    versions = miner.get_series_versions([series_id])
+    if series_id not in versions:
+        miner.get_series(series_id)
+        versions = miner.get_series_versions([series_id])
+    forecast = load_forecast(miner.db_path, series_id)
+
+    def build():
+        metadata = miner.get_series_metadata(series_id)
+        series = miner.get_series(series_id)
+        if exclude:
+            flagged = miner.get_quality_flags([series_id], list(exclude))
+            series = series[~pd.to_datetime(series.index).isin(flagged["date"])]
+        return series_payload(
+            series, max_points,
+            title=series_title(series_id, metadata), units=metadata.get("units", ""),
+            forecast=forecast_payload(forecast) if forecast is not None else None,
+        )
+
+    # A refit replaces the cached payload even if the data did not change
+    params = {"series_id": series_id, "max_points": max_points, "exclude": tuple(sorted(exclude)),
+              "forecast": forecast.attrs["fitted"] if forecast is not None else None}
+    return cache.get_figure("series_payload", versions, build, params)
+
+
+def recession_periods(indicator: pd.Series) -> list[list[float]]:
+    """Return ``[start, end]`` epoch-millisecond spans where ``indicator`` is 1.
+
+    Parameters
+    ----------
+    indicator : pd.Series
+        A 0/1 recession indicator such as FRED's monthly ``USREC``
+
+    Returns
+    -------
+    list[list[float]]
+        One span per recession; each ends where the first non-recession
+        observation begins.
+    """
+    flags = indicator.dropna().astype(bool)
+    if flags.empty:
+        return []
+    values = flags.to_numpy()
+    edges = pd.Series(values.astype(int)).diff().fillna(values[0]).to_numpy()
+    starts = flags.index[edges == 1]
+    ends = flags.index[edges == -1]
+    if len(ends) < len(starts):
+        # Still in recession at the last observation: shade through its period.
+        freq = pd.infer_freq(flags.index) if len(flags) > 2 else None
+        if freq:
+            step = pd.tseries.frequencies.to_offset(freq)
+        else:
+            step = flags.index[-1] - flags.index[-2] if len(flags) > 1 else pd.Timedelta(0)
+        ends = ends.append(pd.DatetimeIndex([flags.index[-1] + step]))
+
+    def to_ms(ts) -> float:
+        return float(pd.Timestamp(ts).value // 10**6)
+
+    return [[to_ms(start), to_ms(end)] for start, end in zip(starts, ends)]
+
+
 def create_dash_app():
     """Create and configure a Dash application with economic charts.
     
@@ -58,11 +318,13 @@ def create_dash_app():
     dash.Dash
         A configured Dash application instance.
     """
-    # Create Dash app
-    dash_app = dash.Dash(__name__, url_base_pathname='/dash/')
-    
-    # Get the sample chart figure
-    fig = sample_chart()
+    # Imported here because the indicator dashboard builds on this module.
+    from .indicators import indicator_dashboard, register_indicator_callbacks
+
+    # Create Dash app; tab content is rendered by callbacks, so components
+    # are not all present in the initial layout.
+    dash_app = dash.Dash(__name__, url_base_pathname='/dash/',
+                         suppress_callback_exceptions=True)
     
     # Define the layout
     dash_app.layout = html.Div([
@@ -70,11 +332,7 @@ def create_dash_app():
                 style={'textAlign': 'center', 'color': '#2c3e50', 'marginBottom': 30}),
         
         html.Div([
-            dcc.Graph(
-                id='gdp-chart',
-                figure=fig,
-                style={'height': '500px'}
-            )
+            indicator_dashboard()
         ], style={'margin': '20px'}),
         
         html.Div([
@@ -83,5 +341,7 @@ def create_dash_app():
                    style={'textAlign': 'center', 'color': '#7f8c8d', 'fontSize': 16})
         ], style={'margin': '20px'})
     ])
+
+    register_indicator_callbacks(dash_app)
     
     return dash_app
@@ -0,0 +1,167 @@
+"""Multi-indicator comparison view backed by the server-side frame store.
+
+Building the aligned panel (loading every selected series and resampling it
+to a common monthly grid) is the expensive step; re-normalizing it for
+display is cheap.  The first callback stores the panel in the
+:class:`~app.dash.session_store.ServerSideStore` and only puts its handle
+in a ``dcc.Store``, so changing the normalization never ships the panel
+through the browser.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Callable, Optional
+import logging
+
+import pandas as pd
+import plotly.express as px
+from dash import dcc, html, Input, Output, State
+from dash.exceptions import PreventUpdate
+
+from ..data.economic_indicators import ALL_INDICATORS, get_indicator_info
+from .serialization import encode_figure_arrays
+from .session_store import ServerSideStore, get_session_store
+
+logger = logging.getLogger(__name__)
+
+COMPARE_TAB = "Compare"
+COMPARE_SERIES_ID = "compare-series"
+COMPARE_NORMALIZE_ID = "compare-normalize"
+COMPARE_PANEL_ID = "compare-panel"
+COMPARE_GRAPH_ID = "compare-graph"
+
+PANEL_KEY = "compare-panel"
+
+NORMALIZE_OPTIONS = [
+    {"label": "Level", "value": "level"},
+    {"label": "Index (first value = 100)", "value": "index"},
+    {"label": "Z-score", "value": "zscore"},
+]
+
+
+def compare_layout() -> html.Div:
+    """Return the controls and graph of the comparison tab."""
+    options = [
+        {"label": f"{series_id} ({get_indicator_info(series_id)['category']})", "value": series_id}
+        for series_id in ALL_INDICATORS.values()
+    ]
+    return html.Div([
+        dcc.Dropdown(id=COMPARE_SERIES_ID, options=options, value=["UNRATE", "FEDFUNDS"],
+                     multi=True),
+        dcc.RadioItems(id=COMPARE_NORMALIZE_ID, options=NORMALIZE_OPTIONS, value="index",
+                       inline=True, style={"marginTop": "10px"}),
+        dcc.Store(id=COMPARE_PANEL_ID),
+        dcc.Loading(dcc.Graph(id=COMPARE_GRAPH_ID, style={"height": "500px"})),
+    ])
+
+
+def aligned_panel(miner, series_ids: list[str]) -> pd.DataFrame:
+    """Load series and align them on a common month-start grid.
+
+    Parameters
+    ----------
+    miner : FREDDataMiner
+        Data client
+    series_ids : list[str]
+        FRED series identifiers
+
+    Returns
+    -------
+    pd.DataFrame
+        Monthly means, one column per series, read from the precomputed
+        monthly rollups
+    """
+    frame = miner.get_rollups(series_ids, "M")
+    if frame.empty:
+        return frame
+    return frame.dropna(how="all")
+
+
+def normalize_panel(panel: pd.DataFrame, mode: str) -> pd.DataFrame:
+    """Return the panel rescaled for comparison on one axis."""
+    if mode == "index":
+        first = panel.apply(lambda column: column.dropna().iloc[0] if column.notna().any() else None)
+        return panel.div(first) * 100
+    if mode == "zscore":
+        return (panel - panel.mean()) / panel.std()
+    return panel
+
+
+def _panel_version(miner, series_ids: list[str]) -> str:
+    """Combine the selection and the versions of its series into one string."""
+    versions = miner.get_series_versions(series_ids)
+    text = ";".join(f"{sid}={versions.get(sid, '')}" for sid in sorted(series_ids))
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def register_compare_callbacks(dash_app, get_miner: Callable, session_id_store: str,
+                               store: Optional[ServerSideStore] = None) -> None:
+    """Register the callbacks of :func:`compare_layout`.
+
+    Parameters
+    ----------
+    dash_app : dash.Dash
+        App whose layout can contain the comparison tab
+    get_miner : Callable
+        Returns the FRED client used to load series
+    session_id_store : str
+        ID of the ``dcc.Store`` holding the browser session ID
+    store : ServerSideStore, optional
+        Frame store; defaults to the process-wide store
+    """
+    def frame_store() -> ServerSideStore:
+        return store if store is not None else get_session_store()
+
+    def panel_handle(series_ids: list[str], session_id: str) -> str:
+        miner = get_miner()
+        # One panel per session: a new selection replaces the previous one.
+        return frame_store().get_or_put(
+            session_id, PANEL_KEY, _panel_version(miner, series_ids),
+            lambda: aligned_panel(miner, series_ids),
+        )
+
+    @dash_app.callback(
+        Output(COMPARE_PANEL_ID, "data"),
+        Input(COMPARE_SERIES_ID, "value"),
+        State(session_id_store, "data"),
+    )
+    def _build_panel(series_ids, session_id):
+        if not series_ids:
+            return None
+        if not session_id:
+            # Nothing to key the store by (and sessions must not share one
+            # slot), so the panel is built when it is rendered.
+            return {"handle": None, "series": series_ids, "session": None}
+        try:
+            handle = panel_handle(series_ids, session_id)
+        except Exception as e:
+            logger.error(f"Failed to build comparison panel: {e}")
+            raise PreventUpdate
+        return {"handle": handle, "series": series_ids, "session": session_id}
+
+    @dash_app.callback(
+        Output(COMPARE_GRAPH_ID, "figure"),
+        Input(COMPARE_PANEL_ID, "data"),
+        Input(COMPARE_NORMALIZE_ID, "value"),
+    )
+    def _render_panel(panel_ref, mode):
+        if not panel_ref:
+            return {"data": [], "layout": {"template": "plotly_white", "height": 500}}
+
+        if panel_ref["session"] is None:
+            panel = aligned_panel(get_miner(), panel_ref["series"])
+        else:
+            panel = frame_store().get(panel_ref["handle"])
+        if panel is None:
+            # Evicted or expired: rebuild on the server rather than asking
+            # the browser to resend anything.
+            handle = panel_handle(panel_ref["series"], panel_ref["session"])
+            panel = frame_store().get(handle)
+
+        normalized = normalize_panel(panel, mode).rename_axis("date").reset_index()
+        fig = px.line(normalized, x="date", y=list(panel.columns))
+        fig.update_layout(template="plotly_white", height=500, xaxis_title="Date",
+                          yaxis_title=next(o["label"] for o in NORMALIZE_OPTIONS if o["value"] == mode),
+                          legend_title_text="Series")
+        return encode_figure_arrays(fig)
@@ -0,0 +1,133 @@
+"""Downsampling of long time series for display.
+
+A chart is only about a thousand pixels wide, so sending every observation
+of a long daily series to the browser wastes bandwidth and rendering time.
+Largest-Triangle-Three-Buckets (LTTB) keeps the points that contribute most
+to the visual shape of the line, so a downsampled series is
+indistinguishable from the original at screen resolution.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+# Roughly the pixel width of a full-width chart.
+DEFAULT_MAX_POINTS = 1000
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Return the positions selected by Largest-Triangle-Three-Buckets.
+
+    Bucket boundaries, bucket averages and per-bucket candidate coordinates
+    are computed with vectorized NumPy operations; only the selection itself
+    walks the buckets in order, because each pick depends on the previous
+    one.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        Monotonically increasing x coordinates (numeric)
+    y : np.ndarray
+        Y values; must not contain NaN
+    n_out : int
+        Number of points to keep (including the first and last point)
+
+    Returns
+    -------
+    np.ndarray
+        Sorted integer positions into ``x``/``y``
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # n_out - 2 buckets spread over the interior points [1, n - 1).
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, stops = edges[:-1], edges[1:]
+    counts = stops - starts
+    n_buckets = len(starts)
+
+    # Mean of each bucket in one pass; the "next bucket" of the last bucket
+    # is the final point.
+    avg_x = np.add.reduceat(x[:n - 1], starts) / counts
+    avg_y = np.add.reduceat(y[:n - 1], starts) / counts
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    # Lay the buckets out as rows of a padded matrix so every bucket can be
+    # scored with the same array expression.
+    width = int(counts.max())
+    offsets = np.arange(width)
+    positions = starts[:, None] + offsets[None, :]
+    valid = offsets[None, :] < counts[:, None]
+    positions = np.where(valid, positions, starts[:, None])
+    bucket_x = x[positions]
+    bucket_y = y[positions]
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a_x, a_y = x[0], y[0]
+    for i in range(n_buckets):
+        # Twice the triangle area spanned by the previous pick, each
+        # candidate and the next bucket's average.
+        area = np.abs(
+            (a_x - next_x[i]) * (bucket_y[i] - a_y)
+            - (a_x - bucket_x[i]) * (next_y[i] - a_y)
+        )
+        area[~valid[i]] = -1.0
+        pick = positions[i, int(np.argmax(area))]
+        selected[i + 1] = pick
+        a_x, a_y = x[pick], y[pick]
+
+    return selected
+
+
+def _numeric_index(index: pd.Index) -> np.ndarray:
+    """Return the index as float64, converting datetimes to nanoseconds."""
+    if isinstance(index, pd.DatetimeIndex):
+        values = index.asi8.astype(np.float64)
+    else:
+        values = np.asarray(index, dtype=np.float64)
+    # Work relative to the first point to keep full float precision.
+    return values - values[0] if len(values) else values
+
+
+def lttb(series: pd.Series, n_out: int = DEFAULT_MAX_POINTS) -> pd.Series:
+    """Downsample a series with Largest-Triangle-Three-Buckets.
+
+    Parameters
+    ----------
+    series : pd.Series
+        Series indexed by date (or any monotonically increasing numeric index)
+    n_out : int
+        Maximum number of points to return
+
+    Returns
+    -------
+    pd.Series
+        The selected observations, in their original order
+    """
+    series = series.dropna()
+    if len(series) <= n_out:
+        return series
+    positions = lttb_indices(_numeric_index(series.index), series.to_numpy(), n_out)
+    return series.iloc[positions]
+
+
+def window_slice(series: pd.Series, start=None, end=None) -> pd.Series:
+    """Return the observations inside ``[start, end]`` plus one on each side.
+
+    Keeping the neighbouring points lets the line run to the edges of a
+    zoomed-in plot instead of stopping at the first visible observation.
+    """
+    if start is None and end is None:
+        return series
+    index = series.index
+    lo = 0 if start is None else max(int(index.searchsorted(pd.Timestamp(start))) - 1, 0)
+    hi = len(series) if end is None else min(int(index.searchsorted(pd.Timestamp(end), side="right")) + 1, len(series))
+    return series.iloc[lo:hi]
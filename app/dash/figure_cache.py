@@ -0,0 +1,158 @@
+"""Server-side cache of serialized Plotly figures.
+
+Building a figure with Plotly Express and serializing it to JSON is far more
+expensive than reading the underlying data from the SQLite cache.  This
+module keeps the serialized JSON of each chart keyed by the chart definition
+(a chart ID plus its parameters) and validated against the content version of
+every input series, so a figure is only rebuilt when its data actually
+changed.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Mapping, Optional
+import logging
+
+from .serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+
+class FigureCache:
+    """Thread-safe LRU cache of serialized figure JSON.
+
+    Each entry is stored under ``(chart_id, params)`` together with the
+    versions of the series it was built from.  A lookup with different
+    versions is treated as a miss and the entry is replaced, so stale figures
+    are invalidated automatically as soon as the cached series change.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """Initialize an empty cache.
+
+        Parameters
+        ----------
+        max_entries : int
+            Maximum number of figures kept before the least recently used
+            one is evicted.
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[tuple, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _make_key(chart_id: str, params: Optional[Mapping[str, Any]]) -> tuple:
+        """Build a hashable key from a chart ID and its parameters."""
+        items = tuple(sorted((params or {}).items()))
+        return (chart_id, items)
+
+    @staticmethod
+    def _version_tuple(versions: Mapping[str, str]) -> tuple:
+        """Normalise a series-version mapping into a comparable tuple."""
+        return tuple(sorted(versions.items()))
+
+    def get_json(self, chart_id: str, versions: Mapping[str, str],
+                 builder: Callable[[], Any],
+                 params: Optional[Mapping[str, Any]] = None) -> str:
+        """Return the serialized figure, building it on a miss.
+
+        Parameters
+        ----------
+        chart_id : str
+            Name of the chart definition (e.g. ``'series_chart'``)
+        versions : Mapping[str, str]
+            Content version of each input series, as returned by
+            ``FREDDataMiner.get_series_versions``
+        builder : Callable[[], Any]
+            Zero-argument callable returning a Plotly figure (or figure
+            dict); only called on a miss
+        params : Mapping[str, Any], optional
+            Additional hashable parameters that distinguish charts built by
+            the same definition (date window, series ID, ...)
+
+        Returns
+        -------
+        str
+            Figure JSON
+        """
+        key = self._make_key(chart_id, params)
+        version = self._version_tuple(versions)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # Build outside the lock so slow figures do not serialize all
+        # requests; concurrent misses for the same key simply race to store.
+        figure = builder()
+        figure_json = figure.to_json() if hasattr(figure, "to_json") else dumps(figure)
+
+        with self._lock:
+            self._entries[key] = (version, figure_json)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                logger.debug(f"Evicted cached figure {evicted[0]}")
+
+        return figure_json
+
+    def get_figure(self, chart_id: str, versions: Mapping[str, str],
+                   builder: Callable[[], Any],
+                   params: Optional[Mapping[str, Any]] = None) -> dict:
+        """Return the cached figure as a plain dict for Dash components.
+
+        Parsing stored JSON is much cheaper than rebuilding the figure, and a
+        plain dict skips Plotly's property validation when Dash serializes
+        the response.  Arguments are the same as for :meth:`get_json`.
+        """
+        return loads(self.get_json(chart_id, versions, builder, params))
+
+    def invalidate_series(self, series_id: str) -> int:
+        """Drop every cached figure built from ``series_id``.
+
+        Version checks already prevent stale figures from being served; this
+        only frees memory early.
+
+        Returns
+        -------
+        int
+            Number of entries removed
+        """
+        with self._lock:
+            stale = [
+                key for key, (version, _) in self._entries.items()
+                if any(sid == series_id for sid, _ in version)
+            ]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        """Remove all cached figures and reset the hit counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Global figure cache shared by all Dash apps in the process
+_figure_cache: Optional[FigureCache] = None
+
+
+def get_figure_cache() -> FigureCache:
+    """Get the global figure cache instance."""
+    global _figure_cache
+    if _figure_cache is None:
+        _figure_cache = FigureCache()
+    return _figure_cache
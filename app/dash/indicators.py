@@ -0,0 +1,234 @@
+"""Category-tabbed dashboard generated from the indicator catalog.
+
+The layout contains only the tab strip; a tab's charts are created when the
+tab is selected, and every chart then fetches its own data through a
+pattern-matching callback.  Dash issues one request per chart, so charts
+stream in independently and the first paint does not wait for the whole
+catalog.
+
+Each chart's observations are shipped to the browser once (as typed arrays
+in a ``dcc.Store``) and the figure is drawn by clientside callbacks in
+``assets/indicators.js``.  Changing the date window, the transform or the
+recession overlay therefore costs no server round trip; the server is only
+asked for new data when a zoomed window needs more resolution than the
+downsampled overview provides.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Optional
+import logging
+
+import pandas as pd
+from dash import ClientsideFunction, dcc, html, Input, Output, State, MATCH
+from dash.exceptions import PreventUpdate
+
+from ..data.economic_indicators import INDICATOR_CATEGORIES
+from ..data.fred_client import get_fred_miner
+from .charts import cached_series_payload, recession_periods, series_payload
+from .compare import COMPARE_TAB, compare_layout, register_compare_callbacks
+from .downsample import DEFAULT_MAX_POINTS
+
+logger = logging.getLogger(__name__)
+
+TABS_ID = "indicator-tabs"
+TAB_CONTENT_ID = "indicator-tab-content"
+RANGE_ID = "indicator-range"
+TRANSFORM_ID = "indicator-transform"
+RECESSION_TOGGLE_ID = "indicator-recessions"
+RECESSION_STORE_ID = "indicator-recession-periods"
+SESSION_ID = "dashboard-session"
+
+GRAPH_TYPE = "indicator-graph"
+DATA_TYPE = "indicator-data"
+WINDOW_TYPE = "indicator-window"
+DETAIL_TYPE = "indicator-detail"
+
+# NBER-based recession indicator used for the shaded overlay
+RECESSION_SERIES_ID = "USREC"
+
+RANGE_OPTIONS = [
+    {"label": "1Y", "value": "1Y"},
+    {"label": "5Y", "value": "5Y"},
+    {"label": "10Y", "value": "10Y"},
+    {"label": "Max", "value": "MAX"},
+]
+
+TRANSFORM_OPTIONS = [
+    {"label": "Level", "value": "level"},
+    {"label": "% change over window", "value": "change"},
+    {"label": "% change year over year", "value": "yoy"},
+]
+
+
+def indicator_dashboard() -> html.Div:
+    """Return the tabbed indicator dashboard layout.
+
+    Only the controls and tab headers are part of the initial layout; chart
+    placeholders are rendered by :func:`register_indicator_callbacks` when a
+    tab becomes visible.
+    """
+    categories = list(INDICATOR_CATEGORIES)
+    controls = html.Div([
+        dcc.RadioItems(id=RANGE_ID, options=RANGE_OPTIONS, value="MAX", inline=True),
+        dcc.Dropdown(id=TRANSFORM_ID, options=TRANSFORM_OPTIONS, value="level",
+                     clearable=False, style={"width": "260px"}),
+        dcc.Checklist(id=RECESSION_TOGGLE_ID,
+                      options=[{"label": "Shade recessions", "value": "on"}],
+                      value=[], inline=True),
+    ], style={"display": "flex", "gap": "30px", "alignItems": "center",
+              "marginBottom": "20px"})
+
+    return html.Div([
+        controls,
+        dcc.Store(id=RECESSION_STORE_ID),
+        # Identifies the browser tab to the server-side frame store.
+        dcc.Store(id=SESSION_ID, storage_type="session"),
+        dcc.Tabs(
+            id=TABS_ID,
+            value=categories[0],
+            children=[dcc.Tab(label=name, value=name) for name in categories]
+            + [dcc.Tab(label=COMPARE_TAB, value=COMPARE_TAB)],
+        ),
+        html.Div(id=TAB_CONTENT_ID, style={"marginTop": "20px"}),
+    ])
+
+
+def _indicator_card(series_id: str) -> html.Div:
+    """Return the placeholder graph and data stores for one indicator."""
+    return html.Div([
+        dcc.Loading(
+            dcc.Graph(
+                id={"type": GRAPH_TYPE, "index": series_id},
+                figure=_placeholder_figure(series_id),
+                style={"height": "400px"},
+            ),
+        ),
+        dcc.Store(id={"type": DATA_TYPE, "index": series_id}),
+        dcc.Store(id={"type": WINDOW_TYPE, "index": series_id}),
+        dcc.Store(id={"type": DETAIL_TYPE, "index": series_id}),
+    ], style={"marginBottom": "20px"})
+
+
+def _placeholder_figure(series_id: str, message: str = "Loading...") -> dict:
+    """Return an empty figure shown until (or instead of) the data."""
+    return {
+        "data": [],
+        "layout": {
+            "title": {"text": series_id},
+            "template": "plotly_white",
+            "height": 400,
+            "xaxis": {"visible": False},
+            "yaxis": {"visible": False},
+            "annotations": [{"text": message, "showarrow": False,
+                             "xref": "paper", "yref": "paper", "x": 0.5, "y": 0.5}],
+        },
+    }
+
+
+def register_indicator_callbacks(dash_app, get_miner: Optional[Callable] = None,
+                                 max_points: int = DEFAULT_MAX_POINTS) -> None:
+    """Register the callbacks for :func:`indicator_dashboard`.
+
+    Server callbacks render a tab's placeholders, load each chart's data
+    once, fetch higher-resolution windows on demand and load the recession
+    periods the first time the overlay is enabled.  Everything else runs in
+    the browser.  The Compare tab keeps its aligned panel in the
+    server-side frame store (see ``compare.py``).
+
+    Parameters
+    ----------
+    dash_app : dash.Dash
+        App whose layout contains the indicator dashboard
+    get_miner : Callable, optional
+        Returns the FRED client used to load series; defaults to the
+        process-wide client
+    max_points : int
+        Point budget per chart for LTTB downsampling
+    """
+    get_miner = get_miner or get_fred_miner
+
+    @dash_app.callback(Output(TAB_CONTENT_ID, "children"), Input(TABS_ID, "value"))
+    def _render_tab(category):
+        if category == COMPARE_TAB:
+            return compare_layout()
+        indicators = INDICATOR_CATEGORIES.get(category, {})
+        return [_indicator_card(series_id) for series_id in indicators.values()]
+
+    @dash_app.callback(
+        Output({"type": DATA_TYPE, "index": MATCH}, "data"),
+        Input({"type": DATA_TYPE, "index": MATCH}, "id"),
+    )
+    def _load_indicator(component_id):
+        series_id = component_id["index"]
+        try:
+            return cached_series_payload(get_miner(), series_id, max_points=max_points)
+        except Exception as e:
+            logger.error(f"Failed to load data for {series_id}: {e}")
+            return {"name": series_id, "title": series_id, "error": "Data unavailable"}
+
+    @dash_app.callback(
+        Output({"type": DETAIL_TYPE, "index": MATCH}, "data"),
+        Input({"type": WINDOW_TYPE, "index": MATCH}, "data"),
+        State({"type": WINDOW_TYPE, "index": MATCH}, "id"),
+        prevent_initial_call=True,
+    )
+    def _load_detail(window, component_id):
+        if not window:
+            return None
+        series_id = component_id["index"]
+        start = pd.Timestamp(window["start"], unit="ms")
+        end = pd.Timestamp(window["end"], unit="ms")
+        try:
+            series = get_miner().get_series(series_id)
+        except Exception as e:
+            logger.error(f"Failed to load detail for {series_id}: {e}")
+            raise PreventUpdate
+        detail = series_payload(series, max_points, start, end)
+        detail.update(start=window["start"], end=window["end"])
+        return detail
+
+    @dash_app.callback(
+        Output(RECESSION_STORE_ID, "data"),
+        Input(RECESSION_TOGGLE_ID, "value"),
+        State(RECESSION_STORE_ID, "data"),
+        prevent_initial_call=True,
+    )
+    def _load_recessions(toggle, periods):
+        if not toggle or periods is not None:
+            raise PreventUpdate
+        try:
+            return recession_periods(get_miner().get_series(RECESSION_SERIES_ID))
+        except Exception as e:
+            logger.error(f"Failed to load recession periods: {e}")
+            return []
+
+    register_compare_callbacks(dash_app, get_miner, SESSION_ID)
+
+    dash_app.clientside_callback(
+        ClientsideFunction(namespace="indicators", function_name="ensureSession"),
+        Output(SESSION_ID, "data"),
+        Input(SESSION_ID, "modified_timestamp"),
+        State(SESSION_ID, "data"),
+    )
+
+    dash_app.clientside_callback(
+        ClientsideFunction(namespace="indicators", function_name="requestWindow"),
+        Output({"type": WINDOW_TYPE, "index": MATCH}, "data"),
+        Input({"type": GRAPH_TYPE, "index": MATCH}, "relayoutData"),
+        Input(RANGE_ID, "value"),
+        State({"type": DATA_TYPE, "index": MATCH}, "data"),
+        State({"type": WINDOW_TYPE, "index": MATCH}, "data"),
+        prevent_initial_call=True,
+    )
+
+    dash_app.clientside_callback(
+        ClientsideFunction(namespace="indicators", function_name="render"),
+        Output({"type": GRAPH_TYPE, "index": MATCH}, "figure"),
+        Input({"type": DATA_TYPE, "index": MATCH}, "data"),
+        Input({"type": DETAIL_TYPE, "index": MATCH}, "data"),
+        Input(RANGE_ID, "value"),
+        Input(TRANSFORM_ID, "value"),
+        Input(RECESSION_TOGGLE_ID, "value"),
+        Input(RECESSION_STORE_ID, "data"),
+    )
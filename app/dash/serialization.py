@@ -0,0 +1,215 @@
+"""Compact figure encoding and fast JSON serialization.
+
+Plotly.js (2.28+) accepts data arrays as base64-encoded typed arrays of the
+form ``{"dtype": "f8", "bdata": "..."}``; ``dash>=2.16`` and ``plotly>=5.19``
+are the first releases bundling such a Plotly.js (2.29).  For long numeric series this is
+around half the size of a JSON list of floats and avoids float formatting
+and parsing on both ends.  Dates are sent as epoch milliseconds, which
+Plotly interprets natively on date axes.
+
+This module also plugs ``orjson`` (when installed) into Flask's JSON
+provider and Plotly's JSON engine, which Dash uses for its responses.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from plotly.utils import PlotlyJSONEncoder
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+# Typed-array dtypes understood by Plotly.js, keyed by NumPy dtype string.
+PLOTLY_DTYPES = {
+    "float64": "f8",
+    "float32": "f4",
+    "int32": "i4",
+    "uint32": "u4",
+    "int16": "i2",
+    "uint16": "u2",
+    "int8": "i1",
+    "uint8": "u1",
+}
+
+# Trace attributes that carry per-point data and are worth encoding.
+ARRAY_ATTRIBUTES = ("x", "y", "customdata")
+
+if ORJSON_AVAILABLE:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def encode_typed_array(values) -> Any:
+    """Encode a numeric or datetime array as a Plotly typed-array spec.
+
+    Parameters
+    ----------
+    values : array-like
+        Numbers, datetimes or ISO date strings
+
+    Returns
+    -------
+    dict or original value
+        ``{"dtype": ..., "bdata": ...}`` for encodable input; anything else
+        (categorical labels, already-encoded specs) is returned unchanged.
+    """
+    if isinstance(values, dict) or values is None:
+        return values
+
+    array = np.asarray(values)
+    if array.dtype.kind in "OUS":
+        try:
+            array = pd.to_datetime(array, format="ISO8601").to_numpy()
+        except (ValueError, TypeError):
+            return values
+
+    if array.dtype.kind == "M":
+        # Epoch milliseconds; NaT becomes NaN so it renders as a gap.
+        millis = array.astype("datetime64[ms]").astype(np.int64).astype(np.float64)
+        millis[np.isnat(array)] = np.nan
+        array = millis
+    elif array.dtype.kind == "b":
+        array = array.astype(np.uint8)
+    elif array.dtype.kind in "iu" and array.dtype.itemsize == 8:
+        # Plotly.js has no 64-bit integer arrays.
+        if len(array) and np.abs(array).max() < 2**31:
+            array = array.astype(np.int32)
+        else:
+            array = array.astype(np.float64)
+
+    dtype = PLOTLY_DTYPES.get(str(array.dtype))
+    if dtype is None:
+        return values
+
+    data = np.ascontiguousarray(array).astype(array.dtype.newbyteorder("<"), copy=False)
+    return {"dtype": dtype, "bdata": base64.b64encode(data.tobytes()).decode("ascii")}
+
+
+def encode_figure_arrays(figure) -> dict:
+    """Return a figure dict whose trace arrays use typed-array encoding.
+
+    Parameters
+    ----------
+    figure : plotly.graph_objects.Figure or dict
+        Figure to encode
+
+    Returns
+    -------
+    dict
+        Figure dict; date x-axes are marked as ``type='date'`` so the epoch
+        millisecond values render as dates.
+    """
+    fig = figure.to_plotly_json() if hasattr(figure, "to_plotly_json") else dict(figure)
+    layout = dict(fig.get("layout") or {})
+    traces = []
+
+    for trace in fig.get("data", []):
+        trace = dict(trace)
+        for attr in ARRAY_ATTRIBUTES:
+            if attr not in trace:
+                continue
+            raw = trace[attr]
+            is_dates = attr == "x" and _looks_like_dates(raw)
+            trace[attr] = encode_typed_array(raw)
+            if is_dates and isinstance(trace[attr], dict):
+                axis = "xaxis" + str(trace.get("xaxis", "x"))[1:]
+                layout[axis] = {**layout.get(axis, {}), "type": "date"}
+        traces.append(trace)
+
+    fig["data"] = traces
+    fig["layout"] = layout
+    return fig
+
+
+def _looks_like_dates(values) -> bool:
+    """Return True if ``values`` holds datetimes or ISO date strings."""
+    if isinstance(values, dict) or values is None:
+        return False
+    array = np.asarray(values)
+    if array.dtype.kind == "M":
+        return True
+    if array.dtype.kind in "OUS" and len(array):
+        try:
+            pd.to_datetime(array[:1], format="ISO8601")
+            return True
+        except (ValueError, TypeError):
+            return False
+    return False
+
+
+def dumps(obj: Any) -> str:
+    """Serialize ``obj`` (including NumPy arrays) to a JSON string."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj, default=_orjson_default, option=_ORJSON_OPTIONS).decode()
+        except TypeError:
+            pass
+    return json.dumps(obj, cls=PlotlyJSONEncoder)
+
+
+def loads(data: str | bytes) -> Any:
+    """Parse a JSON document."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _orjson_default(obj: Any) -> Any:
+    """Fallback conversions for types orjson does not handle natively."""
+    if isinstance(obj, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(obj).isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return json.loads(json.dumps(obj, cls=PlotlyJSONEncoder))
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes and decodes with orjson.
+
+    Flask asks for compact output (``separators=(",", ":")``) or, in debug,
+    ``indent=2``; orjson produces both.  Calls with ``json`` keyword
+    arguments orjson cannot honour (e.g. a custom ``default``) fall back to
+    the standard library implementation.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        options = dict(kwargs)
+        sort_keys = options.pop("sort_keys", self.sort_keys)
+        separators = options.pop("separators", None)
+        indent = options.pop("indent", None)
+        if (not ORJSON_AVAILABLE or options or separators not in (None, (",", ":"))
+                or indent not in (None, 2)):
+            return super().dumps(obj, **kwargs)
+        option = _ORJSON_OPTIONS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if not ORJSON_AVAILABLE or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+
+def configure_fast_json(app: Flask) -> None:
+    """Use orjson for Flask JSON responses and Dash/Plotly serialization.
+
+    Does nothing beyond the standard library defaults when orjson is not
+    installed.
+    """
+    if not ORJSON_AVAILABLE:
+        return
+    app.json = FastJSONProvider(app)
+    # Dash encodes layouts and callback responses through plotly.io.json.
+    pio.json.config.default_engine = "orjson"
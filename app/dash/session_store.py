@@ -0,0 +1,224 @@
+"""Server-side store for DataFrames passed between Dash callbacks.
+
+Passing intermediate DataFrames through ``dcc.Store`` serializes them to
+JSON, ships them to the browser and back on every callback.  Instead,
+callbacks put frames into this in-process store and hand the browser a
+short opaque handle.  Frames are encoded with Arrow IPC when ``pyarrow`` is
+installed (pickle otherwise), deduplicated per session and data version,
+and evicted least-recently-used beyond a byte budget or after a
+time-to-live.
+"""
+
+from __future__ import annotations
+
+import io
+import pickle
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+import logging
+
+import pandas as pd
+
+from ..config.secrets import get_config
+
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Entry:
+    """One stored frame and its bookkeeping."""
+
+    payload: bytes
+    encoding: str
+    session_id: str
+    identity: tuple
+    last_access: float
+
+
+class ServerSideStore:
+    """Thread-safe, size- and TTL-bounded store of encoded DataFrames."""
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, ttl_seconds: float = 1800,
+                 encoding: Optional[str] = None):
+        """Initialize an empty store.
+
+        Parameters
+        ----------
+        max_bytes : int
+            Total encoded size kept before least recently used frames are
+            evicted
+        ttl_seconds : float
+            Frames not read or written for this long are dropped
+        encoding : str, optional
+            ``'arrow'`` or ``'pickle'``; defaults to Arrow when available
+        """
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.encoding = encoding or ("arrow" if PYARROW_AVAILABLE else "pickle")
+        if self.encoding == "arrow" and not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow library not installed. Run: pip install pyarrow")
+
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._handles: dict[tuple, str] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def _encode(self, frame: pd.DataFrame) -> bytes:
+        """Serialize a frame with the configured encoding."""
+        if self.encoding == "arrow":
+            table = pa.Table.from_pandas(frame, preserve_index=True)
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            return sink.getvalue().to_pybytes()
+        return pickle.dumps(frame, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _decode(payload: bytes, encoding: str) -> pd.DataFrame:
+        """Deserialize a frame stored by :meth:`_encode`."""
+        if encoding == "arrow":
+            with pa.ipc.open_stream(io.BytesIO(payload)) as reader:
+                return reader.read_all().to_pandas()
+        return pickle.loads(payload)
+
+    def put(self, frame: pd.DataFrame, session_id: str, key: str,
+            data_version: str = "") -> str:
+        """Store a frame and return its handle.
+
+        Storing the same ``(session_id, key, data_version)`` again returns
+        the existing handle without re-encoding the frame.
+
+        Parameters
+        ----------
+        frame : pd.DataFrame
+            Frame to keep on the server
+        session_id : str
+            Browser session the frame belongs to
+        key : str
+            Name of the intermediate result within the session
+        data_version : str
+            Version of the inputs the frame was derived from
+
+        Returns
+        -------
+        str
+            Opaque handle for ``dcc.Store``
+        """
+        identity = (session_id, key, data_version)
+        with self._lock:
+            self._expire()
+            handle = self._handles.get(identity)
+            if handle is not None:
+                self._touch(handle)
+                return handle
+
+        payload = self._encode(frame)
+        handle = secrets.token_urlsafe(16)
+
+        with self._lock:
+            # Replace any older version of the same result for the session.
+            for other in [h for h, e in self._entries.items()
+                          if e.session_id == session_id and e.identity[1] == key]:
+                self._remove(other)
+
+            self._entries[handle] = _Entry(payload, self.encoding, session_id,
+                                           identity, time.monotonic())
+            self._handles[identity] = handle
+            self._size += len(payload)
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                oldest = next(iter(self._entries))
+                logger.debug(f"Evicting stored frame {oldest} to stay within size limit")
+                self._remove(oldest)
+
+        return handle
+
+    def get_or_put(self, session_id: str, key: str, data_version: str,
+                   build: Callable[[], pd.DataFrame]) -> str:
+        """Return the handle for a stored result, building it on a miss.
+
+        ``build`` is only called when the session has no frame for ``key``
+        at ``data_version``, so repeated callbacks skip recomputing it.
+        """
+        with self._lock:
+            self._expire()
+            handle = self._handles.get((session_id, key, data_version))
+            if handle is not None:
+                self._touch(handle)
+                return handle
+        return self.put(build(), session_id, key, data_version)
+
+    def get(self, handle: Optional[str]) -> Optional[pd.DataFrame]:
+        """Return the frame for ``handle``, or None if unknown or expired."""
+        if not handle:
+            return None
+        with self._lock:
+            self._expire()
+            entry = self._entries.get(handle)
+            if entry is None:
+                return None
+            self._touch(handle)
+        return self._decode(entry.payload, entry.encoding)
+
+    def clear_session(self, session_id: str) -> int:
+        """Drop every frame stored for a session and return how many."""
+        with self._lock:
+            handles = [h for h, e in self._entries.items() if e.session_id == session_id]
+            for handle in handles:
+                self._remove(handle)
+        return len(handles)
+
+    @property
+    def size_bytes(self) -> int:
+        """Total encoded size of all stored frames."""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _touch(self, handle: str) -> None:
+        """Mark an entry as recently used (lock must be held)."""
+        self._entries[handle].last_access = time.monotonic()
+        self._entries.move_to_end(handle)
+
+    def _remove(self, handle: str) -> None:
+        """Delete an entry (lock must be held)."""
+        entry = self._entries.pop(handle)
+        self._handles.pop(entry.identity, None)
+        self._size -= len(entry.payload)
+
+    def _expire(self) -> None:
+        """Drop entries idle for longer than the TTL (lock must be held)."""
+        cutoff = time.monotonic() - self.ttl_seconds
+        # Entries are kept in access order, so expired ones are at the front.
+        while self._entries:
+            handle, entry = next(iter(self._entries.items()))
+            if entry.last_access >= cutoff:
+                break
+            self._remove(handle)
+
+
+# Global store shared by the Dash apps in the process
+_store_instance: Optional[ServerSideStore] = None
+
+
+def get_session_store() -> ServerSideStore:
+    """Get the global server-side store, sized from the configuration."""
+    global _store_instance
+    if _store_instance is None:
+        config = get_config()
+        _store_instance = ServerSideStore(
+            max_bytes=int(config.get_config('dash.session_store_max_mb', 256)) * 1024 * 1024,
+            ttl_seconds=float(config.get_config('dash.session_store_ttl_minutes', 30)) * 60,
+        )
+    return _store_instance
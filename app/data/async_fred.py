@@ -0,0 +1,100 @@
+"""Asynchronous FRED fetch path sharing the synchronous client's cache.
+
+``fredapi`` is blocking, so a slow upstream response holds a worker thread
+for its whole duration.  ``AsyncFREDClient`` serves the same cache through
+the engine's async entry point, :meth:`CacheEngine.aget
+<app.data.cache_engine.CacheEngine.aget>`, so one event loop can wait on
+many upstream requests at once.  Upstream requests are made by
+:meth:`FREDDataMiner.afetch_series` through the miner's rate limiter and
+shared transport, so they get the same single-flight, metrics, retries and
+circuit breaker as the synchronous path.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+from typing import Optional
+import logging
+
+import pandas as pd
+
+from .fred_client import FREDDataMiner, get_fred_miner
+from .http_transport import HTTPX_AVAILABLE
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncFREDClient:
+    """Async counterpart of :class:`FREDDataMiner` for use on an event loop."""
+
+    def __init__(self, miner: Optional[FREDDataMiner] = None):
+        """Initialize the client.
+
+        Parameters
+        ----------
+        miner : FREDDataMiner, optional
+            Synchronous client whose cache, API key, rate limiter and
+            transport are used; defaults to the process-wide client
+        """
+        if not HTTPX_AVAILABLE:
+            raise ImportError("httpx library not installed. Run: pip install httpx")
+
+        self.miner = miner or get_fred_miner()
+
+    async def aclose(self) -> None:
+        """Close the async connections of the miner's transport."""
+        if self.miner.transport is not None:
+            await self.miner.transport.aclose()
+
+    async def get_series(self, series_id: str, start_date: Optional[str] = None,
+                         end_date: Optional[str] = None,
+                         force_refresh: bool = False) -> pd.Series:
+        """Retrieve a series, from the cache when it is fresh.
+
+        Arguments and fallback behaviour match
+        :meth:`FREDDataMiner.get_series`.
+        """
+        return await self.miner.engine.aget(self.miner, series_id, start_date, end_date,
+                                            force_refresh)
+
+    async def ensure_cached(self, series_ids: list[str]) -> None:
+        """Concurrently fetch any series that is missing from the cache or stale."""
+        to_fetch = await asyncio.to_thread(self.miner.series_to_refresh, series_ids)
+        results = await asyncio.gather(
+            *(self.get_series(sid, force_refresh=True) for sid in to_fetch),
+            return_exceptions=True)
+        for series_id, result in zip(to_fetch, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to retrieve {series_id}: {result}")
+
+    async def get_multiple_series(self, series_ids: list[str], **kwargs) -> pd.DataFrame:
+        """Retrieve several series as a DataFrame.
+
+        Fresh cached series are read in one batch; the rest are fetched
+        concurrently.
+        """
+        engine = self.miner.engine
+        if kwargs.get("force_refresh"):
+            frame, missing = pd.DataFrame(), list(dict.fromkeys(series_ids))
+        else:
+            frame, missing = await asyncio.to_thread(
+                engine.read_many, self.miner, series_ids,
+                kwargs.get("start_date"), kwargs.get("end_date"))
+        results = await asyncio.gather(
+            *(self.get_series(sid, **kwargs) for sid in missing), return_exceptions=True)
+        fetched = {}
+        for series_id, result in zip(missing, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to retrieve {series_id}: {result}")
+                continue
+            fetched[series_id] = result
+        return engine.merge(frame, fetched, series_ids)
+
+    async def get_series_versions(self, series_ids: list[str]) -> dict[str, str]:
+        """Async wrapper for :meth:`FREDDataMiner.get_series_versions`."""
+        return await asyncio.to_thread(self.miner.get_series_versions, series_ids)
+
+    async def get_last_modified(self, series_ids: list[str]) -> Optional[datetime]:
+        """Async wrapper for :meth:`FREDDataMiner.get_last_modified`."""
+        return await asyncio.to_thread(self.miner.get_last_modified, series_ids)
@@ -0,0 +1,850 @@
+"""Shared cache engine for time series from every data source.
+
+All sources store their series in one SQLite database, ``data_cache.db``,
+so they share the same fast paths and data from different sources can be
+joined with plain SQL.  The engine owns:
+
+* **Storage** – observations (``series_data``), metadata, content versions
+  and change-detection state, keyed by series.  Series from sources other
+  than FRED are stored under ``"<source>:<id>"`` keys.  FRED, the first
+  source, keeps bare IDs, so existing caches stay valid.
+* **Rollups** – weekly to annual aggregates of every series, kept up to
+  date on write (see :mod:`app.data.rollups`).
+* **Quality** – every series is checked for gaps, duplicate dates,
+  frequency breaks, outliers and level shifts before it is stored; the
+  flags are kept alongside it (see :mod:`app.data.quality`).
+* **Freshness** – a series is re-fetched when change detection marks it
+  dirty or, if change detection has not vouched for it recently, once it is
+  older than its source's ``max_age``.
+* **Coalescing** – concurrent requests for the same series share a single
+  upstream fetch, whether they come from threads or, through the async
+  entry point :meth:`CacheEngine.aget`, from coroutines.
+* **Metrics** – hit, miss, fetch, coalesce and fallback counts per source.
+
+Sources plug in by implementing :class:`~app.data.sources.DataSource`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional
+import logging
+
+import pandas as pd
+
+from .quality import check_series, init_quality, read_flags, read_quality, store_quality
+from .rollups import has_rollups, init_rollups, read_rollup, update_rollups
+
+if TYPE_CHECKING:
+    from .sources import DataSource
+
+logger = logging.getLogger(__name__)
+
+# Source whose series are stored under bare IDs
+DEFAULT_SOURCE = "fred"
+
+# Cache file written before the engine existed; adopted on first start
+LEGACY_DB_NAME = "fred_cache.db"
+DB_NAME = "data_cache.db"
+
+# How recently change detection must have checked a series for its verdict to count
+CHANGE_CHECK_MAX_AGE = timedelta(hours=48)
+
+# Keys per ``IN (...)`` clause, below SQLite's bound parameter limit
+MAX_KEYS_PER_QUERY = 900
+
+METRICS = ("hits", "misses", "fetches", "coalesced", "errors", "stale_fallbacks")
+
+
+class _Flight:
+    """An upstream fetch that concurrent callers wait on.
+
+    Threads wait on :attr:`done`; coroutines await :meth:`wait_async`, so
+    synchronous and async callers join the same fetch.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[pd.Series] = None
+        self.error: Optional[BaseException] = None
+        self._lock = threading.Lock()
+        self._wakers: list[Callable[[], None]] = []
+
+    def finish(self) -> None:
+        """Mark the fetch done and wake every waiter."""
+        with self._lock:
+            self.done.set()
+            wakers, self._wakers = self._wakers, []
+        for wake in wakers:
+            wake()
+
+    async def wait_async(self) -> None:
+        """Wait for the fetch without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        woken = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: woken.done() or woken.set_result(None))
+
+        with self._lock:
+            if self.done.is_set():
+                return
+            self._wakers.append(wake)
+        await woken
+
+    def outcome(self) -> pd.Series:
+        """Return a copy of the fetched series, or raise the fetch's error."""
+        if self.error is not None:
+            raise self.error
+        return self.result.copy()
+
+
+class CacheEngine:
+    """Stores, serves and refreshes cached series for all data sources."""
+
+    def __init__(self, cache_dir: str | Path):
+        """Open (and if needed create) the shared cache in ``cache_dir``."""
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(exist_ok=True)
+        self.db_path = self.cache_dir / DB_NAME
+        legacy = self.cache_dir / LEGACY_DB_NAME
+        if legacy.exists() and not self.db_path.exists():
+            legacy.rename(self.db_path)
+            logger.info(f"Adopted {legacy} as the shared cache {self.db_path}")
+        self._init_db()
+
+        self._lock = threading.Lock()
+        self._inflight: dict[tuple, _Flight] = {}
+        self._metrics: dict[str, dict[str, float]] = defaultdict(
+            lambda: dict.fromkeys(METRICS + ("fetch_seconds",), 0))
+
+    def _init_db(self):
+        """Create the shared tables."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS series_data (
+                    series_id TEXT,
+                    date TEXT,
+                    value REAL,
+                    last_updated TEXT,
+                    PRIMARY KEY (series_id, date)
+                )
+            """)
+            # Covering index: range reads of (date, value) are answered from
+            # the index without a lookup into the table per row.
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_series_data_values
+                ON series_data (series_id, date, value)
+            """)
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS series_metadata (
+                    series_id TEXT PRIMARY KEY,
+                    title TEXT,
+                    units TEXT,
+                    frequency TEXT,
+                    last_updated TEXT,
+                    observation_start TEXT,
+                    observation_end TEXT
+                )
+            """)
+
+            # Upstream ``last_updated`` per series and whether change
+            # detection has seen a newer one than the cached copy.
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS series_updates (
+                    series_id TEXT PRIMARY KEY,
+                    upstream_updated TEXT,
+                    dirty INTEGER DEFAULT 0,
+                    checked TEXT
+                )
+            """)
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS series_versions (
+                    series_id TEXT PRIMARY KEY,
+                    version TEXT,
+                    updated TEXT
+                )
+            """)
+
+            init_rollups(conn)
+            init_quality(conn)
+
+    def adopt(self, legacy_name: str, tables: Iterable[str]) -> None:
+        """Copy a source's tables from its old cache file into the shared cache.
+
+        For sources that kept their own SQLite file before the engine held
+        everything.  The tables must already exist in the shared cache.  The
+        old file is renamed to ``<name>.adopted`` afterwards, so this runs
+        once.
+        """
+        legacy = self.cache_dir / legacy_name
+        if not legacy.exists():
+            return
+        tables = list(tables)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("ATTACH DATABASE ? AS legacy", [str(legacy)])
+            present = {name for (name,) in conn.execute(
+                "SELECT name FROM legacy.sqlite_master WHERE type = 'table'")}
+            for table in tables:
+                if table in present:
+                    conn.execute(f'INSERT OR IGNORE INTO main."{table}" SELECT * FROM legacy."{table}"')
+            conn.commit()
+            conn.execute("DETACH DATABASE legacy")
+        finally:
+            conn.close()
+        legacy.rename(legacy.with_name(legacy.name + ".adopted"))
+        logger.info(f"Adopted {', '.join(tables)} from {legacy} into {self.db_path}")
+
+    @staticmethod
+    def key(source: str, series_id: str) -> str:
+        """Return the storage key of a source's series."""
+        return series_id if source == DEFAULT_SOURCE else f"{source}:{series_id}"
+
+    @staticmethod
+    def source_filter(source: str, column: str = "series_id") -> tuple[str, list]:
+        """Return an SQL condition, and its parameters, matching one source's keys.
+
+        Parameters
+        ----------
+        source : str
+            Source name
+        column : str
+            Column (or qualified column) holding storage keys
+        """
+        if source == DEFAULT_SOURCE:
+            # Keys of other sources are "<source>:<id>"; bare IDs have no colon
+            return f"instr({column}, ':') = 0", []
+        prefix = f"{source}:"
+        return f"substr({column}, 1, ?) = ?", [len(prefix), prefix]
+
+    def _count(self, source: str, metric: str, amount: float = 1) -> None:
+        with self._lock:
+            self._metrics[source][metric] += amount
+
+    def metrics(self) -> dict[str, dict[str, float]]:
+        """Return counters per source (``hits``, ``misses``, ``fetches``...)."""
+        with self._lock:
+            return {source: dict(counts) for source, counts in self._metrics.items()}
+
+    # -- Freshness ---------------------------------------------------------
+
+    @staticmethod
+    def is_stale(conn: sqlite3.Connection, key: str, max_age: timedelta) -> bool:
+        """Return True if the cached copy of a series should be re-fetched.
+
+        Series marked dirty by change detection are stale.  Series it has
+        checked recently are fresh however old they are; all others expire
+        after ``max_age``.
+        """
+        return bool(CacheEngine.stale_keys(conn, [key], max_age))
+
+    @staticmethod
+    def stale_keys(conn: sqlite3.Connection, keys: list[str], max_age: timedelta) -> set[str]:
+        """Return the keys among ``keys`` whose cached copy is stale (see
+        :meth:`is_stale`), using two queries per batch of keys."""
+        now = datetime.now()
+        stale = set()
+        for batch in _chunks(keys, MAX_KEYS_PER_QUERY):
+            placeholders = ", ".join("?" for _ in batch)
+            updates = {key: (dirty, checked) for key, dirty, checked in conn.execute(
+                f"SELECT series_id, dirty, checked FROM series_updates "
+                f"WHERE series_id IN ({placeholders})", batch)}
+            cached_at = dict(conn.execute(
+                f"SELECT series_id, last_updated FROM series_metadata "
+                f"WHERE series_id IN ({placeholders})", batch).fetchall())
+            for key in batch:
+                if key in updates:
+                    dirty, checked = updates[key]
+                    if dirty:
+                        stale.add(key)
+                        continue
+                    if checked and now - datetime.fromisoformat(checked) <= CHANGE_CHECK_MAX_AGE:
+                        continue
+                if key in cached_at:
+                    # Catalog crawls record metadata without a cache time.
+                    last_updated = cached_at[key]
+                    if last_updated is None or now - datetime.fromisoformat(last_updated) > max_age:
+                        stale.add(key)
+        return stale
+
+    def to_refresh(self, source: DataSource, series_ids: list[str]) -> list[str]:
+        """Return the series that are missing from the cache or stale, in order."""
+        if not series_ids:
+            return []
+        keys = {series_id: self.key(source.name, series_id) for series_id in series_ids}
+        with sqlite3.connect(self.db_path) as conn:
+            cached = set()
+            for batch in _chunks(list(keys.values()), MAX_KEYS_PER_QUERY):
+                placeholders = ", ".join("?" for _ in batch)
+                cached.update(row[0] for row in conn.execute(
+                    f"SELECT series_id FROM series_versions WHERE series_id IN ({placeholders})",
+                    batch
+                ))
+            stale = self.stale_keys(conn, list(cached), source.max_age)
+            return [
+                series_id for series_id, key in keys.items()
+                if key not in cached or key in stale
+            ]
+
+    # -- Reads -------------------------------------------------------------
+
+    def read(self, source: DataSource, series_id: str, start_date: Optional[str] = None,
+             end_date: Optional[str] = None, allow_stale: bool = False) -> Optional[pd.Series]:
+        """Return a cached series, or None if it is missing or stale.
+
+        With ``allow_stale`` the cached copy is returned however old it is.
+        """
+        key = self.key(source.name, series_id)
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                query = "SELECT date, value FROM series_data WHERE series_id = ?"
+                params = [key]
+                if start_date:
+                    query += " AND date >= ?"
+                    params.append(start_date)
+                if end_date:
+                    query += " AND date <= ?"
+                    params.append(end_date)
+                query += " ORDER BY date"
+
+                df = pd.read_sql_query(query, conn, params=params)
+                if df.empty:
+                    return None
+                if not allow_stale and self.is_stale(conn, key, source.max_age):
+                    return None
+
+                df['date'] = pd.to_datetime(df['date'])
+                return df.set_index('date')['value'].rename(series_id)
+
+        except Exception as e:
+            logger.error(f"Error reading cache for {key}: {e}")
+            return None
+
+    def read_many(self, source: DataSource, series_ids: list[str],
+                  start_date: Optional[str] = None, end_date: Optional[str] = None,
+                  allow_stale: bool = False) -> tuple[pd.DataFrame, list[str]]:
+        """Read several cached series at once as a wide DataFrame.
+
+        Freshness is checked for all series together and the observations
+        are read with one ``IN (...)`` query per batch of series, then
+        pivoted from long to wide in a single vectorized step.
+
+        Returns
+        -------
+        tuple[pd.DataFrame, list[str]]
+            The fresh cached series as columns (in the requested order,
+            indexed by date), and the requested series that are missing or
+            stale and need fetching
+        """
+        keys = {self.key(source.name, series_id): series_id
+                for series_id in dict.fromkeys(series_ids)}
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                stale = set() if allow_stale else self.stale_keys(conn, list(keys), source.max_age)
+                rows = []
+                for batch in _chunks([key for key in keys if key not in stale],
+                                     MAX_KEYS_PER_QUERY):
+                    query = (f"SELECT series_id, date, value FROM series_data "
+                             f"WHERE series_id IN ({', '.join('?' for _ in batch)})")
+                    params = list(batch)
+                    if start_date:
+                        query += " AND date >= ?"
+                        params.append(start_date)
+                    if end_date:
+                        query += " AND date <= ?"
+                        params.append(end_date)
+                    rows.extend(conn.execute(query, params).fetchall())
+        except Exception as e:
+            logger.error(f"Error reading cache for {len(keys)} series: {e}")
+            return pd.DataFrame(), list(keys.values())
+
+        long = pd.DataFrame(rows, columns=["series_id", "date", "value"])
+        frame = long.pivot(index="date", columns="series_id", values="value")
+        # Parse each distinct date once, after the pivot
+        frame.index = pd.DatetimeIndex(pd.to_datetime(frame.index), name="date")
+        frame.columns = [keys[key] for key in frame.columns]
+        present = [series_id for series_id in keys.values() if series_id in frame.columns]
+        frame = frame[present]
+        if present:
+            self._count(source.name, "hits", len(present))
+
+        missing = [series_id for series_id in keys.values() if series_id not in frame.columns]
+        return frame, missing
+
+    @staticmethod
+    def merge(frame: pd.DataFrame, fetched: dict[str, pd.Series],
+              series_ids: list[str]) -> pd.DataFrame:
+        """Add freshly fetched series to a :meth:`read_many` frame, keeping
+        the requested column order."""
+        if fetched:
+            frame = pd.concat([frame, pd.DataFrame(fetched)], axis=1)
+        order = [series_id for series_id in dict.fromkeys(series_ids) if series_id in frame.columns]
+        frame = frame[order]
+        if not frame.empty:
+            frame = frame.sort_index()
+            frame.index.name = "date"
+        return frame
+
+    def versions(self, source: str, series_ids: list[str]) -> dict[str, str]:
+        """Return the content version of each cached series.
+
+        Series that have never been cached are omitted.
+        """
+        if not series_ids:
+            return {}
+        keys = {self.key(source, series_id): series_id for series_id in series_ids}
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                placeholders = ", ".join("?" for _ in keys)
+                cursor = conn.execute(
+                    f"SELECT series_id, version FROM series_versions WHERE series_id IN ({placeholders})",
+                    list(keys)
+                )
+                return {keys[key]: version for key, version in cursor.fetchall()}
+        except Exception as e:
+            logger.error(f"Error reading series versions: {e}")
+            return {}
+
+    def last_modified(self, source: str, series_ids: list[str]) -> Optional[datetime]:
+        """Return when the cached content of any of the series last changed."""
+        if not series_ids:
+            return None
+        keys = [self.key(source, series_id) for series_id in series_ids]
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                placeholders = ", ".join("?" for _ in keys)
+                result = conn.execute(
+                    f"SELECT MAX(updated) FROM series_versions WHERE series_id IN ({placeholders})",
+                    keys
+                ).fetchone()
+                return datetime.fromisoformat(result[0]) if result and result[0] else None
+        except Exception as e:
+            logger.error(f"Error reading last-modified time: {e}")
+            return None
+
+    def metadata(self, source: str, series_id: str) -> dict[str, str]:
+        """Return cached metadata for a series; empty if it is not cached."""
+        key = self.key(source, series_id)
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.row_factory = sqlite3.Row
+                row = conn.execute(
+                    "SELECT * FROM series_metadata WHERE series_id = ?", [key]
+                ).fetchone()
+                if not row:
+                    return {}
+                return {**dict(row), "series_id": series_id}
+        except Exception as e:
+            logger.error(f"Error reading metadata for {key}: {e}")
+            return {}
+
+    def iter_observations(self, source: str, series_ids: list[str],
+                          start_date: Optional[str] = None, end_date: Optional[str] = None,
+                          chunk_size: int = 10000) -> Iterator[list[tuple[str, str, float]]]:
+        """Stream cached ``(date, series_id, value)`` rows in chunks, ordered
+        by date then series, through a single cursor."""
+        if not series_ids:
+            return
+        keys = {self.key(source, series_id): series_id for series_id in series_ids}
+        placeholders = ", ".join("?" for _ in keys)
+        query = f"SELECT date, series_id, value FROM series_data WHERE series_id IN ({placeholders})"
+        params = list(keys)
+        if start_date:
+            query += " AND date >= ?"
+            params.append(start_date)
+        if end_date:
+            query += " AND date <= ?"
+            params.append(end_date)
+        query += " ORDER BY date, series_id"
+
+        # Streaming servers may resume the generator on different worker
+        # threads; access is still strictly sequential.
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        try:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                if source != DEFAULT_SOURCE:
+                    rows = [(date, keys[key], value) for date, key, value in rows]
+                yield rows
+        finally:
+            conn.close()
+
+    def rollup(self, source: DataSource, series_id: str, level: str,
+               start_date: Optional[str] = None,
+               end_date: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """Return the cached rollup of a series at one level.
+
+        Rollups missing for a cached series (one cached before rollups
+        existed) are built from its observations first.  Freshness is not
+        checked; refresh the series first if needed.
+
+        Returns
+        -------
+        pd.DataFrame or None
+            Bins whose label lies in the window (see
+            :func:`~app.data.rollups.read_rollup`), or None if the series is
+            not cached
+        """
+        key = self.key(source.name, series_id)
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                if not has_rollups(conn, key):
+                    rows = conn.execute(
+                        "SELECT date, value FROM series_data WHERE series_id = ?", [key]
+                    ).fetchall()
+                    if not rows:
+                        return None
+                    update_rollups(conn, key, pd.Series(dict(rows), dtype=float))
+                return read_rollup(conn, key, level, start_date, end_date)
+        except Exception as e:
+            logger.error(f"Error reading {level} rollup for {key}: {e}")
+            return None
+
+    def _ensure_quality(self, conn: sqlite3.Connection, keys: list[str]) -> None:
+        """Check cached series that have no quality results yet (ones cached
+        before the checks existed) from their stored observations."""
+        checked = set()
+        for chunk in _chunks(keys, MAX_KEYS_PER_QUERY):
+            checked.update(row[0] for row in conn.execute(
+                f"SELECT series_id FROM series_quality "
+                f"WHERE series_id IN ({', '.join('?' * len(chunk))})", chunk))
+        for key in keys:
+            if key in checked:
+                continue
+            rows = conn.execute(
+                "SELECT date, value FROM series_data WHERE series_id = ?", [key]).fetchall()
+            if rows:
+                store_quality(conn, key, check_series(pd.Series(dict(rows), dtype=float),
+                                                      self._frequency(conn, key)))
+
+    def quality(self, source: DataSource, series_id: str) -> Optional[dict]:
+        """Return the quality summary of a cached series.
+
+        Returns
+        -------
+        dict or None
+            Expected ``frequency`` code, ``observations``, the number of
+            observations carrying each flag in
+            :data:`~app.data.quality.FLAGS` and when it was ``checked``;
+            None if the series is not cached
+        """
+        key = self.key(source.name, series_id)
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                self._ensure_quality(conn, [key])
+                return read_quality(conn, key)
+        except Exception as e:
+            logger.error(f"Error reading quality of {key}: {e}")
+            return None
+
+    def quality_flags(self, source: DataSource, series_ids: list[str],
+                      flags: Optional[list[str]] = None, start_date: Optional[str] = None,
+                      end_date: Optional[str] = None) -> pd.DataFrame:
+        """Return the stored quality flags of cached series.
+
+        See :func:`~app.data.quality.read_flags`; ``series_id`` holds the
+        IDs as given, without the source prefix.
+        """
+        keys = {self.key(source.name, series_id): series_id for series_id in series_ids}
+        with sqlite3.connect(self.db_path) as conn:
+            self._ensure_quality(conn, list(keys))
+            parts = [read_flags(conn, chunk, flags, start_date, end_date)
+                     for chunk in list(_chunks(list(keys), MAX_KEYS_PER_QUERY)) or [[]]]
+        frame = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+        frame["series_id"] = frame["series_id"].map(keys)
+        return frame
+
+    # -- Writes ------------------------------------------------------------
+
+    @staticmethod
+    def _content_version(records: list[tuple]) -> str:
+        """Return a short hash of the (date, value) pairs being cached."""
+        digest = hashlib.sha1()
+        for _, date, value, _ in records:
+            digest.update(f"{date}={value!r};".encode())
+        return digest.hexdigest()[:16]
+
+    def write(self, source: str, series_id: str, data: pd.Series) -> None:
+        """Check and replace the cached observations of a series.
+
+        The quality checks run first; duplicate dates are collapsed to
+        their last value before storing.
+
+        Raises
+        ------
+        sqlite3.Error
+            If the cache could not be written; nothing is changed
+        """
+        key = self.key(source, series_id)
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                report = check_series(data, self._frequency(conn, key))
+                previous = dict(conn.execute(
+                    "SELECT date, value FROM series_data WHERE series_id = ?", [key]))
+                conn.execute("DELETE FROM series_data WHERE series_id = ?", [key])
+
+                records = [
+                    (key, date.strftime('%Y-%m-%d'), float(value), datetime.now().isoformat())
+                    for date, value in report.data.items()
+                ]
+                conn.executemany(
+                    "INSERT INTO series_data (series_id, date, value, last_updated) VALUES (?, ?, ?, ?)",
+                    records
+                )
+                store_quality(conn, key, report)
+
+                # Record a content version so downstream caches (e.g. rendered
+                # figures) can tell whether the stored observations changed.
+                # The timestamp only moves when the content does.
+                conn.execute(
+                    """INSERT INTO series_versions (series_id, version, updated) VALUES (?, ?, ?)
+                       ON CONFLICT(series_id) DO UPDATE SET
+                           version = excluded.version, updated = excluded.updated
+                       WHERE version != excluded.version""",
+                    (key, self._content_version(records), datetime.now().isoformat())
+                )
+
+                # Recompute only the rollup bins whose observations changed.
+                current = {date: value for _, date, value, _ in records}
+                changed = None
+                if previous and has_rollups(conn, key):
+                    changed = [date for date in previous.keys() | current.keys()
+                               if previous.get(date) != current.get(date)]
+                update_rollups(conn, key, pd.Series(current, dtype=float), changed)
+
+        except sqlite3.Error as e:
+            logger.error(f"Error caching series {key}: {e}")
+            raise
+
+    @staticmethod
+    def _frequency(conn: sqlite3.Connection, key: str) -> Optional[str]:
+        """Return the cached ``frequency`` metadata of a series, if any."""
+        row = conn.execute("SELECT frequency FROM series_metadata WHERE series_id = ?",
+                           [key]).fetchone()
+        return row[0] if row else None
+
+    def write_metadata(self, source: str, series_id: str, info) -> None:
+        """Store series metadata (a mapping with FRED-style field names).
+
+        Raises
+        ------
+        sqlite3.Error
+            If the cache could not be written
+        """
+        key = self.key(source, series_id)
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute(
+                    """INSERT OR REPLACE INTO series_metadata
+                       (series_id, title, units, frequency, last_updated, observation_start, observation_end)
+                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                    (
+                        key,
+                        info.get('title', ''),
+                        info.get('units', ''),
+                        info.get('frequency', ''),
+                        datetime.now().isoformat(),
+                        info.get('observation_start', ''),
+                        info.get('observation_end', '')
+                    )
+                )
+                # The cached copy now matches upstream; it ages normally until
+                # change detection next checks it.
+                conn.execute(
+                    """INSERT OR REPLACE INTO series_updates
+                       (series_id, upstream_updated, dirty, checked) VALUES (?, ?, 0, NULL)""",
+                    (key, info.get('last_updated'))
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Error caching metadata for {key}: {e}")
+            raise
+
+    # -- Fetching ----------------------------------------------------------
+
+    def _fetch(self, source: DataSource, series_id: str, start_date: Optional[str],
+               end_date: Optional[str]) -> pd.Series:
+        """Fetch a series and its metadata from the source and cache them.
+
+        The fetched data is returned even if caching it fails.
+        """
+        started = time.perf_counter()
+        data = source.fetch_series(series_id, start_date, end_date)
+        try:
+            self.write(source.name, series_id, data)
+            info = source.fetch_metadata(series_id)
+            if info is not None:
+                self.write_metadata(source.name, series_id, info)
+        except sqlite3.Error:
+            # Already logged by the write
+            self._count(source.name, "errors")
+        self._count(source.name, "fetches")
+        self._count(source.name, "fetch_seconds", time.perf_counter() - started)
+        return data
+
+    async def _afetch(self, source: DataSource, series_id: str, start_date: Optional[str],
+                      end_date: Optional[str]) -> pd.Series:
+        """Async :meth:`_fetch`: series and metadata are fetched concurrently,
+        and the cache is written from a worker thread."""
+        started = time.perf_counter()
+        data, info = await asyncio.gather(
+            source.afetch_series(series_id, start_date, end_date),
+            source.afetch_metadata(series_id))
+
+        def store():
+            self.write(source.name, series_id, data)
+            if info is not None:
+                self.write_metadata(source.name, series_id, info)
+
+        try:
+            await asyncio.to_thread(store)
+        except sqlite3.Error:
+            self._count(source.name, "errors")
+        self._count(source.name, "fetches")
+        self._count(source.name, "fetch_seconds", time.perf_counter() - started)
+        return data
+
+    def _join(self, source: DataSource, series_id: str, start_date: Optional[str],
+              end_date: Optional[str]) -> tuple[tuple, _Flight, bool]:
+        """Find or start the flight for a fetch; returns ``(key, flight, leader)``."""
+        flight_key = (self.key(source.name, series_id), start_date, end_date)
+        with self._lock:
+            flight = self._inflight.get(flight_key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[flight_key] = _Flight()
+        if not leader:
+            self._count(source.name, "coalesced")
+        return flight_key, flight, leader
+
+    def _land(self, flight_key: tuple, flight: _Flight) -> None:
+        with self._lock:
+            self._inflight.pop(flight_key, None)
+        flight.finish()
+
+    def fetch(self, source: DataSource, series_id: str, start_date: Optional[str] = None,
+              end_date: Optional[str] = None) -> pd.Series:
+        """Fetch a series upstream, joining an identical fetch already in flight."""
+        flight_key, flight, leader = self._join(source, series_id, start_date, end_date)
+        if not leader:
+            flight.done.wait()
+            return flight.outcome()
+
+        try:
+            flight.result = self._fetch(source, series_id, start_date, end_date)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            self._land(flight_key, flight)
+
+    async def afetch(self, source: DataSource, series_id: str, start_date: Optional[str] = None,
+                     end_date: Optional[str] = None) -> pd.Series:
+        """Async :meth:`fetch`.
+
+        Joins fetches in flight from threads and coroutines alike, and uses
+        the source's :meth:`~app.data.sources.DataSource.afetch_series`.
+        """
+        flight_key, flight, leader = self._join(source, series_id, start_date, end_date)
+        if not leader:
+            await flight.wait_async()
+            return flight.outcome()
+
+        try:
+            flight.result = await self._afetch(source, series_id, start_date, end_date)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            self._land(flight_key, flight)
+
+    def get(self, source: DataSource, series_id: str, start_date: Optional[str] = None,
+            end_date: Optional[str] = None, force_refresh: bool = False) -> pd.Series:
+        """Return a series from the cache when fresh, otherwise from upstream.
+
+        If the upstream fetch fails, the cached copy is returned however old
+        it is; the error is raised only when nothing is cached.
+        """
+        if not force_refresh:
+            cached = self.read(source, series_id, start_date, end_date)
+            if cached is not None:
+                self._count(source.name, "hits")
+                logger.info(f"Retrieved {series_id} from cache")
+                return cached
+        self._count(source.name, "misses")
+
+        try:
+            logger.info(f"Fetching {series_id} from {source.name}")
+            return self.fetch(source, series_id, start_date, end_date)
+        except Exception as e:
+            self._count(source.name, "errors")
+            logger.error(f"Failed to fetch {series_id}: {e}")
+            cached = self.read(source, series_id, start_date, end_date, allow_stale=True)
+            if cached is not None:
+                self._count(source.name, "stale_fallbacks")
+                logger.warning(f"Using cached data for {series_id} due to API error")
+                return cached
+            raise
+
+    async def aget(self, source: DataSource, series_id: str, start_date: Optional[str] = None,
+                   end_date: Optional[str] = None, force_refresh: bool = False) -> pd.Series:
+        """Async :meth:`get`, for callers on an event loop.
+
+        Cache reads and writes run in worker threads (they are short); the
+        upstream fetch is awaited, so a slow upstream only holds a coroutine.
+        """
+        if not force_refresh:
+            cached = await asyncio.to_thread(self.read, source, series_id, start_date, end_date)
+            if cached is not None:
+                self._count(source.name, "hits")
+                logger.info(f"Retrieved {series_id} from cache")
+                return cached
+        self._count(source.name, "misses")
+
+        try:
+            logger.info(f"Fetching {series_id} from {source.name}")
+            return await self.afetch(source, series_id, start_date, end_date)
+        except Exception as e:
+            self._count(source.name, "errors")
+            logger.error(f"Failed to fetch {series_id}: {e}")
+            cached = await asyncio.to_thread(self.read, source, series_id, start_date, end_date,
+                                             True)
+            if cached is not None:
+                self._count(source.name, "stale_fallbacks")
+                logger.warning(f"Using cached data for {series_id} due to API error")
+                return cached
+            raise
+
+
+def _chunks(items: list, size: int) -> Iterator[list]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+# One engine per cache directory, shared by every source in the process
+_engines: dict[Path, CacheEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_cache_engine(cache_dir: str | Path) -> CacheEngine:
+    """Get the shared cache engine for a cache directory."""
+    path = Path(cache_dir).resolve()
+    with _engines_lock:
+        # Recreate the engine if its database was removed from under it.
+        if path not in _engines or not _engines[path].db_path.exists():
+            _engines[path] = CacheEngine(path)
+        return _engines[path]
@@ -0,0 +1,187 @@
+"""CoinGecko API client feeding the in-memory tick store."""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from typing import Optional
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+import logging
+
+import pandas as pd
+
+from ..config.secrets import get_api_key, get_config
+from .http_transport import HTTPX_AVAILABLE, HTTPTransport, get_transport
+from .tick_store import TickStore, get_tick_store
+
+logger = logging.getLogger(__name__)
+
+# Public API root; override to point at the pro API or a local stand-in
+COINGECKO_BASE_URL = "https://api.coingecko.com/api/v3"
+
+# Coin IDs sent per simple/price request; keeps URLs well under server limits
+MAX_IDS_PER_REQUEST = 250
+
+
+class CoinGeckoClient:
+    """Client for CoinGecko price and market chart data."""
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 batch_size: int = MAX_IDS_PER_REQUEST, timeout: float = 10.0,
+                 transport: Optional[HTTPTransport] = None):
+        """Initialize the client.
+
+        Parameters
+        ----------
+        api_key : str, optional
+            CoinGecko demo API key. If None, uses the secure config or the
+            COINGECKO_API_KEY env var; requests are keyless otherwise.
+        base_url : str, optional
+            API root. If None, uses the COINGECKO_BASE_URL env var, then the
+            ``coingecko.base_url`` config value, then the public API.
+        batch_size : int
+            Maximum coin IDs per price request
+        timeout : float
+            Time budget per request in seconds, including retries
+        transport : HTTPTransport, optional
+            Transport for CoinGecko requests; defaults to the shared
+            ``'coingecko'`` transport
+        """
+        self.api_key = api_key or get_api_key("coingecko")
+        self.base_url = (base_url or os.environ.get("COINGECKO_BASE_URL")
+                         or get_config().get_config('coingecko.base_url') or COINGECKO_BASE_URL)
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.transport = transport
+        if self.transport is None and HTTPX_AVAILABLE:
+            self.transport = get_transport("coingecko")
+
+    def _get(self, path: str, **params) -> dict:
+        """GET an API endpoint and return the decoded JSON."""
+        url = f"{self.base_url.rstrip('/')}/{path}"
+        headers = {"Accept": "application/json"}
+        if self.api_key:
+            headers["x-cg-demo-api-key"] = self.api_key
+        if self.transport is not None:
+            return self.transport.get_json(url, params=params, deadline=self.timeout,
+                                           headers=headers)
+        request = Request(f"{url}?{urlencode(params)}", headers=headers)
+        with urlopen(request, timeout=self.timeout) as response:
+            return json.load(response)
+
+    def get_prices(self, coin_ids: list[str],
+                   vs_currency: str = "usd") -> dict[str, dict[str, float]]:
+        """Fetch current prices for many coins, batching IDs per request.
+
+        Parameters
+        ----------
+        coin_ids : list[str]
+            CoinGecko coin IDs (e.g. ``'bitcoin'``)
+        vs_currency : str
+            Quote currency
+
+        Returns
+        -------
+        dict[str, dict[str, float]]
+            ``{coin_id: {"price", "market_cap", "volume_24h", "change_24h",
+            "last_updated"}}``; unknown coins are omitted
+        """
+        ids = list(dict.fromkeys(coin_ids))
+        quotes = {}
+        for i in range(0, len(ids), self.batch_size):
+            batch = ids[i:i + self.batch_size]
+            body = self._get(
+                "simple/price",
+                ids=",".join(batch),
+                vs_currencies=vs_currency,
+                include_market_cap="true",
+                include_24hr_vol="true",
+                include_24hr_change="true",
+                include_last_updated_at="true",
+            )
+            for coin_id, quote in body.items():
+                if vs_currency not in quote:
+                    continue
+                quotes[coin_id] = {
+                    "price": float(quote[vs_currency]),
+                    "market_cap": float(quote.get(f"{vs_currency}_market_cap") or 0.0),
+                    "volume_24h": float(quote.get(f"{vs_currency}_24h_vol") or 0.0),
+                    "change_24h": float(quote.get(f"{vs_currency}_24h_change") or 0.0),
+                    "last_updated": float(quote.get("last_updated_at") or time.time()),
+                }
+        return quotes
+
+    def get_market_chart(self, coin_id: str, days: int | str = 1,
+                         vs_currency: str = "usd") -> pd.DataFrame:
+        """Fetch historical prices, market caps and volumes for a coin.
+
+        Parameters
+        ----------
+        coin_id : str
+            CoinGecko coin ID
+        days : int or str
+            Days of history (or ``'max'``); CoinGecko picks the granularity
+        vs_currency : str
+            Quote currency
+
+        Returns
+        -------
+        pd.DataFrame
+            Columns ``price``, ``market_cap`` and ``total_volume`` indexed
+            by UTC time
+        """
+        body = self._get(f"coins/{coin_id}/market_chart", vs_currency=vs_currency, days=days)
+        frames = [
+            pd.DataFrame(body.get(key, []), columns=["time", column]).set_index("time")
+            for key, column in (("prices", "price"), ("market_caps", "market_cap"),
+                                ("total_volumes", "total_volume"))
+        ]
+        frame = pd.concat(frames, axis=1)
+        frame.index = pd.to_datetime(frame.index, unit="ms", utc=True)
+        return frame.sort_index()
+
+    def record_prices(self, coin_ids: list[str], store: Optional[TickStore] = None,
+                      vs_currency: str = "usd") -> dict[str, dict[str, float]]:
+        """Fetch current prices and append them to a tick store as ticks.
+
+        The 24h volume CoinGecko reports is a rolling total, not traded
+        volume, so ticks are stored without volume.
+
+        Returns
+        -------
+        dict[str, dict[str, float]]
+            The quotes, as returned by :meth:`get_prices`
+        """
+        store = store if store is not None else get_tick_store()
+        quotes = self.get_prices(coin_ids, vs_currency)
+        for coin_id, quote in quotes.items():
+            store.append(coin_id, quote["last_updated"], quote["price"])
+        return quotes
+
+    def load_history(self, coin_id: str, days: int | str = 1,
+                     store: Optional[TickStore] = None) -> int:
+        """Seed a tick store with a coin's market chart prices.
+
+        Returns
+        -------
+        int
+            Number of ticks stored
+        """
+        store = store if store is not None else get_tick_store()
+        chart = self.get_market_chart(coin_id, days)
+        times = chart.index.asi8 / 1e9
+        return store.extend(coin_id, times, chart["price"].to_numpy())
+
+
+# Global client instance shared by the app
+_client_instance: Optional[CoinGeckoClient] = None
+
+
+def get_coingecko_client() -> CoinGeckoClient:
+    """Get the global CoinGecko client instance."""
+    global _client_instance
+    if _client_instance is None:
+        _client_instance = CoinGeckoClient()
+    return _client_instance
@@ -0,0 +1,352 @@
+"""CoinMarketCap client with a persistent API credit budget.
+
+The CoinMarketCap free plan allows 10,000 credits per monthly billing
+period, and ``quotes/latest`` costs one credit per 100 symbols.  Every call
+is recorded in a ledger table in the shared cache (``data_cache.db``), so
+usage survives restarts.  :class:`QuotaBudget` turns the ledger into a polling
+interval that spreads the remaining credits evenly over the rest of the
+period; when usage runs ahead of that pace the interval widens
+automatically, and it narrows again (down to a floor) as the period ends
+with credits to spare.
+"""
+
+from __future__ import annotations
+
+import calendar
+import json
+import math
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+import logging
+
+from ..config.secrets import get_api_key, get_config
+from .cache_engine import get_cache_engine
+from .http_transport import HTTPX_AVAILABLE, HTTPTransport, get_transport
+
+logger = logging.getLogger(__name__)
+
+COINMARKETCAP_BASE_URL = "https://pro-api.coinmarketcap.com/v1"
+
+# quotes/latest is billed one credit per this many symbols
+SYMBOLS_PER_CREDIT = 100
+
+# Free plan allowance per billing period
+DEFAULT_MONTHLY_CREDITS = 10000
+
+# Own cache file used before the ledger moved into the shared cache
+LEGACY_DB_NAME = "coinmarketcap_cache.db"
+
+
+class QuotaExceeded(RuntimeError):
+    """Raised when a call would exceed the credit budget."""
+
+
+def billing_period(now: datetime, billing_day: int = 1) -> tuple[datetime, datetime]:
+    """Return the UTC start and end of the billing period containing ``now``.
+
+    Periods start at midnight UTC on ``billing_day`` of each month (clamped
+    to the month's length).
+    """
+    def anchor(year: int, month: int) -> datetime:
+        day = min(billing_day, calendar.monthrange(year, month)[1])
+        return datetime(year, month, day, tzinfo=timezone.utc)
+
+    def shift(year: int, month: int, delta: int) -> tuple[int, int]:
+        index = year * 12 + month - 1 + delta
+        return index // 12, index % 12 + 1
+
+    start = anchor(now.year, now.month)
+    if now < start:
+        start = anchor(*shift(now.year, now.month, -1))
+    end = anchor(*shift(start.year, start.month, 1))
+    return start, end
+
+
+class QuotaLedger:
+    """Persistent record of API credits spent, stored in SQLite."""
+
+    def __init__(self, db_path: Path):
+        """Open (and create if needed) the ledger table in ``db_path``."""
+        self.db_path = Path(db_path)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS quota_ledger (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT,
+                    endpoint TEXT,
+                    credits INTEGER
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_quota_ledger_timestamp ON quota_ledger (timestamp)"
+            )
+
+    def record(self, endpoint: str, credits: int, timestamp: Optional[datetime] = None) -> None:
+        """Record credits spent by one call."""
+        timestamp = timestamp or datetime.now(timezone.utc)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                "INSERT INTO quota_ledger (timestamp, endpoint, credits) VALUES (?, ?, ?)",
+                (timestamp.astimezone(timezone.utc).isoformat(), endpoint, int(credits))
+            )
+
+    def used(self, since: datetime, until: Optional[datetime] = None) -> int:
+        """Credits spent from ``since`` (inclusive) to ``until`` (exclusive)."""
+        query = "SELECT COALESCE(SUM(credits), 0) FROM quota_ledger WHERE timestamp >= ?"
+        params = [since.astimezone(timezone.utc).isoformat()]
+        if until is not None:
+            query += " AND timestamp < ?"
+            params.append(until.astimezone(timezone.utc).isoformat())
+        with sqlite3.connect(self.db_path) as conn:
+            return int(conn.execute(query, params).fetchone()[0])
+
+    def last_call(self) -> Optional[datetime]:
+        """Time of the most recent recorded call."""
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute("SELECT MAX(timestamp) FROM quota_ledger").fetchone()
+        return datetime.fromisoformat(row[0]) if row and row[0] else None
+
+
+class QuotaBudget:
+    """Paces calls so a period's credits last until the period ends."""
+
+    def __init__(self, ledger: QuotaLedger, monthly_credits: int = DEFAULT_MONTHLY_CREDITS,
+                 billing_day: int = 1, min_interval: float = 60.0, reserve: float = 0.05):
+        """Initialize the budget.
+
+        Parameters
+        ----------
+        ledger : QuotaLedger
+            Ledger holding the calls made so far
+        monthly_credits : int
+            Credits available per billing period
+        billing_day : int
+            Day of the month on which the period resets
+        min_interval : float
+            Shortest polling interval in seconds, however many credits remain
+        reserve : float
+            Fraction of the allowance held back for on-demand requests
+        """
+        self.ledger = ledger
+        self.monthly_credits = monthly_credits
+        self.billing_day = billing_day
+        self.min_interval = min_interval
+        self.reserve = reserve
+
+    def remaining(self, now: Optional[datetime] = None) -> int:
+        """Credits left in the current period."""
+        now = now or datetime.now(timezone.utc)
+        start, _ = billing_period(now, self.billing_day)
+        return max(0, self.monthly_credits - self.ledger.used(start))
+
+    def can_spend(self, credits: int, now: Optional[datetime] = None) -> bool:
+        """True if ``credits`` fit in what is left of the current period."""
+        return credits <= self.remaining(now)
+
+    def interval(self, credits_per_poll: int, now: Optional[datetime] = None) -> float:
+        """Seconds to wait between polls costing ``credits_per_poll`` each.
+
+        The remaining credits (less the reserve) are divided evenly over the
+        time left in the period.  Spending faster than that pace leaves fewer
+        credits for the same time, which widens the interval.
+
+        Returns
+        -------
+        float
+            Polling interval; ``inf`` if no poll can be afforded this period
+        """
+        now = now or datetime.now(timezone.utc)
+        _, end = billing_period(now, self.billing_day)
+        poll_credits = self.remaining(now) - self.reserve * self.monthly_credits
+        polls = math.floor(poll_credits / max(credits_per_poll, 1))
+        if polls <= 0:
+            return math.inf
+        return max(self.min_interval, (end - now).total_seconds() / polls)
+
+    def next_poll(self, credits_per_poll: int, now: Optional[datetime] = None) -> datetime:
+        """Earliest time the next poll fits the pace."""
+        now = now or datetime.now(timezone.utc)
+        interval = self.interval(credits_per_poll, now)
+        if math.isinf(interval):
+            return billing_period(now, self.billing_day)[1]
+        last = self.ledger.last_call()
+        if last is None:
+            return now
+        return last + timedelta(seconds=interval)
+
+
+class CoinMarketCapClient:
+    """Client for CoinMarketCap quotes that stays within a credit budget."""
+
+    def __init__(self, api_key: Optional[str] = None, cache_dir: Optional[str] = None,
+                 base_url: Optional[str] = None, budget: Optional[QuotaBudget] = None,
+                 timeout: float = 10.0, transport: Optional[HTTPTransport] = None):
+        """Initialize the client.
+
+        Parameters
+        ----------
+        api_key : str, optional
+            CoinMarketCap API key. If None, uses COINMARKETCAP_API_KEY or
+            the secure config.
+        cache_dir : str, optional
+            Directory of the shared cache, which holds the quota ledger.
+            If None, uses config default.
+        base_url : str, optional
+            API root. If None, uses the COINMARKETCAP_BASE_URL env var, then
+            the ``coinmarketcap.base_url`` config value, then the pro API.
+        budget : QuotaBudget, optional
+            Credit budget; by default built from the ``coinmarketcap.*``
+            config values (``monthly_credits``, ``billing_day``,
+            ``min_interval_seconds``)
+        timeout : float
+            Time budget per request in seconds, including retries
+        transport : HTTPTransport, optional
+            Transport for CoinMarketCap requests; defaults to the shared
+            ``'coinmarketcap'`` transport
+        """
+        config = get_config()
+        self.api_key = api_key or get_api_key("coinmarketcap")
+        if not self.api_key:
+            logger.warning("No CoinMarketCap API key found. Requests will be rejected.")
+        self.base_url = (base_url or os.environ.get("COINMARKETCAP_BASE_URL")
+                         or config.get_config('coinmarketcap.base_url') or COINMARKETCAP_BASE_URL)
+        self.timeout = timeout
+        self.transport = transport
+        if self.transport is None and HTTPX_AVAILABLE:
+            self.transport = get_transport("coinmarketcap")
+
+        if cache_dir is None:
+            cache_dir = config.get_config('database.cache_dir', 'data_cache')
+        self.cache_dir = Path(cache_dir)
+        self.engine = get_cache_engine(self.cache_dir)
+        self.db_path = self.engine.db_path
+        ledger = QuotaLedger(self.db_path)
+        self.engine.adopt(LEGACY_DB_NAME, ("quota_ledger",))
+
+        self.budget = budget or QuotaBudget(
+            ledger,
+            monthly_credits=int(config.get_config('coinmarketcap.monthly_credits',
+                                                  DEFAULT_MONTHLY_CREDITS)),
+            billing_day=int(config.get_config('coinmarketcap.billing_day', 1)),
+            min_interval=float(config.get_config('coinmarketcap.min_interval_seconds', 60)),
+        )
+        self._quotes: dict[str, dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def ledger(self) -> QuotaLedger:
+        return self.budget.ledger
+
+    def _get(self, path: str, **params) -> dict:
+        """GET an API endpoint and return the decoded JSON."""
+        url = f"{self.base_url.rstrip('/')}/{path}"
+        headers = {"Accept": "application/json"}
+        if self.api_key:
+            headers["X-CMC_PRO_API_KEY"] = self.api_key
+        if self.transport is not None:
+            return self.transport.get_json(url, params=params, deadline=self.timeout,
+                                           headers=headers)
+        request = Request(f"{url}?{urlencode(params)}", headers=headers)
+        with urlopen(request, timeout=self.timeout) as response:
+            return json.load(response)
+
+    @staticmethod
+    def credits_for(n_symbols: int) -> int:
+        """Credits one quotes/latest call for ``n_symbols`` symbols costs."""
+        return max(1, math.ceil(n_symbols / SYMBOLS_PER_CREDIT))
+
+    @staticmethod
+    def _batches(symbols: list[str]) -> list[list[str]]:
+        """Split unique, upper-cased symbols into full one-credit requests."""
+        symbols = list(dict.fromkeys(s.upper() for s in symbols))
+        return [symbols[i:i + SYMBOLS_PER_CREDIT]
+                for i in range(0, len(symbols), SYMBOLS_PER_CREDIT)]
+
+    def credits_needed(self, symbols: list[str]) -> int:
+        """Credits a quotes/latest poll of ``symbols`` costs."""
+        return sum(self.credits_for(len(batch)) for batch in self._batches(symbols))
+
+    def get_quotes(self, symbols: list[str], convert: str = "USD") -> dict[str, dict[str, float]]:
+        """Fetch latest quotes, packing symbols into as few credits as possible.
+
+        Each request carries up to ``SYMBOLS_PER_CREDIT`` symbols, the most
+        one credit buys.  Every call is recorded in the ledger with the
+        credit count the API reports.
+
+        Parameters
+        ----------
+        symbols : list[str]
+            Ticker symbols (e.g. ``'BTC'``)
+        convert : str
+            Quote currency
+
+        Returns
+        -------
+        dict[str, dict[str, float]]
+            ``{symbol: {"price", "change_24h", "market_cap", "volume_24h"}}``
+
+        Raises
+        ------
+        QuotaExceeded
+            If the calls would exceed the period's remaining credits
+        """
+        batches = self._batches(symbols)
+        needed = self.credits_needed(symbols)
+        if not self.budget.can_spend(needed):
+            raise QuotaExceeded(f"{needed} credits needed, "
+                                f"{self.budget.remaining()} left this billing period")
+
+        quotes = {}
+        for batch in batches:
+            body = self._get("cryptocurrency/quotes/latest",
+                             symbol=",".join(batch), convert=convert)
+            status = body.get("status") or {}
+            self.ledger.record("quotes/latest",
+                               status.get("credit_count", self.credits_for(len(batch))))
+            for symbol, entry in (body.get("data") or {}).items():
+                quote = (entry.get("quote") or {}).get(convert)
+                if not quote:
+                    continue
+                quotes[symbol] = {
+                    "price": float(quote["price"]),
+                    "change_24h": float(quote.get("percent_change_24h") or 0.0),
+                    "market_cap": float(quote.get("market_cap") or 0.0),
+                    "volume_24h": float(quote.get("volume_24h") or 0.0),
+                }
+        return quotes
+
+    def poll_quotes(self, symbols: list[str], now: Optional[datetime] = None,
+                    convert: str = "USD") -> dict[str, dict[str, float]]:
+        """Return quotes, calling the API only when the budget's pace allows.
+
+        Safe to call as often as convenient (e.g. from a fixed-interval
+        poller): between budgeted calls, and once the period's credits are
+        exhausted, the most recent quotes are returned.
+        """
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            if now < self.budget.next_poll(self.credits_needed(symbols), now):
+                return dict(self._quotes)
+            try:
+                self._quotes.update(self.get_quotes(symbols, convert))
+            except QuotaExceeded as e:
+                logger.warning(f"Skipping CoinMarketCap poll: {e}")
+            return dict(self._quotes)
+
+
+# Global client instance shared by the app
+_client_instance: Optional[CoinMarketCapClient] = None
+
+
+def get_coinmarketcap_client() -> CoinMarketCapClient:
+    """Get the global CoinMarketCap client instance."""
+    global _client_instance
+    if _client_instance is None:
+        _client_instance = CoinMarketCapClient()
+    return _client_instance
@@ -0,0 +1,75 @@
+"""Latest cryptocurrency quotes for the price ticker."""
+
+from __future__ import annotations
+
+from typing import Optional
+import logging
+
+from .coingecko_client import CoinGeckoClient, get_coingecko_client
+from .coinmarketcap_client import CoinMarketCapClient, get_coinmarketcap_client
+
+logger = logging.getLogger(__name__)
+
+# Ticker symbol -> CoinGecko coin ID
+COIN_IDS = {
+    "BTC": "bitcoin",
+    "ETH": "ethereum",
+    "SOL": "solana",
+    "ADA": "cardano",
+    "XRP": "ripple",
+    "DOGE": "dogecoin",
+}
+
+
+def fetch_crypto_quotes(symbols: list[str],
+                        client: Optional[CoinGeckoClient] = None) -> dict[str, dict[str, float]]:
+    """Fetch USD prices and 24h changes for several coins in one request.
+
+    The prices are also recorded as ticks in the global tick store, so the
+    ticker's polling keeps the OHLCV bars current.
+
+    Parameters
+    ----------
+    symbols : list[str]
+        Ticker symbols (keys of ``COIN_IDS``); unknown symbols are skipped
+    client : CoinGeckoClient, optional
+        Client to use; defaults to the process-wide client
+
+    Returns
+    -------
+    dict[str, dict[str, float]]
+        ``{symbol: {"price": ..., "change_24h": ...}}``
+    """
+    ids = {COIN_IDS[s]: s for s in symbols if s in COIN_IDS}
+    if not ids:
+        return {}
+
+    client = client or get_coingecko_client()
+    quotes = client.record_prices(list(ids))
+    return {
+        ids[coin_id]: {"price": quote["price"], "change_24h": round(quote["change_24h"], 2)}
+        for coin_id, quote in quotes.items()
+        if coin_id in ids
+    }
+
+
+def fetch_coinmarketcap_quotes(symbols: list[str],
+                               client: Optional[CoinMarketCapClient] = None
+                               ) -> dict[str, dict[str, float]]:
+    """Return USD prices and 24h changes from CoinMarketCap.
+
+    The client only calls the API when its credit budget allows and returns
+    the previous quotes otherwise, so this is safe to poll at any rate.
+    """
+    client = client or get_coinmarketcap_client()
+    return {
+        symbol: {"price": quote["price"], "change_24h": round(quote["change_24h"], 2)}
+        for symbol, quote in client.poll_quotes(symbols).items()
+    }
+
+
+# Quote sources selectable with the ``prices.source`` setting
+QUOTE_SOURCES = {
+    "coingecko": fetch_crypto_quotes,
+    "coinmarketcap": fetch_coinmarketcap_quotes,
+}
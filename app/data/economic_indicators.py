@@ -63,16 +63,20 @@ ALL_INDICATORS = {
     **HOUSING_INDICATORS,
 }
 
+# Indicators grouped by display category, in dashboard order
+INDICATOR_CATEGORIES = {
+    "GDP": GDP_INDICATORS,
+    "Employment": EMPLOYMENT_INDICATORS,
+    "Inflation": INFLATION_INDICATORS,
+    "Interest Rates": INTEREST_RATE_INDICATORS,
+    "Consumer": CONSUMER_INDICATORS,
+    "Housing": HOUSING_INDICATORS,
+}
+
+
 def get_indicator_info(series_id: str) -> dict[str, str]:
     """Get category and description for a series ID."""
-    for category_name, indicators in [
-        ("GDP", GDP_INDICATORS),
-        ("Employment", EMPLOYMENT_INDICATORS),
-        ("Inflation", INFLATION_INDICATORS),
-        ("Interest Rates", INTEREST_RATE_INDICATORS),
-        ("Consumer", CONSUMER_INDICATORS),
-        ("Housing", HOUSING_INDICATORS),
-    ]:
+    for category_name, indicators in INDICATOR_CATEGORIES.items():
         if series_id in indicators:
             return {"category": category_name, "series_id": series_id}
     
@@ -0,0 +1,564 @@
+"""SEC EDGAR XBRL company facts ingester.
+
+``companyfacts`` documents hold every XBRL fact a company has filed and run
+to tens of megabytes for large filers.  They are downloaded gzip-compressed
+and parsed incrementally with ``ijson`` (when installed), so facts are
+written to the cache as they are read and the document is never held in
+memory.  Facts are stored one row per reported value with a column per
+attribute, indexed by CIK, concept and period end.
+
+Requests go through a shared rate limiter that stays within the SEC's fair
+access limit of 10 requests per second, and every ingest reports its
+throughput.
+
+The tables live in the shared ``data_cache.db``, and the client is the
+``'edgar'`` data source: a company's calendar-aligned values for one concept
+are served through the cache engine as series such as
+``'320193/NetIncomeLoss/USD'`` (see :func:`parse_series_id`), so they can be
+joined with series from other sources.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+from urllib.request import Request, urlopen
+import logging
+
+import pandas as pd
+
+from ..config.secrets import get_config
+from .cache_engine import get_cache_engine
+from .http_transport import HTTPX_AVAILABLE, HTTPTransport, get_transport
+from .rate_limit import RateLimiter
+from .sources import DataSource, register_source
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+    ijson = None
+
+logger = logging.getLogger(__name__)
+
+EDGAR_BASE_URL = "https://data.sec.gov/api/xbrl"
+
+# SEC fair access policy: at most 10 requests per second
+SEC_MAX_REQUESTS_PER_SECOND = 10
+
+# Rows written per executemany batch while streaming
+INSERT_BATCH_SIZE = 5000
+
+FACT_COLUMNS = ("cik", "taxonomy", "concept", "unit", "period_start", "period_end",
+                "value", "fy", "fp", "form", "filed", "accn", "frame")
+
+# Calendar frames the SEC assigns to facts, e.g. CY2023, CY2023Q1, CY2023Q4I
+ANNUAL_FRAME = re.compile(r"CY\d{4}(Q4I)?$")
+QUARTERLY_FRAME = re.compile(r"CY\d{4}Q[1-4]I?$")
+
+# Own cache file used before EDGAR data moved into the shared cache
+LEGACY_DB_NAME = "edgar_cache.db"
+
+FRAME_COLUMNS = ("taxonomy", "concept", "unit", "period", "cik", "entity_name",
+                 "period_end", "value", "accn")
+
+
+@dataclass
+class IngestStats:
+    """Throughput of one ingest run."""
+
+    companies: int = 0
+    facts: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def facts_per_second(self) -> float:
+        return self.facts / self.seconds if self.seconds else 0.0
+
+    @property
+    def megabytes_per_second(self) -> float:
+        return self.bytes / 1e6 / self.seconds if self.seconds else 0.0
+
+    def add(self, other: "IngestStats") -> None:
+        self.companies += other.companies
+        self.facts += other.facts
+        self.bytes += other.bytes
+        self.seconds += other.seconds
+
+    def __str__(self) -> str:
+        return (f"{self.companies} companies, {self.facts} facts, "
+                f"{self.bytes / 1e6:.1f} MB in {self.seconds:.1f}s "
+                f"({self.facts_per_second:,.0f} facts/s, {self.megabytes_per_second:.1f} MB/s)")
+
+
+class _CountingReader:
+    """File wrapper counting the bytes read through it."""
+
+    def __init__(self, raw: BinaryIO):
+        self.raw = raw
+        self.bytes = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.raw.read(size)
+        self.bytes += len(data)
+        return data
+
+
+def format_cik(cik: int | str) -> str:
+    """Return the zero-padded 10-digit form of a CIK."""
+    return f"{int(cik):010d}"
+
+
+def parse_series_id(series_id: str) -> tuple[int, str, str, bool]:
+    """Split an EDGAR series ID into CIK, concept, unit and quarterly flag.
+
+    IDs have the form ``'<cik>/<concept>/<unit>'`` for annual values, e.g.
+    ``'320193/NetIncomeLoss/USD'``; a trailing ``'/Q'`` selects quarterly
+    values.  Concepts are from the ``us-gaap`` taxonomy.
+
+    Raises
+    ------
+    ValueError
+        If the ID is malformed
+    """
+    parts = series_id.split("/")
+    quarterly = parts[-1] == "Q"
+    if quarterly:
+        parts = parts[:-1]
+    if len(parts) != 3:
+        raise ValueError(f"EDGAR series IDs look like '<cik>/<concept>/<unit>[/Q]', "
+                         f"not {series_id!r}")
+    cik, concept, unit = parts
+    return int(cik), concept, unit, quarterly
+
+
+def iter_company_facts(stream: BinaryIO) -> Iterator[tuple]:
+    """Yield fact rows from a companyfacts JSON document.
+
+    With ``ijson`` the document is parsed incrementally; otherwise it is
+    loaded with :mod:`json` first.
+
+    Parameters
+    ----------
+    stream : BinaryIO
+        Uncompressed companyfacts JSON
+
+    Yields
+    ------
+    tuple
+        One row per fact, in ``FACT_COLUMNS`` order
+    """
+    if not IJSON_AVAILABLE:
+        logger.warning("ijson not installed; loading the whole companyfacts document. "
+                       "Run: pip install ijson")
+        document = json.load(stream)
+        cik = int(document["cik"])
+        for taxonomy, concepts in (document.get("facts") or {}).items():
+            for concept, detail in concepts.items():
+                for unit, facts in (detail.get("units") or {}).items():
+                    for fact in facts:
+                        yield _fact_row(cik, taxonomy, concept, unit, fact)
+        return
+
+    # The CIK precedes "facts" in SEC documents, but do not rely on it.
+    cik = None
+    pending = []
+    fact = None
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        if prefix == "cik" and event == "number":
+            cik = int(value)
+            for row in pending:
+                yield (cik,) + row[1:]
+            pending = []
+            continue
+        if not prefix.startswith("facts."):
+            continue
+        parts = prefix.split(".")
+        if len(parts) == 6 and parts[3] == "units" and parts[5] == "item":
+            if event == "start_map":
+                fact = {}
+            elif event == "end_map":
+                row = _fact_row(cik, parts[1], parts[2], parts[4], fact)
+                if cik is None:
+                    pending.append(row)
+                else:
+                    yield row
+        elif len(parts) == 7 and parts[5] == "item" and fact is not None:
+            fact[parts[6]] = value
+    yield from pending
+
+
+def iter_frame(stream: BinaryIO) -> Iterator[dict]:
+    """Yield the data points of a frames JSON document.
+
+    Each point is a dict with ``cik``, ``entityName``, ``end``, ``val`` and
+    ``accn`` keys.
+    """
+    if not IJSON_AVAILABLE:
+        yield from json.load(stream).get("data") or []
+        return
+    yield from ijson.items(stream, "data.item", use_float=True)
+
+
+def _fact_row(cik: Optional[int], taxonomy: str, concept: str, unit: str, fact: dict) -> tuple:
+    """Build a ``FACT_COLUMNS`` row from one companyfacts fact object."""
+    return (
+        cik, taxonomy, concept, unit,
+        fact.get("start"), fact.get("end"),
+        float(fact["val"]) if fact.get("val") is not None else None,
+        fact.get("fy"), fact.get("fp"), fact.get("form"), fact.get("filed"),
+        fact.get("accn"), fact.get("frame"),
+    )
+
+
+class EDGARClient(DataSource):
+    """Client for SEC EDGAR XBRL data, stored in the shared cache."""
+
+    name = "edgar"
+    # Companies file quarterly; their facts are re-downloaded weekly at most
+    max_age = timedelta(days=7)
+
+    def __init__(self, user_agent: Optional[str] = None, cache_dir: Optional[str] = None,
+                 base_url: Optional[str] = None, rate_limiter: Optional[RateLimiter] = None,
+                 timeout: float = 60.0, transport: Optional[HTTPTransport] = None):
+        """Initialize the client.
+
+        Parameters
+        ----------
+        user_agent : str, optional
+            Contact string the SEC requires in the User-Agent header
+            (e.g. ``'Name admin@example.com'``). If None, uses the
+            SEC_EDGAR_USER_AGENT env var, then ``api_keys.sec_edgar_user_agent``.
+        cache_dir : str, optional
+            Directory to store cached data files. If None, uses config default.
+        base_url : str, optional
+            Root of the XBRL API; defaults to data.sec.gov
+        rate_limiter : RateLimiter, optional
+            Limiter shared with other EDGAR clients; by default one allowing
+            ``edgar.requests_per_second`` (capped at the SEC limit of 10)
+        timeout : float
+            Time budget in seconds for a download to start, including retries
+        transport : HTTPTransport, optional
+            Transport for EDGAR requests; defaults to the shared ``'edgar'``
+            transport
+        """
+        config = get_config()
+        self.user_agent = (user_agent or os.environ.get("SEC_EDGAR_USER_AGENT")
+                           or config.get_config('api_keys.sec_edgar_user_agent'))
+        if not self.user_agent or "example.com" in self.user_agent:
+            logger.warning("No SEC EDGAR user agent configured. The SEC may block requests.")
+        self.base_url = base_url or EDGAR_BASE_URL
+        self.timeout = timeout
+        self.transport = transport
+        if self.transport is None and HTTPX_AVAILABLE:
+            self.transport = get_transport("edgar")
+
+        rate = min(float(config.get_config('edgar.requests_per_second',
+                                           SEC_MAX_REQUESTS_PER_SECOND)),
+                   SEC_MAX_REQUESTS_PER_SECOND)
+        self.rate_limiter = rate_limiter or RateLimiter(rate)
+
+        if cache_dir is None:
+            cache_dir = config.get_config('database.cache_dir', 'data_cache')
+        self.cache_dir = Path(cache_dir)
+        self.engine = get_cache_engine(self.cache_dir)
+        self.db_path = self.engine.db_path
+        self._init_cache_db()
+        self.engine.adopt(LEGACY_DB_NAME, ("company_facts", "frames", "companies"))
+
+    def _init_cache_db(self):
+        """Initialize SQLite tables for company facts."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS company_facts (
+                    cik INTEGER,
+                    taxonomy TEXT,
+                    concept TEXT,
+                    unit TEXT,
+                    period_start TEXT,
+                    period_end TEXT,
+                    value REAL,
+                    fy INTEGER,
+                    fp TEXT,
+                    form TEXT,
+                    filed TEXT,
+                    accn TEXT,
+                    frame TEXT
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_company_facts_lookup
+                ON company_facts (cik, concept, period_end)
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS frames (
+                    taxonomy TEXT,
+                    concept TEXT,
+                    unit TEXT,
+                    period TEXT,
+                    cik INTEGER,
+                    entity_name TEXT,
+                    period_end TEXT,
+                    value REAL,
+                    accn TEXT
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_frames_lookup
+                ON frames (concept, unit, period, taxonomy, value)
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS companies (
+                    cik INTEGER PRIMARY KEY,
+                    facts INTEGER,
+                    last_updated TEXT
+                )
+            """)
+
+    def _open(self, path: str) -> BinaryIO:
+        """Open a rate-limited, gzip-decoded response stream."""
+        self.rate_limiter.acquire()
+        url = f"{self.base_url.rstrip('/')}/{path}"
+        headers = {"User-Agent": self.user_agent or "DataProfusion", "Accept-Encoding": "gzip"}
+        if self.transport is not None:
+            return self.transport.open("GET", url, deadline=self.timeout, headers=headers)
+        response = urlopen(Request(url, headers=headers), timeout=self.timeout)
+        if response.headers.get("Content-Encoding") == "gzip":
+            return gzip.GzipFile(fileobj=response)
+        return response
+
+    def ingest_company_facts(self, cik: int | str,
+                             stream: Optional[BinaryIO] = None) -> IngestStats:
+        """Download and store all XBRL facts for one company.
+
+        Existing facts for the company are replaced in a single transaction,
+        so readers never see a half-ingested company.
+
+        Parameters
+        ----------
+        cik : int or str
+            Central Index Key
+        stream : BinaryIO, optional
+            Uncompressed companyfacts JSON to ingest instead of downloading
+
+        Returns
+        -------
+        IngestStats
+        """
+        cik = int(cik)
+        started = time.perf_counter()
+        source = stream or self._open(f"companyfacts/CIK{format_cik(cik)}.json")
+        reader = _CountingReader(source)
+        facts = 0
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute("DELETE FROM company_facts WHERE cik = ?", [cik])
+                placeholders = ", ".join("?" for _ in FACT_COLUMNS)
+                insert = f"INSERT INTO company_facts ({', '.join(FACT_COLUMNS)}) VALUES ({placeholders})"
+                batch = []
+                for row in iter_company_facts(reader):
+                    batch.append(row)
+                    if len(batch) >= INSERT_BATCH_SIZE:
+                        conn.executemany(insert, batch)
+                        facts += len(batch)
+                        batch = []
+                conn.executemany(insert, batch)
+                facts += len(batch)
+                conn.execute(
+                    "INSERT OR REPLACE INTO companies (cik, facts, last_updated) VALUES (?, ?, ?)",
+                    (cik, facts, datetime.now().isoformat())
+                )
+        finally:
+            if stream is None:
+                source.close()
+
+        stats = IngestStats(1, facts, reader.bytes, time.perf_counter() - started)
+        logger.info(f"Ingested CIK {cik}: {stats}")
+        return stats
+
+    def ingest_companies(self, ciks: list[int | str]) -> IngestStats:
+        """Ingest company facts for several companies and report throughput.
+
+        Companies that fail are logged and skipped.
+        """
+        total = IngestStats()
+        started = time.perf_counter()
+        for cik in ciks:
+            try:
+                total.add(self.ingest_company_facts(cik))
+            except Exception as e:
+                logger.error(f"Failed to ingest company facts for CIK {cik}: {e}")
+        total.seconds = time.perf_counter() - started
+        logger.info(f"Company facts ingest finished: {total}")
+        return total
+
+    def ingest_frame(self, concept: str, unit: str, period: str, taxonomy: str = "us-gaap",
+                     stream: Optional[BinaryIO] = None) -> IngestStats:
+        """Download and store one concept's values for every filer in a period.
+
+        Parameters
+        ----------
+        concept : str
+            XBRL concept (e.g. ``'NetIncomeLoss'``)
+        unit : str
+            Unit of measure (e.g. ``'USD'``)
+        period : str
+            Calendar frame: ``CY2023`` (annual), ``CY2023Q4`` (quarterly)
+            or ``CY2023Q4I`` (instantaneous)
+        taxonomy : str
+            XBRL taxonomy
+        stream : BinaryIO, optional
+            Uncompressed frames JSON to ingest instead of downloading
+
+        Returns
+        -------
+        IngestStats
+            ``companies`` is the number of filers in the frame
+        """
+        started = time.perf_counter()
+        source = stream or self._open(f"frames/{taxonomy}/{concept}/{unit}/{period}.json")
+        reader = _CountingReader(source)
+        key = (taxonomy, concept, unit, period)
+        try:
+            rows = [
+                key + (int(point["cik"]), point.get("entityName"), point.get("end"),
+                       float(point["val"]), point.get("accn"))
+                for point in iter_frame(reader)
+                if point.get("val") is not None
+            ]
+        finally:
+            if stream is None:
+                source.close()
+
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                "DELETE FROM frames WHERE taxonomy = ? AND concept = ? AND unit = ? AND period = ?",
+                key
+            )
+            placeholders = ", ".join("?" for _ in FRAME_COLUMNS)
+            conn.executemany(
+                f"INSERT INTO frames ({', '.join(FRAME_COLUMNS)}) VALUES ({placeholders})", rows
+            )
+
+        stats = IngestStats(len(rows), len(rows), reader.bytes, time.perf_counter() - started)
+        logger.info(f"Ingested frame {taxonomy}/{concept}/{unit}/{period}: {stats}")
+        return stats
+
+    def _last_ingested(self, cik: int) -> Optional[str]:
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute("SELECT last_updated FROM companies WHERE cik = ?",
+                               [cik]).fetchone()
+        return row[0] if row else None
+
+    def _frame_values(self, series_id: str) -> pd.Series:
+        """Return the cached calendar-aligned values of a series.
+
+        Only facts the SEC aligned to a calendar frame are used.  The SEC
+        gives each frame to one fact, the latest filed, so each period
+        appears once.
+        """
+        cik, concept, unit, quarterly = parse_series_id(series_id)
+        with sqlite3.connect(self.db_path) as conn:
+            facts = pd.read_sql_query("""
+                SELECT period_end, value, frame FROM company_facts
+                WHERE cik = ? AND concept = ? AND unit = ? AND taxonomy = 'us-gaap'
+                  AND frame IS NOT NULL
+                ORDER BY period_end, filed
+            """, conn, params=[cik, concept, unit])
+        pattern = QUARTERLY_FRAME if quarterly else ANNUAL_FRAME
+        facts = facts[facts["frame"].str.match(pattern)]
+        facts = facts.drop_duplicates("period_end", keep="last")
+        index = pd.DatetimeIndex(pd.to_datetime(facts["period_end"]), name="date")
+        return pd.Series(facts["value"].to_numpy(dtype=float), index=index, name=series_id)
+
+    def fetch_series(self, series_id: str, start_date: Optional[str] = None,
+                     end_date: Optional[str] = None) -> pd.Series:
+        """Return a company's values for a concept (see :func:`parse_series_id`).
+
+        The company's facts are downloaded unless they were ingested within
+        ``max_age``, so series of one company share a download.
+        """
+        cik = parse_series_id(series_id)[0]
+        ingested = self._last_ingested(cik)
+        if ingested is None or datetime.fromisoformat(ingested) < datetime.now() - self.max_age:
+            self.ingest_company_facts(cik)
+        return self._frame_values(series_id).loc[start_date:end_date]
+
+    def fetch_metadata(self, series_id: str) -> dict:
+        """Describe a series from the cached facts."""
+        cik, concept, unit, quarterly = parse_series_id(series_id)
+        data = self._frame_values(series_id)
+        return {
+            'title': f"{concept} (CIK {cik})",
+            'units': unit,
+            'frequency': "Quarterly" if quarterly else "Annual",
+            'observation_start': data.index.min().strftime('%Y-%m-%d') if len(data) else '',
+            'observation_end': data.index.max().strftime('%Y-%m-%d') if len(data) else '',
+            'last_updated': self._last_ingested(cik),
+        }
+
+    def get_series(self, series_id: str, start_date: Optional[str] = None,
+                   end_date: Optional[str] = None, force_refresh: bool = False) -> pd.Series:
+        """Return a series through the shared cache, fetching it when stale."""
+        return self.engine.get(self, series_id, start_date, end_date, force_refresh)
+
+    def get_company_concept(self, cik: int | str, concept: str, unit: Optional[str] = None,
+                            taxonomy: str = "us-gaap") -> pd.DataFrame:
+        """Return one company's values for a concept from the cache.
+
+        Each period appears once, with the value from the latest filing.
+
+        Parameters
+        ----------
+        cik : int or str
+            Central Index Key
+        concept : str
+            XBRL concept (e.g. ``'NetIncomeLoss'``)
+        unit : str, optional
+            Unit filter (e.g. ``'USD'``); all units if None
+        taxonomy : str
+            XBRL taxonomy
+
+        Returns
+        -------
+        pd.DataFrame
+            Facts ordered by period end
+        """
+        query = """
+            SELECT * FROM company_facts
+            WHERE cik = ? AND concept = ? AND taxonomy = ?
+        """
+        params = [int(cik), concept, taxonomy]
+        if unit:
+            query += " AND unit = ?"
+            params.append(unit)
+        query += " ORDER BY period_end, filed"
+        with sqlite3.connect(self.db_path) as conn:
+            frame = pd.read_sql_query(query, conn, params=params)
+        frame = frame.drop_duplicates(["unit", "period_start", "period_end"], keep="last")
+        return frame.reset_index(drop=True)
+
+
+# Global client instance shared by the app
+_client_instance: Optional[EDGARClient] = None
+
+
+def get_edgar_client() -> EDGARClient:
+    """Get the global EDGAR client instance."""
+    global _client_instance
+    if _client_instance is None:
+        _client_instance = EDGARClient()
+    return _client_instance
+
+
+register_source(EDGARClient.name, get_edgar_client)
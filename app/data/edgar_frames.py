@@ -0,0 +1,173 @@
+"""Cross-sectional index over EDGAR frames.
+
+A frame is one XBRL concept reported by every filer for one calendar period
+(e.g. ``NetIncomeLoss`` in ``USD`` for ``CY2023Q4``).  Frames ingested by
+:meth:`EDGARClient.ingest_frame` are loaded once from the cache into value
+arrays sorted ascending, keyed by ``(concept, unit, period)``.  On the sorted
+arrays, top-N is a slice, a percentile is an interpolated lookup, and a
+histogram is a binary search per bin edge.  No query scans the companies.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .edgar_client import EDGARClient, get_edgar_client
+
+# Frames kept in memory before the least recently used is evicted
+MAX_LOADED_FRAMES = 256
+
+
+@dataclass(frozen=True)
+class Frame:
+    """One concept's values across filers, sorted ascending by value."""
+
+    concept: str
+    unit: str
+    period: str
+    values: np.ndarray
+    ciks: np.ndarray
+    names: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def _records(self, order: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame({
+            "cik": self.ciks[order],
+            "entity_name": self.names[order],
+            "value": self.values[order],
+        })
+
+    def top(self, n: int = 10, largest: bool = True) -> pd.DataFrame:
+        """Return the ``n`` filers with the largest (or smallest) values."""
+        n = max(0, min(n, len(self)))
+        order = np.arange(len(self) - 1, len(self) - n - 1, -1) if largest else np.arange(n)
+        return self._records(order)
+
+    def percentile(self, q: float | Sequence[float]) -> float | np.ndarray:
+        """Return the value(s) at percentile(s) ``q`` (0-100)."""
+        if not len(self):
+            raise ValueError(f"Frame {self.concept}/{self.unit}/{self.period} is empty")
+        # values are already sorted, so interpolate by position directly
+        position = np.asarray(q, dtype=float) / 100 * (len(self) - 1)
+        result = np.interp(position, np.arange(len(self)), self.values)
+        return float(result) if np.ndim(result) == 0 else result
+
+    def percentile_rank(self, value: float) -> float:
+        """Return the percentage of filers reporting less than ``value``."""
+        if not len(self):
+            return float("nan")
+        return 100.0 * float(np.searchsorted(self.values, value, side="left")) / len(self)
+
+    def histogram(self, bins: int | Sequence[float] = 10,
+                  range: Optional[tuple[float, float]] = None) -> tuple[np.ndarray, np.ndarray]:
+        """Return ``(counts, edges)`` like :func:`numpy.histogram`.
+
+        Counts come from binary searches of the bin edges in the sorted
+        values, so the cost depends on the number of bins, not filers.
+        """
+        if np.ndim(bins) == 0:
+            low, high = range or ((self.values[0], self.values[-1]) if len(self) else (0.0, 1.0))
+            if low == high:
+                low, high = low - 0.5, high + 0.5
+            edges = np.linspace(low, high, int(bins) + 1)
+        else:
+            edges = np.asarray(bins, dtype=float)
+        positions = np.searchsorted(self.values, edges, side="left")
+        # the last bin is closed on the right, as in numpy.histogram
+        positions[-1] = np.searchsorted(self.values, edges[-1], side="right")
+        return np.diff(positions), edges
+
+
+class FrameIndex:
+    """Loads frames from the EDGAR cache and keeps them in memory."""
+
+    def __init__(self, client: Optional[EDGARClient] = None,
+                 max_frames: int = MAX_LOADED_FRAMES):
+        """Initialize the index.
+
+        Parameters
+        ----------
+        client : EDGARClient, optional
+            Client whose cache holds the frames; defaults to the global client
+        max_frames : int
+            Frames kept in memory before the least recently used is evicted
+        """
+        self.client = client or get_edgar_client()
+        self.max_frames = max_frames
+        self._frames: OrderedDict[tuple, Frame] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def ingest(self, concept: str, unit: str, period: str, taxonomy: str = "us-gaap", **kwargs):
+        """Ingest a frame through the client and drop any stale loaded copy."""
+        stats = self.client.ingest_frame(concept, unit, period, taxonomy=taxonomy, **kwargs)
+        with self._lock:
+            self._frames.pop((taxonomy, concept, unit, period), None)
+        return stats
+
+    def get_frame(self, concept: str, unit: str, period: str,
+                  taxonomy: str = "us-gaap") -> Frame:
+        """Return a frame, loading it from the cache on first use.
+
+        A frame that was never ingested is returned empty.
+        """
+        key = (taxonomy, concept, unit, period)
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames.move_to_end(key)
+                return frame
+
+        with sqlite3.connect(self.client.db_path) as conn:
+            rows = conn.execute("""
+                SELECT cik, entity_name, value FROM frames
+                WHERE concept = ? AND unit = ? AND period = ? AND taxonomy = ?
+                ORDER BY value
+            """, (concept, unit, period, taxonomy)).fetchall()
+        ciks, names, values = zip(*rows) if rows else ((), (), ())
+        frame = Frame(concept, unit, period,
+                      values=np.array(values, dtype=float),
+                      ciks=np.array(ciks, dtype=np.int64),
+                      names=np.array(names, dtype=object))
+
+        with self._lock:
+            self._frames[key] = frame
+            while len(self._frames) > self.max_frames:
+                self._frames.popitem(last=False)
+        return frame
+
+    def top(self, concept: str, unit: str, period: str, n: int = 10,
+            largest: bool = True, taxonomy: str = "us-gaap") -> pd.DataFrame:
+        """Return the top ``n`` filers for a concept in a period."""
+        return self.get_frame(concept, unit, period, taxonomy).top(n, largest)
+
+    def percentile(self, concept: str, unit: str, period: str, q: float | Sequence[float],
+                   taxonomy: str = "us-gaap") -> float | np.ndarray:
+        """Return percentile(s) of a concept across filers in a period."""
+        return self.get_frame(concept, unit, period, taxonomy).percentile(q)
+
+    def histogram(self, concept: str, unit: str, period: str,
+                  bins: int | Sequence[float] = 10,
+                  taxonomy: str = "us-gaap") -> tuple[np.ndarray, np.ndarray]:
+        """Return a histogram of a concept across filers in a period."""
+        return self.get_frame(concept, unit, period, taxonomy).histogram(bins)
+
+
+# Global index shared by the app
+_index_instance: Optional[FrameIndex] = None
+
+
+def get_frame_index() -> FrameIndex:
+    """Get the global EDGAR frame index."""
+    global _index_instance
+    if _index_instance is None:
+        _index_instance = FrameIndex()
+    return _index_instance
@@ -0,0 +1,149 @@
+"""Background fetching of series that are not cached yet.
+
+The data API answers from the cache.  If a request named uncached series
+and the API fetched them on the spot, one anonymous request with a hundred
+made-up IDs would cost a hundred upstream calls.  Instead, uncached series
+go on a bounded queue.  A single worker fetches them through the miner,
+whose shared rate limiter sets the pace, and the API answers ``202`` until
+they are cached:
+
+* A series already queued is not queued again, however often it is asked for.
+* At most ``max_pending`` series wait at once; beyond that :meth:`submit`
+  raises :class:`QueueFull`.
+* A series that could not be fetched is not retried for ``failure_ttl``
+  seconds, so repeated requests for unknown IDs cost nothing upstream.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from typing import Callable, Optional
+import logging
+
+from .fred_client import FREDDataMiner, get_fred_miner
+
+logger = logging.getLogger(__name__)
+
+# Series waiting to be fetched, across all clients
+MAX_PENDING_FETCHES = 100
+
+# Seconds before a series that failed to fetch is tried again
+FAILURE_TTL = 3600.0
+
+
+class QueueFull(RuntimeError):
+    """Raised when too many series are already waiting to be fetched."""
+
+
+class FetchQueue:
+    """Fetches uncached series one at a time in a background thread."""
+
+    def __init__(self, miner: Optional[FREDDataMiner] = None,
+                 max_pending: int = MAX_PENDING_FETCHES, failure_ttl: float = FAILURE_TTL,
+                 clock: Callable[[], float] = time.monotonic):
+        """Initialize the queue.
+
+        Parameters
+        ----------
+        miner : FREDDataMiner, optional
+            Client that fetches and caches the series; defaults to the
+            global client
+        max_pending : int
+            Maximum series waiting to be fetched
+        failure_ttl : float
+            Seconds during which a failed series is reported as missing
+            instead of being fetched again
+        clock : Callable
+            Time source (replaceable in tests)
+        """
+        self.miner = miner or get_fred_miner()
+        self.max_pending = max_pending
+        self.failure_ttl = failure_ttl
+        self._clock = clock
+        self._queue: queue.Queue = queue.Queue()
+        self._pending: set[str] = set()
+        self._failed: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+    def submit(self, series_ids: list[str]) -> tuple[list[str], list[str]]:
+        """Queue uncached series for fetching.
+
+        Parameters
+        ----------
+        series_ids : list[str]
+            Series that are not cached
+
+        Returns
+        -------
+        tuple[list[str], list[str]]
+            ``(pending, failed)``: the series now waiting to be fetched, and
+            those whose last fetch failed within ``failure_ttl``
+
+        Raises
+        ------
+        QueueFull
+            If queueing the new series would exceed ``max_pending``
+        """
+        now = self._clock()
+        pending, failed, new = [], [], []
+        with self._lock:
+            for series_id in series_ids:
+                failed_at = self._failed.get(series_id)
+                if failed_at is not None and now - failed_at < self.failure_ttl:
+                    failed.append(series_id)
+                    continue
+                if series_id not in self._pending and series_id not in new:
+                    new.append(series_id)
+                pending.append(series_id)
+            if new and len(self._pending) + len(new) > self.max_pending:
+                raise QueueFull(f"{len(self._pending)} series are already waiting to be fetched")
+            self._pending.update(new)
+            if new and self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="fetch-queue",
+                                                 daemon=True)
+                self._worker.start()
+        for series_id in new:
+            self._queue.put(series_id)
+        return pending, failed
+
+    def _run(self) -> None:
+        while True:
+            series_id = self._queue.get()
+            try:
+                self.miner.ensure_cached([series_id])
+                fetched = series_id in self.miner.get_series_versions([series_id])
+            except Exception as e:
+                logger.error(f"Queued fetch of {series_id} failed: {e}")
+                fetched = False
+            with self._lock:
+                self._pending.discard(series_id)
+                if fetched:
+                    self._failed.pop(series_id, None)
+                else:
+                    self._forget_expired_failures()
+                    self._failed[series_id] = self._clock()
+            self._queue.task_done()
+
+    def _forget_expired_failures(self) -> None:
+        cutoff = self._clock() - self.failure_ttl
+        for series_id in [s for s, failed_at in self._failed.items() if failed_at <= cutoff]:
+            del self._failed[series_id]
+
+    def join(self) -> None:
+        """Block until every queued series has been fetched or has failed."""
+        self._queue.join()
+
+
+# Global queue shared by the API front ends
+_queue_instance: Optional[FetchQueue] = None
+
+
+def get_fetch_queue() -> FetchQueue:
+    """Get the global fetch queue, backed by the global FRED client."""
+    global _queue_instance
+    if _queue_instance is None:
+        _queue_instance = FetchQueue()
+    return _queue_instance
@@ -0,0 +1,434 @@
+"""Batch forecasting of the indicator catalog.
+
+Forecasts are fitted offline, never inside a request.  A batch run:
+
+1. refreshes the cached indicators and reads their content versions;
+2. picks the series whose data (or forecast settings) changed since their
+   stored fit; the rest keep their forecast;
+3. fits those series in a process pool.  Each gets two lightweight NumPy
+   models: an autoregression on first differences (order chosen by AIC)
+   and Holt's linear exponential smoothing (parameters by grid search).
+   The one with the lower AIC is kept;
+4. stores the fitted model, its input data version and the forecast path
+   with prediction bands in ``forecast_fits`` and ``forecast_points``.
+
+Series observed more often than monthly are forecast from their monthly
+rollup; monthly, quarterly and annual series at their own frequency.  The
+dashboard reads the stored forecasts with :func:`load_forecast`.
+
+Run it after data refreshes, e.g. from cron after change detection::
+
+    python -m app.data.forecasting --processes 4
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from statistics import NormalDist
+from typing import Optional, Sequence
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .economic_indicators import ALL_INDICATORS
+from .fred_client import FREDDataMiner, get_fred_miner
+
+logger = logging.getLogger(__name__)
+
+# Forecast horizon in months
+HORIZON_MONTHS = 12
+
+# Coverage of the prediction bands
+BAND_LEVEL = 0.8
+
+# Fewest observations a model is fitted to
+MIN_OBSERVATIONS = 24
+
+# Most recent observations used for fitting
+MAX_OBSERVATIONS = 600
+
+# Largest autoregressive order considered
+MAX_AR_ORDER = 6
+
+# Smoothing parameters searched for Holt's method
+HOLT_GRID = np.round(np.arange(0.05, 1.0, 0.1), 2)
+
+# Bump to refit everything after changing the models
+MODEL_REVISION = 1
+
+# Frequency of the fitted data -> (pandas offset, months per step)
+FREQUENCIES = {
+    "M": ("MS", 1),
+    "Q": ("QS", 3),
+    "A": ("YS", 12),
+}
+
+
+@dataclass
+class ForecastStats:
+    """Outcome of one batch run."""
+
+    checked: int = 0
+    fitted: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.checked} series checked, {self.fitted} fitted, "
+                f"{self.unchanged} unchanged, {self.failed} failed in {self.seconds:.1f}s")
+
+
+# -- Models ------------------------------------------------------------------
+
+
+def _aic(errors: np.ndarray, n_params: int) -> float:
+    n = len(errors)
+    return n * math.log(max(float(np.mean(errors ** 2)), 1e-300)) + 2 * n_params
+
+
+def fit_ar(values: np.ndarray, steps: int) -> dict:
+    """Fit an AR(p) model to first differences and forecast levels.
+
+    Returns
+    -------
+    dict
+        ``model``, ``params``, ``aic``, ``sigma``, ``mean`` (forecast
+        levels) and ``std`` (forecast standard errors), one per step
+    """
+    diffs = np.diff(values)
+    best = None
+    for p in range(1, min(MAX_AR_ORDER, len(diffs) // 4) + 1):
+        # Lagged design matrix: intercept, then d(t-1) .. d(t-p)
+        design = np.column_stack([np.ones(len(diffs) - p)]
+                                 + [diffs[p - k:len(diffs) - k] for k in range(1, p + 1)])
+        target = diffs[p:]
+        coef, *_ = np.linalg.lstsq(design, target, rcond=None)
+        errors = target - design @ coef
+        aic = _aic(errors, p + 1)
+        if best is None or aic < best[0]:
+            best = (aic, p, coef, errors)
+    if best is None:
+        raise ValueError("too few observations for an AR model")
+    aic, p, coef, errors = best
+    sigma = float(np.sqrt(np.mean(errors ** 2)))
+
+    history = list(diffs[-p:])
+    path = []
+    for _ in range(steps):
+        step = coef[0] + sum(coef[k] * history[-k] for k in range(1, p + 1))
+        history.append(step)
+        path.append(step)
+    mean = values[-1] + np.cumsum(path)
+
+    # Impulse responses of the differences, accumulated for the levels
+    psi = [1.0]
+    for j in range(1, steps):
+        psi.append(sum(coef[k] * psi[j - k] for k in range(1, min(p, j) + 1)))
+    std = sigma * np.sqrt(np.cumsum(np.cumsum(psi) ** 2))
+    return {"model": f"AR({p}) on differences", "params": [float(c) for c in coef],
+            "aic": aic, "sigma": sigma, "mean": mean, "std": std}
+
+
+def _holt_errors(values: np.ndarray, alpha: float, beta: float) -> tuple[np.ndarray, float, float]:
+    level, trend = values[0], values[1] - values[0]
+    errors = np.empty(len(values) - 1)
+    for t in range(1, len(values)):
+        error = values[t] - (level + trend)
+        errors[t - 1] = error
+        level = level + trend + alpha * error
+        trend = trend + alpha * beta * error
+    return errors, level, trend
+
+
+def fit_holt(values: np.ndarray, steps: int) -> dict:
+    """Fit Holt's linear exponential smoothing and forecast.
+
+    Returns the same fields as :func:`fit_ar`.
+    """
+    best = None
+    for alpha in HOLT_GRID:
+        for beta in HOLT_GRID:
+            errors, level, trend = _holt_errors(values, alpha, beta)
+            sse = float(errors @ errors)
+            if best is None or sse < best[0]:
+                best = (sse, alpha, beta, errors, level, trend)
+    _, alpha, beta, errors, level, trend = best
+    sigma = float(np.sqrt(np.mean(errors ** 2)))
+    h = np.arange(1, steps + 1)
+    mean = level + h * trend
+    # Variance of ETS(A,A,N): sigma^2 * (1 + sum_{j<h} (alpha + alpha*beta*j)^2)
+    c = alpha * (1 + beta * np.arange(1, steps))
+    std = sigma * np.sqrt(1 + np.concatenate([[0.0], np.cumsum(c ** 2)]))
+    return {"model": "Holt linear", "params": [float(alpha), float(beta)],
+            "aic": _aic(errors, 4), "sigma": sigma, "mean": mean, "std": std}
+
+
+def fit_forecast(values: np.ndarray, steps: int, level: float = BAND_LEVEL) -> dict:
+    """Fit both models, keep the lower-AIC one and add prediction bands.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Observations on a regular grid, oldest first, without gaps
+    steps : int
+        Forecast horizon in steps of the grid
+    level : float
+        Coverage of the bands
+
+    Returns
+    -------
+    dict
+        ``model``, ``params``, ``aic``, ``sigma`` and ``mean``, ``lower``,
+        ``upper`` lists, one per step
+    """
+    values = np.asarray(values, dtype=float)
+    if len(values) < MIN_OBSERVATIONS:
+        raise ValueError(f"{len(values)} observations; at least {MIN_OBSERVATIONS} are needed")
+    fits = [fit_ar(values, steps), fit_holt(values, steps)]
+    best = min(fits, key=lambda fit: fit["aic"])
+    z = NormalDist().inv_cdf(0.5 + level / 2)
+    return {
+        "model": best["model"],
+        "params": best["params"],
+        "aic": float(best["aic"]),
+        "sigma": best["sigma"],
+        "mean": best["mean"].tolist(),
+        "lower": (best["mean"] - z * best["std"]).tolist(),
+        "upper": (best["mean"] + z * best["std"]).tolist(),
+    }
+
+
+def _fit_task(task: tuple) -> tuple[str, Optional[dict], Optional[str]]:
+    """Process pool entry point: ``(series_id, values, steps, level)`` ->
+    ``(series_id, fit, error)``."""
+    series_id, values, steps, level = task
+    try:
+        return series_id, fit_forecast(values, steps, level), None
+    except Exception as e:
+        return series_id, None, str(e)
+
+
+# -- Storage -----------------------------------------------------------------
+
+
+def _init_tables(conn: sqlite3.Connection) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS forecast_fits (
+            series_id TEXT PRIMARY KEY,
+            data_version TEXT,
+            config TEXT,
+            model TEXT,
+            params TEXT,
+            sigma REAL,
+            aic REAL,
+            fitted TEXT
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS forecast_points (
+            series_id TEXT,
+            date TEXT,
+            mean REAL,
+            lower REAL,
+            upper REAL,
+            PRIMARY KEY (series_id, date)
+        )
+    """)
+
+
+def load_forecast(db_path: str | Path, series_id: str) -> Optional[pd.DataFrame]:
+    """Read the stored forecast of a series.
+
+    Returns
+    -------
+    pd.DataFrame or None
+        ``mean``, ``lower`` and ``upper`` indexed by date, with the model,
+        its fit time and the data version it was fitted to in ``attrs``;
+        None if the series has no forecast
+    """
+    try:
+        with sqlite3.connect(db_path) as conn:
+            fit = conn.execute(
+                "SELECT model, fitted, data_version FROM forecast_fits WHERE series_id = ?",
+                [series_id]).fetchone()
+            if fit is None:
+                return None
+            rows = conn.execute(
+                "SELECT date, mean, lower, upper FROM forecast_points "
+                "WHERE series_id = ? ORDER BY date", [series_id]).fetchall()
+    except sqlite3.OperationalError:
+        # No batch run has created the tables yet
+        return None
+    frame = pd.DataFrame(rows, columns=["date", "mean", "lower", "upper"])
+    frame["date"] = pd.to_datetime(frame["date"])
+    frame = frame.set_index("date")
+    frame.attrs.update(model=fit[0], fitted=fit[1], data_version=fit[2])
+    return frame
+
+
+class ForecastEngine:
+    """Fits and stores forecasts for the indicator catalog."""
+
+    def __init__(self, miner: Optional[FREDDataMiner] = None,
+                 processes: Optional[int] = None, horizon: int = HORIZON_MONTHS,
+                 level: float = BAND_LEVEL):
+        """Initialize the engine.
+
+        Parameters
+        ----------
+        miner : FREDDataMiner, optional
+            Client whose cached series are forecast and whose cache holds
+            the results; defaults to the global client
+        processes : int, optional
+            Worker processes; defaults to the CPU count.  ``1`` fits in
+            this process.
+        horizon : int
+            Forecast horizon in months
+        level : float
+            Coverage of the prediction bands
+        """
+        self.miner = miner or get_fred_miner()
+        self.processes = processes or os.cpu_count() or 1
+        self.horizon = horizon
+        self.level = level
+        self.db_path = self.miner.db_path
+        with sqlite3.connect(self.db_path) as conn:
+            _init_tables(conn)
+
+    @property
+    def config(self) -> str:
+        """Settings a stored fit must match to be reused."""
+        return f"r{MODEL_REVISION};h={self.horizon};level={self.level}"
+
+    def to_refit(self, series_ids: Sequence[str]) -> list[str]:
+        """Return the cached series whose stored fit is missing or outdated."""
+        versions = self.miner.get_series_versions(list(series_ids))
+        with sqlite3.connect(self.db_path) as conn:
+            fits = {series_id: (version, config) for series_id, version, config in conn.execute(
+                "SELECT series_id, data_version, config FROM forecast_fits")}
+        return [series_id for series_id in series_ids
+                if series_id in versions
+                and fits.get(series_id) != (versions[series_id], self.config)]
+
+    def _prepare(self, series_id: str) -> tuple[np.ndarray, pd.DatetimeIndex, str]:
+        """Return the values to fit, their dates and the grid frequency."""
+        series = self.miner.get_series(series_id).dropna()
+        spacing = series.index.to_series().diff().dt.days.median() if len(series) > 1 else 0
+        if spacing < 28:
+            series = self.miner.get_rollup(series_id, "M")["mean"]
+            freq = "M"
+        else:
+            freq = "M" if spacing <= 35 else "Q" if spacing <= 100 else "A"
+        offset = FREQUENCIES[freq][0]
+        # Put the observations on their grid; interior gaps are carried over
+        grid = pd.date_range(series.index.min(), series.index.max(), freq=offset)
+        series = series.reindex(grid.union(series.index)).ffill().reindex(grid)
+        series = series.iloc[-MAX_OBSERVATIONS:]
+        return series.to_numpy(dtype=float), series.index, freq
+
+    def _store(self, conn: sqlite3.Connection, series_id: str, version: str,
+               last_date: pd.Timestamp, freq: str, fit: dict) -> None:
+        offset = FREQUENCIES[freq][0]
+        dates = pd.date_range(last_date, periods=len(fit["mean"]) + 1, freq=offset)[1:]
+        conn.execute("DELETE FROM forecast_points WHERE series_id = ?", [series_id])
+        conn.executemany(
+            "INSERT INTO forecast_points (series_id, date, mean, lower, upper) VALUES (?, ?, ?, ?, ?)",
+            [(series_id, date.strftime("%Y-%m-%d"), mean, lower, upper)
+             for date, mean, lower, upper in zip(dates, fit["mean"], fit["lower"], fit["upper"])])
+        conn.execute(
+            """INSERT OR REPLACE INTO forecast_fits
+               (series_id, data_version, config, model, params, sigma, aic, fitted)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            (series_id, version, self.config, fit["model"], json.dumps(fit["params"]),
+             fit["sigma"], fit["aic"], datetime.now().isoformat()))
+
+    def run(self, series_ids: Optional[Sequence[str]] = None,
+            refresh: bool = True) -> ForecastStats:
+        """Refit the series whose data changed and store their forecasts.
+
+        Parameters
+        ----------
+        series_ids : sequence of str, optional
+            Series to forecast; defaults to every indicator in
+            ``ALL_INDICATORS``
+        refresh : bool
+            Fetch missing or stale series before checking versions
+        """
+        started = time.perf_counter()
+        series_ids = list(dict.fromkeys(series_ids or ALL_INDICATORS.values()))
+        if refresh:
+            self.miner.ensure_cached(series_ids)
+        stats = ForecastStats(checked=len(series_ids))
+        versions = self.miner.get_series_versions(series_ids)
+        refit = self.to_refit(series_ids)
+        stats.unchanged = sum(1 for series_id in series_ids
+                              if series_id in versions and series_id not in refit)
+
+        tasks, grids = [], {}
+        for series_id in refit:
+            try:
+                values, dates, freq = self._prepare(series_id)
+            except Exception as e:
+                logger.error(f"Failed to load {series_id} for forecasting: {e}")
+                stats.failed += 1
+                continue
+            steps = max(1, math.ceil(self.horizon / FREQUENCIES[freq][1]))
+            grids[series_id] = (dates[-1], freq)
+            tasks.append((series_id, values, steps, self.level))
+
+        if self.processes > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.processes, len(tasks))) as pool:
+                results = list(pool.map(_fit_task, tasks))
+        else:
+            results = [_fit_task(task) for task in tasks]
+
+        with sqlite3.connect(self.db_path) as conn:
+            for series_id, fit, error in results:
+                if fit is None:
+                    logger.error(f"Failed to forecast {series_id}: {error}")
+                    stats.failed += 1
+                    continue
+                last_date, freq = grids[series_id]
+                self._store(conn, series_id, versions[series_id], last_date, freq, fit)
+                stats.fitted += 1
+
+        # Series that could not be cached at all
+        stats.failed += sum(1 for series_id in series_ids if series_id not in versions)
+        stats.seconds = time.perf_counter() - started
+        logger.info(f"Forecasting: {stats}")
+        return stats
+
+    def get_forecast(self, series_id: str) -> Optional[pd.DataFrame]:
+        """Return the stored forecast of a series (see :func:`load_forecast`)."""
+        return load_forecast(self.db_path, series_id)
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fit forecasts for the indicator catalog.")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--horizon", type=int, default=HORIZON_MONTHS, help="months ahead")
+    parser.add_argument("--no-refresh", action="store_true",
+                        help="forecast the cache as is, without fetching stale series")
+    parser.add_argument("series", nargs="*", help="series IDs (default: all indicators)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    engine = ForecastEngine(processes=args.processes, horizon=args.horizon)
+    print(engine.run(args.series or None, refresh=not args.no_refresh))
+
+
+if __name__ == "__main__":
+    main()
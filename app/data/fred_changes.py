@@ -0,0 +1,244 @@
+"""Change detection for cached FRED series.
+
+Without it, cached series expire by age and are re-fetched whether or not
+FRED changed them.  This job instead finds the series FRED actually updated
+and marks only those dirty in ``series_updates``:
+
+* Normally it reads FRED's ``series/updates`` feed for the time since its
+  last run, which costs a handful of requests however large the cache is.
+* On the first run, or when the last run is older than the feed's two-week
+  window, it compares each cached series' ``last_updated`` with fresh
+  series metadata instead.
+
+Series it has checked and found unchanged keep serving from the cache (see
+:meth:`FREDDataMiner._is_stale`); dirty series are handed to
+:meth:`FREDDataMiner.ensure_cached`, which re-fetches them and clears the
+flag.  Upstream traffic therefore follows real data changes.
+
+Run it periodically, e.g. hourly from cron::
+
+    python -m app.data.fred_changes
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import logging
+
+from .fred_client import FREDDataMiner, get_fred_miner
+from .fred_crawler import PAGE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# FRED keeps roughly two weeks of series updates in the feed
+FEED_WINDOW = timedelta(days=13)
+
+# Overlap between consecutive feed polls, covering clock and time zone skew
+FEED_OVERLAP = timedelta(hours=6)
+
+
+@dataclass
+class ChangeStats:
+    """Outcome of one change detection run."""
+
+    method: str = ""
+    checked: int = 0
+    changed: int = 0
+    refreshed: int = 0
+    requests: int = 0
+    seconds: float = 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.method}: {self.checked} series checked, {self.changed} changed, "
+                f"{self.refreshed} refreshed with {self.requests} requests in {self.seconds:.1f}s")
+
+
+class FREDChangeDetector:
+    """Marks cached FRED series dirty when FRED reports an update."""
+
+    def __init__(self, miner: Optional[FREDDataMiner] = None, timeout: float = 30.0):
+        """Initialize the detector.
+
+        Parameters
+        ----------
+        miner : FREDDataMiner, optional
+            Client whose cache is checked and refreshed, and whose rate
+            limiter requests wait on; defaults to the global client
+        timeout : float
+            Request timeout in seconds
+        """
+        self.miner = miner or get_fred_miner()
+        self.timeout = timeout
+        self.requests = 0
+        self.db_path = self.miner.db_path
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS change_feed (
+                    feed TEXT PRIMARY KEY,
+                    polled TEXT
+                )
+            """)
+
+    def _get(self, path: str, **params) -> dict:
+        self.requests += 1
+        return self.miner.request_json(path, timeout=self.timeout, **params)
+
+    def _tracked(self, conn: sqlite3.Connection) -> dict[str, Optional[str]]:
+        """Return ``{series_id: upstream_updated}`` for every cached FRED series.
+
+        Other sources share the cache; FRED cannot report on their series.
+        """
+        fred, params = self.miner.engine.source_filter(self.miner.name, "v.series_id")
+        # Series cached before change detection existed have no baseline yet.
+        conn.execute(f"""
+            INSERT OR IGNORE INTO series_updates (series_id, dirty)
+            SELECT v.series_id, 0 FROM series_versions v WHERE {fred}
+        """, params)
+        return dict(conn.execute(f"""
+            SELECT u.series_id, u.upstream_updated FROM series_updates u
+            JOIN series_versions v ON v.series_id = u.series_id
+            WHERE {fred}
+        """, params).fetchall())
+
+    def _mark(self, conn: sqlite3.Connection, tracked: dict[str, Optional[str]],
+              upstream: dict[str, str], checked: list[str]) -> list[str]:
+        """Flag series whose upstream ``last_updated`` moved and stamp the
+        checked ones."""
+        changed = [series_id for series_id, updated in upstream.items()
+                   if series_id in tracked and tracked[series_id] != updated]
+        now = datetime.now().isoformat()
+        conn.executemany("UPDATE series_updates SET dirty = 1 WHERE series_id = ?",
+                         [(series_id,) for series_id in changed])
+        conn.executemany("UPDATE series_updates SET checked = ? WHERE series_id = ?",
+                         [(now, series_id) for series_id in checked])
+        return changed
+
+    def last_polled(self) -> Optional[datetime]:
+        """Return when the cache was last fully checked, if ever."""
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute("SELECT polled FROM change_feed WHERE feed = 'series'").fetchone()
+        return datetime.fromisoformat(row[0]) if row and row[0] else None
+
+    def _set_polled(self, conn: sqlite3.Connection, polled: datetime) -> None:
+        conn.execute("INSERT OR REPLACE INTO change_feed (feed, polled) VALUES ('series', ?)",
+                     (polled.isoformat(),))
+
+    def poll_updates(self, since: datetime) -> list[str]:
+        """Mark cached series updated since ``since`` using the updates feed.
+
+        Every cached series counts as checked: those missing from the feed
+        have not changed.
+
+        Returns
+        -------
+        list[str]
+            Cached series that changed
+        """
+        started = datetime.now(timezone.utc)
+        start = (since.astimezone(timezone.utc) - FEED_OVERLAP).strftime("%Y%m%d%H%M")
+        end = (started + FEED_OVERLAP).strftime("%Y%m%d%H%M")
+        upstream = {}
+        offset = 0
+        while True:
+            page = self._get("series/updates", filter_value="all", start_time=start,
+                             end_time=end, limit=PAGE_SIZE, offset=offset)
+            upstream.update({s["id"]: s.get("last_updated") for s in page["seriess"]})
+            offset += PAGE_SIZE
+            if offset >= page.get("count", 0):
+                break
+
+        with sqlite3.connect(self.db_path) as conn:
+            tracked = self._tracked(conn)
+            changed = self._mark(conn, tracked, upstream, list(tracked))
+            self._set_polled(conn, started)
+        return changed
+
+    def compare_metadata(self, series_ids: Optional[list[str]] = None) -> list[str]:
+        """Mark cached series dirty by comparing fresh metadata with the cache.
+
+        Parameters
+        ----------
+        series_ids : list[str], optional
+            Series to check; defaults to every cached series, in which case
+            the feed can take over from now on
+
+        Returns
+        -------
+        list[str]
+            Cached series that changed
+        """
+        started = datetime.now(timezone.utc)
+        with sqlite3.connect(self.db_path) as conn:
+            tracked = self._tracked(conn)
+        ids = list(tracked) if series_ids is None else [s for s in series_ids if s in tracked]
+
+        upstream = {}
+        for series_id in ids:
+            try:
+                info = self._get("series", series_id=series_id)["seriess"][0]
+                upstream[series_id] = info.get("last_updated")
+            except Exception as e:
+                logger.error(f"Failed to check {series_id} for changes: {e}")
+
+        with sqlite3.connect(self.db_path) as conn:
+            changed = self._mark(conn, tracked, upstream, list(upstream))
+            if series_ids is None and len(upstream) == len(ids):
+                self._set_polled(conn, started)
+        return changed
+
+    def dirty_series(self) -> list[str]:
+        """Return the FRED series marked dirty."""
+        fred, params = self.miner.engine.source_filter(self.miner.name)
+        with sqlite3.connect(self.db_path) as conn:
+            return [row[0] for row in conn.execute(
+                f"SELECT series_id FROM series_updates WHERE dirty = 1 AND {fred} "
+                "ORDER BY series_id", params
+            )]
+
+    def run(self, refresh: bool = True) -> ChangeStats:
+        """Detect changed series and, optionally, re-fetch them.
+
+        Uses the updates feed when the last full check is inside its window,
+        and a metadata comparison otherwise.
+        """
+        started = time.perf_counter()
+        self.requests = 0
+        last = self.last_polled()
+        if last is not None and datetime.now(timezone.utc) - last <= FEED_WINDOW:
+            stats = ChangeStats(method="feed")
+            changed = self.poll_updates(last)
+        else:
+            stats = ChangeStats(method="metadata")
+            changed = self.compare_metadata()
+        with sqlite3.connect(self.db_path) as conn:
+            stats.checked = len(self._tracked(conn))
+        stats.changed = len(changed)
+
+        if refresh:
+            dirty = self.dirty_series()
+            self.miner.ensure_cached(dirty)
+            stats.refreshed = len(dirty) - len(self.dirty_series())
+        stats.requests = self.requests
+        stats.seconds = time.perf_counter() - started
+        logger.info(f"FRED change detection: {stats}")
+        return stats
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Detect and refresh changed FRED series.")
+    parser.add_argument("--no-refresh", action="store_true",
+                        help="only mark changed series dirty")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    print(FREDChangeDetector().run(refresh=not args.no_refresh))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,15 +2,25 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
 import os
-import sqlite3
+import xml.etree.ElementTree as ET
 import pandas as pd
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
+from urllib.parse import parse_qsl, urlencode
+from urllib.request import Request, urlopen
 import logging
 
 from ..config.secrets import get_api_key, get_config
+from .cache_engine import get_cache_engine
+from .http_transport import HTTPX_AVAILABLE, HTTPTransport, get_transport, redact_url
+from .rate_limit import RateLimiter
+from .rollups import choose_level, raw_rollup
+from .sources import DataSource, register_source
+from .vintages import VintageStore
 
 try:
     from fredapi import Fred
@@ -21,11 +31,30 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Public FRED API root; override to point at a mirror or local stand-in
+FRED_BASE_URL = "https://api.stlouisfed.org/fred"
 
-class FREDDataMiner:
-    """Client for retrieving and caching FRED economic data."""
+# FRED allows 120 requests per minute per API key
+FRED_REQUESTS_PER_MINUTE = 120
+
+# fredapi's private fetch method, replaced to route its requests through the
+# rate limiter and transport; requirements.txt pins the version that has it
+FREDAPI_FETCH_HOOK = "_Fred__fetch_data"
+
+
+class FREDDataMiner(DataSource):
+    """Client for retrieving and caching FRED economic data.
+
+    FRED is a :class:`DataSource`; caching is delegated to the shared
+    :class:`~app.data.cache_engine.CacheEngine`.
+    """
+
+    name = "fred"
+    max_age = timedelta(hours=24)
     
-    def __init__(self, api_key: Optional[str] = None, cache_dir: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, cache_dir: Optional[str] = None,
+                 base_url: Optional[str] = None, transport: Optional[HTTPTransport] = None,
+                 rate_limiter: Optional[RateLimiter] = None):
         """Initialize FRED client with caching.
         
         Parameters
@@ -34,6 +63,15 @@ class FREDDataMiner:
             FRED API key. If None, will try secure config then FRED_API_KEY env var.
         cache_dir : str, optional
             Directory to store cached data files. If None, uses config default.
+        base_url : str, optional
+            Root URL of the FRED API. If None, uses the FRED_BASE_URL env var,
+            then the ``fred.base_url`` config value, then the public API.
+        transport : HTTPTransport, optional
+            Transport for FRED requests; defaults to the shared ``'fred'``
+            transport (pooled connections, retries and a circuit breaker)
+        rate_limiter : RateLimiter, optional
+            Limiter every FRED request of this client waits on; defaults to
+            the one shared process-wide (see :func:`get_fred_rate_limiter`)
         """
         if not FREDAPI_AVAILABLE:
             raise ImportError("fredapi library not installed. Run: pip install fredapi")
@@ -45,43 +83,99 @@ class FREDDataMiner:
             logger.info("Set FRED_API_KEY environment variable or add to config/secrets.json")
         
         self.fred = Fred(api_key=self.api_key)
+        self.base_url = (base_url or os.environ.get("FRED_BASE_URL")
+                         or get_config().get_config('fred.base_url') or FRED_BASE_URL)
+        self.fred.root_url = self.base_url
+
+        self.rate_limiter = rate_limiter or get_fred_rate_limiter()
+        self.transport = transport
+        if self.transport is None and HTTPX_AVAILABLE:
+            self.transport = get_transport("fred")
+        # fredapi makes a fresh urlopen call per request; route its fetches
+        # through the rate limiter and the shared transport instead.
+        if not hasattr(self.fred, FREDAPI_FETCH_HOOK):
+            raise ImportError("Unsupported fredapi version (no fetch hook). "
+                              "Run: pip install fredapi==0.5.2")
+        self._fredapi_fetch = getattr(self.fred, FREDAPI_FETCH_HOOK)
+        setattr(self.fred, FREDAPI_FETCH_HOOK, self._fetch_xml)
         
         # Get cache directory from config
         if cache_dir is None:
             cache_dir = get_config().get_config('database.cache_dir', 'data_cache')
         
         self.cache_dir = Path(cache_dir)
-        self.cache_dir.mkdir(exist_ok=True)
-        
-        # Initialize SQLite cache database
-        self.db_path = self.cache_dir / "fred_cache.db"
-        self._init_cache_db()
-    
-    def _init_cache_db(self):
-        """Initialize SQLite database for caching series data."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS series_data (
-                    series_id TEXT,
-                    date TEXT,
-                    value REAL,
-                    last_updated TEXT,
-                    PRIMARY KEY (series_id, date)
-                )
-            """)
-            
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS series_metadata (
-                    series_id TEXT PRIMARY KEY,
-                    title TEXT,
-                    units TEXT,
-                    frequency TEXT,
-                    last_updated TEXT,
-                    observation_start TEXT,
-                    observation_end TEXT
-                )
-            """)
-    
+
+        # Series are stored in the cache shared by all data sources
+        self.engine = get_cache_engine(self.cache_dir)
+        self.db_path = self.engine.db_path
+
+        # Real-time (ALFRED) revisions, kept next to the latest values
+        self.vintages = VintageStore(self.db_path)
+
+    def request_json(self, path: str, timeout: Optional[float] = None, **params) -> dict:
+        """GET a FRED API endpoint with this client's key and return the JSON.
+
+        Parameters
+        ----------
+        path : str
+            Endpoint path below the base URL (e.g. ``'series/updates'``)
+        timeout : float, optional
+            Time budget for the request in seconds, including retries
+        **params
+            Query parameters
+
+        Returns
+        -------
+        dict
+            Decoded response
+        """
+        params.update(api_key=self.api_key, file_type="json")
+        url = f"{self.base_url.rstrip('/')}/{path}"
+        self.rate_limiter.acquire()
+        if self.transport is not None:
+            return self.transport.get_json(url, params=params, deadline=timeout)
+        with urlopen(Request(f"{url}?{urlencode(params)}"), timeout=timeout or 30.0) as response:
+            return json.load(response)
+
+    async def arequest_json(self, path: str, timeout: Optional[float] = None,
+                            **params) -> dict:
+        """Async :meth:`request_json`, through the same limiter and transport."""
+        if self.transport is None:
+            return await asyncio.to_thread(self.request_json, path, timeout, **params)
+        params.update(api_key=self.api_key, file_type="json")
+        await self.rate_limiter.aacquire()
+        return await self.transport.aget_json(f"{self.base_url.rstrip('/')}/{path}",
+                                              params=params, deadline=timeout)
+
+    def _fetch_xml(self, url: str) -> ET.Element:
+        """Fetch a fredapi request URL through the rate limiter and transport.
+
+        Mirrors ``fredapi``'s own fetch: FRED errors are raised as
+        ``ValueError``, with FRED's message when the body carries one.
+        """
+        self.rate_limiter.acquire()
+        if self.transport is None:
+            return self._fredapi_fetch(url)
+        # The key goes in as a parameter, not into the URL the transport logs
+        base, _, query = url.partition("?")
+        params = parse_qsl(query, keep_blank_values=True) + [("api_key", self.api_key or "")]
+        response = self.transport.request("GET", base, params=params)
+        if response.is_error:
+            # FRED explains errors in XML; proxies answer with HTML or nothing
+            message = None
+            if "xml" in response.headers.get("content-type", ""):
+                try:
+                    message = ET.fromstring(response.content).get('message')
+                except ET.ParseError:
+                    pass
+            raise ValueError(message or f"FRED returned HTTP {response.status_code} "
+                                        f"for {redact_url(base)}")
+        try:
+            return ET.fromstring(response.content)
+        except ET.ParseError as e:
+            raise ValueError(f"FRED returned an unreadable response for "
+                             f"{redact_url(base)}: {e}") from e
+
     def get_series(self, series_id: str, start_date: Optional[str] = None, 
                    end_date: Optional[str] = None, force_refresh: bool = False) -> pd.Series:
         """Retrieve economic time series data with caching.
@@ -102,127 +196,163 @@ class FREDDataMiner:
         pd.Series
             Time series data with dates as index
         """
-        if not force_refresh:
-            cached_data = self._get_cached_series(series_id, start_date, end_date)
-            if cached_data is not None:
-                logger.info(f"Retrieved {series_id} from cache")
-                return cached_data
-        
-        try:
-            logger.info(f"Fetching {series_id} from FRED API")
-            data = self.fred.get_series(series_id, start_date, end_date)
-            data.index = pd.to_datetime(data.index)
-            data.index.name = 'date'
-            data.index.freq = None
-
-            # Cache the data
-            self._cache_series(series_id, data)
-            
-            # Cache metadata
-            info = self.fred.get_series_info(series_id)
-            self._cache_metadata(series_id, info)
-            
-            return data
-            
-        except Exception as e:
-            logger.error(f"Failed to fetch {series_id}: {e}")
-            # Try to return cached data as fallback
-            cached_data = self._get_cached_series(series_id, start_date, end_date)
-            if cached_data is not None:
-                logger.warning(f"Using cached data for {series_id} due to API error")
-                return cached_data
-            raise
-    
-    def _get_cached_series(self, series_id: str, start_date: Optional[str], 
-                          end_date: Optional[str]) -> Optional[pd.Series]:
-        """Retrieve series from cache if available and recent."""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                query = """
-                    SELECT date, value FROM series_data 
-                    WHERE series_id = ?
-                """
-                params = [series_id]
-                
-                if start_date:
-                    query += " AND date >= ?"
-                    params.append(start_date)
-                if end_date:
-                    query += " AND date <= ?"
-                    params.append(end_date)
-                    
-                query += " ORDER BY date"
-                
-                df = pd.read_sql_query(query, conn, params=params)
-                
-                if df.empty:
-                    return None
-                
-                # Check if data is recent (within 24 hours for daily data)
-                last_update_query = """
-                    SELECT last_updated FROM series_metadata WHERE series_id = ?
-                """
-                cursor = conn.execute(last_update_query, [series_id])
-                result = cursor.fetchone()
-                
-                if result:
-                    last_updated = datetime.fromisoformat(result[0])
-                    if datetime.now() - last_updated > timedelta(hours=24):
-                        return None
-                
-                df['date'] = pd.to_datetime(df['date'])
-                return df.set_index('date')['value'].rename(series_id)
-                
-        except Exception as e:
-            logger.error(f"Error reading cache for {series_id}: {e}")
-            return None
-    
+        return self.engine.get(self, series_id, start_date, end_date, force_refresh)
+
+    def fetch_series(self, series_id: str, start_date: Optional[str] = None,
+                     end_date: Optional[str] = None) -> pd.Series:
+        """Fetch observations from the FRED API (no caching)."""
+        data = self.fred.get_series(series_id, start_date, end_date)
+        data.index = pd.to_datetime(data.index)
+        data.index.name = 'date'
+        data.index.freq = None
+        return data
+
+    def fetch_metadata(self, series_id: str) -> pd.Series:
+        """Fetch series metadata from the FRED API (no caching)."""
+        return self.fred.get_series_info(series_id)
+
+    async def afetch_series(self, series_id: str, start_date: Optional[str] = None,
+                            end_date: Optional[str] = None) -> pd.Series:
+        """Fetch observations from the FRED API without blocking the event loop."""
+        params = {"series_id": series_id}
+        if start_date:
+            params["observation_start"] = start_date
+        if end_date:
+            params["observation_end"] = end_date
+        rows = (await self.arequest_json("series/observations", **params)).get("observations", [])
+        return pd.Series(
+            # FRED marks missing observations with "."
+            pd.to_numeric([row["value"] for row in rows], errors="coerce"),
+            index=pd.DatetimeIndex([row["date"] for row in rows], name="date"),
+            name=series_id,
+            dtype=float,
+        )
+
+    async def afetch_metadata(self, series_id: str) -> pd.Series:
+        """Fetch series metadata from the FRED API without blocking the event loop."""
+        info = await self.arequest_json("series", series_id=series_id)
+        return pd.Series((info.get("seriess") or [{}])[0])
+
+    def _get_cached_series(self, series_id: str, start_date: Optional[str],
+                          end_date: Optional[str],
+                          allow_stale: bool = False) -> Optional[pd.Series]:
+        """Retrieve series from cache if available and recent (or if
+        ``allow_stale``, however old)."""
+        return self.engine.read(self, series_id, start_date, end_date, allow_stale)
+
+    def series_to_refresh(self, series_ids: list[str]) -> list[str]:
+        """Return the series that are missing from the cache or stale.
+
+        Parameters
+        ----------
+        series_ids : list[str]
+            FRED series identifiers
+
+        Returns
+        -------
+        list[str]
+            Series that need fetching, in the given order
+        """
+        return self.engine.to_refresh(self, series_ids)
+
+    def ensure_cached(self, series_ids: list[str]) -> None:
+        """Fetch any series that is missing from the cache or stale.
+
+        Series that fail to fetch are logged and skipped; callers decide how
+        to report them.
+
+        Parameters
+        ----------
+        series_ids : list[str]
+            FRED series identifiers
+        """
+        for series_id in self.series_to_refresh(series_ids):
+            try:
+                self.get_series(series_id, force_refresh=True)
+            except Exception as e:
+                logger.error(f"Failed to retrieve {series_id}: {e}")
+
+    def get_last_modified(self, series_ids: list[str]) -> Optional[datetime]:
+        """Return when the cached content of any of the series last changed.
+
+        Parameters
+        ----------
+        series_ids : list[str]
+            FRED series identifiers
+
+        Returns
+        -------
+        datetime or None
+            Latest content change, or None if none of the series is cached
+        """
+        return self.engine.last_modified(self.name, series_ids)
+
+    def store_series(self, series_id: str, data: pd.Series,
+                     info: Optional[pd.Series] = None) -> None:
+        """Cache observations (and metadata) fetched outside this client.
+
+        Used by jobs that talk to FRED themselves, such as the catalog
+        crawler.
+
+        Raises
+        ------
+        sqlite3.Error
+            If the cache could not be written
+        """
+        self.engine.write(self.name, series_id, data)
+        if info is not None:
+            self.engine.write_metadata(self.name, series_id, info)
+
     def _cache_series(self, series_id: str, data: pd.Series):
         """Store series data in cache."""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                # Clear existing data for this series
-                conn.execute("DELETE FROM series_data WHERE series_id = ?", [series_id])
-                
-                # Insert new data
-                records = [
-                    (series_id, date.strftime('%Y-%m-%d'), float(value), datetime.now().isoformat())
-                    for date, value in data.items()
-                    if pd.notna(value)
-                ]
-                
-                conn.executemany(
-                    "INSERT INTO series_data (series_id, date, value, last_updated) VALUES (?, ?, ?, ?)",
-                    records
-                )
-                
-        except Exception as e:
-            logger.error(f"Error caching series {series_id}: {e}")
-    
+        self.engine.write(self.name, series_id, data)
+
+    def get_series_versions(self, series_ids: list[str]) -> dict[str, str]:
+        """Return the content version of each cached series.
+
+        The version changes whenever the stored observations of a series
+        change, so it can be used as part of a cache key for anything derived
+        from the series.
+
+        Parameters
+        ----------
+        series_ids : list[str]
+            FRED series identifiers
+
+        Returns
+        -------
+        dict[str, str]
+            Mapping of series ID to version; series that have never been
+            cached are omitted.
+        """
+        return self.engine.versions(self.name, series_ids)
+
     def _cache_metadata(self, series_id: str, info: pd.Series):
         """Store series metadata in cache."""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute(
-                    """INSERT OR REPLACE INTO series_metadata 
-                       (series_id, title, units, frequency, last_updated, observation_start, observation_end)
-                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                    (
-                        series_id,
-                        info.get('title', ''),
-                        info.get('units', ''),
-                        info.get('frequency', ''),
-                        datetime.now().isoformat(),
-                        info.get('observation_start', ''),
-                        info.get('observation_end', '')
-                    )
-                )
-        except Exception as e:
-            logger.error(f"Error caching metadata for {series_id}: {e}")
-    
+        self.engine.write_metadata(self.name, series_id, info)
+
+    def get_series_metadata(self, series_id: str) -> dict[str, str]:
+        """Return cached metadata for a series.
+
+        Parameters
+        ----------
+        series_id : str
+            FRED series identifier
+
+        Returns
+        -------
+        dict[str, str]
+            Title, units, frequency and related fields; empty if the series
+            has not been cached yet.
+        """
+        return self.engine.metadata(self.name, series_id)
+
     def get_multiple_series(self, series_ids: list[str], **kwargs) -> pd.DataFrame:
         """Retrieve multiple series and return as DataFrame.
-        
+
+        Fresh cached series are read together in one batch; only missing or
+        stale series are fetched one by one.
+
         Parameters
         ----------
         series_ids : list[str]
@@ -235,16 +365,235 @@ class FREDDataMiner:
         pd.DataFrame
             DataFrame with series as columns
         """
-        data = {}
-        for series_id in series_ids:
+        if kwargs.get('force_refresh'):
+            frame, missing = pd.DataFrame(), list(dict.fromkeys(series_ids))
+        else:
+            # Everything already cached and fresh comes from one batch read
+            frame, missing = self.engine.read_many(
+                self, series_ids, kwargs.get('start_date'), kwargs.get('end_date'))
+
+        fetched = {}
+        for series_id in missing:
             try:
-                data[series_id] = self.get_series(series_id, **kwargs)
+                fetched[series_id] = self.get_series(series_id, **kwargs)
             except Exception as e:
                 logger.error(f"Failed to retrieve {series_id}: {e}")
                 continue
-        
-        return pd.DataFrame(data)
-    
+
+        return self.engine.merge(frame, fetched, series_ids)
+
+    def get_rollup(self, series_id: str, resolution, start_date: Optional[str] = None,
+                   end_date: Optional[str] = None) -> pd.DataFrame:
+        """Retrieve a series aggregated to (at least) the requested resolution.
+
+        Reads the precomputed rollup at the coarsest level that meets the
+        resolution (see :func:`~app.data.rollups.choose_level`), fetching the
+        series first if it is missing or stale.
+
+        Parameters
+        ----------
+        series_id : str
+            FRED series identifier
+        resolution : str or timedelta
+            Rollup level (``'W'``, ``'M'``, ``'Q'``, ``'A'``) or the widest
+            acceptable bin, e.g. ``'90D'``
+        start_date : str, optional
+            Start date in YYYY-MM-DD format (compared with bin labels)
+        end_date : str, optional
+            End date in YYYY-MM-DD format (compared with bin labels)
+
+        Returns
+        -------
+        pd.DataFrame
+            ``mean``, ``last``, ``min``, ``max`` and ``count`` per bin,
+            indexed by bin label.  If no level is fine enough, every
+            observation is its own bin.  ``attrs['level']`` names the level
+            read (``'raw'`` for observations).
+        """
+        level = choose_level(resolution)
+        if level is None:
+            frame = raw_rollup(self.get_series(series_id, start_date, end_date))
+        else:
+            self.ensure_cached([series_id])
+            frame = self.engine.rollup(self, series_id, level, start_date, end_date)
+            if frame is None:
+                raise KeyError(f"{series_id} is not cached")
+        frame.attrs["level"] = level or "raw"
+        return frame
+
+    def get_rollups(self, series_ids: list[str], resolution, stat: str = "mean",
+                    start_date: Optional[str] = None,
+                    end_date: Optional[str] = None) -> pd.DataFrame:
+        """Retrieve one rollup statistic of several series as a DataFrame.
+
+        Parameters
+        ----------
+        series_ids : list[str]
+            FRED series identifiers
+        resolution : str or timedelta
+            As for :meth:`get_rollup`
+        stat : str
+            One of ``mean``, ``last``, ``min``, ``max`` and ``count``
+        start_date, end_date : str, optional
+            Window in YYYY-MM-DD format (compared with bin labels)
+
+        Returns
+        -------
+        pd.DataFrame
+            Series as columns, bins as rows; series that cannot be retrieved
+            are left out
+        """
+        columns = {}
+        for series_id in series_ids:
+            try:
+                columns[series_id] = self.get_rollup(series_id, resolution, start_date,
+                                                     end_date)[stat]
+            except Exception as e:
+                logger.error(f"Failed to retrieve {series_id} rollup: {e}")
+        frame = pd.DataFrame(columns)
+        frame.index.name = "date"
+        return frame
+
+    def get_quality(self, series_id: str) -> Optional[dict]:
+        """Retrieve the quality summary of a cached series.
+
+        Returns
+        -------
+        dict or None
+            Expected frequency, observation count, flag counts and check
+            time (see :meth:`~app.data.cache_engine.CacheEngine.quality`);
+            None if the series is not cached
+        """
+        return self.engine.quality(self, series_id)
+
+    def get_quality_flags(self, series_ids: list[str], flags: Optional[list[str]] = None,
+                          start_date: Optional[str] = None,
+                          end_date: Optional[str] = None) -> pd.DataFrame:
+        """Retrieve the quality flags stored for cached series.
+
+        Parameters
+        ----------
+        series_ids : list[str]
+            FRED series identifiers
+        flags : list[str], optional
+            Flags to return, from :data:`~app.data.quality.FLAGS`; all by
+            default
+        start_date, end_date : str, optional
+            Window in YYYY-MM-DD format
+
+        Returns
+        -------
+        pd.DataFrame
+            ``series_id``, ``date``, ``flag`` and ``score`` per flagged
+            observation
+        """
+        return self.engine.quality_flags(self, series_ids, flags, start_date, end_date)
+
+    def update_vintages(self, series_id: str) -> int:
+        """Download new ALFRED vintages of a series into the vintage store.
+
+        Only real-time periods from the newest stored vintage on are
+        requested once a series has been ingested.
+
+        Returns
+        -------
+        int
+            Number of revisions added
+        """
+        since = self.vintages.last_vintage(series_id)
+        releases = self.fred.get_series_all_releases(series_id, realtime_start=since)
+        added = self.vintages.ingest(series_id, releases)
+        logger.info(f"Stored {added} new revisions of {series_id}")
+        return added
+
+    def _ensure_vintages(self, series_id: str, as_of: Optional[str] = None) -> None:
+        """Download vintages if the store cannot answer for ``as_of``."""
+        if not self.vintages.needs_ingest(series_id, as_of, self.max_age):
+            return
+        try:
+            self.update_vintages(series_id)
+        except Exception as e:
+            if self.vintages.last_ingested(series_id) is None:
+                raise
+            logger.warning(f"Using stored vintages of {series_id} due to API error: {e}")
+
+    def get_series_as_of(self, series_id: str, as_of, start_date: Optional[str] = None,
+                         end_date: Optional[str] = None) -> pd.Series:
+        """Retrieve a series as it was known on a given day.
+
+        Parameters
+        ----------
+        series_id : str
+            FRED series identifier
+        as_of : str or datetime
+            Day of knowledge; revisions published after it are ignored
+        start_date : str, optional
+            Start date in YYYY-MM-DD format
+        end_date : str, optional
+            End date in YYYY-MM-DD format
+
+        Returns
+        -------
+        pd.Series
+            Observations released on or before ``as_of``, with the values
+            in effect that day
+        """
+        as_of = pd.Timestamp(as_of).strftime("%Y-%m-%d")
+        self._ensure_vintages(series_id, as_of)
+        return self.vintages.as_of(series_id, as_of, start_date, end_date)
+
+    def get_series_all_releases(self, series_id: str, start_date: Optional[str] = None,
+                                end_date: Optional[str] = None) -> pd.DataFrame:
+        """Retrieve the first release and every revision of each observation.
+
+        Parameters
+        ----------
+        series_id : str
+            FRED series identifier
+        start_date : str, optional
+            Start date in YYYY-MM-DD format
+        end_date : str, optional
+            End date in YYYY-MM-DD format
+
+        Returns
+        -------
+        pd.DataFrame
+            ``date``, ``realtime_start`` and ``value`` columns, like
+            ``Fred.get_series_all_releases`` but without republished
+            unchanged values
+        """
+        self._ensure_vintages(series_id)
+        return self.vintages.all_releases(series_id, start_date, end_date)
+
+    def iter_observations(self, series_ids: list[str], start_date: Optional[str] = None,
+                          end_date: Optional[str] = None,
+                          chunk_size: int = 10000) -> Iterator[list[tuple[str, str, float]]]:
+        """Stream cached observations in chunks, ordered by date then series.
+
+        Rows are read through a single cursor with ``fetchmany``, so memory
+        use depends on ``chunk_size`` only, not on how much is exported.
+        Only the cache is read; call :meth:`ensure_cached` first if the
+        series may be missing.
+
+        Parameters
+        ----------
+        series_ids : list[str]
+            FRED series identifiers
+        start_date : str, optional
+            Start date in YYYY-MM-DD format
+        end_date : str, optional
+            End date in YYYY-MM-DD format
+        chunk_size : int
+            Number of rows fetched per chunk
+
+        Yields
+        ------
+        list[tuple[str, str, float]]
+            ``(date, series_id, value)`` rows
+        """
+        return self.engine.iter_observations(self.name, series_ids, start_date, end_date,
+                                             chunk_size)
+
     def search_series(self, search_text: str, limit: int = 10) -> pd.DataFrame:
         """Search for FRED series by text.
         
@@ -265,3 +614,36 @@ class FREDDataMiner:
         except Exception as e:
             logger.error(f"Search failed: {e}")
             return pd.DataFrame()
+
+
+# Global client instance shared by the dashboards
+_miner_instance: Optional[FREDDataMiner] = None
+
+# Limiter shared by every FRED client in the process
+_rate_limiter_instance: Optional[RateLimiter] = None
+
+
+def get_fred_rate_limiter() -> RateLimiter:
+    """Get the limiter shared by all FRED requests in the process.
+
+    It allows ``fred.requests_per_minute`` requests per minute (FRED's
+    per-key limit of 120 unless configured), whether they come from
+    dashboards, the crawler or change detection.
+    """
+    global _rate_limiter_instance
+    if _rate_limiter_instance is None:
+        per_minute = float(get_config().get_config('fred.requests_per_minute',
+                                                   FRED_REQUESTS_PER_MINUTE))
+        _rate_limiter_instance = RateLimiter(per_minute, per=60.0)
+    return _rate_limiter_instance
+
+
+def get_fred_miner() -> FREDDataMiner:
+    """Get the global FRED client instance."""
+    global _miner_instance
+    if _miner_instance is None:
+        _miner_instance = FREDDataMiner()
+    return _miner_instance
+
+
+register_source(FREDDataMiner.name, get_fred_miner)
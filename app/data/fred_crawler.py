@@ -0,0 +1,344 @@
+"""Parallel, resumable crawler for the FRED series catalog.
+
+:class:`FREDDataMiner` fetches series whose IDs are already known.  The
+crawler discovers them instead: starting from category and release roots,
+it walks ``category/children``, ``category/series``, ``releases`` and
+``release/series`` page by page.  Discovered series are written to
+``series_metadata`` in batches, and their observations can be fetched as
+well.
+
+Every unit of work (one API page, or one series' observations) is a row in
+the ``crawl_tasks`` checkpoint table of the FRED cache.  New tasks are
+recorded before they are queued and marked done once their results are
+stored, so an interrupted crawl resumes from the pending rows.  A bounded
+pool of worker threads makes its requests through the miner, whose shared
+rate limiter keeps the crawl and every other FRED caller in the process
+inside the FRED request limit together.
+
+Run from the command line::
+
+    python -m app.data.fred_crawler --workers 8 --observations
+"""
+
+from __future__ import annotations
+
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+import logging
+
+import pandas as pd
+
+from .fred_client import FREDDataMiner, get_fred_miner
+
+logger = logging.getLogger(__name__)
+
+# Maximum page size of the FRED listing endpoints
+PAGE_SIZE = 1000
+
+# Task kinds, in the order a crawl tends to reach them
+CATEGORY = "category"
+CATEGORY_SERIES = "category_series"
+RELEASES = "releases"
+RELEASE_SERIES = "release_series"
+OBSERVATIONS = "observations"
+
+METADATA_FIELDS = ("title", "units", "frequency", "observation_start", "observation_end")
+
+
+@dataclass
+class CrawlStats:
+    """Progress of one crawl run."""
+
+    tasks: int = 0
+    series: int = 0
+    observations: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.tasks} tasks, {self.series} series, {self.observations} observation sets, "
+                f"{self.failed} failed in {self.seconds:.1f}s")
+
+
+class FREDCrawler:
+    """Crawls FRED categories and releases into the local cache."""
+
+    def __init__(self, miner: Optional[FREDDataMiner] = None, workers: int = 8,
+                 fetch_observations: bool = False, max_attempts: int = 3,
+                 timeout: float = 30.0):
+        """Initialize the crawler.
+
+        Parameters
+        ----------
+        miner : FREDDataMiner, optional
+            Client whose cache, API key, base URL and rate limiter are used;
+            defaults to the global client
+        workers : int
+            Number of worker threads
+        fetch_observations : bool
+            Also fetch the observations of every discovered series
+        max_attempts : int
+            Attempts per task before it is marked failed
+        timeout : float
+            Request timeout in seconds
+        """
+        self.miner = miner or get_fred_miner()
+        self.workers = max(1, workers)
+        self.fetch_observations = fetch_observations
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+
+        self.db_path = self.miner.db_path
+        # Writers are serialized; the workers' time is spent waiting on the API.
+        self._db_lock = threading.Lock()
+        self._init_checkpoint_table()
+
+    def _init_checkpoint_table(self):
+        """Create the checkpoint table in the FRED cache."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS crawl_tasks (
+                    kind TEXT,
+                    key TEXT,
+                    page_offset INTEGER,
+                    status TEXT,
+                    attempts INTEGER DEFAULT 0,
+                    error TEXT,
+                    updated TEXT,
+                    PRIMARY KEY (kind, key, page_offset)
+                )
+            """)
+
+    def _get(self, path: str, **params) -> dict:
+        """GET a FRED endpoint as JSON through the miner's rate limiter."""
+        return self.miner.request_json(path, timeout=self.timeout, **params)
+
+    def _add_tasks(self, conn: sqlite3.Connection, tasks: list[tuple[str, str, int]]) -> list:
+        """Record tasks not seen before and return them."""
+        now = datetime.now().isoformat()
+        added = []
+        for task in tasks:
+            cursor = conn.execute(
+                """INSERT OR IGNORE INTO crawl_tasks (kind, key, page_offset, status, updated)
+                   VALUES (?, ?, ?, 'pending', ?)""",
+                task + (now,)
+            )
+            if cursor.rowcount:
+                added.append(task)
+        return added
+
+    def _store_series(self, conn: sqlite3.Connection, seriess: list[dict]) -> None:
+        """Upsert catalog metadata for a page of series.
+
+        ``last_updated`` marks when observations were cached, so it is left
+        untouched here.
+        """
+        conn.executemany(
+            f"""INSERT INTO series_metadata (series_id, {', '.join(METADATA_FIELDS)})
+                VALUES (?, {', '.join('?' for _ in METADATA_FIELDS)})
+                ON CONFLICT(series_id) DO UPDATE SET
+                    {', '.join(f'{f} = excluded.{f}' for f in METADATA_FIELDS)}""",
+            [(s["id"],) + tuple(s.get(f, "") for f in METADATA_FIELDS) for s in seriess]
+        )
+
+    def _run_task(self, task: tuple[str, str, int]) -> tuple[list, list[dict], bool]:
+        """Fetch one task's page.
+
+        Returns
+        -------
+        tuple
+            ``(new_tasks, series, fetched_observations)``
+        """
+        kind, key, offset = task
+        if kind == CATEGORY:
+            children = self._get("category/children", category_id=key)["categories"]
+            return ([(CATEGORY, str(c["id"]), 0) for c in children]
+                    + [(CATEGORY_SERIES, key, 0)]), [], False
+
+        if kind == RELEASES:
+            page = self._get("releases", limit=PAGE_SIZE, offset=offset)
+            tasks = [(RELEASE_SERIES, str(r["id"]), 0) for r in page["releases"]]
+            if offset + PAGE_SIZE < page.get("count", 0):
+                tasks.append((RELEASES, key, offset + PAGE_SIZE))
+            return tasks, [], False
+
+        if kind in (CATEGORY_SERIES, RELEASE_SERIES):
+            path, param = (("category/series", "category_id") if kind == CATEGORY_SERIES
+                           else ("release/series", "release_id"))
+            page = self._get(path, **{param: key}, limit=PAGE_SIZE, offset=offset)
+            seriess = page["seriess"]
+            tasks = []
+            if offset + PAGE_SIZE < page.get("count", 0):
+                tasks.append((kind, key, offset + PAGE_SIZE))
+            if self.fetch_observations:
+                tasks += [(OBSERVATIONS, s["id"], 0) for s in seriess]
+            return tasks, seriess, False
+
+        if kind == OBSERVATIONS:
+            observations = self._get("series/observations", series_id=key)["observations"]
+            data = pd.Series(
+                pd.to_numeric([o["value"] for o in observations], errors="coerce"),
+                index=pd.to_datetime([o["date"] for o in observations]),
+                name=key,
+            )
+            # Raises if the cache cannot be written, so the task is retried
+            # rather than checkpointed as done
+            self.miner.store_series(key, data)
+            return [], [], True
+
+        raise ValueError(f"Unknown crawl task kind: {kind}")
+
+    def _complete(self, task: tuple, new_tasks: list, seriess: list[dict],
+                  observations: bool) -> list:
+        """Store a task's results and checkpoint it in one transaction."""
+        with self._db_lock, sqlite3.connect(self.db_path, timeout=30) as conn:
+            if seriess:
+                self._store_series(conn, seriess)
+            if observations:
+                conn.execute("UPDATE series_metadata SET last_updated = ? WHERE series_id = ?",
+                             (datetime.now().isoformat(), task[1]))
+            added = self._add_tasks(conn, new_tasks)
+            conn.execute(
+                """UPDATE crawl_tasks SET status = 'done', error = NULL, updated = ?
+                   WHERE kind = ? AND key = ? AND page_offset = ?""",
+                (datetime.now().isoformat(),) + task
+            )
+        return added
+
+    def _fail(self, task: tuple, error: Exception) -> bool:
+        """Record a failed attempt; returns True if the task should be retried."""
+        with self._db_lock, sqlite3.connect(self.db_path, timeout=30) as conn:
+            conn.execute(
+                """UPDATE crawl_tasks SET attempts = attempts + 1, error = ?, updated = ?,
+                       status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END
+                   WHERE kind = ? AND key = ? AND page_offset = ?""",
+                (str(error), datetime.now().isoformat(), self.max_attempts) + task
+            )
+            attempts = conn.execute(
+                "SELECT attempts FROM crawl_tasks WHERE kind = ? AND key = ? AND page_offset = ?",
+                task
+            ).fetchone()[0]
+        return attempts < self.max_attempts
+
+    def crawl(self, categories: Optional[list[int]] = None, releases: bool = True,
+              retry_failed: bool = False) -> CrawlStats:
+        """Crawl the catalog, resuming any unfinished tasks from earlier runs.
+
+        Parameters
+        ----------
+        categories : list[int], optional
+            Root category IDs to walk; defaults to ``[0]``, the catalog root
+        releases : bool
+            Also walk every release
+        retry_failed : bool
+            Give tasks that failed in earlier runs another set of attempts
+
+        Returns
+        -------
+        CrawlStats
+        """
+        started = time.perf_counter()
+        roots = [(CATEGORY, str(c), 0) for c in (categories if categories is not None else [0])]
+        if releases:
+            roots.append((RELEASES, "", 0))
+
+        with self._db_lock, sqlite3.connect(self.db_path, timeout=30) as conn:
+            if retry_failed:
+                conn.execute("UPDATE crawl_tasks SET status = 'pending', attempts = 0 "
+                             "WHERE status = 'failed'")
+            self._add_tasks(conn, roots)
+            pending = conn.execute(
+                "SELECT kind, key, page_offset FROM crawl_tasks WHERE status = 'pending'"
+            ).fetchall()
+        if pending:
+            logger.info(f"Crawling FRED catalog: {len(pending)} pending tasks")
+
+        work: queue.Queue = queue.Queue()
+        for task in pending:
+            work.put(tuple(task))
+        stats = CrawlStats()
+        stats_lock = threading.Lock()
+
+        def worker():
+            while True:
+                task = work.get()
+                if task is None:
+                    work.task_done()
+                    return
+                try:
+                    new_tasks, seriess, observations = self._run_task(task)
+                    added = self._complete(task, new_tasks, seriess, observations)
+                    for new_task in added:
+                        work.put(new_task)
+                    with stats_lock:
+                        stats.tasks += 1
+                        stats.series += len(seriess)
+                        stats.observations += observations
+                except Exception as e:
+                    if self._fail(task, e):
+                        work.put(task)
+                    else:
+                        logger.error(f"Crawl task {task} failed: {e}")
+                        with stats_lock:
+                            stats.failed += 1
+                finally:
+                    work.task_done()
+
+        threads = [threading.Thread(target=worker, name=f"fred-crawler-{i}", daemon=True)
+                   for i in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        # New tasks are queued before their parent is marked done, so the
+        # queue only drains once the whole crawl has finished.
+        work.join()
+        for _ in threads:
+            work.put(None)
+        for thread in threads:
+            thread.join()
+
+        stats.seconds = time.perf_counter() - started
+        logger.info(f"FRED crawl finished: {stats}")
+        return stats
+
+    def progress(self) -> dict[str, int]:
+        """Return the number of checkpointed tasks by status."""
+        with sqlite3.connect(self.db_path) as conn:
+            return dict(conn.execute(
+                "SELECT status, COUNT(*) FROM crawl_tasks GROUP BY status"
+            ).fetchall())
+
+    def reset(self) -> None:
+        """Forget all checkpoints so the next crawl starts from the roots."""
+        with self._db_lock, sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM crawl_tasks")
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Crawl the FRED series catalog.")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--category", type=int, action="append",
+                        help="root category ID (repeatable; default: the catalog root)")
+    parser.add_argument("--no-releases", action="store_true", help="skip walking releases")
+    parser.add_argument("--observations", action="store_true",
+                        help="also fetch observations for every series")
+    parser.add_argument("--retry-failed", action="store_true")
+    parser.add_argument("--reset", action="store_true", help="discard checkpoints first")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    crawler = FREDCrawler(workers=args.workers, fetch_observations=args.observations)
+    if args.reset:
+        crawler.reset()
+    print(crawler.crawl(categories=args.category, releases=not args.no_releases,
+                        retry_failed=args.retry_failed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,439 @@
+"""Shared HTTP transport for upstream data sources.
+
+One :class:`HTTPTransport` per upstream host wraps a pooled keep-alive
+``httpx.Client`` and adds the resilience every source needs:
+
+* **Retries** on connection errors, timeouts, 429 and 5xx responses, with
+  jittered exponential backoff.  A ``Retry-After`` header overrides the
+  backoff.
+* **Deadlines**: each request has a total time budget covering every attempt
+  and backoff sleep, so a degraded upstream cannot hold a caller longer.
+* **Circuit breaker**: after repeated failures the transport fails fast with
+  :class:`CircuitOpen` for a cool-down period instead of queueing requests
+  against a dead upstream.  Callers fall back to cached data.  One trial
+  request is let through after the cool-down to probe for recovery.
+
+Code on an event loop uses :meth:`HTTPTransport.aget_json` and
+:meth:`HTTPTransport.arequest`, which share the retry policy and the breaker
+with the synchronous methods.
+
+Log and exception messages name URLs without their query string, which may
+hold API keys.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+import logging
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpen(RuntimeError):
+    """Raised instead of making a request while the circuit is open."""
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a request cannot finish within its deadline."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    Closed: requests flow and failures are counted.  After
+    ``failure_threshold`` consecutive failures the circuit opens and every
+    request is refused for ``reset_timeout`` seconds.  Then it is half-open:
+    one trial request is allowed, and its outcome closes or reopens the
+    circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """``'closed'``, ``'open'`` or ``'half-open'``."""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._clock() - self._opened_at < self.reset_timeout:
+                return "open"
+            return "half-open"
+
+    def allow(self) -> None:
+        """Raise :class:`CircuitOpen` unless a request may be made now."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self.reset_timeout - (self._clock() - self._opened_at)
+            if remaining > 0:
+                raise CircuitOpen(f"circuit open for another {remaining:.1f}s")
+            if self._trial_running:
+                raise CircuitOpen("circuit half-open; trial request in progress")
+            self._trial_running = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                logger.warning(f"Circuit opened after {self._failures} consecutive failures")
+                self._opened_at = self._clock()
+            self._trial_running = False
+
+
+def redact_url(url) -> str:
+    """Return a URL without its query string, for log and error messages."""
+    text = str(url)
+    base, _, query = text.partition("?")
+    return f"{base}?..." if query else base
+
+
+class _RedactQueryFilter(logging.Filter):
+    """Strip query strings from the URLs httpx logs for each request."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if isinstance(record.args, tuple):
+            record.args = tuple(redact_url(arg) if isinstance(arg, httpx.URL) else arg
+                                for arg in record.args)
+        return True
+
+
+if HTTPX_AVAILABLE:
+    logging.getLogger("httpx").addFilter(_RedactQueryFilter())
+
+
+def parse_retry_after(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
+    """Return the delay in seconds requested by a ``Retry-After`` header."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (when - now).total_seconds())
+
+
+class ResponseReader:
+    """File-like reader over the decoded body of a streamed response.
+
+    Lets incremental parsers such as ``ijson`` consume a download while it
+    arrives; gzip transfer encoding is undone by httpx.
+    """
+
+    def __init__(self, response: "httpx.Response"):
+        self.response = response
+        self._chunks = response.iter_bytes()
+        self._buffer = bytearray()
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def close(self) -> None:
+        self.response.close()
+
+
+class HTTPTransport:
+    """Pooled HTTP client with retries, deadlines and a circuit breaker."""
+
+    def __init__(self, timeout: float = 10.0, deadline: float = 30.0, max_retries: int = 3,
+                 backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 max_connections: int = 20, breaker: Optional[CircuitBreaker] = None,
+                 transport=None, headers: Optional[dict] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep,
+                 rng: Optional[random.Random] = None):
+        """Initialize the transport.
+
+        Parameters
+        ----------
+        timeout : float
+            Timeout of a single attempt in seconds
+        deadline : float
+            Default total time budget per request, across all attempts
+        max_retries : int
+            Retries after the first attempt
+        backoff_base, backoff_max : float
+            Backoff before retry ``n`` is drawn uniformly from
+            ``[0, min(backoff_max, backoff_base * 2**n)]``
+        max_connections : int
+            Size of the keep-alive connection pool
+        breaker : CircuitBreaker, optional
+            Breaker for this upstream; by default one opening after five
+            consecutive failures for 30 seconds
+        transport : httpx.BaseTransport, optional
+            Custom transport, e.g. ``httpx.MockTransport`` in tests (which
+            serves async requests too)
+        headers : dict, optional
+            Headers sent with every request
+        clock, sleep, rng
+            Time source, sleep function and random generator (replaceable
+            in tests)
+        """
+        if not HTTPX_AVAILABLE:
+            raise ImportError("httpx library not installed. Run: pip install httpx")
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._client_options = dict(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections),
+            headers=headers,
+            transport=transport,
+            follow_redirects=True,
+        )
+        self._client = httpx.Client(**self._client_options)
+        # Bound to the event loop it is opened on, hence closed by aclose()
+        self._async_client: Optional["httpx.AsyncClient"] = None
+
+    def _backoff(self, attempt: int, response: Optional["httpx.Response"]) -> float:
+        retry_after = parse_retry_after(response.headers.get("Retry-After")) if response else None
+        if retry_after is not None:
+            return retry_after
+        return self._rng.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def request(self, method: str, url: str, deadline: Optional[float] = None,
+                **kwargs) -> "httpx.Response":
+        """Send a request, retrying transient failures within the deadline.
+
+        Parameters
+        ----------
+        method : str
+            HTTP method
+        url : str
+            Absolute URL
+        deadline : float, optional
+            Total time budget in seconds; defaults to the transport's
+        **kwargs
+            Passed to ``httpx.Client.build_request`` (``params``, ``headers``...)
+
+        Returns
+        -------
+        httpx.Response
+            The first response that is not retryable.  4xx responses other
+            than 429 are returned as is.
+
+        Raises
+        ------
+        CircuitOpen
+            If the upstream's circuit is open
+        DeadlineExceeded
+            If the deadline ran out before a usable response
+        httpx.HTTPError
+            If the retries were exhausted; the last error is raised
+        """
+        return self._send(method, url, deadline, stream=False, **kwargs)
+
+    def open(self, method: str, url: str, deadline: Optional[float] = None,
+             **kwargs) -> "ResponseReader":
+        """Like :meth:`request`, but stream the body instead of loading it.
+
+        The deadline covers the attempts up to the response headers; the body
+        is then read within the per-attempt timeout.  The caller must close
+        the returned reader.
+
+        Raises
+        ------
+        httpx.HTTPStatusError
+            If the final response is an HTTP error
+        """
+        response = self._send(method, url, deadline, stream=True, **kwargs)
+        if response.is_error:
+            response.close()
+        self._raise_for_status(response, url)
+        return ResponseReader(response)
+
+    def _allow(self, method: str, shown: str, budget: float, expires: float) -> float:
+        """Return the time left for the next attempt, once the breaker allows it."""
+        # Checked before allow() so an expired deadline cannot strand a
+        # half-open breaker with its trial marked as running
+        remaining = expires - self._clock()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"{method} {shown} exceeded its {budget:.1f}s deadline")
+        self.breaker.allow()
+        return remaining
+
+    def _retry_delay(self, method: str, shown: str, attempt: int, expires: float,
+                     response: Optional["httpx.Response"], error: Exception) -> float:
+        """Record a failed attempt and return the backoff before the next one.
+
+        Raises the error once the retries are exhausted, and
+        :class:`DeadlineExceeded` if the backoff would outlast the deadline.
+        """
+        self.breaker.record_failure()
+        if attempt >= self.max_retries:
+            raise error
+        delay = self._backoff(attempt, response)
+        if delay >= expires - self._clock():
+            raise DeadlineExceeded(
+                f"{method} {shown} cannot be retried in {delay:.1f}s within its deadline"
+            ) from error
+        logger.info(f"Retrying {method} {shown} in {delay:.2f}s after: {error}")
+        return delay
+
+    @staticmethod
+    def _retryable_error(response: "httpx.Response", shown: str) -> "httpx.HTTPStatusError":
+        return httpx.HTTPStatusError(f"{response.status_code} from {shown}",
+                                     request=response.request, response=response)
+
+    def _send(self, method: str, url: str, deadline: Optional[float], stream: bool,
+              **kwargs) -> "httpx.Response":
+        budget = self.deadline if deadline is None else deadline
+        expires = self._clock() + budget
+        shown = redact_url(url)
+        attempt = 0
+        while True:
+            remaining = self._allow(method, shown, budget, expires)
+            response = None
+            try:
+                request = self._client.build_request(
+                    method, url, timeout=min(self.timeout, remaining), **kwargs)
+                response = self._client.send(request, stream=stream)
+            except httpx.TransportError as e:
+                error: Exception = e
+            except BaseException:
+                self.breaker.record_failure()
+                raise
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    self.breaker.record_success()
+                    return response
+                response.close()
+                error = self._retryable_error(response, shown)
+            self._sleep(self._retry_delay(method, shown, attempt, expires, response, error))
+            attempt += 1
+
+    def get_json(self, url: str, params: Optional[dict] = None,
+                 deadline: Optional[float] = None, **kwargs):
+        """GET a URL and return its decoded JSON body, raising on HTTP errors."""
+        response = self.request("GET", url, params=params, deadline=deadline, **kwargs)
+        self._raise_for_status(response, url)
+        return response.json()
+
+    @staticmethod
+    def _raise_for_status(response: "httpx.Response", url: str) -> None:
+        if response.is_error:
+            # httpx's own message would quote the full URL, query included
+            raise httpx.HTTPStatusError(f"{response.status_code} from {redact_url(url)}",
+                                        request=response.request, response=response)
+
+    async def arequest(self, method: str, url: str, deadline: Optional[float] = None,
+                       **kwargs) -> "httpx.Response":
+        """Async :meth:`request`, for callers on an event loop.
+
+        Attempts go through a pooled ``httpx.AsyncClient`` opened on first
+        use, with the same retries, deadline and circuit breaker as the
+        synchronous requests to this upstream.
+        """
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(**self._client_options)
+        budget = self.deadline if deadline is None else deadline
+        expires = self._clock() + budget
+        shown = redact_url(url)
+        attempt = 0
+        while True:
+            remaining = self._allow(method, shown, budget, expires)
+            response = None
+            try:
+                request = self._async_client.build_request(
+                    method, url, timeout=min(self.timeout, remaining), **kwargs)
+                response = await self._async_client.send(request)
+            except httpx.TransportError as e:
+                error: Exception = e
+            except BaseException:
+                # Cancellation included, so a half-open trial is never left running
+                self.breaker.record_failure()
+                raise
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    self.breaker.record_success()
+                    return response
+                error = self._retryable_error(response, shown)
+            await asyncio.sleep(
+                self._retry_delay(method, shown, attempt, expires, response, error))
+            attempt += 1
+
+    async def aget_json(self, url: str, params: Optional[dict] = None,
+                        deadline: Optional[float] = None, **kwargs):
+        """Async :meth:`get_json`."""
+        response = await self.arequest("GET", url, params=params, deadline=deadline, **kwargs)
+        self._raise_for_status(response, url)
+        return response.json()
+
+    def close(self) -> None:
+        """Close pooled connections."""
+        self._client.close()
+
+    async def aclose(self) -> None:
+        """Close the async connection pool; it is reopened on next use."""
+        if self._async_client is not None:
+            client, self._async_client = self._async_client, None
+            await client.aclose()
+
+
+# Transports shared per upstream, so each has one pool and one breaker
+_transports: dict[str, HTTPTransport] = {}
+_transports_lock = threading.Lock()
+
+
+def get_transport(name: str, **kwargs) -> HTTPTransport:
+    """Get the shared transport for an upstream, creating it on first use.
+
+    Parameters
+    ----------
+    name : str
+        Upstream name (e.g. ``'fred'``)
+    **kwargs
+        :class:`HTTPTransport` arguments used when the transport is created
+    """
+    with _transports_lock:
+        if name not in _transports:
+            _transports[name] = HTTPTransport(**kwargs)
+        return _transports[name]
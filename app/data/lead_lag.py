@@ -0,0 +1,298 @@
+"""Cross-indicator correlations and lead/lag scanning.
+
+The indicators are aligned once on a monthly grid, read from the monthly
+rollups.  All pairs and all lags are then computed together instead of
+looping over pairs and shifts in pandas:
+
+* :func:`correlation_matrix` gives pairwise-complete Pearson correlations
+  from a handful of masked matrix products.
+* :func:`cross_correlations` gives the Pearson correlation of every pair at
+  every lag in ``-max_lag..max_lag``.  The overlap count, sums and sums of
+  squares behind each coefficient are cross-correlations themselves.  They
+  are computed for all pairs at once as FFT products, in blocks of rows
+  spread over a thread pool (NumPy releases the GIL in its FFT and array
+  arithmetic).  Missing values are masked, so each coefficient uses exactly
+  the months both series cover, as ``pandas.Series.corr`` would.
+
+:class:`LeadLagScanner` caches scans keyed by the content version of the
+series, so a result is reused until one of the series changes.
+
+Conventions: ``xcorr[i, j, k]`` correlates ``x_i(t)`` with
+``x_j(t + lag_k)``.  A peak at a positive lag means series ``i`` leads
+series ``j`` by that many months.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .economic_indicators import ALL_INDICATORS
+from .fred_client import FREDDataMiner, get_fred_miner
+
+# Scans kept in memory before the least recently used is evicted
+MAX_CACHED_SCANS = 32
+
+# Transformations applied to the aligned panel before correlating; levels
+# of trending series correlate spuriously, so changes are the default.
+TRANSFORMS = ("level", "diff", "pct")
+
+
+def align_panel(miner: FREDDataMiner, series_ids: Sequence[str]) -> pd.DataFrame:
+    """Load monthly means of the series on a common month-start grid."""
+    panel = miner.get_rollups(list(series_ids), "M").dropna(how="all")
+    if panel.empty:
+        return panel
+    grid = pd.date_range(panel.index.min(), panel.index.max(), freq="MS", name="date")
+    return panel.reindex(grid)
+
+
+def transform_panel(panel: pd.DataFrame, transform: str = "diff") -> pd.DataFrame:
+    """Return the panel as levels, first differences or percent changes."""
+    if transform not in TRANSFORMS:
+        raise ValueError(f"transform must be one of {TRANSFORMS}")
+    if transform == "diff":
+        return panel.diff()
+    if transform == "pct":
+        return panel.pct_change(fill_method=None) * 100
+    return panel
+
+
+def _masked(panel: pd.DataFrame | np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return ``(values, mask)`` as ``(n_series, n_periods)`` arrays with
+    missing values zeroed and each series centred (for numerical accuracy)."""
+    values = np.asarray(panel, dtype=float).T
+    mask = np.isfinite(values)
+    values = np.where(mask, values, 0.0)
+    counts = mask.sum(axis=1, keepdims=True)
+    means = np.divide(values.sum(axis=1, keepdims=True), counts,
+                      out=np.zeros_like(counts, dtype=float), where=counts > 0)
+    return np.where(mask, values - means, 0.0), mask.astype(float)
+
+
+def _pearson(n, sx, sy, sxx, syy, sxy, min_periods: int) -> np.ndarray:
+    """Combine overlap sums into Pearson coefficients."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = n * sxy - sx * sy
+        var = (n * sxx - sx ** 2) * (n * syy - sy ** 2)
+        r = cov / np.sqrt(var)
+    r[(n < min_periods) | ~(var > 0)] = np.nan
+    return np.clip(r, -1.0, 1.0)
+
+
+def correlation_matrix(panel: pd.DataFrame, min_periods: int = 12) -> pd.DataFrame:
+    """Pairwise-complete Pearson correlations of a panel's columns.
+
+    Matches ``panel.corr(min_periods=min_periods)`` using six matrix
+    products instead of a loop over pairs.
+    """
+    x, m = _masked(panel)
+    n = m @ m.T
+    sx = x @ m.T
+    sxx = (x ** 2) @ m.T
+    r = _pearson(n, sx, sx.T, sxx, sxx.T, x @ x.T, min_periods)
+    return pd.DataFrame(r, index=panel.columns, columns=panel.columns)
+
+
+@dataclass(frozen=True)
+class LeadLagResult:
+    """Correlation of every pair of series at every lag."""
+
+    series_ids: tuple[str, ...]
+    lags: np.ndarray
+    xcorr: np.ndarray  # (n_series, n_series, n_lags)
+
+    def _position(self, series_id: str) -> int:
+        return self.series_ids.index(series_id)
+
+    def matrix(self, lag: int = 0) -> pd.DataFrame:
+        """Return the correlation matrix at one lag."""
+        k = int(np.searchsorted(self.lags, lag))
+        if k >= len(self.lags) or self.lags[k] != lag:
+            raise ValueError(f"lag {lag} outside the scanned range")
+        return pd.DataFrame(self.xcorr[:, :, k], index=list(self.series_ids),
+                            columns=list(self.series_ids))
+
+    def pair(self, leader: str, follower: str) -> pd.Series:
+        """Return corr(leader(t), follower(t + lag)) by lag."""
+        return pd.Series(self.xcorr[self._position(leader), self._position(follower)],
+                         index=pd.Index(self.lags, name="lag"), name=f"{leader}->{follower}")
+
+    def table(self, min_abs: float = 0.0) -> pd.DataFrame:
+        """Return the strongest lag of every pair, strongest pairs first.
+
+        Each unordered pair appears once, oriented so that the lag is not
+        negative: ``leader`` leads ``follower`` by ``lag`` months.
+
+        Parameters
+        ----------
+        min_abs : float
+            Leave out pairs whose strongest absolute correlation is lower
+        """
+        zero = int(np.searchsorted(self.lags, 0))
+        rows = []
+        for i in range(len(self.series_ids)):
+            for j in range(i + 1, len(self.series_ids)):
+                curve = self.xcorr[i, j]
+                if np.isnan(curve).all():
+                    continue
+                k = int(np.nanargmax(np.abs(curve)))
+                lag, corr = int(self.lags[k]), float(curve[k])
+                leader, follower = self.series_ids[i], self.series_ids[j]
+                if lag < 0:
+                    leader, follower, lag = follower, leader, -lag
+                if abs(corr) >= min_abs:
+                    rows.append({"leader": leader, "follower": follower, "lag": lag,
+                                 "corr": corr, "corr_at_0": float(curve[zero])})
+        frame = pd.DataFrame(rows, columns=["leader", "follower", "lag", "corr", "corr_at_0"])
+        return frame.reindex(frame["corr"].abs().sort_values(ascending=False).index) \
+            .reset_index(drop=True)
+
+
+def _xcorr_block(fft_rows: tuple, fft_cols: tuple, size: int, positions: np.ndarray,
+                 min_periods: int) -> np.ndarray:
+    """Cross-correlate a block of rows with every column series."""
+    m_i, x_i, xx_i = (a.conj()[:, None, :] for a in fft_rows)
+    m_j, x_j, xx_j = (a[None, :, :] for a in fft_cols)
+
+    def lagged(product):
+        return np.fft.irfft(product, n=size, axis=-1)[..., positions]
+
+    n = np.rint(lagged(m_i * m_j))
+    return _pearson(n, lagged(x_i * m_j), lagged(m_i * x_j), lagged(xx_i * m_j),
+                    lagged(m_i * xx_j), lagged(x_i * x_j), min_periods)
+
+
+def cross_correlations(panel: pd.DataFrame, max_lag: int = 12, min_periods: int = 24,
+                       workers: Optional[int] = None) -> LeadLagResult:
+    """Correlate every pair of columns at every lag in ``-max_lag..max_lag``.
+
+    Parameters
+    ----------
+    panel : pd.DataFrame
+        Series as columns on a regular grid; missing values are allowed
+    max_lag : int
+        Largest lead or lag, in periods of the grid
+    min_periods : int
+        Overlapping observations needed for a coefficient; fewer give NaN
+    workers : int, optional
+        Threads the row blocks are spread over; defaults to the CPU count
+
+    Returns
+    -------
+    LeadLagResult
+        ``xcorr[i, j, k]`` is the Pearson correlation of ``x_i(t)`` and
+        ``x_j(t + lags[k])`` over the periods where both are present
+    """
+    series_ids = tuple(str(column) for column in panel.columns)
+    lags = np.arange(-max_lag, max_lag + 1)
+    x, m = _masked(panel)
+    n_series, n_periods = x.shape
+    # Zero padding to at least n_periods + max_lag keeps lags from wrapping
+    size = 1 << int(np.ceil(np.log2(max(2, n_periods + max_lag))))
+    positions = lags % size
+    ffts = tuple(np.fft.rfft(a, n=size, axis=-1) for a in (m, x * m, x * x * m))
+
+    workers = max(1, min(workers or os.cpu_count() or 1, n_series))
+    blocks = [block for block in np.array_split(np.arange(n_series), workers) if len(block)]
+
+    def run(block):
+        return _xcorr_block(tuple(a[block] for a in ffts), ffts, size, positions, min_periods)
+
+    if len(blocks) == 1:
+        parts = [run(blocks[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=len(blocks)) as pool:
+            parts = list(pool.map(run, blocks))
+    xcorr = np.concatenate(parts, axis=0) if parts else np.empty((0, 0, len(lags)))
+    return LeadLagResult(series_ids, lags, xcorr)
+
+
+class LeadLagScanner:
+    """Scans indicators for leads and lags, caching results by data version."""
+
+    def __init__(self, miner: Optional[FREDDataMiner] = None,
+                 max_scans: int = MAX_CACHED_SCANS, workers: Optional[int] = None):
+        """Initialize the scanner.
+
+        Parameters
+        ----------
+        miner : FREDDataMiner, optional
+            Data client; defaults to the global client
+        max_scans : int
+            Results kept in memory before the least recently used is evicted
+        workers : int, optional
+            Threads used per scan; defaults to the CPU count
+        """
+        self.miner = miner or get_fred_miner()
+        self.max_scans = max_scans
+        self.workers = workers
+        self._scans: OrderedDict[tuple, LeadLagResult] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _version(self, series_ids: Sequence[str]) -> str:
+        """Combine the content versions of the series into one string."""
+        versions = self.miner.get_series_versions(list(series_ids))
+        text = ";".join(f"{sid}={versions.get(sid, '')}" for sid in series_ids)
+        return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+    def scan(self, series_ids: Optional[Sequence[str]] = None, max_lag: int = 12,
+             transform: str = "diff", min_periods: int = 24) -> LeadLagResult:
+        """Return the lead/lag scan of a set of indicators.
+
+        Parameters
+        ----------
+        series_ids : sequence of str, optional
+            FRED series identifiers; defaults to every indicator in
+            ``ALL_INDICATORS``
+        max_lag : int
+            Largest lead or lag in months
+        transform : str
+            ``'diff'`` (default), ``'pct'`` or ``'level'``
+        min_periods : int
+            Overlapping months needed for a coefficient
+        """
+        series_ids = tuple(dict.fromkeys(series_ids or ALL_INDICATORS.values()))
+        if transform not in TRANSFORMS:
+            raise ValueError(f"transform must be one of {TRANSFORMS}")
+        self.miner.ensure_cached(list(series_ids))
+        key = (series_ids, max_lag, transform, min_periods, self._version(series_ids))
+        with self._lock:
+            result = self._scans.get(key)
+            if result is not None:
+                self._scans.move_to_end(key)
+                return result
+
+        panel = transform_panel(align_panel(self.miner, series_ids), transform)
+        result = cross_correlations(panel, max_lag, min_periods, self.workers)
+
+        with self._lock:
+            self._scans[key] = result
+            while len(self._scans) > self.max_scans:
+                self._scans.popitem(last=False)
+        return result
+
+    def correlations(self, series_ids: Optional[Sequence[str]] = None,
+                     transform: str = "diff", min_periods: int = 24) -> pd.DataFrame:
+        """Return the same-month correlation matrix of a set of indicators."""
+        return self.scan(series_ids, 0, transform, min_periods).matrix(0)
+
+
+# Global scanner shared by the app
+_scanner_instance: Optional[LeadLagScanner] = None
+
+
+def get_lead_lag_scanner() -> LeadLagScanner:
+    """Get the global lead/lag scanner."""
+    global _scanner_instance
+    if _scanner_instance is None:
+        _scanner_instance = LeadLagScanner()
+    return _scanner_instance
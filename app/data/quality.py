@@ -0,0 +1,322 @@
+"""Data-quality checks run on every series as it is cached.
+
+Each series written through the :class:`~app.data.cache_engine.CacheEngine`
+is checked before it is stored.  The checks are vectorized over the whole
+series and flag individual observations:
+
+* ``duplicate`` – the date occurs more than once in the fetched data; the
+  last value is kept, so a duplicate no longer aborts the write.
+* ``gap`` – the spacing from the previous observation is wider than the
+  series' frequency allows, i.e. observations are missing.
+* ``frequency_break`` – the spacing switches to a different frequency (a
+  run of e.g. quarterly steps in a monthly series) or is narrower than the
+  frequency allows.
+* ``outlier`` – the steps to and from an observation both have a large
+  robust z-score (median and MAD of all steps) and opposite signs.
+  Isolated spikes are caught; level shifts and trends are not.
+* ``level_shift`` – the medians of the windows before and after a date
+  differ far more than they usually do; flagged once per shift, at the
+  first observation of the new level.
+
+The expected frequency comes from the series metadata (FRED's
+``frequency`` field) when it is known, otherwise from the median spacing.
+
+Flags go to ``quality_flags`` and per-series counts to ``series_quality``,
+so charts and the API filter on them (:func:`read_flags`) without
+re-running the checks.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+FLAGS = ("gap", "duplicate", "frequency_break", "outlier", "level_shift")
+
+# Frequency code -> (narrowest, widest) normal spacing in days.  Daily
+# series skip weekends and holidays; weekly dates move with holidays.
+FREQUENCIES = {
+    "D": (1, 5),
+    "W": (5, 9),
+    "BW": (12, 16),
+    "M": (28, 31),
+    "Q": (89, 92),
+    "SA": (181, 184),
+    "A": (365, 366),
+}
+
+# FRED ``frequency`` metadata (text before any comma) -> frequency code
+METADATA_FREQUENCIES = {
+    "Daily": "D",
+    "Weekly": "W",
+    "Biweekly": "BW",
+    "Monthly": "M",
+    "Quarterly": "Q",
+    "Semiannual": "SA",
+    "Annual": "A",
+}
+
+# Robust z-score both steps around an observation must exceed for an outlier
+OUTLIER_Z = 6.0
+
+# Observations in each of the windows compared for a level shift
+LEVEL_SHIFT_WINDOW = 12
+
+# Robust z-score of the change in level above which a shift is flagged
+LEVEL_SHIFT_Z = 6.0
+
+# Converts a median absolute deviation to a normal standard deviation
+MAD_SCALE = 1.4826
+
+
+@dataclass
+class QualityReport:
+    """The outcome of checking one series."""
+
+    data: pd.Series  # sorted, without duplicates or missing values
+    frequency: Optional[str]
+    flags: pd.DataFrame = field(repr=False)  # date, flag, score
+
+    def counts(self) -> dict[str, int]:
+        """Return the number of observations carrying each flag."""
+        counts = self.flags["flag"].value_counts()
+        return {flag: int(counts.get(flag, 0)) for flag in FLAGS}
+
+
+def init_quality(conn: sqlite3.Connection) -> None:
+    """Create the quality tables."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS series_quality (
+            series_id TEXT PRIMARY KEY,
+            frequency TEXT,
+            observations INTEGER,
+            gap INTEGER,
+            duplicate INTEGER,
+            frequency_break INTEGER,
+            outlier INTEGER,
+            level_shift INTEGER,
+            checked TEXT
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS quality_flags (
+            series_id TEXT,
+            flag TEXT,
+            date TEXT,
+            score REAL,
+            PRIMARY KEY (series_id, flag, date)
+        ) WITHOUT ROWID
+    """)
+
+
+def expected_frequency(spacing: np.ndarray, metadata: Optional[str] = None) -> Optional[str]:
+    """Return the frequency code from metadata, or else from the median spacing."""
+    if metadata:
+        code = METADATA_FREQUENCIES.get(metadata.split(",")[0].strip())
+        if code:
+            return code
+    if not len(spacing):
+        return None
+    median = float(np.median(spacing))
+    return next((code for code, (low, high) in FREQUENCIES.items()
+                 if low <= median <= high), None)
+
+
+def _bands(spacing: np.ndarray) -> np.ndarray:
+    """Return the index in :data:`FREQUENCIES` of the band holding each
+    spacing, or -1."""
+    bands = np.full(len(spacing), -1)
+    for i, (low, high) in reversed(list(enumerate(FREQUENCIES.values()))):
+        bands[(spacing >= low) & (spacing <= high)] = i
+    return bands
+
+
+def robust_z(values: np.ndarray) -> np.ndarray:
+    """Return ``(x - median) / (1.4826 * MAD)``; NaN where undefined.
+
+    When more than half the values equal the median (MAD of zero), the mean
+    absolute deviation is used instead, scaled to match for normal data.
+    """
+    finite = values[np.isfinite(values)]
+    if not len(finite):
+        return np.full(len(values), np.nan)
+    deviation = values - np.median(finite)
+    scale = MAD_SCALE * np.median(np.abs(finite - np.median(finite)))
+    if scale == 0:
+        scale = 1.2533 * np.mean(np.abs(finite - np.median(finite)))
+    if scale == 0:
+        return np.zeros(len(values))
+    return deviation / scale
+
+
+def _spacing_flags(dates: pd.DatetimeIndex, spacing: np.ndarray,
+                   frequency: Optional[str]) -> list[tuple]:
+    """Flag gaps and frequency breaks from the spacing between observations."""
+    if frequency is None or not len(spacing):
+        return []
+    low, high = FREQUENCIES[frequency]
+    off = (spacing < low) | (spacing > high)
+    bands = _bands(spacing)
+    # A run of two or more steps at another frequency is a regime change
+    same_prev = np.r_[False, off[1:] & off[:-1] & (bands[1:] == bands[:-1])]
+    same_next = np.r_[same_prev[1:], False]
+    regime = off & (bands >= 0) & (same_prev | same_next)
+    breaks = (regime & ~same_prev) | (off & ~regime & (spacing < low))
+    gaps = off & ~regime & (spacing > high)
+    # Spacing i ends at observation i + 1
+    return ([(dates[i + 1], "gap", spacing[i]) for i in np.flatnonzero(gaps)]
+            + [(dates[i + 1], "frequency_break", spacing[i]) for i in np.flatnonzero(breaks)])
+
+
+def _outlier_flags(values: pd.Series) -> list[tuple]:
+    """Flag spikes: a large step to an observation and a large step back."""
+    z = robust_z(np.diff(values.to_numpy()))
+    z_in, z_out = z[:-1], z[1:]
+    spike = (np.sign(z_in) == -np.sign(z_out)) & (np.minimum(np.abs(z_in), np.abs(z_out))
+                                                  > OUTLIER_Z)
+    # Step i leads to observation i + 1
+    return [(values.index[i + 1], "outlier", np.sign(z_in[i]) * min(abs(z_in[i]), abs(z_out[i])))
+            for i in np.flatnonzero(spike)]
+
+
+def _level_shift_flags(values: pd.Series) -> list[tuple]:
+    """Flag the first observation of each new level."""
+    w = LEVEL_SHIFT_WINDOW
+    if len(values) < 2 * w:
+        return []
+    before = values.rolling(w).median().shift(1)
+    after = values[::-1].rolling(w).median()[::-1]
+    z = pd.Series(robust_z((after - before).to_numpy()), index=values.index)
+    hit = z.abs() > LEVEL_SHIFT_Z
+    if not hit.any():
+        return []
+    # Medians change across a stretch of dates around a shift; flag each
+    # stretch once, where the step between observations is largest.
+    stretch = (~hit).cumsum()[hit]
+    step = values.diff().abs().fillna(0)[hit]
+    return [(date, "level_shift", z[date]) for date in step.groupby(stretch).idxmax()]
+
+
+def check_series(data: pd.Series, frequency: Optional[str] = None) -> QualityReport:
+    """Run every check on a fetched series.
+
+    Parameters
+    ----------
+    data : pd.Series
+        Observations indexed by date, as fetched
+    frequency : str, optional
+        The series' ``frequency`` metadata (e.g. ``'Monthly'``); inferred
+        from the observations if missing or not recognised
+
+    Returns
+    -------
+    QualityReport
+        The cleaned observations to store, the expected frequency code and
+        one row per flag: ``date``, ``flag`` and ``score`` (days since the
+        previous observation for gaps and frequency breaks, occurrences for
+        duplicates, robust z-score for outliers and level shifts)
+    """
+    data = data.dropna()
+    data.index = pd.DatetimeIndex(pd.to_datetime(data.index))
+    data = data.sort_index(kind="stable")
+
+    duplicated = data.index.duplicated(keep=False)
+    occurrences = data.index[duplicated].value_counts()
+    rows = [(date, "duplicate", count) for date, count in occurrences.items()]
+    data = data[~data.index.duplicated(keep="last")].astype(float)
+
+    spacing = np.diff(data.index.to_numpy()) / np.timedelta64(1, "D")
+    code = expected_frequency(spacing, frequency)
+    rows += _spacing_flags(data.index, spacing, code)
+    rows += _outlier_flags(data)
+    rows += _level_shift_flags(data)
+
+    flags = pd.DataFrame(rows, columns=["date", "flag", "score"])
+    flags["score"] = flags["score"].astype(float)
+    return QualityReport(data, code, flags.sort_values(["date", "flag"], ignore_index=True))
+
+
+def store_quality(conn: sqlite3.Connection, key: str, report: QualityReport) -> None:
+    """Replace the stored quality results of a series."""
+    conn.execute("DELETE FROM quality_flags WHERE series_id = ?", [key])
+    conn.executemany(
+        "INSERT OR REPLACE INTO quality_flags (series_id, flag, date, score) VALUES (?, ?, ?, ?)",
+        [(key, flag, date.strftime("%Y-%m-%d"), float(score))
+         for date, flag, score in report.flags.itertuples(index=False, name=None)])
+    counts = report.counts()
+    conn.execute(
+        f"""INSERT OR REPLACE INTO series_quality
+            (series_id, frequency, observations, {', '.join(FLAGS)}, checked)
+            VALUES (?, ?, ?, {', '.join('?' * len(FLAGS))}, ?)""",
+        (key, report.frequency, len(report.data), *counts.values(), datetime.now().isoformat()))
+
+
+def read_quality(conn: sqlite3.Connection, key: str) -> Optional[dict]:
+    """Return the stored quality summary of a series, or None if unchecked."""
+    row = conn.execute(
+        f"SELECT frequency, observations, {', '.join(FLAGS)}, checked "
+        "FROM series_quality WHERE series_id = ?", [key]).fetchone()
+    if row is None:
+        return None
+    return dict(zip(("frequency", "observations", *FLAGS, "checked"), row))
+
+
+def read_flags(conn: sqlite3.Connection, keys: Sequence[str],
+               flags: Optional[Sequence[str]] = None, start_date: Optional[str] = None,
+               end_date: Optional[str] = None) -> pd.DataFrame:
+    """Return the stored flags of some series.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        Cache connection
+    keys : sequence of str
+        Storage keys of the series
+    flags : sequence of str, optional
+        Only these flags; defaults to all of :data:`FLAGS`
+    start_date, end_date : str, optional
+        Only flags dated within this window (YYYY-MM-DD, inclusive)
+
+    Returns
+    -------
+    pd.DataFrame
+        ``series_id`` (storage key), ``date``, ``flag`` and ``score``,
+        ordered by series and date
+    """
+    flags = list(flags or FLAGS)
+    query = (f"SELECT series_id, date, flag, score FROM quality_flags "
+             f"WHERE series_id IN ({', '.join('?' * len(keys))}) "
+             f"AND flag IN ({', '.join('?' * len(flags))})")
+    params = [*keys, *flags]
+    if start_date:
+        query += " AND date >= ?"
+        params.append(start_date)
+    if end_date:
+        query += " AND date <= ?"
+        params.append(end_date)
+    frame = pd.DataFrame(conn.execute(query + " ORDER BY series_id, date", params).fetchall(),
+                         columns=["series_id", "date", "flag", "score"])
+    frame["date"] = pd.to_datetime(frame["date"])
+    return frame
+
+
+def mask_flagged(frame: pd.DataFrame, flags: pd.DataFrame) -> pd.DataFrame:
+    """Blank the observations of a wide frame that carry any of ``flags``.
+
+    ``frame`` has series as columns and dates as the index; ``flags`` is a
+    :func:`read_flags` result whose ``series_id`` column uses the frame's
+    column names.
+    """
+    if flags.empty:
+        return frame
+    frame = frame.copy()
+    index = pd.DatetimeIndex(pd.to_datetime(frame.index))
+    for series_id, dates in flags.groupby("series_id")["date"]:
+        if series_id in frame.columns:
+            frame.loc[index.isin(dates), series_id] = np.nan
+    return frame
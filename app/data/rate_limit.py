@@ -0,0 +1,68 @@
+"""Thread-safe token-bucket rate limiter shared by API clients."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Callable
+
+
+class RateLimiter:
+    """Token bucket allowing ``rate`` requests per ``per`` seconds.
+
+    Up to ``burst`` tokens accumulate while idle; :meth:`acquire` blocks
+    until a token is available, so any number of threads can share one
+    limiter and together stay within the limit.  Coroutines wait with
+    :meth:`aacquire` on the same bucket.
+    """
+
+    def __init__(self, rate: float, per: float = 1.0, burst: int = 1,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """Initialize a full bucket.
+
+        Parameters
+        ----------
+        rate : float
+            Requests allowed per ``per`` seconds
+        per : float
+            Length of the rate window in seconds
+        burst : int
+            Maximum tokens that can accumulate
+        clock, sleep : Callable
+            Time source and sleep function (replaceable in tests)
+        """
+        if rate <= 0 or per <= 0:
+            raise ValueError("rate and per must be positive")
+        self.interval = per / rate
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token, returning how long the caller must wait for it."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) / self.interval)
+            self._updated = now
+            self._tokens -= 1
+            # A negative balance is a queue of waiters; each waits its turn.
+            return 0.0 if self._tokens >= 0 else -self._tokens * self.interval
+
+    def acquire(self) -> float:
+        """Block until a request may be made; returns the time waited."""
+        wait = self._reserve()
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    async def aacquire(self) -> float:
+        """Like :meth:`acquire`, but wait without blocking the event loop."""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
@@ -0,0 +1,227 @@
+"""Precomputed multi-resolution rollups of cached series.
+
+Every series written through the :class:`~app.data.cache_engine.CacheEngine`
+also gets a pyramid of weekly, monthly, quarterly and annual bins in
+``series_rollups``.  Each bin holds the ``mean``, ``last``, ``min``, ``max``
+and ``count`` of its observations.  Bins are labelled the way
+``pandas.Series.resample`` labels them with the API's offsets: weeks by
+their closing Friday, longer periods by their first day.  A rollup read
+therefore matches resampling the raw series.
+
+Rollups are maintained incrementally.  When a write changes a few
+observations, for example a new month appended or the latest value revised,
+only the bins holding them are recomputed.
+
+:func:`choose_level` turns a requested resolution into the coarsest level
+whose bins are no wider than that resolution, so a chart over 60 years reads
+a few hundred annual or quarterly bins instead of every daily observation.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import timedelta
+from typing import Iterable, Optional
+
+import pandas as pd
+
+# Rollup level -> pandas resample offset, from finest to coarsest
+LEVELS = {
+    "W": "W-FRI",
+    "M": "MS",
+    "Q": "QS",
+    "A": "YS",
+}
+
+# Period used to assign a date to its bin, and whether bins are labelled by
+# their last day (weekly, like ``resample('W-FRI')``) or their first
+_PERIODS = {
+    "W": ("W-FRI", True),
+    "M": ("M", False),
+    "Q": ("Q", False),
+    "A": ("Y", False),
+}
+
+# Widest bin of each level, for choosing a level that meets a resolution
+LEVEL_WIDTHS = {
+    "W": timedelta(days=7),
+    "M": timedelta(days=31),
+    "Q": timedelta(days=92),
+    "A": timedelta(days=366),
+}
+
+STATS = ("mean", "last", "min", "max", "count")
+
+
+def init_rollups(conn: sqlite3.Connection) -> None:
+    """Create the rollup table."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS series_rollups (
+            series_id TEXT,
+            level TEXT,
+            period TEXT,
+            mean REAL,
+            last REAL,
+            min REAL,
+            max REAL,
+            count INTEGER,
+            PRIMARY KEY (series_id, level, period)
+        )
+    """)
+
+
+def period_labels(index: pd.DatetimeIndex, level: str) -> pd.DatetimeIndex:
+    """Return the label of the bin each date falls into at ``level``."""
+    period, label_by_end = _PERIODS[level]
+    periods = pd.DatetimeIndex(index).to_period(period)
+    return (periods.end_time if label_by_end else periods.start_time).normalize()
+
+
+def choose_level(resolution) -> Optional[str]:
+    """Return the coarsest level whose bins are no wider than ``resolution``.
+
+    Parameters
+    ----------
+    resolution : str or timedelta
+        A level name (``'W'``, ``'M'``, ``'Q'``, ``'A'``), returned as is,
+        or the widest acceptable bin as a timedelta or a string
+        ``pd.Timedelta`` understands (e.g. ``'45D'``)
+
+    Returns
+    -------
+    str or None
+        Level name, or None if only the raw observations are fine enough
+    """
+    if isinstance(resolution, str) and resolution in LEVELS:
+        return resolution
+    step = pd.Timedelta(resolution)
+    fitting = [level for level, width in LEVEL_WIDTHS.items() if width <= step]
+    return fitting[-1] if fitting else None
+
+
+def resolution_for(start, end, max_points: int) -> timedelta:
+    """Return the bin width that spreads ``start``..``end`` over ``max_points``."""
+    return (pd.Timestamp(end) - pd.Timestamp(start)) / max(1, max_points)
+
+
+def compute_rollup(data: pd.Series, level: str) -> pd.DataFrame:
+    """Aggregate observations into the bins of ``level``.
+
+    Parameters
+    ----------
+    data : pd.Series
+        Observations indexed by date, without missing values
+    level : str
+        Rollup level
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per non-empty bin, indexed by bin label, with the columns
+        in :data:`STATS`
+    """
+    data = data.sort_index()
+    grouped = data.groupby(period_labels(data.index, level))
+    frame = grouped.agg(list(STATS))
+    frame.index.name = "date"
+    return frame
+
+
+def raw_rollup(data: pd.Series) -> pd.DataFrame:
+    """Return observations in rollup form, one single-observation bin each."""
+    data = data.dropna()
+    frame = pd.DataFrame({stat: data for stat in STATS[:-1]}, index=data.index)
+    frame["count"] = 1
+    frame.index.name = "date"
+    return frame
+
+
+def has_rollups(conn: sqlite3.Connection, key: str) -> bool:
+    """Return True if rollups have been built for a series."""
+    return conn.execute("SELECT 1 FROM series_rollups WHERE series_id = ? LIMIT 1",
+                        [key]).fetchone() is not None
+
+
+def update_rollups(conn: sqlite3.Connection, key: str, data: pd.Series,
+                   changed: Optional[Iterable] = None) -> int:
+    """Bring the rollups of a series up to date with its observations.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        Cache connection
+    key : str
+        Storage key of the series
+    data : pd.Series
+        All current observations of the series, indexed by date
+    changed : iterable of dates, optional
+        Dates whose observation was added, revised or removed since the
+        rollups were last updated.  Only the bins holding them are
+        recomputed.  If None, every level is rebuilt from scratch.
+
+    Returns
+    -------
+    int
+        Number of bins rewritten or removed
+    """
+    data = data.dropna()
+    data.index = pd.DatetimeIndex(pd.to_datetime(data.index))
+    if changed is None:
+        conn.execute("DELETE FROM series_rollups WHERE series_id = ?", [key])
+    else:
+        changed = pd.DatetimeIndex(pd.to_datetime(list(changed)))
+        if changed.empty:
+            return 0
+
+    rewritten = 0
+    for level in LEVELS:
+        labels = period_labels(data.index, level)
+        if changed is None:
+            subset = data
+        else:
+            touched = period_labels(changed, level).unique()
+            conn.executemany(
+                "DELETE FROM series_rollups WHERE series_id = ? AND level = ? AND period = ?",
+                [(key, level, label.strftime("%Y-%m-%d")) for label in touched])
+            rewritten += len(touched)
+            subset = data[labels.isin(touched)]
+        if subset.empty:
+            continue
+        rollup = compute_rollup(subset, level)
+        conn.executemany(
+            """INSERT INTO series_rollups
+               (series_id, level, period, mean, last, min, max, count)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            [(key, level, label.strftime("%Y-%m-%d"), float(mean), float(last),
+              float(low), float(high), int(count))
+             for label, (mean, last, low, high, count)
+             in zip(rollup.index, rollup.itertuples(index=False, name=None))])
+        if changed is None:
+            rewritten += len(rollup)
+    return rewritten
+
+
+def read_rollup(conn: sqlite3.Connection, key: str, level: str,
+                start_date: Optional[str] = None,
+                end_date: Optional[str] = None) -> pd.DataFrame:
+    """Read the bins of one level whose label lies in the window.
+
+    Returns
+    -------
+    pd.DataFrame
+        Bins indexed by label (``date``) with the columns in :data:`STATS`;
+        empty if none are stored
+    """
+    query = (f"SELECT period, {', '.join(STATS)} FROM series_rollups "
+             f"WHERE series_id = ? AND level = ?")
+    params = [key, level]
+    if start_date:
+        query += " AND period >= ?"
+        params.append(start_date)
+    if end_date:
+        query += " AND period <= ?"
+        params.append(end_date)
+    query += " ORDER BY period"
+    frame = pd.DataFrame(conn.execute(query, params).fetchall(), columns=("date",) + STATS)
+    frame["date"] = pd.to_datetime(frame["date"])
+    return frame.set_index("date")
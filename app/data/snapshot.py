@@ -0,0 +1,272 @@
+"""Snapshots of the shared cache for warm-starting new hosts.
+
+Filling an empty cache from FRED takes as long as the rate limits allow.
+A snapshot lets a new host start from a copy of an existing cache instead:
+
+* :func:`export_snapshot` copies ``data_cache.db`` with the SQLite online
+  backup API, so the copy is consistent even while other workers write to
+  the cache.  The copy is gzip-compressed, and a JSON manifest next to it
+  records the SHA-256 of the compressed file.
+* :func:`restore_snapshot` verifies the checksum, decompresses the copy next
+  to the live cache, checks its integrity and then moves it over the live
+  cache with :func:`os.replace`.  Readers see either the old cache or the
+  new one, never a partial file.  The restore can keep only some series.
+
+Data keeps its original fetch times, so a restored series counts as fresh
+exactly as long as it would have on the host the snapshot came from.
+
+Usage::
+
+    python -m app.data.snapshot export --output /tmp/cache.db.gz
+    python -m app.data.snapshot restore /tmp/cache.db.gz [GDP UNRATE ...]
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+import logging
+
+from ..config.secrets import get_config
+from .cache_engine import DB_NAME
+
+logger = logging.getLogger(__name__)
+
+# Database pages copied per step of the online backup; other connections
+# may write between steps
+BACKUP_PAGES = 4096
+
+# Bytes read at a time when compressing, decompressing and hashing
+CHUNK_SIZE = 1 << 20
+
+MANIFEST_SUFFIX = ".json"
+
+
+class SnapshotError(RuntimeError):
+    """Raised when a snapshot is missing, corrupt or fails verification."""
+
+
+@dataclass
+class SnapshotInfo:
+    """The manifest stored next to a snapshot."""
+
+    sha256: str
+    size: int
+    created: str
+    series: int
+    source: str
+
+
+def manifest_path(snapshot: str | Path) -> Path:
+    """Return the path of a snapshot's manifest."""
+    snapshot = Path(snapshot)
+    return snapshot.with_name(snapshot.name + MANIFEST_SUFFIX)
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write a small file so it appears complete or not at all."""
+    partial = path.with_name(path.name + ".part")
+    partial.write_bytes(data)
+    os.replace(partial, path)
+
+
+def _count_series(conn: sqlite3.Connection) -> int:
+    try:
+        return conn.execute("SELECT COUNT(*) FROM series_versions").fetchone()[0]
+    except sqlite3.OperationalError:
+        return 0
+
+
+def default_db_path() -> Path:
+    """Return the shared cache in the configured cache directory."""
+    return Path(get_config().get_config('database.cache_dir', 'data_cache')) / DB_NAME
+
+
+def export_snapshot(output: str | Path, db_path: Optional[str | Path] = None,
+                    compresslevel: int = 6) -> SnapshotInfo:
+    """Write a compressed, checksummed snapshot of the cache.
+
+    Parameters
+    ----------
+    output : str or Path
+        Snapshot file to write (conventionally ``*.db.gz``); its manifest
+        is written to ``<output>.json``
+    db_path : str or Path, optional
+        Cache database; defaults to the configured shared cache
+    compresslevel : int
+        gzip compression level, 1 (fastest) to 9 (smallest)
+
+    Returns
+    -------
+    SnapshotInfo
+        The manifest written
+    """
+    db_path = Path(db_path or default_db_path())
+    if not db_path.exists():
+        raise SnapshotError(f"no cache at {db_path}")
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    copy = output.with_name(output.name + ".db.part")
+    partial = output.with_name(output.name + ".part")
+
+    try:
+        source = sqlite3.connect(db_path)
+        target = sqlite3.connect(copy)
+        try:
+            source.backup(target, pages=BACKUP_PAGES)
+            series = _count_series(target)
+        finally:
+            target.close()
+            source.close()
+
+        with open(copy, "rb") as raw, gzip.open(partial, "wb", compresslevel) as packed:
+            shutil.copyfileobj(raw, packed, CHUNK_SIZE)
+        info = SnapshotInfo(sha256=_sha256(partial), size=partial.stat().st_size,
+                            created=datetime.now().isoformat(), series=series,
+                            source=str(db_path))
+        os.replace(partial, output)
+        _write_atomic(manifest_path(output), json.dumps(asdict(info), indent=2).encode())
+    finally:
+        copy.unlink(missing_ok=True)
+        partial.unlink(missing_ok=True)
+
+    logger.info(f"Wrote snapshot of {series} series to {output} ({info.size} bytes)")
+    return info
+
+
+def verify_snapshot(snapshot: str | Path) -> SnapshotInfo:
+    """Check a snapshot against its manifest.
+
+    Raises
+    ------
+    SnapshotError
+        If the snapshot or its manifest is missing or the checksum differs
+    """
+    snapshot = Path(snapshot)
+    try:
+        info = SnapshotInfo(**json.loads(manifest_path(snapshot).read_text()))
+    except (OSError, ValueError, TypeError) as e:
+        raise SnapshotError(f"unreadable manifest for {snapshot}: {e}") from e
+    if not snapshot.exists():
+        raise SnapshotError(f"snapshot {snapshot} not found")
+    if _sha256(snapshot) != info.sha256:
+        raise SnapshotError(f"checksum mismatch for {snapshot}")
+    return info
+
+
+def _keep_series(conn: sqlite3.Connection, series_ids: Iterable[str]) -> None:
+    """Delete every series except ``series_ids`` from a restored cache.
+
+    Rows are removed from each table with a ``series_id`` column.  Crawl
+    checkpoints describe the full cache, so they are cleared.
+    """
+    conn.execute("CREATE TEMP TABLE keep (series_id TEXT PRIMARY KEY)")
+    conn.executemany("INSERT OR IGNORE INTO keep VALUES (?)", [(sid,) for sid in series_ids])
+    tables = [name for (name,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+    for table in tables:
+        columns = {row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')}
+        if "series_id" in columns:
+            conn.execute(f'DELETE FROM "{table}" WHERE series_id NOT IN (SELECT series_id FROM keep)')
+    if "crawl_tasks" in tables:
+        conn.execute("DELETE FROM crawl_tasks")
+
+
+def restore_snapshot(snapshot: str | Path, db_path: Optional[str | Path] = None,
+                     series_ids: Optional[Iterable[str]] = None) -> SnapshotInfo:
+    """Replace the cache with a verified snapshot.
+
+    Parameters
+    ----------
+    snapshot : str or Path
+        Snapshot written by :func:`export_snapshot`
+    db_path : str or Path, optional
+        Cache database to replace; defaults to the configured shared cache
+    series_ids : iterable of str, optional
+        Keep only these series, by storage key (bare FRED IDs,
+        ``"<source>:<id>"`` for other sources); all by default
+
+    Returns
+    -------
+    SnapshotInfo
+        The manifest of the restored snapshot
+
+    Raises
+    ------
+    SnapshotError
+        If verification fails; the live cache is left untouched
+    """
+    info = verify_snapshot(snapshot)
+    db_path = Path(db_path or default_db_path())
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    # Decompress beside the live cache so the final rename stays on one filesystem
+    staged = db_path.with_name(db_path.name + ".restore")
+
+    try:
+        with gzip.open(snapshot, "rb") as packed, open(staged, "wb") as raw:
+            shutil.copyfileobj(packed, raw, CHUNK_SIZE)
+        conn = sqlite3.connect(staged)
+        try:
+            if conn.execute("PRAGMA quick_check").fetchone()[0] != "ok":
+                raise SnapshotError(f"snapshot {snapshot} holds a damaged database")
+            if series_ids is not None:
+                with conn:
+                    _keep_series(conn, series_ids)
+                conn.execute("VACUUM")
+        except sqlite3.DatabaseError as e:
+            raise SnapshotError(f"snapshot {snapshot} is not a valid cache: {e}") from e
+        finally:
+            conn.close()
+        os.replace(staged, db_path)
+    except (OSError, EOFError) as e:
+        raise SnapshotError(f"could not restore {snapshot}: {e}") from e
+    finally:
+        staged.unlink(missing_ok=True)
+
+    logger.info(f"Restored {snapshot} to {db_path}")
+    return info
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export or restore cache snapshots.")
+    parser.add_argument("--db", default=None, help="cache database (default: configured cache)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="write a snapshot of the cache")
+    export.add_argument("--output", default=None,
+                        help="snapshot file (default: snapshots/<timestamp>.db.gz in the cache directory)")
+    export.add_argument("--level", type=int, default=6, help="gzip level, 1-9")
+    restore = commands.add_parser("restore", help="replace the cache with a snapshot")
+    restore.add_argument("snapshot", help="snapshot file")
+    restore.add_argument("series", nargs="*", help="keep only these series (default: all)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db_path = Path(args.db) if args.db else default_db_path()
+    if args.command == "export":
+        output = args.output or (db_path.parent / "snapshots"
+                                 / f"{datetime.now():%Y%m%dT%H%M%S}.db.gz")
+        print(export_snapshot(output, db_path, args.level))
+    else:
+        print(restore_snapshot(args.snapshot, db_path, args.series or None))
+
+
+if __name__ == "__main__":
+    main()
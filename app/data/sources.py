@@ -0,0 +1,96 @@
+"""Plugin interface for time series data sources.
+
+A source only knows how to fetch a series (and optionally its metadata)
+from upstream.  Storage, freshness, request coalescing and metrics come
+from the shared :class:`~app.data.cache_engine.CacheEngine`, so a new source
+gets the same cache behaviour as FRED by implementing
+:meth:`DataSource.fetch_series` and registering a factory::
+
+    class MySource(DataSource):
+        name = "mysource"
+
+        def fetch_series(self, series_id, start_date=None, end_date=None):
+            ...
+
+    register_source("mysource", MySource)
+"""
+
+from __future__ import annotations
+
+import asyncio
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from typing import Callable, Optional
+
+import pandas as pd
+
+
+class DataSource(ABC):
+    """A provider of time series that the cache engine stores and refreshes."""
+
+    #: Short unique name; also the namespace of the source's cache keys
+    name: str = ""
+
+    #: Age after which a cached series is re-fetched, unless change
+    #: detection has vouched for it
+    max_age: timedelta = timedelta(hours=24)
+
+    @abstractmethod
+    def fetch_series(self, series_id: str, start_date: Optional[str] = None,
+                     end_date: Optional[str] = None) -> pd.Series:
+        """Fetch observations from upstream.
+
+        Returns
+        -------
+        pd.Series
+            Values indexed by a ``DatetimeIndex`` named ``date``
+        """
+
+    def fetch_metadata(self, series_id: str) -> Optional[dict]:
+        """Fetch series metadata (``title``, ``units``, ``frequency``,
+        ``observation_start``, ``observation_end``, ``last_updated``).
+
+        Returns None if the source has no metadata.
+        """
+        return None
+
+    async def afetch_series(self, series_id: str, start_date: Optional[str] = None,
+                            end_date: Optional[str] = None) -> pd.Series:
+        """Async :meth:`fetch_series`, used by
+        :meth:`~app.data.cache_engine.CacheEngine.aget`.
+
+        Runs :meth:`fetch_series` in a worker thread; sources with an async
+        upstream client override it.
+        """
+        return await asyncio.to_thread(self.fetch_series, series_id, start_date, end_date)
+
+    async def afetch_metadata(self, series_id: str) -> Optional[dict]:
+        """Async :meth:`fetch_metadata`, used by
+        :meth:`~app.data.cache_engine.CacheEngine.aget`."""
+        return await asyncio.to_thread(self.fetch_metadata, series_id)
+
+
+_factories: dict[str, Callable[[], DataSource]] = {}
+
+
+def register_source(name: str, factory: Callable[[], DataSource]) -> None:
+    """Register a factory returning the shared instance of a source."""
+    _factories[name] = factory
+
+
+def get_source(name: str) -> DataSource:
+    """Return the shared instance of a registered source.
+
+    Raises
+    ------
+    KeyError
+        If no source of that name is registered
+    """
+    if name not in _factories:
+        raise KeyError(f"Unknown data source: {name!r} (registered: {', '.join(sorted(_factories))})")
+    return _factories[name]()
+
+
+def available_sources() -> list[str]:
+    """Return the names of the registered sources."""
+    return sorted(_factories)
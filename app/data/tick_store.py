@@ -0,0 +1,268 @@
+"""In-memory tick store with incrementally maintained OHLCV bars.
+
+Each coin keeps its raw ticks in a fixed-size NumPy ring buffer, so memory
+is bounded no matter how long the process runs.  Every tick batch is also
+folded into 1-minute, 1-hour and 1-day bars as it arrives; the bars live in
+their own ring buffers, so charts read ready-made bars and never rescan the
+raw ticks.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+TICK_DTYPE = np.dtype([("time", "f8"), ("price", "f8"), ("volume", "f8")])
+
+BAR_DTYPE = np.dtype([
+    ("start", "f8"), ("open", "f8"), ("high", "f8"), ("low", "f8"),
+    ("close", "f8"), ("volume", "f8"), ("ticks", "i8"),
+])
+
+# Bar interval name -> length in seconds
+BAR_INTERVALS = {"1m": 60, "1h": 3600, "1d": 86400}
+
+# Bars kept per interval: one week of minutes, a year of hours, ten years of days
+BAR_CAPACITY = {"1m": 7 * 1440, "1h": 365 * 24, "1d": 3650}
+
+
+class RingBuffer:
+    """Fixed-capacity circular buffer of NumPy records.
+
+    Appending beyond the capacity overwrites the oldest records.  Records
+    are returned oldest first.
+    """
+
+    def __init__(self, capacity: int, dtype: np.dtype):
+        """Allocate an empty buffer of ``capacity`` records of ``dtype``."""
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=dtype)
+        self._head = 0  # index the next record is written to
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def extend(self, records: np.ndarray) -> None:
+        """Append records (a structured array of the buffer's dtype)."""
+        n = len(records)
+        if n == 0:
+            return
+        if n >= self.capacity:
+            self._data[:] = records[-self.capacity:]
+            self._head = 0
+            self._count = self.capacity
+            return
+        first = min(n, self.capacity - self._head)
+        self._data[self._head:self._head + first] = records[:first]
+        self._data[:n - first] = records[first:]
+        self._head = (self._head + n) % self.capacity
+        self._count = min(self._count + n, self.capacity)
+
+    @property
+    def last(self) -> Optional[np.void]:
+        """The newest record, as a writable view; None if empty."""
+        if not self._count:
+            return None
+        return self._data[(self._head - 1) % self.capacity]
+
+    def to_array(self) -> np.ndarray:
+        """Return a copy of all records, oldest first."""
+        if self._count < self.capacity:
+            return self._data[:self._count].copy()
+        return np.concatenate([self._data[self._head:], self._data[:self._head]])
+
+
+class BarBuilder:
+    """Maintains OHLCV bars of one interval from a stream of ticks."""
+
+    def __init__(self, interval: int, capacity: int):
+        """Create a builder for bars of ``interval`` seconds."""
+        self.interval = interval
+        self.bars = RingBuffer(capacity, BAR_DTYPE)
+
+    def update(self, times: np.ndarray, prices: np.ndarray, volumes: np.ndarray) -> None:
+        """Fold time-ordered ticks into the bars.
+
+        Ticks for the current (newest) bar update it in place; later ticks
+        open new bars.  Callers must not pass ticks older than the current
+        bar.
+        """
+        starts = np.floor(times / self.interval) * self.interval
+        current = self.bars.last
+        if current is not None:
+            same = starts == current["start"]
+            if same.any():
+                current["high"] = max(current["high"], prices[same].max())
+                current["low"] = min(current["low"], prices[same].min())
+                current["close"] = prices[same][-1]
+                current["volume"] += volumes[same].sum()
+                current["ticks"] += int(same.sum())
+                keep = ~same
+                starts, prices, volumes = starts[keep], prices[keep], volumes[keep]
+        if not len(starts):
+            return
+
+        # One new bar per run of equal bucket starts.
+        first = np.concatenate([[0], np.flatnonzero(np.diff(starts)) + 1])
+        last = np.concatenate([first[1:], [len(starts)]]) - 1
+        new = np.empty(len(first), dtype=BAR_DTYPE)
+        new["start"] = starts[first]
+        new["open"] = prices[first]
+        new["high"] = np.maximum.reduceat(prices, first)
+        new["low"] = np.minimum.reduceat(prices, first)
+        new["close"] = prices[last]
+        new["volume"] = np.add.reduceat(volumes, first)
+        new["ticks"] = last - first + 1
+        self.bars.extend(new)
+
+
+class _CoinTicks:
+    """Tick buffer and bar builders for one coin."""
+
+    def __init__(self, capacity: int, intervals: tuple[str, ...]):
+        self.ticks = RingBuffer(capacity, TICK_DTYPE)
+        self.builders = {name: BarBuilder(BAR_INTERVALS[name], BAR_CAPACITY[name])
+                         for name in intervals}
+        self.dropped = 0
+
+
+class TickStore:
+    """Thread-safe per-coin tick buffers with live OHLCV bars."""
+
+    def __init__(self, capacity: int = 100_000,
+                 intervals: tuple[str, ...] = tuple(BAR_INTERVALS)):
+        """Initialize an empty store.
+
+        Parameters
+        ----------
+        capacity : int
+            Raw ticks kept per coin before the oldest are overwritten
+        intervals : tuple[str, ...]
+            Bar intervals to maintain (keys of ``BAR_INTERVALS``)
+        """
+        unknown = set(intervals) - set(BAR_INTERVALS)
+        if unknown:
+            raise ValueError(f"Unknown bar intervals: {', '.join(sorted(unknown))}")
+        self.capacity = capacity
+        self.intervals = tuple(intervals)
+        self._coins: dict[str, _CoinTicks] = {}
+        self._lock = threading.Lock()
+
+    def append(self, coin_id: str, timestamp: float, price: float,
+               volume: float = 0.0) -> None:
+        """Record one tick (``timestamp`` in seconds since the epoch)."""
+        self.extend(coin_id, [timestamp], [price], [volume])
+
+    def extend(self, coin_id: str, timestamps, prices, volumes=None) -> int:
+        """Record a batch of ticks.
+
+        Ticks are sorted by time; any older than the coin's newest stored
+        tick are dropped (and counted in :meth:`dropped`) so buffers and bars
+        stay in time order.
+
+        Parameters
+        ----------
+        coin_id : str
+            Coin identifier
+        timestamps : array-like
+            Seconds since the epoch
+        prices : array-like
+            Prices
+        volumes : array-like, optional
+            Traded volume per tick; zero if not known
+
+        Returns
+        -------
+        int
+            Number of ticks stored
+        """
+        times = np.asarray(timestamps, dtype="f8")
+        prices = np.asarray(prices, dtype="f8")
+        volumes = np.zeros_like(times) if volumes is None else np.asarray(volumes, dtype="f8")
+        order = np.argsort(times, kind="stable")
+        times, prices, volumes = times[order], prices[order], volumes[order]
+
+        with self._lock:
+            coin = self._coins.get(coin_id)
+            if coin is None:
+                coin = self._coins[coin_id] = _CoinTicks(self.capacity, self.intervals)
+            newest = coin.ticks.last
+            if newest is not None:
+                fresh = times >= newest["time"]
+                coin.dropped += int((~fresh).sum())
+                times, prices, volumes = times[fresh], prices[fresh], volumes[fresh]
+            if not len(times):
+                return 0
+
+            records = np.empty(len(times), dtype=TICK_DTYPE)
+            records["time"], records["price"], records["volume"] = times, prices, volumes
+            coin.ticks.extend(records)
+            for builder in coin.builders.values():
+                builder.update(times, prices, volumes)
+            return len(times)
+
+    def coins(self) -> list[str]:
+        """Coins with at least one tick."""
+        with self._lock:
+            return list(self._coins)
+
+    def dropped(self, coin_id: str) -> int:
+        """Number of out-of-order ticks dropped for a coin."""
+        with self._lock:
+            coin = self._coins.get(coin_id)
+            return coin.dropped if coin else 0
+
+    def ticks(self, coin_id: str) -> pd.DataFrame:
+        """Return the buffered ticks of a coin, indexed by UTC time."""
+        with self._lock:
+            coin = self._coins.get(coin_id)
+            records = coin.ticks.to_array() if coin else np.empty(0, dtype=TICK_DTYPE)
+        frame = pd.DataFrame({"price": records["price"], "volume": records["volume"]},
+                             index=pd.to_datetime(records["time"], unit="s", utc=True))
+        frame.index.name = "time"
+        return frame
+
+    def bars(self, coin_id: str, interval: str = "1m") -> pd.DataFrame:
+        """Return OHLCV bars of a coin, indexed by UTC bar start.
+
+        Parameters
+        ----------
+        coin_id : str
+            Coin identifier
+        interval : str
+            One of the store's intervals (``'1m'``, ``'1h'``, ``'1d'``)
+
+        Returns
+        -------
+        pd.DataFrame
+            Columns ``open``, ``high``, ``low``, ``close``, ``volume`` and
+            ``ticks``; the last row is the bar still being built
+        """
+        if interval not in self.intervals:
+            raise ValueError(f"Interval must be one of {', '.join(self.intervals)}")
+        with self._lock:
+            coin = self._coins.get(coin_id)
+            records = (coin.builders[interval].bars.to_array() if coin
+                       else np.empty(0, dtype=BAR_DTYPE))
+        frame = pd.DataFrame({name: records[name] for name in BAR_DTYPE.names[1:]},
+                             index=pd.to_datetime(records["start"], unit="s", utc=True))
+        frame.index.name = "time"
+        return frame
+
+
+# Global tick store shared by the data clients in the process
+_store_instance: Optional[TickStore] = None
+
+
+def get_tick_store() -> TickStore:
+    """Get the global tick store instance."""
+    global _store_instance
+    if _store_instance is None:
+        _store_instance = TickStore()
+    return _store_instance
@@ -0,0 +1,193 @@
+"""Bitemporal store of FRED series vintages (ALFRED real-time data).
+
+The regular cache keeps only the latest revision of each observation.  For
+backtests, this store also keeps what was known when: every observation
+has a valid time (``date``) and a transaction time (``realtime_start``,
+the day a value was published).
+
+Only revision deltas are stored.  An observation gets a row when it is
+first released and another one each time its value changes.  Republishing
+an unchanged value adds nothing, so a series with thousands of vintages
+costs little more than its revisions.  The table is clustered on
+``(series_id, date, realtime_start)``.  The value known on a given day is
+therefore the last row at or before that day, found by one range scan per
+series.
+
+Past vintages never change.  A point-in-time query for a day before the
+last ingest is answered from the store without asking FRED again.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+
+class VintageStore:
+    """Revision deltas of FRED series, stored in the shared cache."""
+
+    def __init__(self, db_path: str | Path):
+        """Open the store in the cache database at ``db_path``."""
+        self.db_path = Path(db_path)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS series_vintages (
+                    series_id TEXT,
+                    date TEXT,
+                    realtime_start TEXT,
+                    value REAL,
+                    PRIMARY KEY (series_id, date, realtime_start)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS vintage_ingests (
+                    series_id TEXT PRIMARY KEY,
+                    ingested TEXT
+                )
+            """)
+
+    @staticmethod
+    def _deltas(releases: pd.DataFrame) -> list[tuple[str, str, Optional[float]]]:
+        """Reduce ``date``/``realtime_start``/``value`` rows to value changes."""
+        if releases.empty:
+            return []
+        frame = pd.DataFrame({
+            "date": pd.to_datetime(releases["date"]).dt.strftime("%Y-%m-%d"),
+            "realtime_start": pd.to_datetime(releases["realtime_start"]).dt.strftime("%Y-%m-%d"),
+            "value": pd.to_numeric(releases["value"], errors="coerce"),
+        }).sort_values(["date", "realtime_start"])
+        previous = frame.groupby("date")["value"].shift()
+        both_missing = frame["value"].isna() & previous.isna()
+        first = frame["date"] != frame["date"].shift()
+        changed = first | ((frame["value"] != previous) & ~both_missing)
+        return [
+            (date, start, None if pd.isna(value) else float(value))
+            for date, start, value in frame[changed].itertuples(index=False, name=None)
+        ]
+
+    def ingest(self, series_id: str, releases: pd.DataFrame) -> int:
+        """Store the revisions found in an ALFRED all-releases download.
+
+        The download may overlap what is already stored (e.g. when
+        refreshing from the last ingested vintage on); values already in
+        effect are not stored again.
+
+        Parameters
+        ----------
+        series_id : str
+            FRED series identifier
+        releases : pd.DataFrame
+            ``date``, ``realtime_start`` and ``value`` columns, as returned
+            by ``Fred.get_series_all_releases``
+
+        Returns
+        -------
+        int
+            Number of revision rows added
+        """
+        deltas = self._deltas(releases)
+        with sqlite3.connect(self.db_path) as conn:
+            latest = {date: (start, value) for date, start, value in conn.execute(
+                """SELECT date, MAX(realtime_start), value FROM series_vintages
+                   WHERE series_id = ? GROUP BY date""", [series_id])}
+            rows = []
+            for date, start, value in deltas:
+                known = latest.get(date)
+                if known is not None and start <= known[0]:
+                    continue  # already stored, or superseded by a stored revision
+                if known is not None and known[1] == value:
+                    continue  # republished without change
+                rows.append((series_id, date, start, value))
+                latest[date] = (start, value)
+            conn.executemany(
+                "INSERT OR IGNORE INTO series_vintages VALUES (?, ?, ?, ?)", rows)
+            conn.execute("INSERT OR REPLACE INTO vintage_ingests VALUES (?, ?)",
+                         (series_id, datetime.now().isoformat()))
+        return len(rows)
+
+    def last_ingested(self, series_id: str) -> Optional[datetime]:
+        """Return when vintages of a series were last downloaded, if ever."""
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute("SELECT ingested FROM vintage_ingests WHERE series_id = ?",
+                               [series_id]).fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def last_vintage(self, series_id: str) -> Optional[str]:
+        """Return the newest stored ``realtime_start`` of a series."""
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute("SELECT MAX(realtime_start) FROM series_vintages "
+                               "WHERE series_id = ?", [series_id]).fetchone()
+        return row[0]
+
+    def as_of(self, series_id: str, as_of: str, start_date: Optional[str] = None,
+              end_date: Optional[str] = None) -> pd.Series:
+        """Return the series as it was known on ``as_of`` (YYYY-MM-DD).
+
+        Observations not yet released by then are absent; ones published as
+        missing are dropped, as in the regular cache.
+        """
+        # SQLite returns the bare ``value`` column from the row holding the
+        # MAX, i.e. the revision in effect on ``as_of``.
+        query = """SELECT date, value, MAX(realtime_start) FROM series_vintages
+                   WHERE series_id = ? AND realtime_start <= ?"""
+        params = [series_id, as_of]
+        if start_date:
+            query += " AND date >= ?"
+            params.append(start_date)
+        if end_date:
+            query += " AND date <= ?"
+            params.append(end_date)
+        query += " GROUP BY date ORDER BY date"
+        with sqlite3.connect(self.db_path) as conn:
+            rows = [(date, value) for date, value, _ in conn.execute(query, params)
+                    if value is not None]
+        index = pd.DatetimeIndex(pd.to_datetime([date for date, _ in rows]), name="date")
+        return pd.Series([value for _, value in rows], index=index, dtype=float, name=series_id)
+
+    def all_releases(self, series_id: str, start_date: Optional[str] = None,
+                     end_date: Optional[str] = None) -> pd.DataFrame:
+        """Return every stored release and revision of a series.
+
+        Returns
+        -------
+        pd.DataFrame
+            ``date``, ``realtime_start`` and ``value`` columns, one row per
+            first release or revision, ordered by date then publication
+        """
+        query = ("SELECT date, realtime_start, value FROM series_vintages "
+                 "WHERE series_id = ?")
+        params = [series_id]
+        if start_date:
+            query += " AND date >= ?"
+            params.append(start_date)
+        if end_date:
+            query += " AND date <= ?"
+            params.append(end_date)
+        query += " ORDER BY date, realtime_start"
+        with sqlite3.connect(self.db_path) as conn:
+            frame = pd.DataFrame(conn.execute(query, params).fetchall(),
+                                 columns=["date", "realtime_start", "value"])
+        frame["date"] = pd.to_datetime(frame["date"])
+        frame["realtime_start"] = pd.to_datetime(frame["realtime_start"])
+        frame["value"] = frame["value"].astype(float)
+        return frame
+
+    def needs_ingest(self, series_id: str, as_of: Optional[str] = None,
+                     max_age: timedelta = timedelta(hours=24)) -> bool:
+        """Return True if FRED must be asked for newer vintages.
+
+        Never-ingested series always need it.  Otherwise a query about a
+        day before the last download is already answered by the store; a
+        query about a later day (or about every release) needs a download
+        once the last one is older than ``max_age``.
+        """
+        ingested = self.last_ingested(series_id)
+        if ingested is None:
+            return True
+        if as_of is not None and pd.Timestamp(as_of) < pd.Timestamp(ingested.date()):
+            return False
+        return datetime.now() - ingested > max_age
@@ -1,9 +1,74 @@
-// Price ticker infinite scroll
+// Price ticker: live quotes from the server's price stream, infinite scroll
 document.addEventListener('DOMContentLoaded', function() {
-    const content = document.querySelector('.price-ticker .ticker-content');
-    if (content) {
-        const items = content.innerHTML;
-        // Double the content for smooth infinite scroll
-        content.innerHTML = items + items;
+    const ticker = document.querySelector('.price-ticker');
+    const content = ticker && ticker.querySelector('.ticker-content');
+    if (!content) {
+        return;
     }
+
+    // One copy of the items; the content shows it twice for a seamless scroll.
+    const items = Array.from(content.children);
+
+    function render() {
+        content.replaceChildren(...items, ...items.map(function(item) {
+            return item.cloneNode(true);
+        }));
+    }
+
+    function formatPrice(price) {
+        const digits = price >= 1 ? 2 : 4;
+        return '$' + price.toLocaleString('en-US', {
+            minimumFractionDigits: digits,
+            maximumFractionDigits: digits
+        });
+    }
+
+    function createItem(symbol) {
+        const item = document.createElement('span');
+        item.className = 'ticker-item crypto';
+        item.dataset.symbol = symbol;
+        item.innerHTML = '<span class="symbol"></span><span class="price"></span>' +
+            '<span class="change"></span>';
+        item.querySelector('.symbol').textContent = symbol;
+        items.push(item);
+        return item;
+    }
+
+    function update(quotes) {
+        let added = false;
+        Object.keys(quotes).forEach(function(symbol) {
+            if (!items.some(function(item) { return item.dataset.symbol === symbol; })) {
+                createItem(symbol);
+                added = true;
+            }
+        });
+        if (added) {
+            render();
+        }
+
+        Object.entries(quotes).forEach(function([symbol, quote]) {
+            content.querySelectorAll('[data-symbol="' + symbol + '"]').forEach(function(item) {
+                item.querySelector('.price').textContent = formatPrice(quote.price);
+                const change = item.querySelector('.change');
+                const pct = quote.change_24h;
+                change.textContent = (pct >= 0 ? '+' : '') + pct.toFixed(2) + '%';
+                change.classList.toggle('positive', pct >= 0);
+                change.classList.toggle('negative', pct < 0);
+            });
+        });
+    }
+
+    render();
+
+    if (!window.EventSource) {
+        return;
+    }
+    // EventSource reconnects by itself and sends Last-Event-ID, so the
+    // server can replay missed updates or send a fresh snapshot.
+    const source = new EventSource(ticker.dataset.stream || '/api/prices/stream');
+    ['snapshot', 'update'].forEach(function(type) {
+        source.addEventListener(type, function(event) {
+            update(JSON.parse(event.data));
+        });
+    });
 });
@@ -0,0 +1,2 @@
+from app.api.asgi import create_asgi_app
+app = create_asgi_app()
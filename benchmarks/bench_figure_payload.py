@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Benchmark figure payload size and serialization time.
+
+Compares a long daily series chart serialized the way Dash does by default
+(plain JSON lists, standard library encoder) against the typed-array
+encoding from ``app.dash.serialization`` with orjson.
+
+Usage::
+
+    python benchmarks/bench_figure_payload.py [n_points]
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from plotly.utils import PlotlyJSONEncoder
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.dash.charts import series_chart
+from app.dash.serialization import ORJSON_AVAILABLE, dumps, encode_figure_arrays
+
+
+def plain_figure_dict(fig, series: pd.Series) -> dict:
+    """Return the figure with ISO date strings and float lists as data."""
+    fig_dict = fig.to_plotly_json()
+    trace = fig_dict["data"][0]
+    trace["x"] = series.index.strftime("%Y-%m-%d").tolist()
+    trace["y"] = series.tolist()
+    return fig_dict
+
+
+def measure(label: str, func, repeat: int = 5) -> str:
+    """Time ``func`` and return its output, printing size and best time."""
+    payload = func()
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+    print(f"{label:<34} {len(payload) / 1024:>10.1f} KiB {best * 1000:>10.2f} ms")
+    return payload
+
+
+def main() -> None:
+    """Run the benchmark."""
+    n_points = int(sys.argv[1]) if len(sys.argv) > 1 else 16000
+    rng = np.random.default_rng(0)
+    index = pd.date_range("1962-01-02", periods=n_points, freq="D", name="date")
+    series = pd.Series(4 + rng.standard_normal(n_points).cumsum() / 50, index=index, name="DGS10")
+    fig = series_chart(series, title="DGS10")
+
+    plain = plain_figure_dict(fig, series)
+    encoded = encode_figure_arrays(fig)
+
+    print(f"{n_points} points, orjson available: {ORJSON_AVAILABLE}")
+    print(f"{'variant':<34} {'payload':>14} {'encode':>13}")
+    measure("JSON lists + json", lambda: json.dumps(plain, cls=PlotlyJSONEncoder))
+    measure("JSON lists + fast encoder", lambda: dumps(plain))
+    measure("typed arrays + json", lambda: json.dumps(encoded, cls=PlotlyJSONEncoder))
+    measure("typed arrays + fast encoder", lambda: dumps(encoded))
+    encode_time = min(timeit.repeat(lambda: encode_figure_arrays(fig), number=1, repeat=5))
+    print(f"{'(typed-array encoding step)':<34} {'':>14} {encode_time * 1000:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
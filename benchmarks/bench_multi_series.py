@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Benchmark loading a multi-series panel from a warm cache.
+
+Fills a temporary cache with ``n_series`` monthly series of ``n_obs``
+observations.  It then times ``get_multiple_series`` (one batch query and a
+vectorized pivot) against reading the same series one by one and
+outer-joining them, which is what it did before.
+
+Usage::
+
+    python benchmarks/bench_multi_series.py [n_series] [n_obs]
+"""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.data.fred_client import FREDDataMiner
+
+
+def build_cache(cache_dir: str, n_series: int, n_obs: int) -> tuple[FREDDataMiner, list[str]]:
+    with patch("app.data.fred_client.Fred"), \
+            patch("app.data.fred_client.get_api_key", return_value="bench"):
+        miner = FREDDataMiner(cache_dir=cache_dir)
+    rng = np.random.default_rng(0)
+    ids = [f"SERIES{i:03d}" for i in range(n_series)]
+    index = pd.date_range("1950-01-01", periods=n_obs, freq="MS", name="date")
+    for series_id in ids:
+        miner._cache_series(series_id, pd.Series(rng.standard_normal(n_obs).cumsum(), index=index))
+        miner._cache_metadata(series_id, pd.Series({"title": series_id}))
+    return miner, ids
+
+
+def per_series(miner: FREDDataMiner, ids: list[str]) -> pd.DataFrame:
+    return pd.DataFrame({series_id: miner.get_series(series_id) for series_id in ids})
+
+
+def main() -> None:
+    n_series = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    n_obs = int(sys.argv[2]) if len(sys.argv) > 2 else 900
+    with tempfile.TemporaryDirectory() as cache_dir:
+        miner, ids = build_cache(cache_dir, n_series, n_obs)
+        pd.testing.assert_frame_equal(miner.get_multiple_series(ids), per_series(miner, ids),
+                                      check_freq=False)
+        print(f"{n_series} series x {n_obs} observations from a warm cache")
+        for label, func in [("per-series reads + join", lambda: per_series(miner, ids)),
+                            ("batch read + pivot", lambda: miner.get_multiple_series(ids))]:
+            best = min(timeit.repeat(func, number=1, repeat=20))
+            print(f"  {label:<24} {best * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
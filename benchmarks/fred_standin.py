@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Local stand-in for the FRED API with injectable latency.
+
+Serves ``/fred/series`` and ``/fred/series/observations`` in both the XML
+format ``fredapi`` requests and the JSON format (``file_type=json``) used
+by the async client.  Every series ID exists and returns deterministic
+monthly observations.  Point the app at it with
+``FRED_BASE_URL=http://127.0.0.1:8081/fred``.
+
+Usage::
+
+    python benchmarks/fred_standin.py [--port 8081] [--latency 0.5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import zlib
+from xml.sax.saxutils import quoteattr
+
+import numpy as np
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Route
+
+
+def _observations(series_id: str, n_obs: int) -> list[tuple[str, str]]:
+    """Return deterministic (date, value) pairs for a series."""
+    rng = np.random.default_rng(zlib.crc32(series_id.encode()))
+    dates = pd.date_range("1950-01-01", periods=n_obs, freq="MS").strftime("%Y-%m-%d")
+    values = np.round(100 + rng.standard_normal(n_obs).cumsum(), 3)
+    return list(zip(dates, map(str, values)))
+
+
+def create_standin(latency: float = 0.5, n_obs: int = 900) -> Starlette:
+    """Create the stand-in app; every response is delayed by ``latency`` seconds."""
+
+    async def series(request):
+        await asyncio.sleep(latency)
+        series_id = request.query_params["series_id"]
+        info = {"id": series_id, "title": f"Stand-in {series_id}", "units": "Index",
+                "frequency": "Monthly", "observation_start": "1950-01-01",
+                "observation_end": "2024-12-01"}
+        if request.query_params.get("file_type") == "json":
+            return Response(json.dumps({"seriess": [info]}), media_type="application/json")
+        attrs = " ".join(f"{k}={quoteattr(v)}" for k, v in info.items())
+        return Response(f"<seriess><series {attrs}/></seriess>", media_type="text/xml")
+
+    async def observations(request):
+        await asyncio.sleep(latency)
+        rows = _observations(request.query_params["series_id"], n_obs)
+        if request.query_params.get("file_type") == "json":
+            body = {"observations": [{"date": d, "value": v} for d, v in rows]}
+            return Response(json.dumps(body), media_type="application/json")
+        items = "".join(f'<observation date="{d}" value="{v}"/>' for d, v in rows)
+        return Response(f"<observations>{items}</observations>", media_type="text/xml")
+
+    return Starlette(routes=[
+        Route("/fred/series", series),
+        Route("/fred/series/observations", observations),
+    ])
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.5,
+                        help="seconds added to every response")
+    args = parser.parse_args()
+    uvicorn.run(create_standin(args.latency), host="127.0.0.1", port=args.port,
+                log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
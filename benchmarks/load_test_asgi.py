@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Load test the data API under WSGI and ASGI against a slow FRED stand-in.
+
+Starts the FRED stand-in (``fred_standin.py``) with injected latency, then
+serves the same Flask app twice: through a WSGI server with a fixed pool of
+worker threads (as gunicorn sync workers would), and through the ASGI app
+from ``app.api.asgi``.  Each is hit with concurrent requests for distinct
+series that are cached but marked dirty, so every request refreshes its
+series from the upstream before answering.
+
+Usage::
+
+    python benchmarks/load_test_asgi.py [--requests 40] [--latency 0.5] [--threads 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import httpx
+import pandas as pd
+import uvicorn
+from flask import Flask
+from werkzeug.serving import BaseWSGIServer
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from app.api import init_api
+from app.api.asgi import create_asgi_app
+from app.data import fred_client
+from app.data.async_fred import AsyncFREDClient
+from app.data.fred_client import FREDDataMiner
+from app.data.http_transport import HTTPTransport
+from app.data.rate_limit import RateLimiter
+from fred_standin import create_standin
+
+STANDIN_PORT = 8081
+WSGI_PORT = 8082
+ASGI_PORT = 8083
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """WSGI server handling requests on a fixed number of threads."""
+
+    def __init__(self, host, port, app, threads):
+        super().__init__(host, port, app)
+        self._pool = ThreadPoolExecutor(max_workers=threads)
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def serve_in_thread(app, port: int) -> uvicorn.Server:
+    """Run an ASGI app with uvicorn on a background thread."""
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port,
+                                           log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def stale_miner(series_ids: list[str], connections: int) -> FREDDataMiner:
+    """Install a FRED client that talks to the stand-in, with every series
+    cached but marked dirty.
+
+    The API answers uncached series with 202 and fetches them in the
+    background, so only refreshes of cached series wait on the upstream
+    inside a request.  The stand-in has no rate limit and the transport
+    pool is sized to the load, so the servers' concurrency is what is
+    measured.
+    """
+    miner = FREDDataMiner(api_key="standin", cache_dir=tempfile.mkdtemp(),
+                          base_url=f"http://127.0.0.1:{STANDIN_PORT}/fred",
+                          transport=HTTPTransport(max_connections=connections),
+                          rate_limiter=RateLimiter(1e6))
+    placeholder = pd.Series([1.0], index=pd.DatetimeIndex(["2000-01-01"], name="date"))
+    for series_id in series_ids:
+        miner.store_series(series_id, placeholder, pd.Series({"title": series_id}))
+    # What change detection does when FRED reports an update
+    with sqlite3.connect(miner.db_path) as conn:
+        conn.execute("UPDATE series_updates SET dirty = 1")
+    fred_client._miner_instance = miner
+    return miner
+
+
+async def run_load(port: int, n_requests: int, prefix: str) -> tuple[float, list[float]]:
+    """Issue concurrent requests for distinct series; return wall time and latencies."""
+    async def one(client, i):
+        start = time.perf_counter()
+        response = await client.get(f"http://127.0.0.1:{port}/api/series/{prefix}{i}")
+        # Anything else (e.g. a 202 for an uncached series) skipped the upstream
+        assert response.status_code == 200, response.text
+        return time.perf_counter() - start
+
+    limits = httpx.Limits(max_connections=n_requests)
+    async with httpx.AsyncClient(timeout=300, limits=limits) as client:
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(one(client, i) for i in range(n_requests)))
+        return time.perf_counter() - start, list(latencies)
+
+
+def report(label: str, wall: float, latencies: list[float]) -> None:
+    latencies = sorted(latencies)
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    print(f"{label:<28} wall {wall:6.2f}s  p50 {statistics.median(latencies):6.2f}s  "
+          f"p95 {p95:6.2f}s  {len(latencies) / wall:6.1f} req/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--threads", type=int, default=4,
+                        help="worker threads for the WSGI server")
+    args = parser.parse_args()
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    serve_in_thread(create_standin(args.latency), STANDIN_PORT)
+    print(f"{args.requests} concurrent requests for stale series, "
+          f"{args.latency}s upstream latency\n")
+
+    flask_app = Flask(__name__)
+    init_api(flask_app)
+
+    stale_miner([f"W{i}" for i in range(args.requests)], 2 * args.requests)
+    wsgi = PooledWSGIServer("127.0.0.1", WSGI_PORT, flask_app, args.threads)
+    threading.Thread(target=wsgi.serve_forever, daemon=True).start()
+    report(f"WSGI ({args.threads} threads)", *asyncio.run(run_load(WSGI_PORT, args.requests, "W")))
+    wsgi.shutdown()
+
+    miner = stale_miner([f"A{i}" for i in range(args.requests)], 2 * args.requests)
+    asgi_app = create_asgi_app(flask_app, client_factory=lambda: AsyncFREDClient(miner))
+    serve_in_thread(asgi_app, ASGI_PORT)
+    report("ASGI", *asyncio.run(run_load(ASGI_PORT, args.requests, "A")))
+
+
+if __name__ == "__main__":
+    main()
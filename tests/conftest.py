@@ -55,4 +55,41 @@ def sample_fred_metadata():
 def mock_fred_api():
     """Mock the fredapi.Fred class."""
     with patch('app.data.fred_client.Fred') as mock_fred_class:
-        yield mock_fred_class
\ No newline at end of file
+        yield mock_fred_class
+
+
+@pytest.fixture
+def fred_miner(mock_fred_api, temp_config_dir):
+    """FREDDataMiner backed by a mocked fredapi client and a temporary cache."""
+    with patch('app.data.fred_client.get_api_key', return_value="test_key"):
+        miner = FREDDataMiner(cache_dir=str(temp_config_dir / "cache"))
+    return miner
+
+
+@pytest.fixture
+def cached_miner(fred_miner, mock_fred_api, sample_fred_metadata):
+    """Factory pointing ``fred_miner`` at canned data from the mocked FRED API.
+
+    ``cached_miner(data, metadata=None, cache=())`` answers ``get_series``
+    with a copy of ``data`` (a Series served for every ID, or a mapping of
+    ID to Series) and ``get_series_info`` with ``metadata`` (a Series, a
+    callable taking the ID, or ``sample_fred_metadata`` by default).  The
+    IDs in ``cache`` are fetched into the cache before the miner is returned.
+    """
+    def serve(data, metadata=None, cache=()):
+        fred = mock_fred_api.return_value
+        if isinstance(data, pd.Series):
+            fred.get_series.side_effect = lambda series_id, *args: data.copy()
+        else:
+            fred.get_series.side_effect = lambda series_id, *args: data[series_id].copy()
+        if callable(metadata):
+            fred.get_series_info.side_effect = metadata
+        else:
+            fred.get_series_info.return_value = (sample_fred_metadata if metadata is None
+                                                 else metadata)
+        fred_miner.fred = fred
+        for series_id in cache:
+            fred_miner.get_series(series_id)
+        return fred_miner
+
+    return serve
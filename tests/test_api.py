@@ -0,0 +1,204 @@
+"""Tests for the series data API."""
+
+import gzip
+import io
+import json
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+from flask import Flask
+
+from app.api import init_api
+from app.api.export import iter_rows
+from app.api.series import QueryError, parse_query
+from app.data.fetch_queue import FetchQueue
+
+# Series the API test client starts with in its cache
+CACHED = ("GDP", "UNRATE", "PAYEMS", "CPIAUCSL", "FEDFUNDS", "DGS10")
+
+
+@pytest.fixture
+def fetch_queue(fred_miner):
+    return FetchQueue(fred_miner)
+
+
+@pytest.fixture
+def api_client(cached_miner, fetch_queue):
+    """Test client for an app serving the API from a mocked FRED client."""
+    monthly = pd.Series(
+        [float(i) for i in range(24)],
+        index=pd.date_range("2020-01-01", periods=24, freq="MS", name="date"),
+    )
+    fred_miner = cached_miner(monthly, cache=CACHED)
+
+    app = Flask(__name__)
+    init_api(app)
+    with patch("app.api.routes.get_fred_miner", return_value=fred_miner), \
+            patch("app.api.routes.get_fetch_queue", return_value=fetch_queue):
+        yield app.test_client()
+
+
+class TestParseQuery:
+    """Test query parameter validation."""
+
+    def test_defaults(self):
+        query = parse_query(["gdp"], {})
+        assert query.series_ids == ("GDP",)
+        assert query.fmt == "json" and query.freq is None and query.how == "mean"
+
+    @pytest.mark.parametrize("args", [
+        {"start": "2020-13-01"},
+        {"start": "2021-01-01", "end": "2020-01-01"},
+        {"freq": "D"},
+        {"how": "median"},
+        {"format": "xml"},
+    ])
+    def test_invalid_parameters(self, args):
+        with pytest.raises(QueryError):
+            parse_query(["GDP"], args)
+
+    def test_requires_series(self):
+        with pytest.raises(QueryError):
+            parse_query([" "], {})
+
+
+class TestSeriesEndpoint:
+    """Test the single and batch series endpoints."""
+
+    def test_json(self, api_client):
+        response = api_client.get("/api/series/UNRATE?start=2021-01-01")
+        assert response.status_code == 200
+        body = response.get_json()
+        assert body["dates"][0] == "2021-01-01"
+        assert body["series"]["UNRATE"][0] == 12.0
+        assert response.headers["ETag"].startswith('W/"')
+        assert "Last-Modified" in response.headers
+
+    def test_resample(self, api_client):
+        body = api_client.get("/api/series/UNRATE?freq=Q&how=last").get_json()
+        assert body["dates"][:2] == ["2020-01-01", "2020-04-01"]
+        assert body["series"]["UNRATE"][:2] == [2.0, 5.0]
+
+    def test_batch_csv(self, api_client):
+        response = api_client.get("/api/series?ids=GDP,UNRATE&format=csv")
+        assert response.status_code == 200
+        assert response.mimetype == "text/csv"
+        frame = pd.read_csv(io.BytesIO(response.data), index_col="date")
+        assert list(frame.columns) == ["GDP", "UNRATE"]
+        assert len(frame) == 24
+
+    def test_arrow(self, api_client):
+        pa = pytest.importorskip("pyarrow")
+        response = api_client.get("/api/series/GDP?format=arrow")
+        table = pa.ipc.open_stream(response.data).read_all()
+        assert table.column_names == ["date", "GDP"]
+        assert table.num_rows == 24
+
+    def test_bad_request(self, api_client):
+        response = api_client.get("/api/series/GDP?freq=X")
+        assert response.status_code == 400
+        assert "freq" in response.get_json()["error"]
+
+    def test_uncached_series_are_queued(self, api_client, mock_fred_api, fetch_queue):
+        fred = mock_fred_api.return_value
+        fred.get_series.reset_mock()
+        response = api_client.get("/api/series?ids=GDP,NEW")
+        assert response.status_code == 202
+        assert response.get_json()["pending"] == ["NEW"]
+        assert response.headers["Retry-After"] == "5"
+
+        fetch_queue.join()
+        assert [call.args[0] for call in fred.get_series.call_args_list] == ["NEW"]
+        assert api_client.get("/api/series?ids=GDP,NEW").status_code == 200
+
+    def test_missing_series(self, api_client, mock_fred_api, fetch_queue):
+        mock_fred_api.return_value.get_series.side_effect = ValueError("Bad series")
+        assert api_client.get("/api/series/NOPE").status_code == 202
+        fetch_queue.join()
+        calls = mock_fred_api.return_value.get_series.call_count
+
+        response = api_client.get("/api/series/NOPE")
+        assert response.status_code == 404
+        assert response.get_json()["missing"] == ["NOPE"]
+        # Known failures are not fetched again.
+        assert mock_fred_api.return_value.get_series.call_count == calls
+
+    def test_full_queue(self, api_client, fetch_queue):
+        fetch_queue.max_pending = 1
+        response = api_client.get("/api/series?ids=NEW1,NEW2")
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
+
+    def test_conditional_get(self, api_client, mock_fred_api):
+        first = api_client.get("/api/series/GDP")
+        etag = first.headers["ETag"]
+
+        with patch("app.api.routes.load_frame") as load_frame:
+            revalidated = api_client.get("/api/series/GDP", headers={"If-None-Match": etag})
+            since = api_client.get("/api/series/GDP",
+                                   headers={"If-Modified-Since": first.headers["Last-Modified"]})
+            load_frame.assert_not_called()
+        assert revalidated.status_code == 304
+        assert since.status_code == 304
+
+        other = api_client.get("/api/series/GDP?freq=A", headers={"If-None-Match": etag})
+        assert other.status_code == 200
+
+    def test_etag_changes_with_content(self, api_client, fred_miner, mock_fred_api):
+        etag = api_client.get("/api/series/GDP").headers["ETag"]
+        changed = pd.Series([1.0, 2.0], index=pd.date_range("2020-01-01", periods=2, freq="MS"))
+        mock_fred_api.return_value.get_series.side_effect = lambda *args: changed.copy()
+        fred_miner.get_series("GDP", force_refresh=True)
+
+        response = api_client.get("/api/series/GDP", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    def test_gzip(self, api_client):
+        response = api_client.get("/api/series?ids=GDP,UNRATE,PAYEMS,CPIAUCSL,FEDFUNDS,DGS10",
+                                  headers={"Accept-Encoding": "gzip"})
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert b'"dates"' in gzip.decompress(response.data)
+
+
+class TestExport:
+    """Test the streaming export endpoint."""
+
+    def test_csv(self, api_client):
+        response = api_client.get("/api/export?ids=GDP,UNRATE&start=2021-06-01")
+        assert response.is_streamed
+        assert response.mimetype == "text/csv"
+        frame = pd.read_csv(io.BytesIO(response.data), index_col="date")
+        assert list(frame.columns) == ["GDP", "UNRATE"]
+        assert frame.index[0] == "2021-06-01"
+        assert frame.loc["2021-12-01", "UNRATE"] == 23.0
+
+    def test_ndjson(self, api_client):
+        response = api_client.get("/api/export?ids=GDP&format=ndjson&end=2020-02-01")
+        lines = response.data.decode().splitlines()
+        assert [json.loads(line) for line in lines] == [
+            {"date": "2020-01-01", "GDP": 0.0},
+            {"date": "2020-02-01", "GDP": 1.0},
+        ]
+
+    def test_rejects_resampling(self, api_client):
+        assert api_client.get("/api/export?ids=GDP&freq=M").status_code == 400
+
+    def test_rows_span_chunks(self):
+        chunks = [[("2020-01-01", "A", 1.0)], [("2020-01-01", "B", 2.0), ("2020-02-01", "B", 3.0)]]
+        assert list(iter_rows(chunks, ["A", "B"])) == [
+            ("2020-01-01", [1.0, 2.0]),
+            ("2020-02-01", [None, 3.0]),
+        ]
+
+    def test_iter_observations_chunks(self, fred_miner):
+        data = pd.Series(range(5), index=pd.date_range("2020-01-01", periods=5, name="date"),
+                         dtype=float)
+        fred_miner._cache_series("A", data)
+        fred_miner._cache_series("B", data)
+        chunks = list(fred_miner.iter_observations(["A", "B"], chunk_size=3))
+        assert [len(chunk) for chunk in chunks] == [3, 3, 3, 1]
+        assert chunks[0] == [("2020-01-01", "A", 0.0), ("2020-01-01", "B", 0.0),
+                             ("2020-01-02", "A", 1.0)]
@@ -0,0 +1,242 @@
+"""Tests for the async FRED client and the ASGI data API."""
+
+import asyncio
+import json
+import threading
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+from flask import Flask
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("starlette")
+pytest.importorskip("a2wsgi")
+
+from starlette.testclient import TestClient
+
+from app.api.asgi import create_asgi_app
+from app.api.prices import PricePoller
+from app.data.async_fred import AsyncFREDClient
+from app.data.http_transport import HTTPTransport
+from app.data.rate_limit import RateLimiter
+
+
+def fred_transport(calls):
+    """Mock transport answering FRED JSON requests and recording their paths."""
+    def handler(request):
+        calls.append(request.url.path)
+        series_id = request.url.params["series_id"]
+        if series_id == "NOPE":
+            return httpx.Response(400, json={"error_message": "Bad series"})
+        if request.url.path.endswith("/observations"):
+            dates = pd.date_range("2020-01-01", periods=24, freq="MS").strftime("%Y-%m-%d")
+            observations = [{"date": d, "value": str(float(i))} for i, d in enumerate(dates)]
+            observations[1]["value"] = "."
+            return httpx.Response(200, json={"observations": observations})
+        return httpx.Response(200, json={"seriess": [{"id": series_id, "title": series_id}]})
+    return httpx.MockTransport(handler)
+
+
+def async_client(miner, calls, **kwargs):
+    """Async client whose miner talks to the mocked FRED API."""
+    miner.transport = HTTPTransport(transport=fred_transport(calls), backoff_base=0.001,
+                                    **kwargs)
+    miner.rate_limiter = RateLimiter(10000)
+    return AsyncFREDClient(miner)
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def asgi_client(fred_miner, calls):
+    """Test client for the ASGI app with a mocked upstream; GDP and UNRATE
+    start out cached."""
+    async def warm():
+        client = async_client(fred_miner, calls)
+        try:
+            await client.ensure_cached(["GDP", "UNRATE"])
+        finally:
+            await client.aclose()
+
+    asyncio.run(warm())
+    flask_app = Flask(__name__)
+
+    @flask_app.route("/hello")
+    def hello():
+        return "hello from flask"
+
+    app = create_asgi_app(flask_app, client_factory=lambda: async_client(fred_miner, calls))
+    with TestClient(app) as client:
+        yield client
+
+
+class TestAsyncFREDClient:
+    """Test the async fetch and cache path."""
+
+    def test_fetch_writes_shared_cache(self, fred_miner, calls):
+        async def run():
+            client = async_client(fred_miner, calls)
+            try:
+                return await client.get_series("GDP")
+            finally:
+                await client.aclose()
+
+        data = asyncio.run(run())
+        assert data.count() == 23  # the "." observation is missing
+        assert "GDP" in fred_miner.get_series_versions(["GDP"])
+        assert fred_miner.get_series_metadata("GDP")["title"] == "GDP"
+
+    def test_concurrent_requests_share_fetch(self, fred_miner, calls):
+        async def run():
+            client = async_client(fred_miner, calls)
+            try:
+                await asyncio.gather(*(client.ensure_cached(["GDP"]) for _ in range(5)))
+            finally:
+                await client.aclose()
+
+        asyncio.run(run())
+        assert sorted(calls) == ["/fred/series", "/fred/series/observations"]
+        metrics = fred_miner.engine.metrics()["fred"]
+        assert metrics["fetches"] == 1 and metrics["coalesced"] == 4
+
+    def test_joins_sync_fetch_in_flight(self, fred_miner, calls, sample_fred_series):
+        started, release = threading.Event(), threading.Event()
+
+        def slow_fetch(*args):
+            started.set()
+            release.wait(5)
+            return sample_fred_series.copy()
+
+        fred_miner.fred.get_series.side_effect = slow_fetch
+        fred_miner.fred.get_series_info.return_value = pd.Series({"title": "GDP"})
+        leader = threading.Thread(target=fred_miner.get_series, args=("GDP",))
+        leader.start()
+        started.wait(5)
+
+        async def run():
+            client = async_client(fred_miner, calls)
+            waiter = asyncio.ensure_future(client.get_series("GDP", force_refresh=True))
+            await asyncio.sleep(0.05)
+            release.set()
+            try:
+                return await waiter
+            finally:
+                await client.aclose()
+
+        assert asyncio.run(run()).tolist() == sample_fred_series.tolist()
+        leader.join()
+        assert calls == []
+
+    def test_upstream_errors_are_retried(self, fred_miner, calls):
+        transport = fred_transport(calls)
+        failures = []
+
+        def flaky(request):
+            if not failures:
+                failures.append(request)
+                return httpx.Response(503)
+            return transport.handle_request(request)
+
+        async def run():
+            client = async_client(fred_miner, calls)
+            fred_miner.transport = HTTPTransport(transport=httpx.MockTransport(flaky),
+                                                 backoff_base=0.001)
+            try:
+                return await client.get_series("GDP")
+            finally:
+                await client.aclose()
+
+        assert asyncio.run(run()).count() == 23
+        assert len(failures) == 1
+
+
+class TestASGIApp:
+    """Test the async API routes and the mounted WSGI app."""
+
+    def test_series(self, asgi_client):
+        response = asgi_client.get("/api/series/GDP?freq=Q&how=last")
+        assert response.status_code == 200
+        body = response.json()
+        assert body["dates"][0] == "2020-01-01"
+        assert body["series"]["GDP"][:2] == [2.0, 5.0]
+
+    def test_conditional_get(self, asgi_client):
+        etag = asgi_client.get("/api/series/GDP").headers["etag"]
+        response = asgi_client.get("/api/series/GDP", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+    def test_missing_series(self, asgi_client, fred_miner):
+        fred_miner.fred.get_series.side_effect = ValueError("Bad series")
+        response = asgi_client.get("/api/series?ids=GDP,NOPE")
+        assert response.status_code == 202
+        assert response.json()["pending"] == ["NOPE"]
+
+        asgi_client.app.state.fetch_queue.join()
+        response = asgi_client.get("/api/series?ids=GDP,NOPE")
+        assert response.status_code == 404
+        assert response.json()["missing"] == ["NOPE"]
+
+    def test_export(self, asgi_client):
+        response = asgi_client.get("/api/export?ids=GDP,UNRATE&format=ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert len(rows) == 23  # missing observations are not cached
+        assert rows[1] == {"date": "2020-03-01", "GDP": 2.0, "UNRATE": 2.0}
+
+    def test_flask_mounted(self, asgi_client):
+        assert asgi_client.get("/hello").text == "hello from flask"
+
+
+class TestPriceStream:
+    """Test the native SSE route."""
+
+    def make_poller(self):
+        with patch.object(PricePoller, "start"):
+            poller = PricePoller(lambda symbols: {"BTC": {"price": 1.0}}, ["BTC"],
+                                 max_clients=1)
+        poller.poll_once()
+        return poller
+
+    def test_stream(self):
+        poller = self.make_poller()
+        app = create_asgi_app(Flask(__name__))
+        scope = {"type": "http", "method": "GET", "path": "/api/prices/stream",
+                 "raw_path": b"/api/prices/stream", "query_string": b"", "headers": [],
+                 "http_version": "1.1", "scheme": "http", "server": ("test", 80),
+                 "asgi": {"version": "3.0"}}
+
+        async def run():
+            messages, got_snapshot = [], asyncio.Event()
+
+            async def receive():
+                await asyncio.Event().wait()
+
+            async def send(message):
+                messages.append(message)
+                if b"snapshot" in message.get("body", b""):
+                    got_snapshot.set()
+
+            task = asyncio.ensure_future(app(scope, receive, send))
+            await asyncio.wait_for(got_snapshot.wait(), 1)
+            assert poller.clients == 1
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            return messages
+
+        with patch("app.api.asgi.get_price_poller", return_value=poller):
+            messages = asyncio.run(run())
+        headers = dict(messages[0]["headers"])
+        assert headers[b"content-type"].startswith(b"text/event-stream")
+        assert headers[b"cache-control"] == b"no-cache"
+        assert poller.clients == 0
+
+    def test_full(self, asgi_client):
+        poller = self.make_poller()
+        poller.max_clients = 0
+        with patch("app.api.asgi.get_price_poller", return_value=poller):
+            response = asgi_client.get("/api/prices/stream")
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "30"
@@ -0,0 +1,141 @@
+"""Tests for the shared cache engine and data source plugins."""
+
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from app.data import sources
+from app.data.cache_engine import CacheEngine, get_cache_engine
+from app.data.sources import DataSource, get_source, register_source
+
+
+class ToySource(DataSource):
+    """Source returning a fixed series, counting upstream fetches."""
+
+    name = "toy"
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.fetches = 0
+        self.fail = False
+
+    def fetch_series(self, series_id, start_date=None, end_date=None):
+        self.fetches += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("upstream down")
+        return pd.Series([1.0, 2.0, 3.0], name=series_id,
+                         index=pd.date_range("2024-01-01", periods=3, freq="D", name="date"))
+
+    def fetch_metadata(self, series_id):
+        return {"title": f"Toy {series_id}", "units": "Index", "last_updated": "v1"}
+
+
+@pytest.fixture
+def engine(temp_config_dir):
+    return CacheEngine(temp_config_dir / "cache")
+
+
+class TestCacheEngine:
+    """Test storage, freshness, coalescing and metrics."""
+
+    def test_get_caches_and_counts(self, engine):
+        source = ToySource()
+        first = engine.get(source, "BTC")
+        second = engine.get(source, "BTC")
+        assert source.fetches == 1
+        assert second.tolist() == first.tolist() == [1.0, 2.0, 3.0]
+        assert second.name == "BTC"
+        metrics = engine.metrics()["toy"]
+        assert (metrics["hits"], metrics["misses"], metrics["fetches"]) == (1, 1, 1)
+        assert engine.metadata("toy", "BTC")["title"] == "Toy BTC"
+
+    def test_sources_are_namespaced(self, engine, sample_fred_series):
+        engine.write("fred", "BTC", sample_fred_series)
+        engine.get(ToySource(), "BTC")
+        assert engine.versions("fred", ["BTC"]) != engine.versions("toy", ["BTC"])
+        with sqlite3.connect(engine.db_path) as conn:
+            keys = {row[0] for row in conn.execute("SELECT DISTINCT series_id FROM series_data")}
+        assert keys == {"BTC", "toy:BTC"}
+
+    def test_one_store_for_all_sources(self, fred_miner, sample_fred_series):
+        engine = get_cache_engine(fred_miner.cache_dir)
+        assert fred_miner.engine is engine
+        fred_miner._cache_series("GDP", sample_fred_series)
+        engine.get(ToySource(), "BTC")
+        rows = list(engine.iter_observations("toy", ["BTC"]))[0]
+        assert {series_id for _, series_id, _ in rows} == {"BTC"}
+        with sqlite3.connect(engine.db_path) as conn:
+            joined = conn.execute("""
+                SELECT COUNT(DISTINCT series_id) FROM series_data
+                WHERE series_id IN ('GDP', 'toy:BTC')
+            """).fetchone()[0]
+        assert joined == 2
+
+    def test_write_failures_raise(self, engine, sample_fred_series, monkeypatch):
+        def locked(*args, **kwargs):
+            raise sqlite3.OperationalError("database is locked")
+
+        monkeypatch.setattr("app.data.cache_engine.store_quality", locked)
+        with pytest.raises(sqlite3.OperationalError):
+            engine.write("fred", "GDP", sample_fred_series)
+        assert engine.versions("fred", ["GDP"]) == {}
+        # A fetch still hands its data to the caller.
+        assert engine.get(ToySource(), "BTC").tolist() == [1.0, 2.0, 3.0]
+        assert engine.metrics()["toy"]["errors"] == 1
+
+    def test_concurrent_requests_coalesce(self, engine):
+        source = ToySource(delay=0.2)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(engine.fetch(source, "ETH")))
+                   for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert source.fetches == 1
+        assert len(results) == 5
+        assert engine.metrics()["toy"]["coalesced"] == 4
+
+    def test_falls_back_to_stale_cache(self, engine):
+        source = ToySource()
+        engine.get(source, "BTC")
+        source.fail = True
+        assert engine.get(source, "BTC", force_refresh=True).tolist() == [1.0, 2.0, 3.0]
+        assert engine.metrics()["toy"]["stale_fallbacks"] == 1
+        with pytest.raises(ConnectionError):
+            engine.get(source, "SOL")
+
+    def test_adopts_legacy_cache(self, temp_config_dir):
+        legacy = temp_config_dir / "fred_cache.db"
+        with sqlite3.connect(legacy) as conn:
+            conn.execute("CREATE TABLE series_data (series_id TEXT, date TEXT, value REAL, "
+                         "last_updated TEXT, PRIMARY KEY (series_id, date))")
+            conn.execute("INSERT INTO series_data VALUES ('GDP', '2020-01-01', 1.0, NULL)")
+        engine = CacheEngine(temp_config_dir)
+        assert not legacy.exists()
+        assert engine.db_path.name == "data_cache.db"
+        with sqlite3.connect(engine.db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM series_data").fetchone()[0] == 1
+
+
+class TestSourceRegistry:
+    """Test source registration."""
+
+    def test_fred_is_registered(self, fred_miner):
+        from app.data import fred_client
+        assert isinstance(fred_miner, DataSource)
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(fred_client, "_miner_instance", fred_miner)
+            assert get_source("fred") is fred_miner
+
+    def test_register_and_unknown(self, monkeypatch):
+        monkeypatch.setattr(sources, "_factories", dict(sources._factories))
+        source = ToySource()
+        register_source("toy", lambda: source)
+        assert get_source("toy") is source
+        with pytest.raises(KeyError, match="Unknown data source"):
+            get_source("nope")
@@ -0,0 +1,101 @@
+"""Tests for the CoinGecko client and crypto endpoints."""
+
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+
+from app.api import init_api
+from app.data.coingecko_client import CoinGeckoClient
+from app.data.crypto_prices import fetch_crypto_quotes
+from app.data.tick_store import TickStore
+
+
+def fake_get(calls):
+    """Stand-in for ``CoinGeckoClient._get`` recording requested IDs."""
+    def _get(path, **params):
+        if path == "simple/price":
+            ids = params["ids"].split(",")
+            calls.append(ids)
+            return {coin_id: {"usd": float(i + 1), "usd_24h_change": -1.234,
+                              "last_updated_at": 1_700_000_000 + i}
+                    for i, coin_id in enumerate(ids) if coin_id != "unknown"}
+        return {"prices": [[1_700_000_000_000, 1.0], [1_700_000_060_000, 2.0]],
+                "market_caps": [[1_700_000_000_000, 10.0], [1_700_000_060_000, 20.0]],
+                "total_volumes": [[1_700_000_000_000, 5.0], [1_700_000_060_000, 6.0]]}
+    return _get
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def client(calls):
+    with patch('app.data.coingecko_client.get_api_key', return_value=None):
+        client = CoinGeckoClient(base_url="http://standin", batch_size=2)
+    client._get = fake_get(calls)
+    return client
+
+
+class TestCoinGeckoClient:
+    """Test batching and tick recording."""
+
+    def test_requests_go_through_transport(self):
+        httpx = pytest.importorskip("httpx")
+        from app.data.http_transport import HTTPTransport
+
+        seen = []
+
+        def handler(request):
+            seen.append(request)
+            return httpx.Response(200, json={"bitcoin": {"usd": 1.0}})
+
+        transport = HTTPTransport(transport=httpx.MockTransport(handler))
+        client = CoinGeckoClient(api_key="demo", base_url="http://standin",
+                                 transport=transport)
+        assert client.get_prices(["bitcoin"])["bitcoin"]["price"] == 1.0
+        assert seen[0].url.params["ids"] == "bitcoin"
+        assert seen[0].headers["x-cg-demo-api-key"] == "demo"
+
+    def test_get_prices_batches_ids(self, client, calls):
+        quotes = client.get_prices(["a", "b", "c", "unknown", "a"])
+        assert calls == [["a", "b"], ["c", "unknown"]]
+        assert set(quotes) == {"a", "b", "c"}
+        assert quotes["c"]["price"] == 1.0
+
+    def test_market_chart(self, client):
+        chart = client.get_market_chart("bitcoin")
+        assert list(chart.columns) == ["price", "market_cap", "total_volume"]
+        assert str(chart.index.tz) == "UTC"
+
+    def test_record_prices_and_history(self, client):
+        store = TickStore()
+        client.load_history("a", store=store)
+        client.record_prices(["a"], store=store)
+        assert store.ticks("a")["price"].tolist() == [1.0, 2.0]  # poll tick is older
+        assert store.dropped("a") == 1
+        assert store.bars("a", "1m")["close"].iloc[-1] == 2.0
+
+    def test_fetch_crypto_quotes(self, client):
+        with patch("app.data.coingecko_client.get_tick_store", return_value=TickStore()):
+            quotes = fetch_crypto_quotes(["BTC", "AAPL"], client=client)
+        assert quotes == {"BTC": {"price": 1.0, "change_24h": -1.23}}
+
+
+class TestBarsRoute:
+    """Test the OHLCV bars endpoint."""
+
+    def test_bars(self):
+        store = TickStore()
+        store.extend("bitcoin", [0, 30, 90], [1.0, 3.0, 2.0])
+        app = Flask(__name__)
+        init_api(app)
+        with patch("app.api.routes.get_tick_store", return_value=store):
+            client = app.test_client()
+            body = client.get("/api/crypto/bitcoin/bars?interval=1m").get_json()
+            assert body["time"] == [0, 60000]
+            assert body["high"] == [3.0, 2.0]
+            assert client.get("/api/crypto/bitcoin/bars?interval=5m").status_code == 400
+            assert client.get("/api/crypto/dogecoin/bars").status_code == 404
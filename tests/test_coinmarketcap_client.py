@@ -0,0 +1,132 @@
+"""Tests for the CoinMarketCap client and its credit budget."""
+
+import math
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+
+from app.data.coinmarketcap_client import (
+    CoinMarketCapClient, QuotaBudget, QuotaExceeded, QuotaLedger, billing_period,
+)
+
+UTC = timezone.utc
+
+
+@pytest.fixture
+def ledger(temp_config_dir):
+    return QuotaLedger(temp_config_dir / "cmc.db")
+
+
+@pytest.fixture
+def client(temp_config_dir):
+    """Client with a fake API answering quotes/latest."""
+    with patch("app.data.coinmarketcap_client.get_api_key", return_value="key"):
+        client = CoinMarketCapClient(cache_dir=str(temp_config_dir / "cache"))
+    client.requests = []
+
+    def _get(path, **params):
+        symbols = params["symbol"].split(",")
+        client.requests.append(symbols)
+        return {
+            "status": {"credit_count": math.ceil(len(symbols) / 100)},
+            "data": {s: {"quote": {"USD": {"price": 1.5, "percent_change_24h": 2.0}}}
+                     for s in symbols},
+        }
+
+    client._get = _get
+    return client
+
+
+class TestBillingPeriod:
+    """Test billing period boundaries."""
+
+    def test_calendar_month(self):
+        start, end = billing_period(datetime(2024, 2, 10, tzinfo=UTC))
+        assert (start.day, start.month, end.day, end.month) == (1, 2, 1, 3)
+
+    def test_billing_day_before_anchor(self):
+        start, end = billing_period(datetime(2024, 1, 5, tzinfo=UTC), billing_day=15)
+        assert start == datetime(2023, 12, 15, tzinfo=UTC)
+        assert end == datetime(2024, 1, 15, tzinfo=UTC)
+
+    def test_billing_day_clamped(self):
+        start, end = billing_period(datetime(2024, 2, 29, 12, tzinfo=UTC), billing_day=31)
+        assert start == datetime(2024, 2, 29, tzinfo=UTC)
+        assert end == datetime(2024, 3, 31, tzinfo=UTC)
+
+
+class TestQuotaBudget:
+    """Test ledger-driven pacing."""
+
+    def test_ledger_persists(self, ledger, temp_config_dir):
+        ledger.record("quotes/latest", 3, datetime(2024, 1, 2, tzinfo=UTC))
+        reopened = QuotaLedger(temp_config_dir / "cmc.db")
+        assert reopened.used(datetime(2024, 1, 1, tzinfo=UTC)) == 3
+        assert reopened.used(datetime(2024, 2, 1, tzinfo=UTC)) == 0
+
+    def test_ledger_lives_in_shared_cache(self, temp_config_dir):
+        cache_dir = temp_config_dir / "legacy"
+        cache_dir.mkdir()
+        QuotaLedger(cache_dir / "coinmarketcap_cache.db").record(
+            "quotes/latest", 7, datetime(2024, 1, 2, tzinfo=UTC))
+        client = CoinMarketCapClient(api_key="key", cache_dir=str(cache_dir))
+        assert client.db_path == cache_dir / "data_cache.db"
+        assert client.ledger.used(datetime(2024, 1, 1, tzinfo=UTC)) == 7
+        assert not (cache_dir / "coinmarketcap_cache.db").exists()
+
+    def test_even_spread(self, ledger):
+        budget = QuotaBudget(ledger, monthly_credits=3100, reserve=0.0, min_interval=1)
+        now = datetime(2024, 1, 1, tzinfo=UTC)
+        # 31 days, 3100 one-credit polls
+        assert budget.interval(1, now) == pytest.approx(31 * 86400 / 3100)
+        assert budget.interval(2, now) == pytest.approx(31 * 86400 / 1550)
+
+    def test_interval_widens_when_ahead_of_pace(self, ledger):
+        budget = QuotaBudget(ledger, monthly_credits=3100, reserve=0.0, min_interval=1)
+        now = datetime(2024, 1, 16, 12, tzinfo=UTC)
+        on_pace = budget.interval(1, now)
+        ledger.record("quotes/latest", 2500, now - timedelta(days=1))
+        assert budget.interval(1, now) > 2 * on_pace
+
+    def test_exhausted(self, ledger):
+        budget = QuotaBudget(ledger, monthly_credits=100, reserve=0.1)
+        now = datetime(2024, 1, 10, tzinfo=UTC)
+        ledger.record("quotes/latest", 95, now)
+        assert math.isinf(budget.interval(1, now))
+        assert budget.next_poll(1, now) == datetime(2024, 2, 1, tzinfo=UTC)
+        assert budget.can_spend(5, now) and not budget.can_spend(6, now)
+
+
+class TestCoinMarketCapClient:
+    """Test symbol packing and budgeted polling."""
+
+    def test_packs_symbols_per_credit(self, client):
+        symbols = [f"C{i}" for i in range(250)] + ["c0"]
+        quotes = client.get_quotes(symbols)
+        assert [len(batch) for batch in client.requests] == [100, 100, 50]
+        assert len(quotes) == 250
+        assert client.budget.remaining() == client.budget.monthly_credits - 3
+
+    def test_quota_exceeded(self, client):
+        client.budget.monthly_credits = 1
+        with pytest.raises(QuotaExceeded):
+            client.get_quotes([f"C{i}" for i in range(101)])
+        assert client.requests == []
+
+    def test_poll_respects_pace(self, client):
+        first = client.poll_quotes(["BTC", "ETH"])
+        assert first["BTC"]["price"] == 1.5
+        again = client.poll_quotes(["BTC", "ETH"])
+        assert again == first
+        assert len(client.requests) == 1
+
+        later = datetime.now(UTC) + timedelta(seconds=client.budget.interval(1) + 1)
+        client.poll_quotes(["BTC", "ETH"], now=later)
+        assert len(client.requests) == 2
+
+    def test_ticker_source(self, client):
+        from app.data.crypto_prices import fetch_coinmarketcap_quotes
+        assert fetch_coinmarketcap_quotes(["BTC"], client=client) == {
+            "BTC": {"price": 1.5, "change_24h": 2.0}
+        }
@@ -0,0 +1,95 @@
+"""Tests for LTTB downsampling and zoom re-resolution helpers."""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.dash.charts import downsampled_series_chart
+from app.dash.downsample import lttb, lttb_indices, window_slice
+
+
+def reference_lttb(x, y, threshold):
+    """Straightforward scalar LTTB used to check the vectorized version."""
+    n = len(x)
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    selected = [0]
+    for i in range(threshold - 2):
+        start = int(math.floor((i + 1) * every)) + 1
+        stop = min(int(math.floor((i + 2) * every)) + 1, n)
+        avg_x = x[start:stop].mean() if stop > start else x[-1]
+        avg_y = y[start:stop].mean() if stop > start else y[-1]
+        lo = int(math.floor(i * every)) + 1
+        hi = int(math.floor((i + 1) * every)) + 1
+        areas = [abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+                 for j in range(lo, hi)]
+        a = lo + int(np.argmax(areas))
+        selected.append(a)
+    selected.append(n - 1)
+    return np.array(selected)
+
+
+@pytest.fixture
+def daily_series():
+    """A long random-walk daily series similar to DGS10."""
+    rng = np.random.default_rng(42)
+    index = pd.date_range("1962-01-02", periods=16000, freq="D", name="date")
+    return pd.Series(rng.standard_normal(16000).cumsum(), index=index, name="DGS10")
+
+
+class TestLTTB:
+    """Test the LTTB implementation."""
+
+    @pytest.mark.parametrize("n, n_out", [(100, 10), (5000, 37), (15000, 1000), (1001, 1000)])
+    def test_matches_reference(self, n, n_out):
+        """Test that the vectorized selection equals the scalar algorithm."""
+        rng = np.random.default_rng(n)
+        x = np.arange(n, dtype=float)
+        y = rng.standard_normal(n).cumsum()
+        np.testing.assert_array_equal(lttb_indices(x, y, n_out), reference_lttb(x, y, n_out))
+
+    def test_short_series_unchanged(self, daily_series):
+        """Test that series within the budget are returned as-is."""
+        short = daily_series.iloc[:50]
+        pd.testing.assert_series_equal(lttb(short, 100), short)
+
+    def test_keeps_endpoints_and_extremes(self, daily_series):
+        """Test that the downsampled series preserves the visual envelope."""
+        result = lttb(daily_series, 500)
+
+        assert len(result) == 500
+        assert result.index[0] == daily_series.index[0]
+        assert result.index[-1] == daily_series.index[-1]
+        assert result.index.is_monotonic_increasing
+        assert daily_series.idxmax() in result.index
+        assert daily_series.idxmin() in result.index
+
+    def test_ignores_missing_values(self, daily_series):
+        """Test that NaN observations are dropped before downsampling."""
+        daily_series.iloc[::7] = np.nan
+        assert lttb(daily_series, 300).notna().all()
+
+
+class TestZoomHelpers:
+    """Test window slicing for zoomed charts."""
+
+    def test_window_slice_includes_neighbours(self, daily_series):
+        """Test that the slice keeps one point beyond each edge."""
+        window = window_slice(daily_series, "2000-01-10", "2000-01-20")
+        assert window.index[0] == pd.Timestamp("2000-01-09")
+        assert window.index[-1] == pd.Timestamp("2000-01-21")
+
+    def test_zoomed_chart_spends_budget_on_window(self, daily_series):
+        """Test that a zoomed figure holds more detail for the visible range."""
+        overview = downsampled_series_chart(daily_series, 200)
+        zoomed = downsampled_series_chart(daily_series, 200, "2000-01-01", "2001-01-01")
+
+        overview_x = pd.to_datetime(pd.Series(overview.data[0].x))
+        zoomed_x = pd.to_datetime(pd.Series(zoomed.data[0].x))
+        in_window = lambda x: ((x >= "2000-01-01") & (x <= "2001-01-01")).sum()
+
+        assert len(overview.data[0].x) == 200
+        assert in_window(zoomed_x) > in_window(overview_x)
+        assert zoomed.layout.xaxis.range == ("2000-01-01", "2001-01-01")
@@ -0,0 +1,166 @@
+"""Tests for the SEC EDGAR company facts ingester."""
+
+import gzip
+import io
+import json
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from app.data import edgar_client
+from app.data.edgar_client import (
+    EDGARClient, format_cik, iter_company_facts, parse_series_id,
+)
+from app.data.sources import available_sources
+
+COMPANY_FACTS = {
+    "cik": 320193,
+    "entityName": "Apple Inc.",
+    "facts": {
+        "dei": {
+            "EntityCommonStockSharesOutstanding": {
+                "label": "Shares outstanding",
+                "units": {"shares": [
+                    {"end": "2023-10-20", "val": 15550061000, "accn": "A1", "fy": 2023,
+                     "fp": "FY", "form": "10-K", "filed": "2023-11-03"},
+                ]},
+            },
+        },
+        "us-gaap": {
+            "NetIncomeLoss": {
+                "label": "Net Income (Loss)",
+                "units": {"USD": [
+                    {"start": "2022-09-25", "end": "2023-09-30", "val": 96995000000,
+                     "accn": "A1", "fy": 2023, "fp": "FY", "form": "10-K",
+                     "filed": "2023-11-03", "frame": "CY2023"},
+                    {"start": "2022-09-25", "end": "2023-09-30", "val": 97000000000,
+                     "accn": "A2", "fy": 2024, "fp": "FY", "form": "10-K",
+                     "filed": "2024-11-01"},
+                    {"start": "2021-09-26", "end": "2022-09-24", "val": 99803000000,
+                     "accn": "A1", "fy": 2023, "fp": "FY", "form": "10-K",
+                     "filed": "2023-11-03", "frame": "CY2022"},
+                ]},
+            },
+        },
+    },
+}
+
+
+def document():
+    return io.BytesIO(json.dumps(COMPANY_FACTS).encode())
+
+
+@pytest.fixture
+def client(temp_config_dir):
+    return EDGARClient(user_agent="Tests tests@example.org",
+                       cache_dir=str(temp_config_dir / "cache"))
+
+
+class TestIterCompanyFacts:
+    """Test streaming and fallback parsing."""
+
+    @pytest.mark.parametrize("streaming", [True, False])
+    def test_rows(self, streaming):
+        if streaming:
+            pytest.importorskip("ijson")
+        with patch.object(edgar_client, "IJSON_AVAILABLE", streaming):
+            rows = list(iter_company_facts(document()))
+        assert len(rows) == 4
+        assert rows[1] == (320193, "us-gaap", "NetIncomeLoss", "USD", "2022-09-25",
+                           "2023-09-30", 96995000000.0, 2023, "FY", "10-K", "2023-11-03",
+                           "A1", "CY2023")
+        assert rows[0][3] == "shares" and rows[0][4] is None
+
+    def test_cik_after_facts(self):
+        pytest.importorskip("ijson")
+        reordered = {"facts": COMPANY_FACTS["facts"], "cik": 42}
+        rows = list(iter_company_facts(io.BytesIO(json.dumps(reordered).encode())))
+        assert {row[0] for row in rows} == {42}
+
+
+class TestEDGARClient:
+    """Test ingestion into the cache."""
+
+    def test_ingest_and_query(self, client):
+        stats = client.ingest_company_facts(320193, stream=document())
+        assert stats.facts == 4 and stats.companies == 1
+        assert stats.bytes == len(document().getvalue())
+
+        net_income = client.get_company_concept(320193, "NetIncomeLoss", unit="USD")
+        assert net_income["period_end"].tolist() == ["2022-09-24", "2023-09-30"]
+        # Restated value from the later filing wins.
+        assert net_income["value"].tolist() == [99803000000.0, 97000000000.0]
+
+    def test_reingest_replaces(self, client):
+        client.ingest_company_facts(320193, stream=document())
+        client.ingest_company_facts(320193, stream=document())
+        assert len(client.get_company_concept(320193, "NetIncomeLoss")) == 2
+
+    def test_ingest_companies_reports_failures(self, client):
+        with patch.object(client, "_open", side_effect=[document(), OSError("404")]):
+            stats = client.ingest_companies([320193, 1])
+        assert stats.companies == 1 and stats.facts == 4
+        assert "facts/s" in str(stats)
+
+    def test_download_through_transport(self, temp_config_dir):
+        httpx = pytest.importorskip("httpx")
+        from app.data.http_transport import HTTPTransport
+
+        def handler(request):
+            assert request.url.path == "/api/xbrl/companyfacts/CIK0000320193.json"
+            assert request.headers["User-Agent"] == "Tests tests@example.org"
+            return httpx.Response(200, content=gzip.compress(document().getvalue()),
+                                  headers={"Content-Encoding": "gzip"})
+
+        client = EDGARClient(user_agent="Tests tests@example.org",
+                             cache_dir=str(temp_config_dir / "cache"),
+                             base_url="http://edgar.test/api/xbrl",
+                             transport=HTTPTransport(transport=httpx.MockTransport(handler)))
+        stats = client.ingest_company_facts(320193)
+        assert stats.facts == 4 and stats.bytes == len(document().getvalue())
+
+    def test_rate_capped_at_sec_limit(self, temp_config_dir):
+        with patch("app.data.edgar_client.get_config") as get_config:
+            get_config.return_value.get_config.side_effect = lambda key, default=None: (
+                50 if key == "edgar.requests_per_second" else default)
+            client = EDGARClient(user_agent="x", cache_dir=str(temp_config_dir / "c"))
+        assert client.rate_limiter.interval == pytest.approx(0.1)
+
+    def test_format_cik(self):
+        assert format_cik("320193") == "0000320193"
+
+
+class TestEDGARSource:
+    """Test EDGAR series served from the shared cache."""
+
+    def test_series_from_shared_cache(self, client):
+        assert client.db_path.name == "data_cache.db"
+        assert "edgar" in available_sources()
+        with patch.object(client, "_open", return_value=document()) as download:
+            data = client.get_series("320193/NetIncomeLoss/USD")
+            again = client.get_series("320193/NetIncomeLoss/USD")
+            client.get_series("320193/NetIncomeLoss/USD/Q")
+        assert download.call_count == 1  # one download serves every series of a company
+        assert data.index.strftime("%Y-%m-%d").tolist() == ["2022-09-24", "2023-09-30"]
+        assert data.tolist() == again.tolist() == [99803000000.0, 96995000000.0]
+        metadata = client.engine.metadata("edgar", "320193/NetIncomeLoss/USD")
+        assert (metadata["units"], metadata["frequency"]) == ("USD", "Annual")
+
+    def test_parse_series_id(self):
+        assert parse_series_id("320193/Assets/USD/Q") == (320193, "Assets", "USD", True)
+        with pytest.raises(ValueError):
+            parse_series_id("320193/Assets")
+
+    def test_adopts_legacy_cache(self, temp_config_dir):
+        cache_dir = temp_config_dir / "legacy"
+        cache_dir.mkdir()
+        with sqlite3.connect(cache_dir / "edgar_cache.db") as conn:
+            conn.execute("CREATE TABLE companies (cik INTEGER PRIMARY KEY, facts INTEGER, "
+                         "last_updated TEXT)")
+            conn.execute("INSERT INTO companies VALUES (320193, 4, '2024-01-01T00:00:00')")
+        client = EDGARClient(user_agent="x", cache_dir=str(cache_dir))
+        with sqlite3.connect(client.db_path) as conn:
+            assert conn.execute("SELECT cik, facts FROM companies").fetchall() == [(320193, 4)]
+        assert not (cache_dir / "edgar_cache.db").exists()
+        assert (cache_dir / "edgar_cache.db.adopted").exists()
@@ -0,0 +1,78 @@
+"""Tests for the EDGAR frames cross-sectional index."""
+
+import io
+import json
+
+import numpy as np
+import pytest
+
+from app.data.edgar_client import EDGARClient
+from app.data.edgar_frames import FrameIndex
+
+VALUES = [5.0, -2.0, 12.5, 7.0, 0.0, 3.0, 9.0, 1.0, 40.0, 7.0]
+
+
+def frame_document(values=VALUES):
+    return io.BytesIO(json.dumps({
+        "taxonomy": "us-gaap", "tag": "NetIncomeLoss", "ccp": "CY2023Q4", "uom": "USD",
+        "pts": len(values),
+        "data": [{"accn": f"A{i}", "cik": 1000 + i, "entityName": f"Co {i}",
+                  "loc": "US-CA", "end": "2023-12-31", "val": v}
+                 for i, v in enumerate(values)],
+    }).encode())
+
+
+@pytest.fixture
+def index(temp_config_dir):
+    client = EDGARClient(user_agent="Tests tests@example.org",
+                         cache_dir=str(temp_config_dir / "cache"))
+    index = FrameIndex(client)
+    index.ingest("NetIncomeLoss", "USD", "CY2023Q4", stream=frame_document())
+    return index
+
+
+class TestFrameIndex:
+    """Test cross-sectional queries."""
+
+    def test_top(self, index):
+        top = index.top("NetIncomeLoss", "USD", "CY2023Q4", n=3)
+        assert top["value"].tolist() == [40.0, 12.5, 9.0]
+        assert top["cik"].tolist() == [1008, 1002, 1006]
+        bottom = index.top("NetIncomeLoss", "USD", "CY2023Q4", n=2, largest=False)
+        assert bottom["entity_name"].tolist() == ["Co 1", "Co 4"]
+
+    def test_percentile_matches_numpy(self, index):
+        q = [0, 10, 25, 50, 90, 100]
+        result = index.percentile("NetIncomeLoss", "USD", "CY2023Q4", q)
+        np.testing.assert_allclose(result, np.percentile(VALUES, q))
+        assert index.percentile("NetIncomeLoss", "USD", "CY2023Q4", 50) == pytest.approx(6.0)
+
+    @pytest.mark.parametrize("bins", [4, [-5.0, 0.0, 7.0, 40.0]])
+    def test_histogram_matches_numpy(self, index, bins):
+        counts, edges = index.histogram("NetIncomeLoss", "USD", "CY2023Q4", bins=bins)
+        expected_counts, expected_edges = np.histogram(VALUES, bins=bins)
+        np.testing.assert_array_equal(counts, expected_counts)
+        np.testing.assert_allclose(edges, expected_edges)
+
+    def test_percentile_rank(self, index):
+        frame = index.get_frame("NetIncomeLoss", "USD", "CY2023Q4")
+        assert frame.percentile_rank(7.0) == 50.0
+
+    def test_frame_is_cached_until_reingested(self, index):
+        first = index.get_frame("NetIncomeLoss", "USD", "CY2023Q4")
+        assert index.get_frame("NetIncomeLoss", "USD", "CY2023Q4") is first
+        index.ingest("NetIncomeLoss", "USD", "CY2023Q4", stream=frame_document([1.0, 2.0]))
+        assert len(index.get_frame("NetIncomeLoss", "USD", "CY2023Q4")) == 2
+
+    def test_unknown_frame_is_empty(self, index):
+        frame = index.get_frame("Revenues", "USD", "CY2023Q4")
+        assert len(frame) == 0
+        assert frame.top(5).empty
+        with pytest.raises(ValueError):
+            frame.percentile(50)
+
+    def test_eviction(self, index):
+        index.max_frames = 1
+        index.get_frame("NetIncomeLoss", "USD", "CY2023Q4")
+        index.get_frame("Revenues", "USD", "CY2023")
+        assert list(index._frames) == [("us-gaap", "Revenues", "USD", "CY2023")]
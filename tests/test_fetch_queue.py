@@ -0,0 +1,74 @@
+"""Tests for the background fetch queue."""
+
+import threading
+
+import pytest
+
+from app.data.fetch_queue import FetchQueue, QueueFull
+
+
+class FakeMiner:
+    """Caches every series except those in ``bad``, once ``gate`` is set."""
+
+    def __init__(self, bad=()):
+        self.bad = set(bad)
+        self.cached = set()
+        self.fetched = []
+        self.gate = threading.Event()
+
+    def ensure_cached(self, series_ids):
+        self.gate.wait(5)
+        for series_id in series_ids:
+            self.fetched.append(series_id)
+            if series_id not in self.bad:
+                self.cached.add(series_id)
+
+    def get_series_versions(self, series_ids):
+        return {series_id: "v1" for series_id in series_ids if series_id in self.cached}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestFetchQueue:
+    """Test deduplication, bounds and failure memory."""
+
+    def test_series_are_queued_once(self):
+        miner = FakeMiner()
+        fetch_queue = FetchQueue(miner)
+        assert fetch_queue.submit(["A", "B", "A"]) == (["A", "B", "A"], [])
+        assert fetch_queue.submit(["B"]) == (["B"], [])
+        miner.gate.set()
+        fetch_queue.join()
+        assert miner.fetched == ["A", "B"]
+
+    def test_bounded(self):
+        miner = FakeMiner()
+        fetch_queue = FetchQueue(miner, max_pending=2)
+        fetch_queue.submit(["A", "B"])
+        with pytest.raises(QueueFull):
+            fetch_queue.submit(["C"])
+        assert fetch_queue.submit(["A"]) == (["A"], [])  # already waiting: free
+        miner.gate.set()
+        fetch_queue.join()
+        assert fetch_queue.submit(["C"]) == (["C"], [])
+
+    def test_failures_are_remembered(self):
+        miner = FakeMiner(bad={"NOPE"})
+        miner.gate.set()
+        clock = FakeClock()
+        fetch_queue = FetchQueue(miner, failure_ttl=60, clock=clock)
+        fetch_queue.submit(["NOPE"])
+        fetch_queue.join()
+        assert fetch_queue.submit(["NOPE"]) == ([], ["NOPE"])
+        assert miner.fetched == ["NOPE"]
+
+        clock.now += 61
+        assert fetch_queue.submit(["NOPE"]) == (["NOPE"], [])
+        fetch_queue.join()
+        assert miner.fetched == ["NOPE", "NOPE"]
@@ -0,0 +1,93 @@
+"""Tests for the server-side figure cache."""
+
+import pytest
+from unittest.mock import Mock
+
+from app.dash.charts import cached_series_chart, sample_chart
+from app.dash.figure_cache import FigureCache
+
+
+class TestFigureCache:
+    """Test the FigureCache class."""
+
+    def test_hit_reuses_serialized_figure(self):
+        """Test that a second lookup with the same versions skips the builder."""
+        cache = FigureCache()
+        builder = Mock(side_effect=sample_chart)
+
+        first = cache.get_json("sample", {"GDP": "v1"}, builder)
+        second = cache.get_json("sample", {"GDP": "v1"}, builder)
+
+        assert first == second
+        assert builder.call_count == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_version_change_invalidates(self):
+        """Test that a new series version rebuilds and replaces the entry."""
+        cache = FigureCache()
+        builder = Mock(side_effect=sample_chart)
+
+        cache.get_json("sample", {"GDP": "v1"}, builder)
+        cache.get_json("sample", {"GDP": "v2"}, builder)
+
+        assert builder.call_count == 2
+        assert len(cache) == 1
+
+    def test_params_distinguish_entries(self):
+        """Test that chart parameters are part of the key."""
+        cache = FigureCache()
+        cache.get_json("chart", {}, sample_chart, params={"start": "2020"})
+        cache.get_json("chart", {}, sample_chart, params={"start": "2021"})
+        assert len(cache) == 2
+
+    def test_lru_eviction(self):
+        """Test that the least recently used figure is evicted first."""
+        cache = FigureCache(max_entries=2)
+        builder = Mock(return_value={"data": [], "layout": {}})
+
+        cache.get_json("a", {}, builder)
+        cache.get_json("b", {}, builder)
+        cache.get_json("a", {}, builder)  # refresh 'a'
+        cache.get_json("c", {}, builder)  # evicts 'b'
+        cache.get_json("a", {}, builder)
+
+        assert builder.call_count == 3
+        cache.get_json("b", {}, builder)
+        assert builder.call_count == 4
+
+    def test_invalidate_series(self):
+        """Test dropping every figure derived from one series."""
+        cache = FigureCache()
+        cache.get_json("a", {"GDP": "v1"}, sample_chart)
+        cache.get_json("b", {"GDP": "v1", "UNRATE": "v1"}, sample_chart)
+        cache.get_json("c", {"UNRATE": "v1"}, sample_chart)
+
+        assert cache.invalidate_series("GDP") == 2
+        assert len(cache) == 1
+
+    def test_get_figure_returns_dict(self):
+        """Test that figures are returned as plain dicts for Dash."""
+        figure = FigureCache().get_figure("sample", {}, sample_chart)
+        assert isinstance(figure, dict)
+        assert figure["data"][0]["type"] == "scatter"
+
+
+class TestCachedSeriesChart:
+    """Test charts built through the figure cache from cached FRED data."""
+
+    def test_rebuilds_only_when_series_changes(self, fred_miner, sample_fred_series, sample_fred_metadata):
+        """Test that the figure is rebuilt after the cached series changes."""
+        fred_miner.fred.get_series.return_value = sample_fred_series
+        fred_miner.fred.get_series_info.return_value = sample_fred_metadata
+        cache = FigureCache()
+
+        cached_series_chart(fred_miner, "GDP", cache=cache)
+        cached_series_chart(fred_miner, "GDP", cache=cache)
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        fred_miner.fred.get_series.return_value = sample_fred_series + 1
+        fred_miner.get_series("GDP", force_refresh=True)
+        figure = cached_series_chart(fred_miner, "GDP", cache=cache)
+
+        assert cache.misses == 2
+        assert figure["layout"]["title"]["text"] == "Gross Domestic Product (GDP)"
@@ -0,0 +1,107 @@
+"""Tests for the batch forecasting engine."""
+
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.dash.charts import cached_series_payload
+from app.dash.figure_cache import FigureCache
+from app.data.forecasting import ForecastEngine, fit_ar, fit_forecast, fit_holt, load_forecast
+
+
+def ar_series(n=300, phi=0.6, seed=3):
+    """A random walk whose steps follow an AR(1) process."""
+    rng = np.random.default_rng(seed)
+    steps = np.zeros(n)
+    for t in range(1, n):
+        steps[t] = phi * steps[t - 1] + rng.standard_normal()
+    return 100 + np.cumsum(steps)
+
+
+@pytest.fixture
+def catalog():
+    """Monthly, quarterly and daily series keyed by ID."""
+    monthly = pd.date_range("2000-01-01", periods=300, freq="MS", name="date")
+    quarterly = pd.date_range("1980-01-01", periods=120, freq="QS", name="date")
+    daily = pd.bdate_range("2015-01-01", periods=1500, name="date")
+    return {
+        "MONTHLY": pd.Series(ar_series(), index=monthly),
+        "QUARTERLY": pd.Series(np.linspace(50, 170, 120), index=quarterly),
+        "DAILY": pd.Series(ar_series(1500, seed=4), index=daily),
+        "SHORT": pd.Series(np.arange(10.0), index=monthly[:10]),
+    }
+
+
+@pytest.fixture
+def engine(cached_miner, catalog):
+    return ForecastEngine(cached_miner(catalog), processes=1)
+
+
+class TestModels:
+    """Test the NumPy models."""
+
+    def test_ar_recovers_coefficient(self):
+        fit = fit_ar(ar_series(2000), steps=12)
+        assert fit["model"].startswith("AR(")
+        assert fit["params"][1] == pytest.approx(0.6, abs=0.1)
+        assert np.all(np.diff(fit["std"]) > 0)
+
+    def test_holt_extends_trend(self):
+        values = 10 + 2.0 * np.arange(60)
+        fit = fit_holt(values, steps=3)
+        np.testing.assert_allclose(fit["mean"], [130, 132, 134], atol=1e-6)
+
+    def test_forecast_bands(self):
+        fit = fit_forecast(ar_series(), steps=6, level=0.8)
+        assert len(fit["mean"]) == len(fit["lower"]) == len(fit["upper"]) == 6
+        assert all(lo < mid < hi for lo, mid, hi in zip(fit["lower"], fit["mean"], fit["upper"]))
+        with pytest.raises(ValueError):
+            fit_forecast(np.arange(5.0), steps=6)
+
+
+class TestForecastEngine:
+    """Test batch runs, persistence and incremental refits."""
+
+    def test_run_stores_forecasts(self, engine):
+        stats = engine.run(["MONTHLY", "QUARTERLY", "DAILY", "SHORT"])
+        assert (stats.checked, stats.fitted, stats.failed) == (4, 3, 1)
+
+        monthly = engine.get_forecast("MONTHLY")
+        assert len(monthly) == 12
+        assert monthly.index[0] == pd.Timestamp("2025-01-01")
+        assert (monthly["lower"] < monthly["upper"]).all()
+        assert monthly.attrs["data_version"] == engine.miner.get_series_versions(["MONTHLY"])["MONTHLY"]
+
+        quarterly = engine.get_forecast("QUARTERLY")
+        assert quarterly.index.tolist() == list(pd.date_range("2010-01-01", periods=4, freq="QS"))
+        # Daily data is forecast from its monthly rollup
+        assert engine.get_forecast("DAILY").index.day.tolist() == [1] * 12
+        assert engine.get_forecast("SHORT") is None
+
+    def test_refits_only_changed_series(self, engine, catalog):
+        engine.run(["MONTHLY", "QUARTERLY"])
+        assert engine.run(["MONTHLY", "QUARTERLY"]).fitted == 0
+
+        engine.miner._cache_series("QUARTERLY", catalog["QUARTERLY"] * 2)
+        assert engine.to_refit(["MONTHLY", "QUARTERLY"]) == ["QUARTERLY"]
+        stats = engine.run(["MONTHLY", "QUARTERLY"], refresh=False)
+        assert (stats.fitted, stats.unchanged) == (1, 1)
+        assert engine.get_forecast("QUARTERLY")["mean"].iloc[0] > 340
+
+    def test_process_pool(self, engine):
+        engine.processes = 2
+        assert engine.run(["MONTHLY", "QUARTERLY", "DAILY"]).fitted == 3
+
+    def test_load_forecast_before_any_run(self, temp_config_dir):
+        db_path = temp_config_dir / "empty.db"
+        sqlite3.connect(db_path).close()
+        assert load_forecast(db_path, "GDP") is None
+
+    def test_dashboard_payload_includes_forecast(self, engine):
+        cache = FigureCache()
+        assert cached_series_payload(engine.miner, "MONTHLY", cache=cache)["forecast"] is None
+        engine.run(["MONTHLY"])
+        payload = cached_series_payload(engine.miner, "MONTHLY", cache=cache)
+        assert set(payload["forecast"]) == {"x", "mean", "lower", "upper", "model"}
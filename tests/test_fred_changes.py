@@ -0,0 +1,120 @@
+"""Tests for FRED change detection."""
+
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+
+from app.data.fred_changes import FREDChangeDetector
+
+UPSTREAM = {"GDP": "2024-01-25 07:51:02-06", "UNRATE": "2024-02-02 07:44:01-06"}
+
+
+@pytest.fixture
+def cached_miner(cached_miner, mock_fred_api, sample_fred_series):
+    """The series in ``UPSTREAM`` cached with their upstream ``last_updated``."""
+    def metadata(series_id):
+        return pd.Series({"title": series_id, "last_updated": UPSTREAM[series_id]})
+
+    miner = cached_miner(sample_fred_series, metadata, cache=UPSTREAM)
+    mock_fred_api.return_value.get_series.reset_mock()
+    return miner
+
+
+class FakeFRED:
+    """Serves series metadata and the updates feed from ``UPSTREAM``."""
+
+    def __init__(self, upstream, feed=()):
+        self.upstream = dict(upstream)
+        self.feed = list(feed)
+        self.calls = []
+
+    def __call__(self, path, **params):
+        self.calls.append(path)
+        if path == "series":
+            series_id = params["series_id"]
+            return {"seriess": [{"id": series_id, "last_updated": self.upstream[series_id]}]}
+        if path == "series/updates":
+            ids = self.feed[params["offset"]:params["offset"] + params["limit"]]
+            return {"count": len(self.feed),
+                    "seriess": [{"id": i, "last_updated": self.upstream.get(i, "new")} for i in ids]}
+        raise AssertionError(path)
+
+
+@pytest.fixture
+def detector(cached_miner):
+    return FREDChangeDetector(cached_miner)
+
+
+def age_cache(miner, hours=48):
+    """Make every cached series older than the wall-clock expiry."""
+    old = (datetime.now() - timedelta(hours=hours)).isoformat()
+    with sqlite3.connect(miner.db_path) as conn:
+        conn.execute("UPDATE series_metadata SET last_updated = ?", (old,))
+
+
+class TestFREDChangeDetector:
+    """Test that only changed series are invalidated."""
+
+    def test_first_run_compares_metadata(self, detector, cached_miner):
+        detector.miner.request_json = FakeFRED({**UPSTREAM, "GDP": "2024-02-29 07:51:02-06"})
+        stats = detector.run(refresh=False)
+        assert stats.method == "metadata"
+        assert stats.checked == 2 and stats.requests == 2
+        assert detector.dirty_series() == ["GDP"]
+        assert detector.last_polled() is not None
+
+    def test_unchanged_series_serve_from_cache_indefinitely(self, detector, cached_miner):
+        detector.miner.request_json = FakeFRED(UPSTREAM)
+        detector.run()
+        age_cache(cached_miner, hours=24 * 30)
+        assert cached_miner.series_to_refresh(list(UPSTREAM)) == []
+        cached_miner.get_series("UNRATE")
+        cached_miner.fred.get_series.assert_not_called()
+
+    def test_unchecked_series_still_expire(self, cached_miner):
+        age_cache(cached_miner)
+        assert cached_miner.series_to_refresh(list(UPSTREAM)) == list(UPSTREAM)
+
+    def test_feed_refreshes_only_changed(self, detector, cached_miner):
+        detector.miner.request_json = FakeFRED(UPSTREAM)
+        detector.run()
+
+        changed = {**UPSTREAM, "UNRATE": "2024-03-08 07:44:01-06"}
+        fake = FakeFRED(changed, feed=["UNRATE", "PAYEMS", "CPIAUCSL"])
+        detector.miner.request_json = fake
+        cached_miner.fred.get_series_info.side_effect = lambda series_id: pd.Series(
+            {"title": series_id, "last_updated": changed[series_id]})
+        stats = detector.run()
+
+        assert stats.method == "feed" and stats.changed == 1 and stats.refreshed == 1
+        assert fake.calls == ["series/updates"]
+        cached_miner.fred.get_series.assert_called_once()
+        assert cached_miner.fred.get_series.call_args[0][0] == "UNRATE"
+        assert detector.dirty_series() == []
+
+    def test_feed_pages(self, detector, cached_miner, monkeypatch):
+        monkeypatch.setattr("app.data.fred_changes.PAGE_SIZE", 2)
+        with sqlite3.connect(cached_miner.db_path) as conn:
+            detector._set_polled(conn, datetime.now(timezone.utc))
+        fake = FakeFRED({**UPSTREAM, "GDP": "later"}, feed=["A", "B", "C", "D", "GDP"])
+        detector.miner.request_json = fake
+        assert detector.run(refresh=False).changed == 1
+        assert fake.calls == ["series/updates"] * 3
+
+    def test_stale_poll_falls_back_to_metadata(self, detector, cached_miner):
+        with sqlite3.connect(cached_miner.db_path) as conn:
+            detector._set_polled(conn, datetime.now(timezone.utc) - timedelta(days=30))
+        detector.miner.request_json = FakeFRED(UPSTREAM)
+        assert detector.run(refresh=False).method == "metadata"
+
+    def test_other_sources_are_not_tracked(self, detector, cached_miner, sample_fred_series):
+        cached_miner.engine.write("coingecko", "bitcoin", sample_fred_series)
+        detector.miner.request_json = FakeFRED(UPSTREAM)
+        stats = detector.run(refresh=False)
+        assert stats.checked == len(UPSTREAM) and detector.last_polled() is not None
+        with sqlite3.connect(cached_miner.db_path) as conn:
+            conn.execute("UPDATE series_updates SET dirty = 1")
+        assert detector.dirty_series() == sorted(UPSTREAM)
+        assert detector.run(refresh=False).method == "feed"
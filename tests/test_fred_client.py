@@ -260,4 +260,72 @@ class TestFREDDataMiner:
         result = miner.get_series("GDP")
 
         mock_fred_api.return_value.get_series.assert_called_once()
-        pd.testing.assert_series_equal(result, sample_fred_series)
\ No newline at end of file
+        pd.testing.assert_series_equal(result, sample_fred_series)
+
+class TestSeriesVersions:
+    """Test content versions recorded for cached series."""
+
+    def test_version_recorded_on_cache(self, fred_miner, sample_fred_series, sample_fred_metadata):
+        """Test that fetching a series records its content version."""
+        fred_miner.fred.get_series.return_value = sample_fred_series
+        fred_miner.fred.get_series_info.return_value = sample_fred_metadata
+
+        assert fred_miner.get_series_versions(["GDP"]) == {}
+        fred_miner.get_series("GDP")
+
+        versions = fred_miner.get_series_versions(["GDP", "UNRATE"])
+        assert list(versions) == ["GDP"]
+
+    def test_version_changes_only_with_content(self, fred_miner, sample_fred_series, sample_fred_metadata):
+        """Test that re-caching identical data keeps the version stable."""
+        fred_miner.fred.get_series_info.return_value = sample_fred_metadata
+        fred_miner.fred.get_series.return_value = sample_fred_series
+        fred_miner.get_series("GDP")
+        first = fred_miner.get_series_versions(["GDP"])["GDP"]
+
+        fred_miner.get_series("GDP", force_refresh=True)
+        assert fred_miner.get_series_versions(["GDP"])["GDP"] == first
+
+        fred_miner.fred.get_series.return_value = sample_fred_series * 1.01
+        fred_miner.get_series("GDP", force_refresh=True)
+        assert fred_miner.get_series_versions(["GDP"])["GDP"] != first
+
+
+class TestBatchRead:
+    """Test loading several cached series in one batch."""
+
+    @pytest.fixture
+    def panel(self, fred_miner, sample_fred_metadata):
+        ids = [f"S{i:02d}" for i in range(30)]
+        for i, series_id in enumerate(ids):
+            # Series cover different, overlapping date ranges
+            index = pd.date_range("2000-01-01", periods=120 + i, freq="MS", name="date")
+            data = pd.Series(range(len(index)), index=index, dtype=float) * (i + 1)
+            fred_miner._cache_series(series_id, data)
+            fred_miner._cache_metadata(series_id, sample_fred_metadata)
+        return ids
+
+    def test_matches_per_series_reads(self, fred_miner, mock_fred_api, panel):
+        ids = list(reversed(panel))
+        result = fred_miner.get_multiple_series(ids, start_date="2005-01-01")
+        mock_fred_api.return_value.get_series.assert_not_called()
+
+        expected = pd.DataFrame({
+            series_id: fred_miner._get_cached_series(series_id, "2005-01-01", None)
+            for series_id in ids
+        })
+        assert list(result.columns) == ids
+        pd.testing.assert_frame_equal(result, expected, check_freq=False)
+
+    def test_fetches_only_missing_and_stale(self, fred_miner, mock_fred_api, panel,
+                                            sample_fred_series, sample_fred_metadata):
+        with sqlite3.connect(fred_miner.db_path) as conn:
+            conn.execute("UPDATE series_updates SET dirty = 1 WHERE series_id = 'S05'")
+        mock_fred_api.return_value.get_series.return_value = sample_fred_series
+        mock_fred_api.return_value.get_series_info.return_value = sample_fred_metadata
+
+        result = fred_miner.get_multiple_series(["S01", "NEW", "S05"])
+        fetched = [call.args[0] for call in mock_fred_api.return_value.get_series.call_args_list]
+        assert fetched == ["NEW", "S05"]
+        assert list(result.columns) == ["S01", "NEW", "S05"]
+        assert result.index.is_monotonic_increasing
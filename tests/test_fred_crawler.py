@@ -0,0 +1,159 @@
+"""Tests for the FRED catalog crawler."""
+
+import sqlite3
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from app.data import fred_crawler
+from app.data.fred_changes import FREDChangeDetector
+from app.data.fred_crawler import FREDCrawler
+
+CHILDREN = {"0": [1, 2], "1": [], "2": []}
+CATEGORY_SERIES = {"0": [], "1": ["A", "B", "C"], "2": ["D"]}
+RELEASE_SERIES = {"10": ["A", "E"]}
+
+
+def series_info(series_id):
+    return {"id": series_id, "title": f"Series {series_id}", "units": "Index",
+            "frequency": "Monthly", "observation_start": "2020-01-01",
+            "observation_end": "2020-03-01"}
+
+
+def page(ids, offset, limit):
+    return {"count": len(ids), "seriess": [series_info(i) for i in ids[offset:offset + limit]]}
+
+
+class FakeFRED:
+    """Answers crawler requests from the tables above."""
+
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = set(fail)
+        self.lock = threading.Lock()
+
+    def __call__(self, path, **params):
+        key = (path, str(params.get("category_id") or params.get("release_id")
+                         or params.get("series_id") or ""))
+        with self.lock:
+            self.calls.append(key)
+        if key in self.fail:
+            raise OSError("HTTP Error 500")
+        offset, limit = params.get("offset", 0), params.get("limit", 1000)
+        if path == "category/children":
+            return {"categories": [{"id": c} for c in CHILDREN[key[1]]]}
+        if path == "category/series":
+            return page(CATEGORY_SERIES[key[1]], offset, limit)
+        if path == "releases":
+            return {"count": 1, "releases": [{"id": 10}]}
+        if path == "release/series":
+            return page(RELEASE_SERIES[key[1]], offset, limit)
+        if path == "series/observations":
+            return {"observations": [{"date": "2020-01-01", "value": "1.5"},
+                                     {"date": "2020-02-01", "value": "."},
+                                     {"date": "2020-03-01", "value": "2.5"}]}
+        raise AssertionError(path)
+
+
+@pytest.fixture
+def crawler(fred_miner, monkeypatch):
+    monkeypatch.setattr(fred_crawler, "PAGE_SIZE", 2)
+    return FREDCrawler(fred_miner, workers=4, max_attempts=2)
+
+
+def catalog(miner):
+    with sqlite3.connect(miner.db_path) as conn:
+        return {row[0] for row in conn.execute("SELECT series_id FROM series_metadata")}
+
+
+class TestFREDCrawler:
+    """Test discovery, checkpointing and resumption."""
+
+    def test_discovers_catalog(self, crawler, fred_miner):
+        fake = FakeFRED()
+        crawler._get = fake
+        stats = crawler.crawl()
+        assert catalog(fred_miner) == {"A", "B", "C", "D", "E"}
+        # Category 1 has three series, so its listing takes two pages.
+        assert fake.calls.count(("category/series", "1")) == 2
+        assert stats.failed == 0 and stats.observations == 0
+        assert crawler.progress() == {"done": stats.tasks}
+        assert fred_miner.get_series_metadata("A")["last_updated"] is None
+
+    def test_fetches_each_series_once(self, crawler, fred_miner):
+        crawler.fetch_observations = True
+        fake = FakeFRED()
+        crawler._get = fake
+        stats = crawler.crawl()
+        assert stats.observations == 5
+        assert sorted(k for p, k in fake.calls if p == "series/observations") == list("ABCDE")
+        data = fred_miner.get_series("A")
+        assert data.tolist() == [1.5, 2.5]
+        fred_miner.fred.get_series.assert_not_called()
+
+    def test_resumes_after_failure(self, crawler, fred_miner):
+        crawler._get = FakeFRED(fail={("category/children", "2")})
+        stats = crawler.crawl()
+        assert stats.failed == 1
+        assert crawler.progress()["failed"] == 1
+        assert "D" not in catalog(fred_miner)
+
+        # Finished work is not repeated; failed tasks wait for retry_failed.
+        fake = FakeFRED()
+        crawler._get = fake
+        assert crawler.crawl().tasks == 0
+        assert fake.calls == []
+        crawler.crawl(retry_failed=True)
+        assert fake.calls[0] == ("category/children", "2")
+        assert "D" in catalog(fred_miner)
+        assert set(crawler.progress()) == {"done"}
+
+    def test_interrupted_pending_tasks_resume(self, crawler, fred_miner):
+        with sqlite3.connect(fred_miner.db_path) as conn:
+            crawler._add_tasks(conn, [("release_series", "10", 0)])
+        fake = FakeFRED()
+        crawler._get = fake
+        crawler.crawl(categories=[], releases=False)
+        assert fake.calls == [("release/series", "10")]
+        assert catalog(fred_miner) == {"A", "E"}
+
+    def test_crawl_keeps_cache_freshness(self, crawler, fred_miner, sample_fred_series,
+                                         sample_fred_metadata):
+        fred_miner._cache_series("A", sample_fred_series)
+        fred_miner._cache_metadata("A", sample_fred_metadata)
+        cached_at = fred_miner.get_series_metadata("A")["last_updated"]
+        crawler._get = FakeFRED()
+        crawler.crawl()
+        metadata = fred_miner.get_series_metadata("A")
+        assert metadata["last_updated"] == cached_at
+        assert metadata["title"] == "Series A"
+
+    def test_catalog_only_series_are_stale(self, crawler, fred_miner):
+        crawler._get = FakeFRED()
+        crawler.crawl()
+        assert fred_miner.series_to_refresh(["A"]) == ["A"]
+
+    def test_failed_write_is_not_checkpointed(self, crawler, fred_miner):
+        crawler.fetch_observations = True
+        crawler._get = FakeFRED()
+        store = fred_miner.store_series
+
+        def locked(series_id, data):
+            if series_id == "A":
+                raise sqlite3.OperationalError("database is locked")
+            store(series_id, data)
+
+        fred_miner.store_series = locked
+        stats = crawler.crawl()
+        assert stats.failed == 1 and stats.observations == 4
+        assert crawler.progress()["failed"] == 1
+        assert fred_miner.get_series_metadata("A")["last_updated"] is None
+
+    def test_requests_share_the_miner_limiter(self, fred_miner):
+        fred_miner.rate_limiter = Mock()
+        fred_miner.transport = Mock()
+        fred_miner.transport.get_json.return_value = {}
+        FREDCrawler(fred_miner)._get("releases")
+        FREDChangeDetector(fred_miner)._get("series/updates")
+        assert fred_miner.rate_limiter.acquire.call_count == 2
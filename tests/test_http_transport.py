@@ -0,0 +1,316 @@
+"""Tests for the shared HTTP transport."""
+
+import asyncio
+import gzip
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest.mock import patch
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from app.data.fred_client import FREDDataMiner
+from app.data.rate_limit import RateLimiter
+from app.data.http_transport import (
+    CircuitBreaker, CircuitOpen, DeadlineExceeded, HTTPTransport, parse_retry_after,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def scripted(*responses):
+    """MockTransport answering with each response (or raising it) in turn."""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        item = responses[min(len(calls), len(responses)) - 1]
+        if isinstance(item, BaseException):
+            raise item
+        return item
+
+    return httpx.MockTransport(handler), calls
+
+
+def make_transport(mock, clock=None, **kwargs):
+    clock = clock or FakeClock()
+    breaker = kwargs.pop("breaker", None) or CircuitBreaker(clock=clock.time)
+    return HTTPTransport(transport=mock, clock=clock.time, sleep=clock.sleep,
+                         breaker=breaker, **kwargs)
+
+
+class TestRetries:
+    """Test retry and backoff behaviour."""
+
+    def test_retries_transient_errors(self):
+        mock, calls = scripted(httpx.Response(503), httpx.ConnectError("refused"),
+                               httpx.Response(200, json={"ok": True}))
+        clock = FakeClock()
+        transport = make_transport(mock, clock, backoff_base=1.0)
+        assert transport.get_json("http://upstream/x") == {"ok": True}
+        assert len(calls) == 3
+        # Full jitter: each sleep lies within the exponential cap.
+        assert 0 <= clock.sleeps[0] <= 1.0 and 0 <= clock.sleeps[1] <= 2.0
+
+    def test_client_errors_are_not_retried(self):
+        mock, calls = scripted(httpx.Response(404))
+        transport = make_transport(mock)
+        assert transport.request("GET", "http://upstream/x").status_code == 404
+        assert len(calls) == 1
+        assert transport.breaker.state == "closed"
+
+    def test_gives_up_after_max_retries(self):
+        mock, calls = scripted(httpx.Response(500))
+        transport = make_transport(mock, max_retries=2,
+                                   breaker=CircuitBreaker(failure_threshold=10))
+        with pytest.raises(httpx.HTTPStatusError):
+            transport.request("GET", "http://upstream/x")
+        assert len(calls) == 3
+
+    def test_honors_retry_after(self):
+        mock, _ = scripted(httpx.Response(429, headers={"Retry-After": "7"}),
+                           httpx.Response(200))
+        clock = FakeClock()
+        make_transport(mock, clock).request("GET", "http://upstream/x")
+        assert clock.sleeps == [7.0]
+
+    def test_retry_after_beyond_deadline(self):
+        mock, calls = scripted(httpx.Response(429, headers={"Retry-After": "120"}))
+        with pytest.raises(DeadlineExceeded):
+            make_transport(mock, deadline=30).request("GET", "http://upstream/x")
+        assert len(calls) == 1
+
+    def test_attempt_timeout_capped_by_deadline(self):
+        mock, calls = scripted(httpx.Response(200))
+        make_transport(mock, timeout=10).request("GET", "http://upstream/x", deadline=2.5)
+        assert calls[0].extensions["timeout"]["read"] == 2.5
+
+    def test_messages_leave_out_query_strings(self, caplog):
+        mock, _ = scripted(httpx.Response(503))
+        transport = make_transport(mock, max_retries=2,
+                                   breaker=CircuitBreaker(failure_threshold=10))
+        with caplog.at_level("INFO"), pytest.raises(httpx.HTTPStatusError) as raised:
+            transport.get_json("http://upstream/x?series_id=GDP", params={"api_key": "SECRET"})
+        assert "SECRET" not in str(raised.value) and "GDP" not in str(raised.value)
+        assert "Retrying" in caplog.text and "SECRET" not in caplog.text
+
+        mock, _ = scripted(httpx.Response(403))
+        with pytest.raises(httpx.HTTPStatusError) as raised:
+            make_transport(mock).get_json("http://upstream/x", params={"api_key": "SECRET"})
+        assert "SECRET" not in str(raised.value)
+
+    def test_parse_retry_after(self):
+        now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        later = format_datetime(now + timedelta(seconds=90), usegmt=True)
+        assert parse_retry_after(later, now=now) == 90
+        assert parse_retry_after("5") == 5
+        assert parse_retry_after("soon") is None
+
+
+class TestCircuitBreaker:
+    """Test failing fast against a degraded upstream."""
+
+    def test_opens_and_recovers(self):
+        clock = FakeClock()
+        mock, calls = scripted(httpx.Response(503), httpx.Response(503), httpx.Response(200))
+        transport = make_transport(
+            mock, clock, max_retries=0,
+            breaker=CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock.time))
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                transport.request("GET", "http://upstream/x")
+        with pytest.raises(CircuitOpen):
+            transport.request("GET", "http://upstream/x")
+        assert len(calls) == 2
+
+        clock.now += 31
+        assert transport.breaker.state == "half-open"
+        assert transport.request("GET", "http://upstream/x").status_code == 200
+        assert transport.breaker.state == "closed"
+
+    def test_failed_trial_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock.time)
+        breaker.record_failure()
+        clock.now += 10
+        breaker.allow()
+        with pytest.raises(CircuitOpen):
+            breaker.allow()  # only one trial at a time
+        breaker.record_failure()
+        assert breaker.state == "open"
+
+    def test_expired_deadline_does_not_strand_trial(self):
+        clock = FakeClock()
+        mock, calls = scripted(httpx.Response(200))
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock.time)
+        breaker.record_failure()
+        clock.now += 10
+        transport = make_transport(mock, clock, breaker=breaker)
+        with pytest.raises(DeadlineExceeded):
+            transport.request("GET", "http://upstream/x", deadline=0)
+        assert transport.request("GET", "http://upstream/x").status_code == 200
+        assert breaker.state == "closed" and len(calls) == 1
+
+    def test_interrupted_trial_reopens(self):
+        clock = FakeClock()
+        mock, _ = scripted(KeyboardInterrupt())
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock.time)
+        breaker.record_failure()
+        clock.now += 10
+        with pytest.raises(KeyboardInterrupt):
+            make_transport(mock, clock, breaker=breaker).request("GET", "http://upstream/x")
+        assert breaker.state == "open"
+
+
+class TestStream:
+    """Test streamed responses."""
+
+    def test_open_retries_then_reads_body(self):
+        body = gzip.compress(b"0123456789" * 10)
+        mock, calls = scripted(httpx.Response(503), httpx.Response(
+            200, content=body, headers={"Content-Encoding": "gzip"}))
+        reader = make_transport(mock).open("GET", "http://upstream/x")
+        assert reader.read(15) == b"012345678901234"
+        assert reader.read() == (b"0123456789" * 10)[15:]
+        assert reader.read(10) == b""
+        reader.close()
+        assert len(calls) == 2 and reader.response.is_closed
+
+    def test_open_raises_on_http_errors(self):
+        mock, _ = scripted(httpx.Response(404))
+        with pytest.raises(httpx.HTTPStatusError):
+            make_transport(mock).open("GET", "http://upstream/x")
+
+
+class TestAsync:
+    """Test requests made from an event loop."""
+
+    def test_retries_transient_errors(self):
+        mock, calls = scripted(httpx.Response(503), httpx.Response(200, json={"ok": True}))
+        transport = make_transport(mock, backoff_base=0.001)
+
+        async def run():
+            try:
+                return await transport.aget_json("http://upstream/x")
+            finally:
+                await transport.aclose()
+
+        assert asyncio.run(run()) == {"ok": True}
+        assert len(calls) == 2
+
+    def test_shares_breaker_with_sync_requests(self):
+        clock = FakeClock()
+        mock, calls = scripted(httpx.Response(503))
+        transport = make_transport(
+            mock, clock, max_retries=0,
+            breaker=CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock.time))
+        with pytest.raises(httpx.HTTPStatusError):
+            transport.request("GET", "http://upstream/x")
+
+        async def run():
+            try:
+                await transport.arequest("GET", "http://upstream/x")
+            finally:
+                await transport.aclose()
+
+        with pytest.raises(CircuitOpen):
+            asyncio.run(run())
+        assert len(calls) == 1
+
+
+OBSERVATIONS = ('<observations><observation date="2020-01-01" value="1.5"/>'
+                '<observation date="2020-02-01" value="2.5"/></observations>')
+INFO = ('<seriess><series id="GDP" title="GDP" units="Index" frequency="Monthly" '
+        'observation_start="2020-01-01" observation_end="2020-02-01" '
+        'last_updated="2024-01-01 07:00:00-06"/></seriess>')
+
+
+class TestFREDTransport:
+    """Test FRED requests through the transport."""
+
+    @pytest.fixture
+    def fred_routes(self):
+        state = {"down": False, "requests": []}
+
+        def handler(request):
+            state["requests"].append(request)
+            if state["down"]:
+                return httpx.Response(503)
+            body = OBSERVATIONS if request.url.path.endswith("/observations") else INFO
+            return httpx.Response(200, text=body)
+
+        return state, httpx.MockTransport(handler)
+
+    def make_miner(self, mock, temp_config_dir, clock, api_key="key"):
+        transport = make_transport(
+            mock, clock, max_retries=1,
+            breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60, clock=clock.time))
+        with patch("app.data.fred_client.get_api_key", return_value=api_key):
+            return FREDDataMiner(cache_dir=str(temp_config_dir / "cache"),
+                                 base_url="http://fred.test/fred", transport=transport,
+                                 rate_limiter=RateLimiter(10000))
+
+    def test_get_series_uses_transport(self, fred_routes, temp_config_dir):
+        state, mock = fred_routes
+        miner = self.make_miner(mock, temp_config_dir, FakeClock())
+        data = miner.get_series("GDP", force_refresh=True)
+        assert data.tolist() == [1.5, 2.5]
+        assert miner.get_series_metadata("GDP")["title"] == "GDP"
+        assert {r.url.params["api_key"] for r in state["requests"]} == {"key"}
+        assert state["requests"][0].url.params["series_id"] == "GDP"
+
+    def test_api_key_not_logged(self, fred_routes, temp_config_dir, caplog):
+        state, mock = fred_routes
+        miner = self.make_miner(mock, temp_config_dir, FakeClock(), api_key="SECRET")
+        state["down"] = True
+        with caplog.at_level("INFO"), pytest.raises(Exception):
+            miner.get_series("GDP", force_refresh=True)
+        assert "Retrying" in caplog.text and "SECRET" not in caplog.text
+        assert state["requests"][0].url.params["api_key"] == "SECRET"
+
+    def test_open_circuit_falls_back_to_stale_cache(self, fred_routes, temp_config_dir):
+        state, mock = fred_routes
+        clock = FakeClock()
+        miner = self.make_miner(mock, temp_config_dir, clock)
+        miner.get_series("GDP", force_refresh=True)
+
+        state["down"] = True
+        assert miner.get_series("GDP", force_refresh=True).tolist() == [1.5, 2.5]
+        sent = len(state["requests"])
+        # The circuit is now open: no further upstream requests.
+        assert miner.get_series("GDP", force_refresh=True).tolist() == [1.5, 2.5]
+        assert len(state["requests"]) == sent
+        assert miner.transport.breaker.state == "open"
+
+    @pytest.mark.parametrize("response, message", [
+        (httpx.Response(400, text='<error code="400" message="Bad Request.  The series does '
+                                  'not exist."/>', headers={"Content-Type": "text/xml"}),
+         "The series does not exist"),
+        (httpx.Response(403, text="<html><body>Forbidden</body></html>",
+                        headers={"Content-Type": "text/html"}), "HTTP 403"),
+        (httpx.Response(404), "HTTP 404"),
+        (httpx.Response(200, text="<html>maintenance"), "unreadable response"),
+    ])
+    def test_errors_raise_value_error(self, temp_config_dir, response, message):
+        mock, _ = scripted(response)
+        miner = self.make_miner(mock, temp_config_dir, FakeClock())
+        with pytest.raises(ValueError, match=message):
+            miner.fetch_series("GDP")
+
+    def test_unsupported_fredapi_rejected(self, fred_routes, temp_config_dir):
+        _, mock = fred_routes
+        with patch("app.data.fred_client.Fred") as fred, pytest.raises(ImportError):
+            del fred.return_value._Fred__fetch_data
+            self.make_miner(mock, temp_config_dir, FakeClock())
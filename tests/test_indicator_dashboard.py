@@ -0,0 +1,174 @@
+"""Tests for the category-tabbed indicator dashboard."""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from dash import Dash, html
+
+from app.dash.charts import recession_periods, series_payload
+from app.dash.compare import COMPARE_TAB
+from app.dash.figure_cache import get_figure_cache
+from app.dash.indicators import (
+    DATA_TYPE, DETAIL_TYPE, RECESSION_STORE_ID, RECESSION_TOGGLE_ID, TAB_CONTENT_ID,
+    TABS_ID, WINDOW_TYPE, indicator_dashboard, register_indicator_callbacks,
+)
+from app.data.economic_indicators import INDICATOR_CATEGORIES
+
+
+def match_output(component_type, prop):
+    """Return the wildcard output string Dash uses for MATCH callbacks."""
+    return json.dumps({"index": ["MATCH"], "type": component_type}, separators=(",", ":")) + f".{prop}"
+
+
+@pytest.fixture
+def dashboard_client(fred_miner):
+    """Test client for a Dash app serving the indicator dashboard."""
+    dash_app = Dash(__name__, suppress_callback_exceptions=True)
+    dash_app.layout = html.Div([indicator_dashboard()])
+    register_indicator_callbacks(dash_app, get_miner=lambda: fred_miner, max_points=100)
+    get_figure_cache().clear()
+    return dash_app.server.test_client()
+
+
+def update(client, payload):
+    """POST a callback request and return the decoded response."""
+    response = client.post("/_dash-update-component", json=payload)
+    assert response.status_code == 200, response.data
+    return response.get_json()["response"]
+
+
+def data_request(series_id):
+    """Build the initial data-load payload for one indicator."""
+    store_id = {"type": DATA_TYPE, "index": series_id}
+    return {
+        "output": match_output(DATA_TYPE, "data"),
+        "outputs": {"id": store_id, "property": "data"},
+        "inputs": [{"id": store_id, "property": "id", "value": store_id}],
+        "changedPropIds": [],
+    }
+
+
+def detail_request(series_id, window):
+    """Build the payload asking for a higher-resolution window."""
+    window_id = {"type": WINDOW_TYPE, "index": series_id}
+    return {
+        "output": match_output(DETAIL_TYPE, "data"),
+        "outputs": {"id": {"type": DETAIL_TYPE, "index": series_id}, "property": "data"},
+        "inputs": [{"id": window_id, "property": "data", "value": window}],
+        "state": [{"id": window_id, "property": "id", "value": window_id}],
+        "changedPropIds": [json.dumps(window_id, separators=(",", ":")) + ".data"],
+    }
+
+
+@pytest.fixture
+def daily_series():
+    """Five years of daily observations."""
+    index = pd.date_range("2015-01-01", periods=1826, freq="D", name="date")
+    return pd.Series(np.linspace(1.0, 3.0, 1826), index=index)
+
+
+class TestIndicatorDashboard:
+    """Test lazy per-tab rendering of the indicator dashboard."""
+
+    def test_layout_has_one_tab_per_category(self):
+        """Test that the initial layout contains tabs but no charts."""
+        layout = indicator_dashboard()
+        tabs = next(child for child in layout.children if getattr(child, "id", None) == TABS_ID)
+        content = next(child for child in layout.children if getattr(child, "id", None) == TAB_CONTENT_ID)
+        assert [tab.value for tab in tabs.children] == list(INDICATOR_CATEGORIES) + [COMPARE_TAB]
+        assert content.children is None
+
+    def test_tab_renders_only_its_charts(self, dashboard_client):
+        """Test that selecting a tab creates placeholders for that category."""
+        response = update(dashboard_client, {
+            "output": f"{TAB_CONTENT_ID}.children",
+            "outputs": {"id": TAB_CONTENT_ID, "property": "children"},
+            "inputs": [{"id": TABS_ID, "property": "value", "value": "Housing"}],
+            "changedPropIds": [f"{TABS_ID}.value"],
+        })
+
+        cards = response[TAB_CONTENT_ID]["children"]
+        graph_ids = [card["props"]["children"][0]["props"]["children"]["props"]["id"]["index"]
+                     for card in cards]
+        assert graph_ids == list(INDICATOR_CATEGORIES["Housing"].values())
+
+    def test_chart_data_loads_through_own_callback(self, dashboard_client, fred_miner, daily_series):
+        """Test that each chart fetches its own series once, downsampled."""
+        fred_miner.fred.get_series.return_value = daily_series
+        fred_miner.fred.get_series_info.return_value = pd.Series(
+            {"title": "Housing Starts", "units": "Thousands of Units"}
+        )
+
+        response = update(dashboard_client, data_request("HOUST"))
+        payload = next(iter(response.values()))["data"]
+
+        fred_miner.fred.get_series.assert_called_once_with("HOUST", None, None)
+        assert payload["title"] == "Housing Starts (HOUST)"
+        assert payload["units"] == "Thousands of Units"
+        assert payload["x"]["dtype"] == "f8"
+        assert payload["complete"] is False
+
+    def test_unavailable_data_reports_error(self, dashboard_client, fred_miner):
+        """Test that a failed fetch is passed to the browser as a message."""
+        fred_miner.fred.get_series.side_effect = Exception("API Error")
+
+        response = update(dashboard_client, data_request("PERMIT"))
+        payload = next(iter(response.values()))["data"]
+
+        assert payload["error"] == "Data unavailable"
+
+    def test_detail_window_served_at_full_budget(self, dashboard_client, fred_miner, daily_series):
+        """Test that a zoomed window returns every observation it contains."""
+        fred_miner.fred.get_series.return_value = daily_series
+        fred_miner.fred.get_series_info.return_value = pd.Series({"title": "Test"})
+        start = pd.Timestamp("2016-01-01").value // 10**6
+        end = pd.Timestamp("2016-02-29").value // 10**6
+
+        response = update(dashboard_client, detail_request("DGS10", {"start": start, "end": end}))
+        detail = next(iter(response.values()))["data"]
+
+        assert detail["complete"] is True
+        assert (detail["start"], detail["end"]) == (start, end)
+
+    def test_recessions_loaded_once_when_enabled(self, dashboard_client, fred_miner):
+        """Test that the overlay data is only fetched the first time it is shown."""
+        usrec = pd.Series([0, 1, 1, 0], index=pd.date_range("2020-01-01", periods=4, freq="MS"))
+        fred_miner.fred.get_series.return_value = usrec
+        fred_miner.fred.get_series_info.return_value = pd.Series({"title": "Recession"})
+
+        def toggle(value, periods):
+            return dashboard_client.post("/_dash-update-component", json={
+                "output": f"{RECESSION_STORE_ID}.data",
+                "outputs": {"id": RECESSION_STORE_ID, "property": "data"},
+                "inputs": [{"id": RECESSION_TOGGLE_ID, "property": "value", "value": value}],
+                "state": [{"id": RECESSION_STORE_ID, "property": "data", "value": periods}],
+                "changedPropIds": [f"{RECESSION_TOGGLE_ID}.value"],
+            })
+
+        periods = toggle(["on"], None).get_json()["response"][RECESSION_STORE_ID]["data"]
+        assert len(periods) == 1
+        assert toggle(["on"], periods).status_code == 204
+        fred_miner.fred.get_series.assert_called_once_with("USREC", None, None)
+
+
+class TestPayloads:
+    """Test data payloads shipped to the clientside charts."""
+
+    def test_short_series_complete(self, daily_series):
+        """Test that a series within the budget is marked complete."""
+        payload = series_payload(daily_series.iloc[:100], 200, title="T")
+        assert payload["complete"] is True
+        assert payload["title"] == "T"
+
+    def test_recession_periods(self):
+        """Test converting a 0/1 indicator into shaded spans."""
+        index = pd.date_range("2020-01-01", periods=6, freq="MS")
+        usrec = pd.Series([0, 1, 1, 0, 0, 1], index=index)
+        to_ms = lambda date: float(pd.Timestamp(date).value // 10**6)
+
+        assert recession_periods(usrec) == [
+            [to_ms("2020-02-01"), to_ms("2020-04-01")],
+            [to_ms("2020-06-01"), to_ms("2020-07-01")],
+        ]
@@ -0,0 +1,80 @@
+"""Tests for the correlation and lead/lag analytics."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.data.lead_lag import (
+    LeadLagScanner,
+    correlation_matrix,
+    cross_correlations,
+    transform_panel,
+)
+
+
+@pytest.fixture
+def panel():
+    """Monthly panel where B follows A by three months, with gaps."""
+    rng = np.random.default_rng(7)
+    index = pd.date_range("1990-01-01", periods=240, freq="MS", name="date")
+    a = rng.standard_normal(240)
+    b = np.roll(a, 3) + 0.3 * rng.standard_normal(240)
+    c = rng.standard_normal(240)
+    frame = pd.DataFrame({"A": a, "B": b, "C": c}, index=index)
+    frame.iloc[:20, 2] = np.nan
+    frame.iloc[100:110, 1] = np.nan
+    return frame
+
+
+class TestCorrelations:
+    """Test the vectorized math against pandas."""
+
+    def test_correlation_matrix_matches_pandas(self, panel):
+        pd.testing.assert_frame_equal(correlation_matrix(panel, min_periods=12),
+                                      panel.corr(min_periods=12), atol=1e-10)
+
+    def test_cross_correlations_match_shifted_corr(self, panel):
+        result = cross_correlations(panel, max_lag=6, min_periods=12, workers=2)
+        assert result.xcorr.shape == (3, 3, 13)
+        for i, a in enumerate(panel.columns):
+            for j, b in enumerate(panel.columns):
+                for k, lag in enumerate(result.lags):
+                    expected = panel[a].corr(panel[b].shift(-lag), min_periods=12)
+                    assert result.xcorr[i, j, k] == pytest.approx(expected, abs=1e-9)
+
+    def test_finds_leader(self, panel):
+        result = cross_correlations(panel, max_lag=6)
+        assert result.pair("A", "B").idxmax() == 3
+        best = result.table().iloc[0]
+        assert (best["leader"], best["follower"], best["lag"]) == ("A", "B", 3)
+        assert best["corr"] > 0.9
+        pd.testing.assert_frame_equal(result.matrix(0), correlation_matrix(panel, 24),
+                                      atol=1e-9)
+
+    def test_too_little_overlap_is_nan(self, panel):
+        result = cross_correlations(panel, max_lag=2, min_periods=1000)
+        assert np.isnan(result.xcorr).all()
+        assert result.table().empty
+
+    def test_transform(self, panel):
+        assert transform_panel(panel, "diff")["A"].iloc[1] == pytest.approx(
+            panel["A"].iloc[1] - panel["A"].iloc[0])
+        with pytest.raises(ValueError):
+            transform_panel(panel, "log")
+
+
+class TestLeadLagScanner:
+    """Test panel loading and result caching."""
+
+    def test_scan_is_cached_by_version(self, cached_miner, panel):
+        fred_miner = cached_miner({sid: panel[sid].dropna().cumsum() for sid in panel})
+        scanner = LeadLagScanner(fred_miner, workers=1)
+
+        first = scanner.scan(["A", "B", "C"], max_lag=6)
+        assert scanner.scan(["A", "B", "C"], max_lag=6) is first
+        assert first.pair("A", "B").idxmax() == 3
+
+        fred_miner._cache_series("C", panel["C"].dropna().cumsum() * 2)
+        assert scanner.scan(["A", "B", "C"], max_lag=6) is not first
+        assert scanner.correlations(["A", "B"]).loc["A", "B"] == pytest.approx(
+            first.matrix(0).loc["A", "B"])
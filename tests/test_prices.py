@@ -0,0 +1,210 @@
+"""Tests for the server-side price poller and SSE stream."""
+
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+
+from app.api import init_api
+from app.api.prices import PricePoller, StreamFull, diff_quotes
+
+
+class FakeFeed:
+    """Quote source whose prices the test sets directly."""
+
+    def __init__(self):
+        self.quotes = {}
+        self.calls = 0
+
+    def __call__(self, symbols):
+        self.calls += 1
+        return {s: dict(q) for s, q in self.quotes.items() if s in symbols}
+
+
+def parse(chunk):
+    """Split formatted SSE text into (id, event, data) tuples."""
+    events = []
+    for block in chunk.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if "data" in fields:
+            events.append((fields.get("id"), fields.get("event"), json.loads(fields["data"])))
+    return events
+
+
+@pytest.fixture
+def feed():
+    return FakeFeed()
+
+
+@pytest.fixture
+def poller(feed):
+    # Polls are driven by the tests, not the background thread.
+    with patch.object(PricePoller, "start"):
+        yield PricePoller(feed, ["BTC", "ETH"], history=3, heartbeat=0.01, max_clients=2)
+
+
+class TestPricePoller:
+    """Test polling, fan-out and resume behaviour."""
+
+    def test_diff_quotes(self):
+        previous = {"BTC": {"price": 1.0}, "ETH": {"price": 2.0}}
+        current = {"BTC": {"price": 1.0}, "ETH": {"price": 3.0}, "SOL": {"price": 4.0}}
+        assert diff_quotes(previous, current) == {"ETH": {"price": 3.0}, "SOL": {"price": 4.0}}
+
+    def test_unchanged_poll_publishes_nothing(self, poller, feed):
+        feed.quotes = {"BTC": {"price": 1.0}}
+        assert poller.poll_once() == 1
+        assert poller.poll_once() is None
+
+    def test_snapshot_then_updates(self, poller, feed):
+        feed.quotes = {"BTC": {"price": 1.0}, "ETH": {"price": 2.0}}
+        poller.poll_once()
+
+        stream = poller.subscribe()
+        assert next(stream).startswith("retry:")
+        [(_, event, data)] = parse(next(stream))
+        assert event == "snapshot"
+        assert data == feed.quotes
+
+        feed.quotes["ETH"] = {"price": 2.5}
+        poller.poll_once()
+        [(_, event, data)] = parse(next(stream))
+        assert (event, data) == ("update", {"ETH": {"price": 2.5}})
+        assert next(stream) == ": keep-alive\n\n"
+        stream.close()
+
+    def test_resume_replays_missed_events(self, poller, feed):
+        feed.quotes = {"BTC": {"price": 1.0}}
+        poller.poll_once()
+        stream = poller.subscribe()
+        next(stream)
+        [(last_id, _, _)] = parse(next(stream))
+        stream.close()
+
+        for price in (2.0, 3.0):
+            feed.quotes["BTC"] = {"price": price}
+            poller.poll_once()
+
+        stream = poller.subscribe(last_id)
+        next(stream)
+        events = parse(next(stream))
+        assert [(e, d["BTC"]["price"]) for _, e, d in events] == [("update", 2.0), ("update", 3.0)]
+
+    def test_client_behind_history_gets_snapshot(self, poller, feed):
+        feed.quotes = {"BTC": {"price": 0.0}}
+        poller.poll_once()
+        stream = poller.subscribe()
+        next(stream)
+        next(stream)
+
+        # More updates than the history holds arrive while the client is blocked.
+        for price in range(1, 6):
+            feed.quotes["BTC"] = {"price": float(price)}
+            poller.poll_once()
+
+        [(_, event, data)] = parse(next(stream))
+        assert (event, data) == ("snapshot", {"BTC": {"price": 5.0}})
+
+    def test_unknown_event_id_gets_snapshot(self, poller, feed):
+        feed.quotes = {"BTC": {"price": 1.0}}
+        poller.poll_once()
+        stream = poller.subscribe("0-1")
+        next(stream)
+        assert parse(next(stream))[0][1] == "snapshot"
+
+    def test_max_clients(self, poller):
+        first = poller.subscribe()
+        next(first)
+        poller.subscribe()
+        with pytest.raises(StreamFull):
+            poller.subscribe()
+        first.close()
+        assert poller.clients == 1
+        poller.subscribe()
+
+    def test_fetch_error_keeps_state(self, poller, feed):
+        feed.quotes = {"BTC": {"price": 1.0}}
+        poller.poll_once()
+        with patch.object(poller, "fetch", side_effect=OSError("down")):
+            assert poller.poll_once() is None
+        assert poller._quotes == {"BTC": {"price": 1.0}}
+
+
+class TestAsyncStream:
+    """Test streams consumed on an event loop."""
+
+    def test_snapshot_then_updates(self, poller, feed):
+        feed.quotes = {"BTC": {"price": 1.0}}
+        poller.poll_once()
+
+        async def run():
+            stream = poller.asubscribe()
+            chunks = [await anext(stream), await anext(stream)]
+            feed.quotes["BTC"] = {"price": 2.0}
+            poller.poll_once()
+            chunks.append(await anext(stream))
+            await stream.aclose()
+            return chunks
+
+        retry, snapshot, update = asyncio.run(run())
+        assert retry.startswith("retry:")
+        assert parse(snapshot)[0][1:] == ("snapshot", {"BTC": {"price": 1.0}})
+        assert parse(update)[0][1:] == ("update", {"BTC": {"price": 2.0}})
+        assert poller.clients == 0
+
+    def test_publish_from_poller_thread_wakes_stream(self, poller, feed):
+        feed.quotes = {"BTC": {"price": 1.0}}
+        poller.poll_once()
+        poller.heartbeat = 30
+
+        async def run():
+            stream = poller.asubscribe()
+            await anext(stream)
+            await anext(stream)
+            waiting = asyncio.ensure_future(anext(stream))
+            await asyncio.sleep(0.01)
+            feed.quotes["BTC"] = {"price": 2.0}
+            await asyncio.to_thread(poller.poll_once)
+            chunk = await asyncio.wait_for(waiting, 1)
+            await stream.aclose()
+            return chunk
+
+        assert parse(asyncio.run(run()))[0][1] == "update"
+
+    def test_max_clients(self, poller):
+        async def run():
+            poller.asubscribe()
+            poller.subscribe()
+            with pytest.raises(StreamFull):
+                poller.asubscribe()
+
+        asyncio.run(run())
+
+
+class TestPriceStreamRoute:
+    """Test the SSE endpoint."""
+
+    def test_stream(self, poller, feed):
+        feed.quotes = {"BTC": {"price": 1.0}}
+        poller.poll_once()
+        app = Flask(__name__)
+        init_api(app)
+        with patch("app.api.routes.get_price_poller", return_value=poller):
+            response = app.test_client().get("/api/prices/stream")
+            assert response.mimetype == "text/event-stream"
+            assert response.headers["Cache-Control"] == "no-cache"
+            chunks = response.iter_encoded()
+            next(chunks)
+            assert parse(next(chunks).decode())[0][1] == "snapshot"
+            response.close()
+
+    def test_full(self, poller):
+        app = Flask(__name__)
+        init_api(app)
+        poller.max_clients = 0
+        with patch("app.api.routes.get_price_poller", return_value=poller):
+            response = app.test_client().get("/api/prices/stream")
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "30"
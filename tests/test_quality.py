@@ -0,0 +1,127 @@
+"""Tests for the ingest-time data-quality checks."""
+
+import sqlite3
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from flask import Flask
+
+from app.api import init_api
+from app.dash.charts import cached_series_payload
+from app.dash.figure_cache import FigureCache
+from app.data.quality import check_series, mask_flagged
+
+
+@pytest.fixture
+def monthly():
+    """A noisy monthly random walk with a spike, a level shift and a gap."""
+    rng = np.random.default_rng(0)
+    index = pd.date_range("1950-01-01", periods=600, freq="MS", name="date")
+    values = 100 + np.cumsum(rng.standard_normal(600))
+    values[200] += 40
+    values[400:] += 30
+    return pd.Series(values, index=index).drop(index[[100, 101]])
+
+
+def flagged(report, flag):
+    return report.flags.loc[report.flags["flag"] == flag, "date"].tolist()
+
+
+class TestChecks:
+    """Test the vectorized checks."""
+
+    def test_flags(self, monthly):
+        report = check_series(monthly, "Monthly")
+        assert report.frequency == "M"
+        assert flagged(report, "gap") == [pd.Timestamp("1958-07-01")]
+        assert flagged(report, "outlier") == [pd.Timestamp("1966-09-01")]
+        assert flagged(report, "level_shift") == [pd.Timestamp("1983-05-01")]
+        assert report.counts()["duplicate"] == 0
+
+    def test_clean_random_walk_is_not_flagged(self):
+        rng = np.random.default_rng(1)
+        daily = pd.Series(np.cumsum(rng.standard_normal(5000)),
+                          index=pd.bdate_range("2000-01-03", periods=5000))
+        report = check_series(daily)
+        assert report.frequency == "D"
+        assert report.flags.empty
+
+    def test_duplicates_keep_last_value(self, monthly):
+        data = pd.concat([monthly, pd.Series([-1.0], index=[monthly.index[5]])])
+        report = check_series(data)
+        assert report.data.index.is_unique and report.data.index.is_monotonic_increasing
+        assert report.data.iloc[5] == -1.0
+        assert report.flags.loc[report.flags["flag"] == "duplicate", "score"].tolist() == [2.0]
+
+    def test_frequency_break(self):
+        index = pd.date_range("2000-01-01", periods=48, freq="MS").append(
+            pd.date_range("2004-03-01", periods=12, freq="3MS"))
+        report = check_series(pd.Series(np.arange(60.0), index=index), "Monthly, End of Period")
+        assert flagged(report, "frequency_break") == [pd.Timestamp("2004-03-01")]
+        assert flagged(report, "gap") == []
+
+    def test_short_and_empty_series(self):
+        assert check_series(pd.Series(dtype=float)).flags.empty
+        assert check_series(pd.Series([1.0], index=[pd.Timestamp("2000-01-01")])).frequency is None
+
+    def test_mask_flagged(self, monthly):
+        report = check_series(monthly)
+        frame = pd.DataFrame({"A": report.data, "B": report.data})
+        flags = report.flags.assign(series_id="A")
+        masked = mask_flagged(frame, flags[flags["flag"] == "outlier"])
+        assert masked["A"].isna().sum() == 1 and masked["B"].notna().all()
+
+
+@pytest.fixture
+def miner(cached_miner, sample_fred_metadata, monthly):
+    return cached_miner(monthly, sample_fred_metadata.replace({"Quarterly": "Monthly"}))
+
+
+class TestStoredQuality:
+    """Test the quality tables and the readers built on them."""
+
+    def test_results_stored_on_write(self, miner, monthly):
+        miner.get_series("UNRATE")
+        summary = miner.get_quality("UNRATE")
+        assert summary["observations"] == len(monthly)
+        assert (summary["gap"], summary["outlier"], summary["level_shift"]) == (1, 1, 1)
+
+        flags = miner.get_quality_flags(["UNRATE"], ["outlier", "gap"], start_date="1960-01-01")
+        assert flags["series_id"].tolist() == ["UNRATE"]
+        assert flags["date"].tolist() == [pd.Timestamp("1966-09-01")]
+        assert miner.get_quality("MISSING") is None
+
+    def test_duplicates_no_longer_abort_write(self, miner, monthly):
+        miner._cache_series("DUP", pd.concat([monthly, monthly.iloc[:3]]))
+        assert len(miner._get_cached_series("DUP", None, None)) == len(monthly)
+        assert miner.get_quality("DUP")["duplicate"] == 3
+
+    def test_series_cached_before_checks(self, miner):
+        miner.get_series("UNRATE")
+        with sqlite3.connect(miner.db_path) as conn:
+            conn.execute("DELETE FROM series_quality")
+            conn.execute("DELETE FROM quality_flags")
+        assert len(miner.get_quality_flags(["UNRATE"])) == 3
+
+    def test_api_exclude(self, miner):
+        miner.get_series("UNRATE")
+        app = Flask(__name__)
+        init_api(app)
+        with patch("app.api.routes.get_fred_miner", return_value=miner):
+            client = app.test_client()
+            full = client.get("/api/series/UNRATE").get_json()
+            response = client.get("/api/series/UNRATE?exclude=outlier")
+            assert client.get("/api/series/UNRATE?exclude=typo").status_code == 400
+            assert response.headers["ETag"] != client.get("/api/series/UNRATE").headers["ETag"]
+        assert response.status_code == 200
+        values = response.get_json()["series"]["UNRATE"]
+        assert values.count(None) == full["series"]["UNRATE"].count(None) + 1
+
+    def test_chart_payload_exclude(self, miner, monthly):
+        cache = FigureCache()
+        full = cached_series_payload(miner, "UNRATE", max_points=10_000, cache=cache)
+        cleaned = cached_series_payload(miner, "UNRATE", max_points=10_000, cache=cache,
+                                        exclude=["outlier"])
+        assert len(full["x"]["bdata"]) > len(cleaned["x"]["bdata"])
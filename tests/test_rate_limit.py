@@ -0,0 +1,57 @@
+"""Tests for the shared token-bucket rate limiter."""
+
+import threading
+
+import pytest
+
+from app.data.rate_limit import RateLimiter
+
+
+class FakeClock:
+    """Clock that only advances when the limiter sleeps."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.lock = threading.Lock()
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        with self.lock:
+            self.now = max(self.now, self.now + seconds)
+
+
+class TestRateLimiter:
+    """Test pacing of requests."""
+
+    def test_paces_requests(self):
+        clock = FakeClock()
+        limiter = RateLimiter(10, clock=clock.time, sleep=lambda s: None)
+        waits = [limiter.acquire() for _ in range(5)]
+        # First request is free; each later one queues 0.1s behind the last.
+        assert waits == pytest.approx([0.0, 0.1, 0.2, 0.3, 0.4])
+
+    def test_tokens_refill_while_idle(self):
+        clock = FakeClock()
+        limiter = RateLimiter(10, burst=3, clock=clock.time, sleep=clock.sleep)
+        for _ in range(3):
+            assert limiter.acquire() == 0.0
+        assert limiter.acquire() == pytest.approx(0.1)
+        clock.now += 10
+        assert [limiter.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+
+    def test_shared_between_threads(self):
+        limiter = RateLimiter(1000)
+        waits = []
+        threads = [threading.Thread(target=lambda: waits.append(limiter.acquire()))
+                   for _ in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert sorted(waits)[-1] == pytest.approx(0.019, abs=0.005)
+
+    def test_invalid_rate(self):
+        with pytest.raises(ValueError):
+            RateLimiter(0)
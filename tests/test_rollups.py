@@ -0,0 +1,108 @@
+"""Tests for the precomputed rollup pyramid."""
+
+import sqlite3
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.data.cache_engine import CacheEngine
+from app.data.rollups import LEVELS, choose_level, read_rollup, resolution_for
+
+
+@pytest.fixture
+def engine(temp_config_dir):
+    return CacheEngine(temp_config_dir / "cache")
+
+
+@pytest.fixture
+def daily():
+    """Four years of business-day observations."""
+    index = pd.bdate_range("2020-01-01", "2023-12-31", name="date")
+    values = np.random.default_rng(1).standard_normal(len(index)).cumsum()
+    return pd.Series(values, index=index)
+
+
+def stored(engine, level, key="X"):
+    with sqlite3.connect(engine.db_path) as conn:
+        return read_rollup(conn, key, level)
+
+
+class TestRollups:
+    """Test materialization, incremental updates and level choice."""
+
+    @pytest.mark.parametrize("level", list(LEVELS))
+    def test_matches_resample(self, engine, daily, level):
+        engine.write("fred", "X", daily)
+        rollup = stored(engine, level)
+        expected = daily.resample(LEVELS[level]).agg(["mean", "last", "min", "max", "count"])
+        expected = expected[expected["count"] > 0]
+        pd.testing.assert_frame_equal(rollup, expected, check_freq=False, check_dtype=False,
+                                      check_names=False)
+
+    def test_append_updates_only_touched_bins(self, engine, daily):
+        engine.write("fred", "X", daily)
+        with sqlite3.connect(engine.db_path) as conn:
+            before = dict(conn.execute(
+                "SELECT level || period, rowid FROM series_rollups").fetchall())
+
+        extended = pd.concat([daily, pd.Series([100.0], index=pd.DatetimeIndex(["2024-01-02"]))])
+        revised = extended.copy()
+        revised.iloc[0] = -50.0
+        engine.write("fred", "X", revised)
+
+        with sqlite3.connect(engine.db_path) as conn:
+            after = dict(conn.execute(
+                "SELECT level || period, rowid FROM series_rollups").fetchall())
+        rewritten = {key for key in after if before.get(key) != after[key]}
+        # The new week/month/quarter/year, plus the first bin of each level
+        assert len(rewritten) == 2 * len(LEVELS)
+        assert stored(engine, "A").loc["2024-01-01", "last"] == 100.0
+        assert stored(engine, "M").loc["2020-01-01", "min"] == -50.0
+
+        expected = revised.resample("QS").mean()
+        np.testing.assert_allclose(stored(engine, "Q")["mean"], expected)
+
+    def test_built_lazily_for_older_caches(self, engine, daily):
+        engine.write("fred", "X", daily)
+        with sqlite3.connect(engine.db_path) as conn:
+            conn.execute("DELETE FROM series_rollups")
+
+        class Source:
+            name = "fred"
+
+        rollup = engine.rollup(Source(), "X", "A", start_date="2021-01-01")
+        assert rollup.index.year.tolist() == [2021, 2022, 2023]
+        assert engine.rollup(Source(), "MISSING", "A") is None
+
+    def test_choose_level(self):
+        assert choose_level("Q") == "Q"
+        assert choose_level(timedelta(days=3)) is None
+        assert choose_level("10D") == "W"
+        assert choose_level("45D") == "M"
+        assert choose_level(timedelta(days=400)) == "A"
+        # 60 years in 200 points: quarterly bins are fine enough
+        assert choose_level(resolution_for("1960-01-01", "2020-01-01", 200)) == "Q"
+
+
+class TestMinerRollups:
+    """Test the FRED client's rollup queries."""
+
+    def test_get_rollup_picks_level(self, fred_miner, mock_fred_api, daily, sample_fred_metadata):
+        mock_fred_api.return_value.get_series.return_value = daily
+        mock_fred_api.return_value.get_series_info.return_value = sample_fred_metadata
+        fred_miner.fred = mock_fred_api.return_value
+
+        yearly = fred_miner.get_rollup("X", "400D")
+        assert yearly.attrs["level"] == "A"
+        assert len(yearly) == 4
+        assert mock_fred_api.return_value.get_series.call_count == 1
+
+        raw = fred_miner.get_rollup("X", "1D")
+        assert raw.attrs["level"] == "raw"
+        assert len(raw) == len(daily) and (raw["count"] == 1).all()
+
+        panel = fred_miner.get_rollups(["X", "Y"], "M", stat="max")
+        assert list(panel.columns) == ["X", "Y"]
+        np.testing.assert_allclose(panel["X"], daily.resample("MS").max())
@@ -0,0 +1,126 @@
+"""Tests for typed-array figure encoding and the fast JSON provider."""
+
+import base64
+import json
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from flask import Flask, jsonify
+
+from app.dash import serialization
+from app.dash.charts import series_chart
+from app.dash.serialization import (
+    ORJSON_AVAILABLE, FastJSONProvider, configure_fast_json, dumps,
+    encode_figure_arrays, encode_typed_array, loads,
+)
+
+
+def decode(spec):
+    """Decode a Plotly typed-array spec back into a NumPy array."""
+    dtypes = {"f8": "<f8", "f4": "<f4", "i4": "<i4", "u1": "u1"}
+    return np.frombuffer(base64.b64decode(spec["bdata"]), dtype=dtypes[spec["dtype"]])
+
+
+class TestTypedArrays:
+    """Test typed-array encoding of figure data."""
+
+    def test_float_round_trip(self):
+        """Test that floats are encoded losslessly as f8."""
+        values = np.array([1.5, -2.25, np.nan, 1e300])
+        spec = encode_typed_array(values)
+        assert spec["dtype"] == "f8"
+        np.testing.assert_array_equal(decode(spec), values)
+
+    def test_int64_narrowed(self):
+        """Test that small 64-bit integers become int32 for Plotly.js."""
+        spec = encode_typed_array(np.array([2018, 2019, 2020], dtype=np.int64))
+        assert spec["dtype"] == "i4"
+        np.testing.assert_array_equal(decode(spec), [2018, 2019, 2020])
+
+    def test_dates_become_epoch_millis(self):
+        """Test that datetimes and ISO strings encode as epoch milliseconds."""
+        dates = pd.date_range("2020-01-01", periods=3, freq="D")
+        expected = (dates.asi8 // 10**6).astype(float)
+
+        np.testing.assert_array_equal(decode(encode_typed_array(dates.to_numpy())), expected)
+        np.testing.assert_array_equal(
+            decode(encode_typed_array(["2020-01-01", "2020-01-02", "2020-01-03"])), expected
+        )
+
+    def test_labels_left_alone(self):
+        """Test that categorical labels are not encoded."""
+        labels = ["GDP", "UNRATE"]
+        assert encode_typed_array(labels) is labels
+
+    def test_figure_arrays_encoded(self):
+        """Test that a date-indexed chart gets typed arrays and a date axis."""
+        series = pd.Series([1.0, 2.0, 3.0], name="GDP",
+                           index=pd.date_range("2020-01-01", periods=3, name="date"))
+        fig = encode_figure_arrays(series_chart(series))
+
+        trace = fig["data"][0]
+        assert trace["x"]["dtype"] == "f8"
+        np.testing.assert_array_equal(decode(trace["y"]), [1.0, 2.0, 3.0])
+        assert fig["layout"]["xaxis"]["type"] == "date"
+        assert fig["layout"]["xaxis"]["title"]["text"] == "Date"
+
+    def test_encoded_figure_smaller_than_lists(self):
+        """Test that typed arrays shrink a long series payload."""
+        rng = np.random.default_rng(0)
+        series = pd.Series(rng.standard_normal(5000).cumsum(), name="DGS10",
+                           index=pd.date_range("2000-01-01", periods=5000, name="date"))
+        plain = {"data": [{"x": series.index.strftime("%Y-%m-%d").tolist(), "y": series.tolist()}]}
+        encoded = encode_figure_arrays(plain)
+        assert len(dumps(encoded)) < 0.75 * len(dumps(plain))
+
+
+class TestFastJSON:
+    """Test the JSON encoder plugged into Flask and Dash."""
+
+    def test_dumps_handles_numpy(self):
+        """Test that NumPy values serialize with the fast encoder."""
+        payload = {"values": np.array([1.0, 2.0]), "count": np.int64(2)}
+        assert loads(dumps(payload)) == {"values": [1.0, 2.0], "count": 2}
+
+    @pytest.mark.skipif(not ORJSON_AVAILABLE, reason="orjson not installed")
+    def test_flask_responses_use_orjson(self):
+        """Test that jsonify and debug responses are encoded by orjson."""
+        app = Flask(__name__)
+        configure_fast_json(app)
+        assert isinstance(app.json, FastJSONProvider)
+
+        encode_with = serialization.orjson.dumps
+        with patch("app.dash.serialization.orjson.dumps", wraps=encode_with) as encode:
+            with app.app_context():
+                assert json.loads(jsonify({"a": 1}).get_data()) == {"a": 1}
+            assert encode.call_count == 1
+
+            app.debug = True
+            with app.app_context():
+                body = app.json.response({"a": 1}).get_data(as_text=True)
+            assert encode.call_count == 2
+            assert body == '{\n  "a": 1\n}\n'
+
+    @pytest.mark.skipif(not ORJSON_AVAILABLE, reason="orjson not installed")
+    def test_unsupported_arguments_fall_back(self):
+        """Test that options orjson cannot honour use the standard library."""
+        app = Flask(__name__)
+        configure_fast_json(app)
+        with patch("app.dash.serialization.orjson.dumps") as encode:
+            assert app.json.dumps({"a": 1}, separators=(", ", ": ")) == '{"a": 1}'
+        encode.assert_not_called()
+
+    @pytest.mark.skipif(not ORJSON_AVAILABLE, reason="orjson not installed")
+    def test_flask_provider_round_trip(self):
+        """Test that NumPy values returned by a view survive the round trip."""
+        app = Flask(__name__)
+        configure_fast_json(app)
+
+        @app.route("/data")
+        def data():
+            return {"b": np.float64(1.5), "a": [1, 2]}
+
+        response = app.test_client().get("/data")
+        assert response.get_json() == {"a": [1, 2], "b": 1.5}
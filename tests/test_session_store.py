@@ -0,0 +1,174 @@
+"""Tests for the server-side DataFrame store and the comparison view."""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from dash import Dash, html
+
+from app.dash.compare import (
+    COMPARE_GRAPH_ID, COMPARE_NORMALIZE_ID, COMPARE_PANEL_ID, COMPARE_SERIES_ID,
+    compare_layout, normalize_panel, register_compare_callbacks,
+)
+from app.dash.session_store import PYARROW_AVAILABLE, ServerSideStore
+
+
+@pytest.fixture
+def panel():
+    """A small two-column monthly panel."""
+    index = pd.date_range("2020-01-01", periods=24, freq="MS", name="date")
+    return pd.DataFrame({"UNRATE": np.linspace(3.5, 6.0, 24),
+                         "FEDFUNDS": np.linspace(1.5, 0.1, 24)}, index=index)
+
+
+ENCODINGS = ["pickle"] + (["arrow"] if PYARROW_AVAILABLE else [])
+
+
+class TestServerSideStore:
+    """Test the ServerSideStore class."""
+
+    @pytest.mark.parametrize("encoding", ENCODINGS)
+    def test_round_trip(self, panel, encoding):
+        """Test that stored frames come back unchanged behind a short handle."""
+        store = ServerSideStore(encoding=encoding)
+        handle = store.put(panel, "session-1", "panel", "v1")
+
+        assert isinstance(handle, str) and len(handle) < 32
+        pd.testing.assert_frame_equal(store.get(handle), panel, check_freq=False)
+
+    def test_same_version_reuses_handle(self, panel):
+        """Test that an unchanged result is neither rebuilt nor re-encoded."""
+        store = ServerSideStore()
+        built = []
+
+        def build():
+            built.append(1)
+            return panel
+
+        first = store.get_or_put("session-1", "panel", "v1", build)
+        second = store.get_or_put("session-1", "panel", "v1", build)
+
+        assert first == second
+        assert len(built) == 1
+
+    def test_new_version_replaces_old(self, panel):
+        """Test that a session keeps only the latest version of a result."""
+        store = ServerSideStore()
+        old = store.put(panel, "session-1", "panel", "v1")
+        new = store.put(panel * 2, "session-1", "panel", "v2")
+
+        assert store.get(old) is None
+        assert store.get(new) is not None
+        assert len(store) == 1
+
+    def test_sessions_are_isolated(self, panel):
+        """Test that the same key in different sessions gets different handles."""
+        store = ServerSideStore()
+        assert store.put(panel, "a", "panel", "v1") != store.put(panel, "b", "panel", "v1")
+        assert store.clear_session("a") == 1
+        assert len(store) == 1
+
+    def test_size_limit_evicts_least_recently_used(self, panel):
+        """Test that the byte budget evicts the oldest frames first."""
+        probe = ServerSideStore(encoding="pickle")
+        size = len(probe._encode(panel))
+        store = ServerSideStore(max_bytes=int(size * 2.5), encoding="pickle")
+
+        first = store.put(panel, "a", "panel")
+        second = store.put(panel, "b", "panel")
+        store.get(first)  # 'second' is now least recently used
+        store.put(panel, "c", "panel")
+
+        assert store.get(second) is None
+        assert store.get(first) is not None
+        assert store.size_bytes <= store.max_bytes
+
+    def test_ttl_expiry(self, panel):
+        """Test that idle frames expire."""
+        store = ServerSideStore(ttl_seconds=0.05)
+        handle = store.put(panel, "a", "panel")
+        time.sleep(0.1)
+        assert store.get(handle) is None
+        assert store.size_bytes == 0
+
+    def test_unknown_handle(self):
+        """Test that unknown or empty handles return None."""
+        store = ServerSideStore()
+        assert store.get(None) is None
+        assert store.get("not-a-handle") is None
+
+
+class TestCompareView:
+    """Test the comparison tab callbacks."""
+
+    @pytest.fixture
+    def compare_client(self, fred_miner):
+        """Test client for a Dash app serving only the comparison view."""
+        store = ServerSideStore()
+        dash_app = Dash(__name__, suppress_callback_exceptions=True)
+        dash_app.layout = html.Div([compare_layout()])
+        register_compare_callbacks(dash_app, lambda: fred_miner, "session", store=store)
+        return dash_app.server.test_client(), store
+
+    def test_panel_stays_on_server(self, compare_client, fred_miner, panel):
+        """Test that the browser only receives a handle, not the frame."""
+        client, store = compare_client
+        fred_miner.fred.get_series.side_effect = lambda sid, *args: panel[sid]
+        fred_miner.fred.get_series_info.return_value = pd.Series({"title": "Test"})
+
+        response = client.post("/_dash-update-component", json={
+            "output": f"{COMPARE_PANEL_ID}.data",
+            "outputs": {"id": COMPARE_PANEL_ID, "property": "data"},
+            "inputs": [{"id": COMPARE_SERIES_ID, "property": "value", "value": ["UNRATE", "FEDFUNDS"]}],
+            "state": [{"id": "session", "property": "data", "value": "session-1"}],
+            "changedPropIds": [f"{COMPARE_SERIES_ID}.value"],
+        }).get_json()["response"]
+        panel_ref = response[COMPARE_PANEL_ID]["data"]
+
+        assert set(panel_ref) == {"handle", "series", "session"}
+        assert list(store.get(panel_ref["handle"]).columns) == ["UNRATE", "FEDFUNDS"]
+
+        figure = client.post("/_dash-update-component", json={
+            "output": f"{COMPARE_GRAPH_ID}.figure",
+            "outputs": {"id": COMPARE_GRAPH_ID, "property": "figure"},
+            "inputs": [
+                {"id": COMPARE_PANEL_ID, "property": "data", "value": panel_ref},
+                {"id": COMPARE_NORMALIZE_ID, "property": "value", "value": "zscore"},
+            ],
+            "changedPropIds": [f"{COMPARE_NORMALIZE_ID}.value"],
+        }).get_json()["response"][COMPARE_GRAPH_ID]["figure"]
+
+        assert [trace["name"] for trace in figure["data"]] == ["UNRATE", "FEDFUNDS"]
+
+    def test_no_session_skips_store(self, compare_client, fred_miner, panel):
+        """Test that a panel without a session is built inline, not stored."""
+        client, store = compare_client
+        fred_miner.fred.get_series.side_effect = lambda sid, *args: panel[sid]
+        fred_miner.fred.get_series_info.return_value = pd.Series({"title": "Test"})
+
+        panel_ref = client.post("/_dash-update-component", json={
+            "output": f"{COMPARE_PANEL_ID}.data",
+            "outputs": {"id": COMPARE_PANEL_ID, "property": "data"},
+            "inputs": [{"id": COMPARE_SERIES_ID, "property": "value", "value": ["UNRATE"]}],
+            "state": [{"id": "session", "property": "data", "value": None}],
+            "changedPropIds": [f"{COMPARE_SERIES_ID}.value"],
+        }).get_json()["response"][COMPARE_PANEL_ID]["data"]
+        assert panel_ref["handle"] is None
+
+        figure = client.post("/_dash-update-component", json={
+            "output": f"{COMPARE_GRAPH_ID}.figure",
+            "outputs": {"id": COMPARE_GRAPH_ID, "property": "figure"},
+            "inputs": [
+                {"id": COMPARE_PANEL_ID, "property": "data", "value": panel_ref},
+                {"id": COMPARE_NORMALIZE_ID, "property": "value", "value": "level"},
+            ],
+            "changedPropIds": [f"{COMPARE_NORMALIZE_ID}.value"],
+        }).get_json()["response"][COMPARE_GRAPH_ID]["figure"]
+        assert [trace["name"] for trace in figure["data"]] == ["UNRATE"]
+        assert len(store) == 0
+
+
+        """Test rebasing every column to 100 at its first observation."""
+        rebased = normalize_panel(panel, "index")
+        assert (rebased.iloc[0] == 100).all()
@@ -0,0 +1,86 @@
+"""Tests for cache snapshot export and restore."""
+
+import io
+import json
+import sqlite3
+
+import pytest
+
+from app.data.edgar_client import EDGARClient
+from app.data.snapshot import (
+    SnapshotError,
+    export_snapshot,
+    manifest_path,
+    restore_snapshot,
+    verify_snapshot,
+)
+
+
+@pytest.fixture
+def cache(cached_miner, sample_fred_series):
+    """A cache holding two series."""
+    return cached_miner(sample_fred_series, cache=["GDP", "GDPC1"])
+
+
+def series_in(db_path, table="series_data"):
+    with sqlite3.connect(db_path) as conn:
+        return {row[0] for row in conn.execute(f"SELECT DISTINCT series_id FROM {table}")}
+
+
+class TestSnapshot:
+    """Test export, verification and restore."""
+
+    def test_round_trip(self, cache, temp_config_dir):
+        snapshot = temp_config_dir / "snapshots" / "cache.db.gz"
+        info = export_snapshot(snapshot, cache.db_path)
+        assert info.series == 2
+        assert json.loads(manifest_path(snapshot).read_text())["sha256"] == info.sha256
+        assert verify_snapshot(snapshot) == info
+
+        target = temp_config_dir / "node" / "data_cache.db"
+        restore_snapshot(snapshot, target)
+        assert series_in(target) == {"GDP", "GDPC1"}
+        with sqlite3.connect(target) as conn, sqlite3.connect(cache.db_path) as live:
+            query = "SELECT * FROM series_data ORDER BY series_id, date"
+            assert conn.execute(query).fetchall() == live.execute(query).fetchall()
+
+    def test_includes_other_sources(self, cache, temp_config_dir):
+        edgar = EDGARClient(user_agent="x", cache_dir=str(temp_config_dir / "cache"))
+        edgar.ingest_company_facts(320193, stream=io.BytesIO(b'{"cik": 320193, "facts": {}}'))
+        snapshot = temp_config_dir / "cache.db.gz"
+        export_snapshot(snapshot, cache.db_path)
+        target = temp_config_dir / "node" / "data_cache.db"
+        restore_snapshot(snapshot, target)
+        with sqlite3.connect(target) as conn:
+            assert conn.execute("SELECT cik FROM companies").fetchall() == [(320193,)]
+
+    def test_restore_subset(self, cache, temp_config_dir):
+        snapshot = temp_config_dir / "cache.db.gz"
+        export_snapshot(snapshot, cache.db_path)
+        target = temp_config_dir / "node" / "data_cache.db"
+        restore_snapshot(snapshot, target, series_ids=["GDP"])
+        for table in ("series_data", "series_metadata", "series_versions", "series_rollups",
+                      "series_quality"):
+            assert series_in(target, table) == {"GDP"}
+
+    def test_corrupt_snapshot_leaves_cache_alone(self, cache, temp_config_dir):
+        snapshot = temp_config_dir / "cache.db.gz"
+        export_snapshot(snapshot, cache.db_path)
+        data = bytearray(snapshot.read_bytes())
+        data[len(data) // 2] ^= 0xFF
+        snapshot.write_bytes(bytes(data))
+
+        target = temp_config_dir / "node" / "data_cache.db"
+        target.parent.mkdir()
+        target.write_bytes(b"live cache")
+        with pytest.raises(SnapshotError, match="checksum"):
+            restore_snapshot(snapshot, target)
+        assert target.read_bytes() == b"live cache"
+        assert not target.with_name("data_cache.db.restore").exists()
+
+    def test_missing_manifest(self, cache, temp_config_dir):
+        snapshot = temp_config_dir / "cache.db.gz"
+        export_snapshot(snapshot, cache.db_path)
+        manifest_path(snapshot).unlink()
+        with pytest.raises(SnapshotError):
+            verify_snapshot(snapshot)
@@ -0,0 +1,84 @@
+"""Tests for the ring-buffer tick store and OHLCV bars."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.data.tick_store import TICK_DTYPE, RingBuffer, TickStore
+
+
+def records(times):
+    out = np.zeros(len(times), dtype=TICK_DTYPE)
+    out["time"] = times
+    return out
+
+
+class TestRingBuffer:
+    """Test the fixed-size circular buffer."""
+
+    def test_wraps_and_keeps_order(self):
+        ring = RingBuffer(4, TICK_DTYPE)
+        ring.extend(records([1, 2, 3]))
+        ring.extend(records([4, 5]))
+        assert len(ring) == 4
+        assert ring.to_array()["time"].tolist() == [2, 3, 4, 5]
+        assert ring.last["time"] == 5
+
+    def test_batch_larger_than_capacity(self):
+        ring = RingBuffer(3, TICK_DTYPE)
+        ring.extend(records([1]))
+        ring.extend(records(range(10, 20)))
+        assert ring.to_array()["time"].tolist() == [17, 18, 19]
+
+    def test_last_is_writable_view(self):
+        ring = RingBuffer(2, TICK_DTYPE)
+        ring.extend(records([1]))
+        ring.last["price"] = 9.0
+        assert ring.to_array()["price"][0] == 9.0
+
+
+class TestTickStore:
+    """Test tick recording and incremental bars."""
+
+    def test_bars_match_full_resample(self):
+        rng = np.random.default_rng(0)
+        times = np.sort(rng.uniform(0, 3 * 3600, 2000))
+        prices = 100 + rng.standard_normal(2000).cumsum()
+        volumes = rng.uniform(0, 5, 2000)
+
+        store = TickStore()
+        # Mix single ticks and batches, as polling and backfills would.
+        for i in range(0, 100):
+            store.append("btc", times[i], prices[i], volumes[i])
+        for chunk in np.array_split(np.arange(100, 2000), 7):
+            store.extend("btc", times[chunk], prices[chunk], volumes[chunk])
+
+        ticks = pd.DataFrame({"price": prices, "volume": volumes},
+                             index=pd.to_datetime(times, unit="s", utc=True))
+        for interval, rule in (("1m", "1min"), ("1h", "1h")):
+            resampled = ticks.resample(rule)
+            expected = resampled["price"].ohlc().assign(volume=resampled["volume"].sum()).dropna()
+            bars = store.bars("btc", interval)
+            np.testing.assert_allclose(bars[["open", "high", "low", "close", "volume"]].to_numpy(),
+                                       expected.to_numpy())
+            assert (bars.index == expected.index).all()
+
+    def test_out_of_order_ticks_dropped(self):
+        store = TickStore()
+        store.extend("eth", [10, 20], [1.0, 2.0])
+        assert store.extend("eth", [5, 30], [9.0, 3.0]) == 1
+        assert store.dropped("eth") == 1
+        assert store.ticks("eth")["price"].tolist() == [1.0, 2.0, 3.0]
+
+    def test_tick_capacity_bounds_memory_not_bars(self):
+        store = TickStore(capacity=10)
+        store.extend("sol", np.arange(0, 6000, 60.0), np.arange(100.0))
+        assert len(store.ticks("sol")) == 10
+        assert len(store.bars("sol", "1m")) == 100
+
+    def test_unknown_interval(self):
+        store = TickStore(intervals=("1m",))
+        with pytest.raises(ValueError):
+            store.bars("btc", "1h")
+        with pytest.raises(ValueError):
+            TickStore(intervals=("5m",))
@@ -0,0 +1,101 @@
+"""Tests for the bitemporal vintage store and real-time FRED queries."""
+
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.data.vintages import VintageStore
+
+
+def releases(rows):
+    """An all-releases frame from ``(date, realtime_start, value)`` rows."""
+    frame = pd.DataFrame(rows, columns=["date", "realtime_start", "value"])
+    frame["date"] = pd.to_datetime(frame["date"])
+    frame["realtime_start"] = pd.to_datetime(frame["realtime_start"])
+    return frame
+
+
+# GDP for 2013Q4 and 2014Q1 as published over four vintages; the last
+# vintage republishes 2013Q4 unchanged.
+GDP_RELEASES = releases([
+    ("2013-10-01", "2014-01-30", 17102.5),
+    ("2013-10-01", "2014-02-28", 17080.7),
+    ("2013-10-01", "2014-03-27", 17089.6),
+    ("2013-10-01", "2014-04-30", 17089.6),
+    ("2014-01-01", "2014-04-30", 17149.6),
+    ("2014-01-01", "2014-05-29", np.nan),
+])
+
+
+@pytest.fixture
+def store(temp_config_dir):
+    return VintageStore(temp_config_dir / "vintages.db")
+
+
+class TestVintageStore:
+    """Test delta storage and point-in-time queries."""
+
+    def test_stores_only_changes(self, store):
+        assert store.ingest("GDP", GDP_RELEASES) == 5
+        stored = store.all_releases("GDP")
+        assert stored["realtime_start"].dt.strftime("%Y-%m-%d").tolist() == [
+            "2014-01-30", "2014-02-28", "2014-03-27", "2014-04-30", "2014-05-29"]
+
+    def test_as_of(self, store):
+        store.ingest("GDP", GDP_RELEASES)
+        assert store.as_of("GDP", "2014-01-29").empty
+        assert store.as_of("GDP", "2014-02-01").tolist() == [17102.5]
+        assert store.as_of("GDP", "2014-03-27").tolist() == [17089.6]
+        as_of = store.as_of("GDP", "2014-05-01")
+        assert as_of.index.strftime("%Y-%m-%d").tolist() == ["2013-10-01", "2014-01-01"]
+        assert as_of.tolist() == [17089.6, 17149.6]
+        # Withdrawn as missing by the last vintage
+        assert store.as_of("GDP", "2014-06-01").tolist() == [17089.6]
+        assert store.as_of("GDP", "2014-05-01", start_date="2014-01-01").tolist() == [17149.6]
+
+    def test_overlapping_ingest_adds_nothing(self, store):
+        store.ingest("GDP", GDP_RELEASES)
+        assert store.ingest("GDP", GDP_RELEASES.iloc[2:]) == 0
+        revision = releases([("2014-01-01", "2014-06-26", 17101.3)])
+        assert store.ingest("GDP", revision) == 1
+        assert store.as_of("GDP", "2014-07-01").tolist() == [17089.6, 17101.3]
+
+    def test_point_in_time_uses_primary_key(self, store):
+        with sqlite3.connect(store.db_path) as conn:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT date, value, MAX(realtime_start) FROM series_vintages "
+                "WHERE series_id = ? AND realtime_start <= ? GROUP BY date", ["GDP", "2014-01-01"]
+            ).fetchall()
+        assert "PRIMARY KEY" in " ".join(row[-1] for row in plan)
+
+
+class TestMinerVintages:
+    """Test vintage-aware retrieval through the FRED client."""
+
+    def test_as_of_downloads_once(self, fred_miner, mock_fred_api):
+        fred = mock_fred_api.return_value
+        fred.get_series_all_releases.return_value = GDP_RELEASES
+        fred_miner.fred = fred
+
+        assert fred_miner.get_series_as_of("GDP", "2014-03-01").tolist() == [17080.7]
+        assert fred_miner.get_series_as_of("GDP", pd.Timestamp("2014-05-01")).tolist() == [
+            17089.6, 17149.6]
+        assert len(fred_miner.get_series_all_releases("GDP")) == 5
+        assert fred.get_series_all_releases.call_count == 1
+        assert fred.get_series_all_releases.call_args.kwargs["realtime_start"] is None
+
+    def test_falls_back_to_stored_vintages(self, fred_miner, mock_fred_api):
+        fred = mock_fred_api.return_value
+        fred.get_series_all_releases.return_value = GDP_RELEASES
+        fred_miner.fred = fred
+        fred_miner.update_vintages("GDP")
+        fred.get_series_all_releases.side_effect = ConnectionError("down")
+        fred_miner.max_age = pd.Timedelta(0)
+
+        # Newer than the last download, so FRED is asked and fails
+        assert fred_miner.get_series_as_of("GDP", "2099-01-01").tolist() == [17089.6]
+        assert fred.get_series_all_releases.call_args.kwargs["realtime_start"] == "2014-05-29"
+        with pytest.raises(ConnectionError):
+            fred_miner.get_series_as_of("UNRATE", "2014-01-01")